@@ -3,6 +3,7 @@ Builder Pattern para construção complexa do sistema de alocação de salas.
 Permite construção flexível e configurável do sistema.
 """
 
+import pandas as pd
 from typing import List, Optional, Dict, Any
 from ..models.domain import Materia, Sala, Subject
 from ..strategies.interfaces import CompatibilidadeStrategy, CompatibilidadePadrao, Validator, ValidatorPadrao
@@ -164,23 +165,12 @@ class AlocadorSalasRefatorado:
     
     def validar_sistema(self) -> List[str]:
         """Valida todo o sistema"""
-        erros = []
-        
-        # Validar matérias
-        for materia in self.materias:
-            erros.extend(self.validator.validar_materia(materia))
-        
-        # Validar salas
-        for sala in self.salas:
-            erros.extend(self.validator.validar_sala(sala))
-        
-        # Validar compatibilidades
-        for materia in self.materias:
-            salas_compatíveis = self._filtrar_salas_compatíveis(materia)
-            if not salas_compatíveis:
-                erros.append(f"Nenhuma sala compatível encontrada para matéria {materia.nome}")
-        
-        return erros
+        return self.validator.formatar_erros(self.validar_sistema_tabela())
+    
+    def validar_sistema_tabela(self) -> pd.DataFrame:
+        """Valida matérias, salas e compatibilidades em lote, com índices das linhas"""
+        return self.validator.validar_lote(self.materias, self.salas,
+                                           self.compatibilidade_strategy)
     
     def _filtrar_salas_compatíveis(self, materia: Materia) -> List[Sala]:
         """Filtra salas compatíveis com a matéria"""
@@ -3,122 +3,162 @@ Facade para alocação de salas usando programação linear
 Implementa padrões de projeto: Factory, Builder, Strategy, Repository, Observer, Facade
 """
 
-from typing import Dict, Any, List
-from ..models.domain import Observer
+from typing import Dict, Any, List, Optional
+from ..models.domain import Observer, DeltaAlocacao
 from ..factories.creators import FactoryManager
 from ..builders.constructors import AlocadorBuilder
 from ..repositories.alocacao_repo import AlocacaoLinearStrategy, AlocacaoRepository, AlocacaoManager
 from ..services.data_loader import CarregadorDadosRefatorado
+from ..services.cache_alocacao import AlocacaoMemoizadaStrategy, CacheResultadosAlocacao
+from ..services.barramento_eventos import BarramentoEventos
 from ..strategies.interfaces import CompatibilidadePadrao
+from ..utils.instrumentacao import exportar_jsonl, exportar_prometheus
+from ..utils.perfil import PerfiladorExecucao
 
 
-class ConsoleObserver(Observer):
-    """Observador para exibir progresso no console"""
+class RelatorioAlocacoesConsole:
+    """Relatório detalhado por sala e por horário, renderizado apenas quando exibido"""
 
-    def on_progress(self, etapa: str, progresso: float):
-        print(f"[{progresso:5.1f}%] {etapa}")
+    def __init__(self, alocacoes):
+        self.alocacoes = list(alocacoes)
+        self._texto: Optional[str] = None
 
-    def on_sucesso(self, resultado):
-        print(f"Alocação concluída com sucesso!")
-        print(f"  {resultado.metricas['total_alocacoes']} matérias alocadas")
-        print(f"  Utilização média: {resultado.metricas['utilizacao_media']:.1f}%")
-        print(f"  Salas utilizadas: {len(set(a.sala.id for a in resultado.alocacoes))}")
-        print(f"  Custo total: R$ {resultado.metricas.get('custo_total', 0):.2f}")
-        self._mostrar_resumo_por_sala(resultado.alocacoes)
+    def __str__(self) -> str:
+        if self._texto is None:
+            self._texto = "\n".join(self._linhas_por_sala() + self._linhas_por_horario())
+        return self._texto
 
-    def on_erro(self, erro: str):
-        print(f"Erro na alocação: {erro}")
+    def _linhas_por_sala(self) -> List[str]:
+        """Resumo das alocações por sala"""
+        if not self.alocacoes:
+            return []
 
-    def _mostrar_resumo_por_sala(self, alocacoes):
-        """Mostra resumo das alocações por sala"""
-        if not alocacoes:
-            return
-
-        print("\n" + "="*80)
-        print("RESUMO DAS ALOCAÇÕES POR SALA")
-        print("="*80)
+        linhas = ["\n" + "="*80, "RESUMO DAS ALOCAÇÕES POR SALA", "="*80]
 
         # Agrupar alocações por sala
         salas_materias = {}
-        for alocacao in alocacoes:
+        for alocacao in self.alocacoes:
             sala_id = alocacao.sala.id
             if sala_id not in salas_materias:
                 salas_materias[sala_id] = {'sala': alocacao.sala, 'materias': []}
             salas_materias[sala_id]['materias'].append(alocacao)
 
-        # Mostrar resumo por sala
         for sala_id in sorted(salas_materias.keys()):
             info_sala = salas_materias[sala_id]
             sala = info_sala['sala']
             materias = info_sala['materias']
 
-            total_alunos = sum(m.inscritos for m in [a.materia for a in materias])
+            total_alunos = sum(a.materia.inscritos for a in materias)
             utilizacao_media = sum(a.utilizacao_percentual for a in materias) / len(materias)
 
-            print(f"\n{sala.nome}")
-            print(f"   {sala.local.value.upper()} | {sala.tipo.value.upper()} | {sala.capacidade} lugares")
-            print(f"   {len(materias)} matérias | {total_alunos} alunos | {utilizacao_media:.1f}% utilização")
-            print("   " + "-"*60)
+            linhas.append(f"\n{sala.nome}")
+            linhas.append(f"   {sala.local.value.upper()} | {sala.tipo.value.upper()} | {sala.capacidade} lugares")
+            linhas.append(f"   {len(materias)} matérias | {total_alunos} alunos | {utilizacao_media:.1f}% utilização")
+            linhas.append("   " + "-"*60)
 
             for alocacao in sorted(materias, key=lambda a: a.materia.nome):
                 materia = alocacao.materia
                 lab_info = " [LAB]" if materia.material > 0 else ""
-                print(f"   • {materia.nome}{lab_info}")
-                print(f"     {materia.horario}")
-                print(f"     {materia.inscritos} alunos | {alocacao.utilizacao_percentual:.1f}% | {alocacao.espaco_ocioso} vagas ociosas")
+                linhas.append(f"   • {materia.nome}{lab_info}")
+                linhas.append(f"     {materia.horario}")
+                linhas.append(f"     {materia.inscritos} alunos | {alocacao.utilizacao_percentual:.1f}% | {alocacao.espaco_ocioso} vagas ociosas")
 
-        self._mostrar_resumo_por_horario(alocacoes)
+        return linhas
 
-    def _mostrar_resumo_por_horario(self, alocacoes):
-        """Mostra resumo das alocações por horário"""
-        if not alocacoes:
-            return
+    def _linhas_por_horario(self) -> List[str]:
+        """Resumo das alocações por horário"""
+        if not self.alocacoes:
+            return []
 
-        print("\n" + "="*80)
-        print("RESUMO DAS ALOCAÇÕES POR HORÁRIO")
-        print("="*80)
+        linhas = ["\n" + "="*80, "RESUMO DAS ALOCAÇÕES POR HORÁRIO", "="*80]
 
         # Agrupar alocações por horário
         horarios_materias = {}
-        for alocacao in alocacoes:
-            horario = alocacao.materia.horario
-            if horario not in horarios_materias:
-                horarios_materias[horario] = []
-            horarios_materias[horario].append(alocacao)
+        for alocacao in self.alocacoes:
+            horarios_materias.setdefault(alocacao.materia.horario, []).append(alocacao)
 
-        # Mostrar resumo por horário
         for horario in sorted(horarios_materias.keys()):
             materias_horario = horarios_materias[horario]
-            total_alunos = sum(m.inscritos for m in [a.materia for a in materias_horario])
+            total_alunos = sum(a.materia.inscritos for a in materias_horario)
 
-            print(f"\n{horario}")
-            print(f"   {len(materias_horario)} matérias | {total_alunos} alunos")
-            print("   " + "-"*60)
+            linhas.append(f"\n{horario}")
+            linhas.append(f"   {len(materias_horario)} matérias | {total_alunos} alunos")
+            linhas.append("   " + "-"*60)
 
             for alocacao in sorted(materias_horario, key=lambda a: a.materia.nome):
                 materia = alocacao.materia
                 sala = alocacao.sala
                 lab_info = " [LAB]" if materia.material > 0 else ""
-                print(f"   • {materia.nome}{lab_info}")
-                print(f"     {sala.nome} ({sala.tipo.value.upper()}) - {sala.local.value.upper()}")
-                print(f"     {materia.inscritos}/{sala.capacidade} | {alocacao.utilizacao_percentual:.1f}% | {alocacao.espaco_ocioso} vagas")
+                linhas.append(f"   • {materia.nome}{lab_info}")
+                linhas.append(f"     {sala.nome} ({sala.tipo.value.upper()}) - {sala.local.value.upper()}")
+                linhas.append(f"     {materia.inscritos}/{sala.capacidade} | {alocacao.utilizacao_percentual:.1f}% | {alocacao.espaco_ocioso} vagas")
+
+        return linhas
+
+
+class ConsoleObserver(Observer):
+    """Observador para exibir progresso no console"""
+
+    def __init__(self, detalhado: bool = False):
+        # O relatório por sala e por horário percorre todas as alocações; só é impresso sob pedido
+        self.detalhado = detalhado
+        self.ultimo_relatorio: Optional[RelatorioAlocacoesConsole] = None
+
+    def on_progress(self, etapa: str, progresso: float):
+        print(f"[{progresso:5.1f}%] {etapa}")
+
+    def on_sucesso(self, resultado):
+        print("\n".join([
+            "Alocação concluída com sucesso!",
+            f"  {resultado.metricas.get('total_alocacoes', 0)} matérias alocadas",
+            f"  Utilização média: {resultado.metricas.get('utilizacao_media', 0):.1f}%",
+            f"  Salas utilizadas: {len(set(a.sala.id for a in resultado.alocacoes))}",
+            f"  Custo total: R$ {resultado.metricas.get('custo_total', 0):.2f}",
+        ]))
+        # O relatório detalhado só é montado se for exibido
+        self.ultimo_relatorio = RelatorioAlocacoesConsole(resultado.alocacoes)
+        if self.detalhado:
+            self.imprimir_relatorio()
+
+    def imprimir_relatorio(self):
+        """Imprime o relatório detalhado da última alocação bem-sucedida"""
+        if self.ultimo_relatorio is not None and self.ultimo_relatorio.alocacoes:
+            print(self.ultimo_relatorio)
+
+    def on_erro(self, erro: str):
+        print(f"Erro na alocação: {erro}")
+
+    def on_evento(self, evento: Dict[str, Any]):
+        if evento.get('tipo') == 'resumo':
+            print(f"Tempo total: {evento['tempo_parede']:.3f}s (CPU {evento['tempo_cpu']:.3f}s)")
 
 
 class SistemaAlocacaoFacade:
     """Facade para alocação de salas usando programação linear"""
 
-    def __init__(self):
+    def __init__(self, diretorio_cache: Optional[str] = None, perfil: Optional[bool] = None,
+                 diretorio_perfil: str = "perfis", relatorio_detalhado: bool = False):
         self.factory_manager = FactoryManager()
         self.observers: List[Observer] = []
-        self._adicionar_observador_padrao()
-
-    def _adicionar_observador_padrao(self):
+        self.cache_resultados = CacheResultadosAlocacao(diretorio=diretorio_cache)
+        # Perfilamento opcional (flag ou variável ALOCACAO_PROFILE)
+        self.perfilador = PerfiladorExecucao(diretorio_perfil, habilitado=perfil)
+        # Observadores recebem os eventos em segundo plano, fora do caminho da alocação
+        self.barramento = BarramentoEventos()
+        self._adicionar_observador_padrao(relatorio_detalhado)
+
+    def _adicionar_observador_padrao(self, relatorio_detalhado: bool = False):
         """Adiciona observador padrão"""
-        self.observers.append(ConsoleObserver())
+        self.adicionar_observador(ConsoleObserver(relatorio_detalhado))
 
     def adicionar_observador(self, observer: Observer):
         """Adiciona observador personalizado"""
         self.observers.append(observer)
+        self.barramento.inscrever(observer)
+
+    def fechar(self):
+        """Entrega os eventos pendentes e encerra as threads dos observadores"""
+        self.barramento.fechar()
 
     def criar_sistema_basico(self) -> Dict[str, Any]:
         """Cria um sistema básico para demonstração"""
@@ -179,28 +219,76 @@ class SistemaAlocacaoFacade:
         for sala in salas:
             repository.salvar_sala(sala)
 
-        # Configurar estratégia e manager
-        strategy = AlocacaoLinearStrategy(CompatibilidadePadrao())
+        # Configurar estratégia (memoizada pela impressão digital das entradas) e manager
+        strategy = AlocacaoMemoizadaStrategy(AlocacaoLinearStrategy(CompatibilidadePadrao()),
+                                             self.cache_resultados)
         manager = AlocacaoManager(repository)
         manager.definir_estrategia(strategy)
 
-        # Adicionar observadores
-        for observer in self.observers:
-            manager.adicionar_observer(observer)
+        # Observadores são notificados pelo barramento
+        manager.adicionar_observer(self.barramento)
+
+        # Manter o manager para realocações incrementais posteriores
+        sistema['manager'] = manager
 
         # Executar alocação
-        resultado = manager.executar_alocacao()
+        with self.perfilador.secao('alocacao'):
+            resultado = manager.executar_alocacao()
+        self.barramento.descarregar()
+        return self._formatar_resultado(manager, resultado)
+
+    def executar_realocacao_incremental(self, sistema: Dict[str, Any], delta: DeltaAlocacao) -> Dict[str, Any]:
+        """Reotimiza apenas as matérias afetadas pelo delta desde a última alocação"""
+        manager = sistema.get('manager')
+        if manager is None:
+            return {'sucesso': False, 'erro': "Execute a alocação completa antes da incremental"}
+
+        resultado = manager.executar_alocacao_incremental(delta)
+        self.barramento.descarregar()
+        if resultado.sucesso:
+            sistema['materias'] = manager.repository.buscar_materias()
+            sistema['salas'] = manager.repository.buscar_salas()
+        return self._formatar_resultado(manager, resultado)
 
+    def _formatar_resultado(self, manager: AlocacaoManager, resultado) -> Dict[str, Any]:
+        """Monta o dicionário de retorno de uma alocação"""
         if resultado.sucesso:
             df_resultados = manager.obter_resultados_dataframe()
             return {
                 'sucesso': True,
                 'resultado': resultado,
                 'dataframe': df_resultados,
-                'metricas': resultado.metricas
+                'metricas': resultado.metricas,
+                'instrumentacao': resultado.instrumentacao
             }
         else:
-            return {'sucesso': False, 'erro': resultado.erro}
+            return {'sucesso': False, 'erro': resultado.erro,
+                    'instrumentacao': getattr(resultado, 'instrumentacao', None),
+                    'diagnostico': getattr(resultado, 'diagnostico', None)}
+
+    def gerar_pdf(self, resultado, arquivo: str = "horario_alocacao.pdf") -> bool:
+        """Gera o PDF de horários de uma alocação"""
+        try:
+            from pdf_generator import create_timetable_pdf_from_alocacoes
+        except ImportError as e:
+            print(f"Geração de PDF indisponível: {e}")
+            return False
+
+        with self.perfilador.secao('pdf'):
+            return create_timetable_pdf_from_alocacoes(resultado, arquivo)
+
+    def exportar_instrumentacao(self, resultado: Dict[str, Any], caminho_jsonl: Optional[str] = None,
+                                caminho_prometheus: Optional[str] = None,
+                                rotulos: Optional[Dict[str, Any]] = None) -> bool:
+        """Exporta as medições por fase de uma alocação em JSON lines e/ou Prometheus"""
+        instrumentacao = resultado.get('instrumentacao')
+        if instrumentacao is None:
+            return False
+        if caminho_jsonl:
+            exportar_jsonl(instrumentacao, caminho_jsonl, rotulos)
+        if caminho_prometheus:
+            exportar_prometheus(instrumentacao, caminho_prometheus, rotulos)
+        return True
 
     def carregar_dados_reais(self, arquivo_csv: str = "oferta_cc_2025_1.csv") -> Dict[str, Any]:
         """Carrega dados reais de um arquivo CSV"""
@@ -211,14 +299,15 @@ class SistemaAlocacaoFacade:
         try:
             carregador = CarregadorDadosRefatorado()
 
-            # Adicionar observadores
-            for observer in self.observers:
-                carregador.adicionar_observer(observer)
+            # Observadores são notificados pelo barramento
+            carregador.adicionar_observer(self.barramento)
 
             # Carregar dados
-            repository = carregador.carregar_dados_csv(arquivo_csv)
-            materias = list(repository.buscar_materias())
-            salas = list(repository.buscar_salas())
+            with self.perfilador.secao('carregamento'):
+                repository = carregador.carregar_dados_csv(arquivo_csv)
+                materias = list(repository.buscar_materias())
+                salas = list(repository.buscar_salas())
+            self.barramento.descarregar()
 
             # Mostrar estatísticas
             self._mostrar_estatisticas_dados(materias, salas)
@@ -244,9 +333,11 @@ class SistemaAlocacaoFacade:
             }
 
         except FileNotFoundError:
+            self.barramento.descarregar()
             print(f"Arquivo {arquivo_csv} não encontrado")
             return {'sucesso': False, 'erro': 'Arquivo não encontrado'}
         except Exception as e:
+            self.barramento.descarregar()
             print(f"Erro ao carregar dados: {e}")
             return {'sucesso': False, 'erro': str(e)}
 
@@ -45,7 +45,9 @@ class MateriaFactoryPadrao(MateriaFactory):
             nome=str(dados['nome']),
             inscritos=int(dados['inscritos']),
             horario=str(dados['horario']),
-            material=int(material)
+            material=int(material),
+            docente=str(dados.get('docente', '')),
+            curso=str(dados.get('curso', ''))
         )
 
 
@@ -134,7 +136,9 @@ class MateriaFactoryCSV(MateriaFactory):
             'nome': 'nome',
             'matriculados': 'inscritos',
             'horario': 'horario',
-            'material': 'material'  # Adicionar campo material
+            'material': 'material',  # Adicionar campo material
+            'docente': 'docente',
+            'curso': 'curso'
         }
 
         dados_normalizados = {}
@@ -10,14 +10,19 @@ import os
 # Adicionar o diretório pai ao path para permitir imports absolutos
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def main():
+def main(argv=None):
     """Função principal do sistema"""
+    argv = sys.argv[1:] if argv is None else argv
     print("=== SISTEMA DE ALOCAÇÃO DE SALAS ===")
     print("Carregando ofertas de CC e Engenharia com todas as salas do IC...\n")
 
     try:
         from app.services.data_loader import SistemaCompletoRefatorado
         from app.core.facade import SistemaAlocacaoFacade
+        from app.utils.perfil import PerfiladorExecucao
+
+        # Perfilamento opcional: --perfil ou ALOCACAO_PROFILE=1
+        perfilador = PerfiladorExecucao(habilitado=True if '--perfil' in argv else None)
 
         # Carregar dados de ambas as ofertas
         sistema = SistemaCompletoRefatorado()
@@ -25,15 +30,17 @@ def main():
         print("="*60)
         print("CARREGANDO OFERTA DE CIÊNCIA DA COMPUTAÇÃO")
         print("="*60)
-        repository_cc = sistema.carregar_dados_csv('oferta_cc_2025_1.csv')
-        materias_cc = list(repository_cc.buscar_materias())
+        with perfilador.secao('carregamento_cc'):
+            repository_cc = sistema.carregar_dados_csv('oferta_cc_2025_1.csv')
+            materias_cc = list(repository_cc.buscar_materias())
         print(f"OK - {len(materias_cc)} matérias de CC carregadas")
 
         print("\n" + "="*60)
         print("CARREGANDO OFERTA DE ENGENHARIA DE COMPUTAÇÃO")
         print("="*60)
-        repository_ec = sistema.carregar_dados_csv('oferta_ec_2025_1.csv')
-        materias_ec = list(repository_ec.buscar_materias())
+        with perfilador.secao('carregamento_ec'):
+            repository_ec = sistema.carregar_dados_csv('oferta_ec_2025_1.csv')
+            materias_ec = list(repository_ec.buscar_materias())
         print(f"OK - {len(materias_ec)} matérias de Engenharia carregadas")
 
         # Detectar e tratar matérias compartilhadas entre as ofertas
@@ -156,7 +163,8 @@ def main():
         compatibilidade = CompatibilidadePadrao()
         alocador = AlocacaoLinearStrategy(compatibilidade)
 
-        resultado = alocador.alocar(todas_materias, todas_salas)
+        with perfilador.secao('alocacao'):
+            resultado = alocador.alocar(todas_materias, todas_salas)
 
         if resultado.sucesso:
             print("OK - Alocação executada com sucesso!")
@@ -232,6 +240,9 @@ def main():
         print("Interface simplificada e experiência do usuário melhorada!")
         print("="*80)
 
+        if perfilador.diretorio_execucao:
+            print(f"\nPerfil da execução salvo em: {perfilador.diretorio_execucao}")
+
     except FileNotFoundError as e:
         print(f"Erro: {e}")
         return False
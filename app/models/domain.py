@@ -5,7 +5,7 @@ Implementa entidades principais com validação e comportamento encapsulado.
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Set, Optional
+from typing import List, Set, Optional, Any, Dict
 from abc import ABC, abstractmethod
 
 
@@ -31,6 +31,8 @@ class Materia:
     inscritos: int
     horario: str  # Formato: "Segunda 14:00-16:00"
     material: int  # 0 = nenhum, 1 = computadores, 2 = robótica, 3 = eletrônica
+    docente: str = ""  # vários docentes separados por ';'
+    curso: str = ""  # oferta (currículo ou trilha) de origem
 
     def __post_init__(self):
         """Validação pós-inicialização"""
@@ -105,6 +107,18 @@ class AlocacaoResultado:
         self.alocacoes = alocacoes or []
         self.erro = erro
         self.metricas = self._calcular_metricas() if sucesso else None
+        self.instrumentacao: Optional[Any] = None  # medições por fase (utils.instrumentacao)
+        self.diagnostico: Optional[Any] = None  # gargalos detectados antes do solver (services.analise_viabilidade)
+        self._tabela = None
+
+    @property
+    def tabela(self):
+        """Tabela colunar das alocações (services.tabela_resultados), construída na primeira leitura"""
+        # getattr: resultados serializados antes deste atributo existir (cache em disco)
+        if getattr(self, '_tabela', None) is None:
+            from ..services.tabela_resultados import construir_tabela_alocacoes
+            self._tabela = construir_tabela_alocacoes(self.alocacoes)
+        return self._tabela
 
     def _calcular_metricas(self) -> dict:
         """Calcula métricas do resultado"""
@@ -139,6 +153,20 @@ class AlocacaoResultado:
         }
 
 
+@dataclass
+class DeltaAlocacao:
+    """Alterações de dados desde a última alocação"""
+    materias_alteradas: List[Materia] = field(default_factory=list)  # novas ou modificadas
+    materias_removidas: List[str] = field(default_factory=list)
+    salas_alteradas: List[Sala] = field(default_factory=list)  # novas ou modificadas
+    salas_removidas: List[str] = field(default_factory=list)
+
+    def vazio(self) -> bool:
+        """Indica se não há alterações"""
+        return not (self.materias_alteradas or self.materias_removidas or
+                    self.salas_alteradas or self.salas_removidas)
+
+
 class Observer(ABC):
     """Interface para observadores do processo de alocação"""
 
@@ -157,6 +185,10 @@ class Observer(ABC):
         """Notifica erro na alocação"""
         pass
 
+    def on_evento(self, evento: Dict[str, Any]):
+        """Notifica evento estruturado (ex: medições de fase); opcional"""
+        pass
+
 
 class Subject:
     """Sujeito para padrão Observer"""
@@ -186,3 +218,8 @@ class Subject:
         """Notifica erro para todos os observadores"""
         for observer in self._observers:
             observer.on_erro(erro)
+
+    def notificar_evento(self, evento: Dict[str, Any]):
+        """Notifica evento estruturado para todos os observadores"""
+        for observer in self._observers:
+            observer.on_evento(evento)
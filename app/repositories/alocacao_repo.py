@@ -3,21 +3,50 @@ Repositório e algoritmo de alocação refatorado.
 Implementa Repository Pattern e Strategy Pattern para algoritmos de alocação.
 """
 
+import bisect
+import copy
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pulp
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Optional, Any
-from ..models.domain import Materia, Sala, Alocacao, AlocacaoResultado, Subject
-from ..strategies.interfaces import AlocacaoStrategy, CompatibilidadeStrategy, CompatibilidadePadrao, SolverStrategy
+from types import MappingProxyType
+from typing import List, Dict, Set, Optional, Any, Tuple, Mapping, ValuesView
+from ..models.domain import Materia, Sala, Alocacao, AlocacaoResultado, Subject, LocalSala, DeltaAlocacao
+from ..strategies.interfaces import (AlocacaoStrategy, CompatibilidadeStrategy, CompatibilidadePadrao,
+                                     CompatibilidadeComOcupacao, SolverStrategy, Repository)
 from ..factories.creators import FactoryManager
-
-
-class AlocacaoRepository:
+from ..utils.horarios import extrair_slots_tempo
+from ..utils.instrumentacao import Instrumentacao
+from ..services.execucao_async import ExecutorAlocacao, TrabalhoAlocacao, obter_executor_padrao
+from ..services.tamanho_modelo import (EstatisticasModelo, LimitesModelo, AcaoExcessoModelo,
+                                       agrupar_indices_por_slot, calcular_estatisticas_modelo,
+                                       componentes_independentes)
+from ..services.analise_viabilidade import RelatorioViabilidade, analisar_viabilidade
+from ..services.atribuicao import atribuicao_custo_minimo, SEM_ATRIBUICAO
+from ..services.tabela_resultados import construir_tabela_alocacoes
+
+
+class AlocacaoRepository(Repository):
     """Repositório para gerenciamento de dados de alocação"""
 
     def __init__(self):
         self.materias: Dict[str, Materia] = {}
         self.salas: Dict[str, Sala] = {}
-        self.alocacoes: List[Alocacao] = []
+        self._alocacoes: Dict[str, Alocacao] = {}
+
+        # Índices secundários, atualizados a cada inclusão ou remoção
+        self._alocacoes_por_sala: Dict[str, Dict[str, Alocacao]] = {}
+        self._alocacoes_por_slot: Dict[str, Dict[str, Alocacao]] = {}
+        self._slots_alocacao: Dict[str, List[str]] = {}
+        self._salas_por_local: Dict[LocalSala, Dict[str, Sala]] = {}
+        self._salas_por_capacidade: List[Tuple[int, str]] = []
+
+    @property
+    def alocacoes(self) -> ValuesView:
+        """Visão somente leitura das alocações"""
+        return self._alocacoes.values()
 
     def salvar_materia(self, materia: Materia) -> bool:
         """Salva uma matéria"""
@@ -30,11 +59,43 @@ class AlocacaoRepository:
     def salvar_sala(self, sala: Sala) -> bool:
         """Salva uma sala"""
         try:
+            if sala.id in self.salas:
+                self._desindexar_sala(self.salas[sala.id])
             self.salas[sala.id] = sala
+            self._salas_por_local.setdefault(sala.local, {})[sala.id] = sala
+            bisect.insort(self._salas_por_capacidade, (sala.capacidade, sala.id))
             return True
         except Exception:
             return False
 
+    def remover_materia(self, materia_id: str) -> bool:
+        """Remove uma matéria e sua alocação"""
+        if materia_id not in self.materias:
+            return False
+        self.remover_alocacao(materia_id)
+        del self.materias[materia_id]
+        return True
+
+    def remover_sala(self, sala_id: str) -> bool:
+        """Remove uma sala e as alocações feitas nela"""
+        sala = self.salas.pop(sala_id, None)
+        if sala is None:
+            return False
+        self._desindexar_sala(sala)
+        for materia_id in list(self._alocacoes_por_sala.get(sala_id, {})):
+            self.remover_alocacao(materia_id)
+        return True
+
+    def _desindexar_sala(self, sala: Sala):
+        """Remove a sala dos índices de local e capacidade"""
+        por_local = self._salas_por_local.get(sala.local)
+        if por_local is not None:
+            por_local.pop(sala.id, None)
+        posicao = bisect.bisect_left(self._salas_por_capacidade, (sala.capacidade, sala.id))
+        if posicao < len(self._salas_por_capacidade) and \
+                self._salas_por_capacidade[posicao] == (sala.capacidade, sala.id):
+            del self._salas_por_capacidade[posicao]
+
     def buscar_materias(self) -> List[Materia]:
         """Busca todas as matérias"""
         return list(self.materias.values())
@@ -54,18 +115,83 @@ class AlocacaoRepository:
     def salvar_alocacao(self, alocacao: Alocacao) -> bool:
         """Salva uma alocação"""
         try:
-            self.alocacoes.append(alocacao)
+            materia_id = alocacao.materia.id
+            if materia_id in self._alocacoes:
+                self.remover_alocacao(materia_id)
+
+            self._alocacoes[materia_id] = alocacao
+            self._alocacoes_por_sala.setdefault(alocacao.sala.id, {})[materia_id] = alocacao
+
+            slots = list(dict.fromkeys(extrair_slots_tempo(alocacao.materia.horario)))
+            self._slots_alocacao[materia_id] = slots
+            for slot in slots:
+                self._alocacoes_por_slot.setdefault(slot, {})[materia_id] = alocacao
             return True
         except Exception:
             return False
 
+    def remover_alocacao(self, materia_id: str) -> bool:
+        """Remove a alocação de uma matéria"""
+        alocacao = self._alocacoes.pop(materia_id, None)
+        if alocacao is None:
+            return False
+
+        por_sala = self._alocacoes_por_sala.get(alocacao.sala.id)
+        if por_sala is not None:
+            por_sala.pop(materia_id, None)
+            if not por_sala:
+                del self._alocacoes_por_sala[alocacao.sala.id]
+
+        for slot in self._slots_alocacao.pop(materia_id, []):
+            por_slot = self._alocacoes_por_slot.get(slot)
+            if por_slot is not None:
+                por_slot.pop(materia_id, None)
+                if not por_slot:
+                    del self._alocacoes_por_slot[slot]
+        return True
+
     def buscar_alocacoes(self) -> List[Alocacao]:
-        """Busca todas as alocações"""
-        return self.alocacoes.copy()
+        """Busca todas as alocações (para iterar sem cópia, use a propriedade alocacoes)"""
+        return list(self._alocacoes.values())
 
     def limpar_alocacoes(self):
         """Limpa todas as alocações"""
-        self.alocacoes.clear()
+        self._alocacoes.clear()
+        self._alocacoes_por_sala.clear()
+        self._alocacoes_por_slot.clear()
+        self._slots_alocacao.clear()
+
+    # Consultas por índice
+    def buscar_alocacoes_por_sala(self, sala_id: str) -> List[Alocacao]:
+        """Busca as alocações de uma sala"""
+        return list(self._alocacoes_por_sala.get(sala_id, {}).values())
+
+    def buscar_alocacoes_por_slot(self, slot: str) -> List[Alocacao]:
+        """Busca as alocações que ocupam um slot (ex: 'Segunda 09:00-09:50')"""
+        return list(self._alocacoes_por_slot.get(slot, {}).values())
+
+    def alocacoes_por_sala(self) -> Mapping[str, Mapping[str, Alocacao]]:
+        """Índice somente leitura sala -> alocações"""
+        return MappingProxyType(self._alocacoes_por_sala)
+
+    def alocacoes_por_slot(self) -> Mapping[str, Mapping[str, Alocacao]]:
+        """Índice somente leitura slot -> alocações"""
+        return MappingProxyType(self._alocacoes_por_slot)
+
+    def buscar_salas_por_local(self, local: LocalSala) -> List[Sala]:
+        """Busca salas de uma localização"""
+        return list(self._salas_por_local.get(local, {}).values())
+
+    def buscar_salas_por_capacidade_minima(self, capacidade: int) -> List[Sala]:
+        """Busca salas com capacidade maior ou igual à informada, da menor para a maior"""
+        inicio = bisect.bisect_left(self._salas_por_capacidade, (capacidade, ''))
+        return [self.salas[sala_id] for _, sala_id in self._salas_por_capacidade[inicio:]]
+
+    def buscar_salas_livres(self, slot: str, capacidade_minima: int = 0) -> List[Sala]:
+        """Busca salas sem alocação no slot informado"""
+        ocupadas = {a.sala.id for a in self._alocacoes_por_slot.get(slot, {}).values()}
+        return [sala for sala in self.buscar_salas_por_capacidade_minima(capacidade_minima)
+                if sala.id not in ocupadas]
 
 
 class PulpSolverStrategy(SolverStrategy):
@@ -100,49 +226,324 @@ class PulpSolverStrategy(SolverStrategy):
 class AlocacaoLinearStrategy(AlocacaoStrategy):
     """Estratégia de alocação usando programação linear inteira"""
 
+    # Último modelo montado; não faz parte da configuração (nem da chave do cache)
+    ATRIBUTOS_EXECUCAO = ('problema', 'variaveis')
+
     def __init__(self, compatibilidade: CompatibilidadeStrategy = None,
-                 solver_strategy: SolverStrategy = None):
+                 solver_strategy: SolverStrategy = None, medir_memoria: bool = False,
+                 limites: Optional[LimitesModelo] = None, verificar_viabilidade: bool = True,
+                 relaxacao_linear: bool = False):
         super().__init__(compatibilidade)
         self.solver_strategy = solver_strategy or PulpSolverStrategy()
+        self.medir_memoria = medir_memoria
+        self.limites = limites
+        self.verificar_viabilidade = verificar_viabilidade
+        # Modo rascunho: resolve só a relaxação linear e arredonda com reparo
+        self.relaxacao_linear = relaxacao_linear
         self.problema = None
         self.variaveis = {}
+        # Estado da última execução fica fora dos atributos públicos, que formam a chave do cache
+        self._ultimas_estatisticas: Optional[EstatisticasModelo] = None
+        self._ultimo_diagnostico: Optional[RelatorioViabilidade] = None
+
+    @property
+    def ultimas_estatisticas(self) -> Optional[EstatisticasModelo]:
+        """Tamanho do modelo da última execução"""
+        return self._ultimas_estatisticas
+
+    @property
+    def ultimo_diagnostico(self) -> Optional[RelatorioViabilidade]:
+        """Análise de viabilidade da última execução"""
+        return self._ultimo_diagnostico
+
+    def estimar_modelo(self, materias: List[Materia], salas: List[Sala]) -> EstatisticasModelo:
+        """Relatório de tamanho do modelo sem montá-lo"""
+        matriz = self.compatibilidade.matriz_compatibilidade(materias, salas)
+        return calcular_estatisticas_modelo(materias, salas, matriz)
 
     def alocar(self, materias: List[Materia], salas: List[Sala]) -> AlocacaoResultado:
         """Executa alocação usando programação linear"""
+        instrumentacao = self._nova_instrumentacao(self.medir_memoria)
+        with instrumentacao:
+            resultado = self._alocar(materias, salas, instrumentacao)
+        resultado.instrumentacao = instrumentacao
+        return resultado
+
+    def _alocar(self, materias: List[Materia], salas: List[Sala],
+                instrumentacao: Instrumentacao) -> AlocacaoResultado:
+        """Executa as fases da alocação, medindo cada uma"""
+        try:
+            self._notificar_progresso("Calculando compatibilidade", 0.0)
+            with instrumentacao.fase('compatibilidade') as fase:
+                matriz = self.compatibilidade.matriz_compatibilidade(materias, salas)
+                fase.contadores.update(self._contar_candidatos(matriz, len(materias), len(salas)))
+
+            # O tamanho é verificado antes de criar qualquer objeto do PuLP
+            with instrumentacao.fase('estatisticas_modelo') as fase:
+                grupos = agrupar_indices_por_slot(materias)
+                estatisticas = calcular_estatisticas_modelo(materias, salas, matriz, grupos)
+                self._ultimas_estatisticas = estatisticas
+                fase.contadores.update(estatisticas.para_contadores())
+
+            # Gargalos por slot são detectados em milissegundos, sem gastar uma execução do solver
+            if self.verificar_viabilidade:
+                self._notificar_progresso("Analisando viabilidade por horário", 10.0)
+                with instrumentacao.fase('viabilidade') as fase:
+                    diagnostico = analisar_viabilidade(materias, salas, self.compatibilidade, matriz, grupos)
+                    self._ultimo_diagnostico = diagnostico
+                    fase.contadores['slots_analisados'] = diagnostico.slots_analisados
+                    fase.contadores['gargalos'] = len(diagnostico.gargalos)
+                    fase.contadores['materias_sem_sala'] = len(diagnostico.materias_sem_sala)
+                if not diagnostico.viavel:
+                    resultado = AlocacaoResultado(sucesso=False, erro=diagnostico.resumo())
+                    resultado.diagnostico = diagnostico
+                    return resultado
+
+            violacoes = self.limites.violacoes(estatisticas) if self.limites else []
+            if violacoes:
+                return self._tratar_excesso(materias, salas, matriz, grupos, estatisticas,
+                                            violacoes, instrumentacao)
+
+            return self._resolver_modelo(materias, salas, matriz, instrumentacao)
+
+        except Exception as e:
+            return AlocacaoResultado(sucesso=False, erro=str(e))
+
+    def _tratar_excesso(self, materias: List[Materia], salas: List[Sala], matriz: np.ndarray,
+                        grupos: Dict[str, List[int]], estatisticas: EstatisticasModelo,
+                        violacoes: List[str], instrumentacao: Instrumentacao) -> AlocacaoResultado:
+        """Aplica a ação configurada para modelos acima dos limites"""
+        acao = self.limites.acao
+        if acao == AcaoExcessoModelo.ERRO:
+            return AlocacaoResultado(
+                sucesso=False,
+                erro=(f"Modelo excede os limites configurados ({'; '.join(violacoes)}): "
+                      f"{estatisticas.resumo()}. Reduza a oferta ou use decomposição/heurística."))
+
+        if acao == AcaoExcessoModelo.HEURISTICA:
+            heuristica = AlocacaoGulosaHorariosStrategy(self.compatibilidade)
+            resultado = heuristica._alocar(materias, salas, instrumentacao, matriz)
+            return self._marcar_modo(resultado, 'heuristica', componentes=1, componentes_heuristica=1)
+
+        return self._resolver_decomposto(materias, salas, matriz, grupos, instrumentacao)
+
+    def _resolver_decomposto(self, materias: List[Materia], salas: List[Sala], matriz: np.ndarray,
+                             grupos: Dict[str, List[int]],
+                             instrumentacao: Instrumentacao) -> AlocacaoResultado:
+        """Resolve cada componente independente separadamente; os que ainda excedem usam a heurística"""
+        with instrumentacao.fase('decomposicao') as fase:
+            componentes = componentes_independentes(materias, matriz, grupos)
+            fase.contadores['componentes'] = len(componentes)
+            fase.contadores['maior_componente'] = max((len(c) for c in componentes), default=0)
+
+        heuristica = AlocacaoGulosaHorariosStrategy(self.compatibilidade)
+        alocacoes = []
+        componentes_heuristica = 0
+        for k, indices in enumerate(componentes):
+            materias_componente = [materias[i] for i in indices]
+            matriz_componente = matriz[indices]
+            faixa = (20.0 + 80.0 * k / len(componentes), 20.0 + 80.0 * (k + 1) / len(componentes))
+            estatisticas = calcular_estatisticas_modelo(materias_componente, salas, matriz_componente)
+            if self.limites.violacoes(estatisticas):
+                componentes_heuristica += 1
+                self._notificar_progresso(f"Heurística no componente {k + 1}/{len(componentes)}", faixa[0])
+                resultado = heuristica._alocar(materias_componente, salas, instrumentacao, matriz_componente)
+            else:
+                resultado = self._resolver_modelo(materias_componente, salas, matriz_componente,
+                                                  instrumentacao, faixa)
+            if not resultado.sucesso:
+                return resultado
+            alocacoes.extend(resultado.alocacoes)
+
+        posicao = {materia.id: i for i, materia in enumerate(materias)}
+        alocacoes.sort(key=lambda a: posicao[a.materia.id])
+        resultado = AlocacaoResultado(sucesso=True, alocacoes=alocacoes)
+        return self._marcar_modo(resultado, 'decomposto', componentes=len(componentes),
+                                 componentes_heuristica=componentes_heuristica)
+
+    @staticmethod
+    def _marcar_modo(resultado: AlocacaoResultado, modo: str, **extras) -> AlocacaoResultado:
+        """Registra nas métricas como o modelo foi resolvido"""
+        if resultado.sucesso:
+            resultado.metricas = dict(resultado.metricas, modo_modelo=modo, **extras)
+        return resultado
+
+    def _resolver_modelo(self, materias: List[Materia], salas: List[Sala], matriz: np.ndarray,
+                         instrumentacao: Instrumentacao,
+                         faixa_progresso: Tuple[float, float] = (20.0, 100.0)) -> AlocacaoResultado:
+        """Monta e resolve o modelo linear inteiro"""
+        inicio, fim = faixa_progresso
         try:
+            self._notificar_progresso("Montando modelo linear", inicio)
             # Criar problema
             self.problema = pulp.LpProblem("AlocacaoSalas", pulp.LpMinimize)
 
             # Criar variáveis e restrições
-            self._criar_variaveis_decisao(materias, salas)
-            self._criar_funcao_objetivo(materias, salas)
-            self._criar_restricoes_hard(materias, salas)
+            with instrumentacao.fase('variaveis') as fase:
+                self._criar_variaveis_decisao(materias, salas, matriz)
+                fase.contadores['variaveis'] = len(self.variaveis)
+            with instrumentacao.fase('objetivo'):
+                self._criar_funcao_objetivo(materias, salas)
+            with instrumentacao.fase('restricoes') as fase:
+                self._criar_restricoes_hard(materias, salas)
+                fase.contadores['restricoes'] = len(self.problema.constraints)
+                fase.contadores['nao_zeros'] = sum(len(r) for r in self.problema.constraints.values())
 
             # Resolver
-            sucesso = self.solver_strategy.resolver(self.problema)
+            self._notificar_progresso("Resolvendo modelo linear", inicio + (fim - inicio) * 0.3)
+            with instrumentacao.fase('solver') as fase:
+                sucesso = self.solver_strategy.resolver(self.problema)
+                fase.contadores['solucao_otima'] = int(sucesso)
 
+            if sucesso and self.relaxacao_linear:
+                return self._arredondar_relaxacao(materias, salas, matriz, instrumentacao)
             if sucesso:
-                solucao = self.solver_strategy.extrair_solucao(self.problema)
-                alocacoes = self._criar_alocacoes(materias, salas, solucao)
-                return AlocacaoResultado(sucesso=True, alocacoes=alocacoes)
+                with instrumentacao.fase('extracao') as fase:
+                    solucao = self._extrair_solucao()
+                    alocacoes = self._criar_alocacoes(materias, salas, solucao)
+                    fase.contadores['alocacoes'] = len(alocacoes)
+                with instrumentacao.fase('metricas'):
+                    return AlocacaoResultado(sucesso=True, alocacoes=alocacoes)
             else:
                 return AlocacaoResultado(sucesso=False, erro="Não foi possível encontrar solução ótima")
 
         except Exception as e:
             return AlocacaoResultado(sucesso=False, erro=str(e))
 
-    def _criar_variaveis_decisao(self, materias: List[Materia], salas: List[Sala]):
+    def _arredondar_relaxacao(self, materias: List[Materia], salas: List[Sala], matriz: np.ndarray,
+                              instrumentacao: Instrumentacao) -> AlocacaoResultado:
+        """Arredonda a solução da relaxação e reporta o limite inferior e o gap obtidos"""
+        with instrumentacao.fase('arredondamento') as fase:
+            limite_lp = pulp.value(self.problema.objective) or 0.0
+            fracao = np.zeros(matriz.shape)
+            posicao_materia = {m.id: i for i, m in enumerate(materias)}
+            posicao_sala = {s.id: j for j, s in enumerate(salas)}
+            for (materia_id, sala_id), var in self.variaveis.items():
+                fracao[posicao_materia[materia_id], posicao_sala[sala_id]] = var.varValue or 0.0
+
+            solucao = self._arredondar_solucao(materias, salas, matriz, fracao)
+            fase.contadores['limite_inferior_lp'] = limite_lp
+            fase.contadores['materias_fracionarias'] = int((fracao.max(axis=1) < 1 - 1e-6).sum()) \
+                if len(materias) else 0
+
+        if solucao is None:
+            return AlocacaoResultado(sucesso=False,
+                                     erro="Arredondamento da relaxação linear não encontrou alocação sem conflitos")
+
+        with instrumentacao.fase('metricas') as fase:
+            alocacoes = self._criar_alocacoes(materias, salas, solucao)
+            objetivo = float(sum(a.sala.capacidade - a.materia.inscritos + a.sala.custo_adicional
+                                 for a in alocacoes))
+            # O ótimo inteiro está entre o limite da relaxação e o objetivo arredondado
+            gap = (objetivo - limite_lp) / abs(objetivo) if objetivo else 0.0
+            fase.contadores['gap_relativo'] = gap
+            resultado = AlocacaoResultado(sucesso=True, alocacoes=alocacoes)
+            resultado.metricas = dict(resultado.metricas, modo_modelo='relaxacao_linear',
+                                      limite_inferior_lp=limite_lp, objetivo_arredondado=objetivo,
+                                      gap_relativo=gap)
+            return resultado
+
+    @staticmethod
+    def _arredondar_solucao(materias: List[Materia], salas: List[Sala], matriz: np.ndarray,
+                            fracao: np.ndarray) -> Optional[Dict[str, str]]:
+        """Fixa as decisões mais firmes primeiro, sem conflito de sala e horário, e repara as pendentes"""
+        capacidades = np.array([s.capacidade for s in salas], dtype=np.int64)
+        inscritos = np.array([m.inscritos for m in materias], dtype=np.int64)
+        custos = capacidades + np.array([s.custo_adicional for s in salas], dtype=np.float64)
+        viaveis = matriz & (capacidades[None, :] >= inscritos[:, None])
+        slots = [set(extrair_slots_tempo(m.horario)) for m in materias]
+        ocupacao: List[Dict[str, int]] = [{} for _ in salas]  # slot -> matéria, por sala
+        sala_de = [-1] * len(materias)
+
+        def bloqueadores(i: int, j: int) -> Set[int]:
+            return {ocupacao[j][slot] for slot in slots[i] if slot in ocupacao[j]}
+
+        def ocupar(i: int, j: int):
+            sala_de[i] = j
+            for slot in slots[i]:
+                ocupacao[j][slot] = i
+
+        def liberar(i: int):
+            j, sala_de[i] = sala_de[i], -1
+            for slot in slots[i]:
+                del ocupacao[j][slot]
+
+        def preferencias(i: int) -> List[int]:
+            return sorted(np.flatnonzero(viaveis[i]), key=lambda j: (-fracao[i, j], custos[j]))
+
+        pendentes = []
+        ordem = sorted(range(len(materias)), key=lambda i: (-fracao[i].max(initial=0.0), viaveis[i].sum()))
+        for i in ordem:
+            j = next((j for j in preferencias(i) if not bloqueadores(i, j)), None)
+            if j is None:
+                pendentes.append(i)
+            else:
+                ocupar(i, j)
+
+        # Reparo: move uma única matéria bloqueadora para outra sala livre
+        for i in pendentes:
+            reparado = False
+            for j in preferencias(i):
+                bloqueio = bloqueadores(i, j)
+                if len(bloqueio) != 1:
+                    continue
+                b = bloqueio.pop()
+                liberar(b)
+                k = next((k for k in preferencias(b) if k != j and not bloqueadores(b, k)), None)
+                if k is None:
+                    ocupar(b, j)
+                    continue
+                ocupar(b, k)
+                ocupar(i, j)
+                reparado = True
+                break
+            if not reparado:
+                return None
+
+        return {materias[i].id: salas[j].id for i, j in enumerate(sala_de)}
+
+    @staticmethod
+    def _contar_candidatos(matriz: np.ndarray, n_materias: int, n_salas: int) -> Dict[str, float]:
+        """Contadores de salas candidatas por matéria"""
+        candidatos = matriz.sum(axis=1) if n_materias else np.zeros(1, dtype=int)
+        return {
+            'materias': n_materias,
+            'salas': n_salas,
+            'pares_compativeis': int(candidatos.sum()),
+            'candidatos_por_materia_min': int(candidatos.min()),
+            'candidatos_por_materia_media': float(candidatos.mean()),
+            'candidatos_por_materia_max': int(candidatos.max()),
+            'materias_sem_candidatos': int((candidatos == 0).sum()) if n_materias else 0,
+        }
+
+    def _criar_variaveis_decisao(self, materias: List[Materia], salas: List[Sala],
+                                 matriz: Optional[np.ndarray] = None):
         """Cria variáveis de decisão"""
         self.variaveis = {}
-
-        for materia in materias:
-            for sala in salas:
-                if self.compatibilidade.eh_compativel(materia, sala):
-                    var_name = f"x_{materia.id}_{sala.id}"
+        if matriz is None:
+            matriz = self.compatibilidade.matriz_compatibilidade(materias, salas)
+
+        for i, materia in enumerate(materias):
+            for j in np.flatnonzero(matriz[i]):
+                sala = salas[j]
+                var_name = f"x_{materia.id}_{sala.id}"
+                if self.relaxacao_linear:
+                    # Pares sem capacidade ficam fixos em zero, o que aperta o limite da relaxação
+                    limite = 1 if sala.capacidade >= materia.inscritos else 0
+                    self.variaveis[(materia.id, sala.id)] = pulp.LpVariable(
+                        var_name, lowBound=0, upBound=limite, cat='Continuous'
+                    )
+                else:
                     self.variaveis[(materia.id, sala.id)] = pulp.LpVariable(
                         var_name, cat='Binary'
                     )
 
+    def _extrair_solucao(self) -> Dict[str, str]:
+        """Extrai a solução a partir das variáveis de decisão (matéria -> sala)"""
+        # Os nomes das variáveis são sanitizados pelo PuLP; o mapeamento é a fonte confiável dos IDs
+        return {materia_id: sala_id for (materia_id, sala_id), var in self.variaveis.items()
+                if var.varValue is not None and var.varValue > 0.5}
+
     def _criar_funcao_objetivo(self, materias: List[Materia], salas: List[Sala]):
         """Cria função objetivo"""
         objetivo = 0
@@ -208,31 +609,7 @@ class AlocacaoLinearStrategy(AlocacaoStrategy):
 
     def _extrair_slots_tempo(self, horario_str: str) -> List[str]:
         """Extrai slots de tempo individuais de um horário complexo"""
-        import re
-
-        # Padrão para extrair dias e horários
-        # Ex: "Segunda/Quinta 09:00-09:50/10:00-10:50" -> ["Segunda 09:00-09:50", "Segunda 10:00-10:50", "Quinta 09:00-09:50", "Quinta 10:00-10:50"]
-
-        # Dividir por " | " se houver múltiplos horários
-        horarios_parts = horario_str.split(' | ')
-        slots = []
-
-        for part in horarios_parts:
-            # Extrair dias e horários
-            match = re.match(r'([^0-9]+)\s+(.+)', part.strip())
-            if not match:
-                continue
-
-            dias_str, horarios_str = match.groups()
-            dias = [d.strip() for d in dias_str.split('/')]
-            horarios = [h.strip() for h in horarios_str.split('/')]
-
-            # Combinar cada dia com cada horário
-            for dia in dias:
-                for horario in horarios:
-                    slots.append(f"{dia} {horario}")
-
-        return slots if slots else [horario_str]
+        return extrair_slots_tempo(horario_str)
 
     def _criar_alocacoes(self, materias: List[Materia], salas: List[Sala],
                         solucao: Dict[str, str]) -> List[Alocacao]:
@@ -260,31 +637,42 @@ class AlocacaoGulosaStrategy(AlocacaoStrategy):
 
     def alocar(self, materias: List[Materia], salas: List[Sala]) -> AlocacaoResultado:
         """Executa alocação usando algoritmo guloso"""
+        instrumentacao = self._nova_instrumentacao()
+        resultado = self._alocar(materias, salas, instrumentacao)
+        resultado.instrumentacao = instrumentacao
+        return resultado
+
+    def _alocar(self, materias: List[Materia], salas: List[Sala],
+                instrumentacao: Instrumentacao) -> AlocacaoResultado:
+        """Executa alocação gulosa, medindo as fases"""
         try:
             alocacoes = []
             salas_disponiveis = salas.copy()
 
-            # Ordenar matérias por número de inscritos (maior primeiro)
-            materias_ordenadas = sorted(materias, key=lambda m: m.inscritos, reverse=True)
-
-            for materia in materias_ordenadas:
-                # Encontrar melhor sala disponível
-                melhor_sala = self._encontrar_melhor_sala(materia, salas_disponiveis)
-
-                if melhor_sala:
-                    alocacao = Alocacao(
-                        materia=materia,
-                        sala=melhor_sala,
-                        espaco_ocioso=melhor_sala.calcular_espaco_ocioso(materia.inscritos),
-                        utilizacao_percentual=melhor_sala.calcular_utilizacao(materia.inscritos)
-                    )
-                    alocacoes.append(alocacao)
-                    salas_disponiveis.remove(melhor_sala)
-                else:
-                    return AlocacaoResultado(sucesso=False,
-                                           erro=f"Nenhuma sala disponível para {materia.nome}")
-
-            return AlocacaoResultado(sucesso=True, alocacoes=alocacoes)
+            with instrumentacao.fase('alocacao') as fase:
+                # Ordenar matérias por número de inscritos (maior primeiro)
+                materias_ordenadas = sorted(materias, key=lambda m: m.inscritos, reverse=True)
+
+                for materia in materias_ordenadas:
+                    # Encontrar melhor sala disponível
+                    melhor_sala = self._encontrar_melhor_sala(materia, salas_disponiveis)
+
+                    if melhor_sala:
+                        alocacao = Alocacao(
+                            materia=materia,
+                            sala=melhor_sala,
+                            espaco_ocioso=melhor_sala.calcular_espaco_ocioso(materia.inscritos),
+                            utilizacao_percentual=melhor_sala.calcular_utilizacao(materia.inscritos)
+                        )
+                        alocacoes.append(alocacao)
+                        salas_disponiveis.remove(melhor_sala)
+                    else:
+                        return AlocacaoResultado(sucesso=False,
+                                               erro=f"Nenhuma sala disponível para {materia.nome}")
+                fase.contadores['alocacoes'] = len(alocacoes)
+
+            with instrumentacao.fase('metricas'):
+                return AlocacaoResultado(sucesso=True, alocacoes=alocacoes)
 
         except Exception as e:
             return AlocacaoResultado(sucesso=False, erro=str(e))
@@ -310,13 +698,341 @@ class AlocacaoGulosaStrategy(AlocacaoStrategy):
         return min(salas_compatíveis, key=score_sala)
 
 
+class AlocacaoGulosaHorariosStrategy(AlocacaoStrategy):
+    """Estratégia gulosa que respeita conflitos de horário, usada como fallback de modelos grandes"""
+
+    def alocar(self, materias: List[Materia], salas: List[Sala]) -> AlocacaoResultado:
+        """Executa alocação gulosa por slots de horário"""
+        instrumentacao = self._nova_instrumentacao()
+        resultado = self._alocar(materias, salas, instrumentacao)
+        resultado.instrumentacao = instrumentacao
+        return resultado
+
+    def _alocar(self, materias: List[Materia], salas: List[Sala], instrumentacao: Instrumentacao,
+                matriz: Optional[np.ndarray] = None) -> AlocacaoResultado:
+        """Aloca as matérias mais restritas primeiro na sala livre de menor custo"""
+        try:
+            with instrumentacao.fase('heuristica') as fase:
+                if matriz is None:
+                    matriz = self.compatibilidade.matriz_compatibilidade(materias, salas)
+                capacidades = np.array([s.capacidade for s in salas], dtype=np.int64)
+                inscritos = np.array([m.inscritos for m in materias], dtype=np.int64)
+                viaveis = matriz & (capacidades[None, :] >= inscritos[:, None])
+                # Mesmo custo da função objetivo do modelo linear (sem a parcela constante dos inscritos)
+                custos = capacidades + np.array([s.custo_adicional for s in salas], dtype=np.float64)
+                ordem_salas = np.argsort(custos, kind='stable')
+
+                ocupacao: List[Set[str]] = [set() for _ in salas]
+                candidatos = viaveis.sum(axis=1)
+                ordem = sorted(range(len(materias)), key=lambda i: (candidatos[i], -inscritos[i]))
+                alocacoes: Dict[int, Alocacao] = {}
+
+                for i in ordem:
+                    materia = materias[i]
+                    slots = set(extrair_slots_tempo(materia.horario))
+                    j = next((j for j in ordem_salas if viaveis[i, j] and ocupacao[j].isdisjoint(slots)), None)
+                    if j is None:
+                        return AlocacaoResultado(
+                            sucesso=False,
+                            erro=f"Nenhuma sala disponível sem conflito de horário para {materia.nome}")
+                    sala = salas[j]
+                    ocupacao[j] |= slots
+                    alocacoes[i] = Alocacao(
+                        materia=materia,
+                        sala=sala,
+                        espaco_ocioso=sala.calcular_espaco_ocioso(materia.inscritos),
+                        utilizacao_percentual=sala.calcular_utilizacao(materia.inscritos)
+                    )
+                fase.contadores['alocacoes'] = len(alocacoes)
+
+            with instrumentacao.fase('metricas'):
+                return AlocacaoResultado(sucesso=True, alocacoes=[alocacoes[i] for i in sorted(alocacoes)])
+
+        except Exception as e:
+            return AlocacaoResultado(sucesso=False, erro=str(e))
+
+
+class AlocacaoMatchingStrategy(AlocacaoStrategy):
+    """Resolve por atribuição de custo mínimo as partes separáveis por horário; o restante vai para o modelo linear"""
+
+    def __init__(self, compatibilidade: CompatibilidadeStrategy = None,
+                 estrategia_restante: AlocacaoStrategy = None):
+        super().__init__(compatibilidade)
+        self.estrategia_restante = estrategia_restante or AlocacaoLinearStrategy(self.compatibilidade)
+
+    def com_compatibilidade(self, compatibilidade: CompatibilidadeStrategy) -> 'AlocacaoMatchingStrategy':
+        copia = super().com_compatibilidade(compatibilidade)
+        copia.estrategia_restante = self.estrategia_restante.com_compatibilidade(compatibilidade)
+        return copia
+
+    def alocar(self, materias: List[Materia], salas: List[Sala]) -> AlocacaoResultado:
+        """Executa alocação por atribuição nas partes separáveis"""
+        instrumentacao = self._nova_instrumentacao()
+        resultado = self._alocar(materias, salas, instrumentacao)
+        resultado.instrumentacao = instrumentacao
+        return resultado
+
+    def _alocar(self, materias: List[Materia], salas: List[Sala],
+                instrumentacao: Instrumentacao) -> AlocacaoResultado:
+        """Separa os componentes, resolve as atribuições uma a uma e delega o restante"""
+        try:
+            with instrumentacao.fase('compatibilidade'):
+                matriz = self.compatibilidade.matriz_compatibilidade(materias, salas)
+
+            with instrumentacao.fase('separacao') as fase:
+                separaveis, restante = self._separar(materias, matriz)
+                fase.contadores['componentes_atribuicao'] = len(separaveis)
+                fase.contadores['materias_atribuicao'] = sum(len(c) for c in separaveis)
+                fase.contadores['materias_modelo'] = len(restante)
+
+            # Sequencial: a atribuição é laço em Python preso ao GIL e threads só somavam overhead
+            alocacoes = []
+            with instrumentacao.fase('atribuicao'):
+                custos = self._custos(materias, salas, matriz)
+                for k, indices in enumerate(separaveis):
+                    self._notificar_progresso(f"Atribuição {k + 1}/{len(separaveis)}",
+                                              60.0 * k / len(separaveis))
+                    parcial = self._resolver_atribuicao(materias, salas, indices, *custos)
+                    if isinstance(parcial, str):
+                        return AlocacaoResultado(sucesso=False, erro=parcial)
+                    alocacoes.extend(parcial)
+
+            if restante:
+                self._notificar_progresso("Resolvendo restante com modelo linear", 60.0)
+                resultado = self.estrategia_restante.alocar([materias[i] for i in restante], salas)
+                instrumentacao.incorporar(getattr(resultado, 'instrumentacao', None))
+                if not resultado.sucesso:
+                    return resultado
+                alocacoes.extend(resultado.alocacoes)
+
+            with instrumentacao.fase('metricas'):
+                posicao = {materia.id: i for i, materia in enumerate(materias)}
+                alocacoes.sort(key=lambda a: posicao[a.materia.id])
+                resultado = AlocacaoResultado(sucesso=True, alocacoes=alocacoes)
+                resultado.metricas = dict(resultado.metricas, modo_modelo='atribuicao',
+                                          materias_atribuicao=len(materias) - len(restante),
+                                          materias_modelo=len(restante))
+                return resultado
+
+        except Exception as e:
+            return AlocacaoResultado(sucesso=False, erro=str(e))
+
+    @staticmethod
+    def _separar(materias: List[Materia], matriz: np.ndarray) -> Tuple[List[List[int]], List[int]]:
+        """Componentes cujas matérias têm exatamente os mesmos slots viram problemas de atribuição"""
+        assinaturas = [frozenset(extrair_slots_tempo(m.horario)) for m in materias]
+        separaveis, restante = [], []
+        for indices in componentes_independentes(materias, matriz):
+            # Mesmos slots: quaisquer duas matérias do componente conflitam em toda sala comum
+            if len({assinaturas[i] for i in indices}) == 1:
+                separaveis.append(indices)
+            else:
+                restante.extend(indices)
+        return separaveis, sorted(restante)
+
+    @staticmethod
+    def _custos(materias: List[Materia], salas: List[Sala],
+                matriz: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Custo da função objetivo do modelo linear e pares permitidos (compatível e com capacidade)"""
+        capacidades = np.array([s.capacidade for s in salas], dtype=np.int64)
+        inscritos = np.array([m.inscritos for m in materias], dtype=np.int64)
+        adicionais = np.array([s.custo_adicional for s in salas], dtype=np.float64)
+        custos = capacidades[None, :] - inscritos[:, None] + adicionais[None, :]
+        permitidos = matriz & (capacidades[None, :] >= inscritos[:, None])
+        return custos, permitidos
+
+    @staticmethod
+    def _resolver_atribuicao(materias: List[Materia], salas: List[Sala], indices: List[int],
+                             custos: np.ndarray, permitidos: np.ndarray):
+        """Atribuição ótima de um componente; retorna as alocações ou a mensagem de erro"""
+        colunas = np.flatnonzero(permitidos[indices].any(axis=0))
+        atribuicao = atribuicao_custo_minimo(custos[np.ix_(indices, colunas)],
+                                             permitidos[np.ix_(indices, colunas)])
+        if (atribuicao == SEM_ATRIBUICAO).any():
+            nomes = ', '.join(materias[i].nome for i in indices)
+            return f"Salas insuficientes para as matérias simultâneas: {nomes}"
+
+        alocacoes = []
+        for i, coluna in zip(indices, atribuicao):
+            materia, sala = materias[i], salas[colunas[coluna]]
+            alocacoes.append(Alocacao(
+                materia=materia,
+                sala=sala,
+                espaco_ocioso=sala.calcular_espaco_ocioso(materia.inscritos),
+                utilizacao_percentual=sala.calcular_utilizacao(materia.inscritos)
+            ))
+        return alocacoes
+
+
+class AlocacaoLNSStrategy(AlocacaoStrategy):
+    """Busca em vizinhança grande: reotimiza partes da alocação com o modelo linear até esgotar o tempo"""
+
+    VIZINHANCAS = ('dia', 'local', 'capacidade', 'salas')
+
+    def __init__(self, compatibilidade: CompatibilidadeStrategy = None,
+                 estrategia_inicial: AlocacaoStrategy = None, estrategia_subproblema: AlocacaoStrategy = None,
+                 orcamento_tempo: float = 10.0, tamanho_vizinhanca: int = 40,
+                 max_iteracoes: Optional[int] = None, max_trabalhadores: int = 1, semente: int = 0):
+        super().__init__(compatibilidade)
+        self.estrategia_inicial = estrategia_inicial or AlocacaoGulosaHorariosStrategy(self.compatibilidade)
+        self.estrategia_subproblema = estrategia_subproblema or AlocacaoLinearStrategy(self.compatibilidade)
+        self.orcamento_tempo = orcamento_tempo
+        self.tamanho_vizinhanca = tamanho_vizinhanca
+        self.max_iteracoes = max_iteracoes
+        self.max_trabalhadores = max_trabalhadores
+        self.semente = semente
+
+    def com_compatibilidade(self, compatibilidade: CompatibilidadeStrategy) -> 'AlocacaoLNSStrategy':
+        copia = super().com_compatibilidade(compatibilidade)
+        copia.estrategia_inicial = self.estrategia_inicial.com_compatibilidade(compatibilidade)
+        copia.estrategia_subproblema = self.estrategia_subproblema.com_compatibilidade(compatibilidade)
+        return copia
+
+    def alocar(self, materias: List[Materia], salas: List[Sala]) -> AlocacaoResultado:
+        """Executa alocação por busca em vizinhança grande"""
+        instrumentacao = self._nova_instrumentacao()
+        resultado = self._alocar(materias, salas, instrumentacao)
+        resultado.instrumentacao = instrumentacao
+        return resultado
+
+    def _alocar(self, materias: List[Materia], salas: List[Sala],
+                instrumentacao: Instrumentacao) -> AlocacaoResultado:
+        """Parte de uma solução viável e aceita as reotimizações de vizinhanças que não pioram o custo"""
+        try:
+            limite = time.monotonic() + self.orcamento_tempo
+            with instrumentacao.fase('solucao_inicial'):
+                inicial = self.estrategia_inicial.alocar(materias, salas)
+                if not inicial.sucesso:
+                    # O arredondamento da relaxação costuma achar solução onde o guloso falha
+                    rascunho = AlocacaoLinearStrategy(self.compatibilidade, relaxacao_linear=True)
+                    inicial = rascunho.alocar(materias, salas)
+            if not inicial.sucesso:
+                return inicial
+            self._notificar_progresso("Solução inicial obtida", 10.0)
+
+            atual: Dict[str, Alocacao] = {a.materia.id: a for a in inicial.alocacoes}
+            objetivo_inicial = sum(self._custo(a) for a in atual.values())
+            aleatorio = random.Random(self.semente)
+            iteracoes = melhorias = 0
+
+            with instrumentacao.fase('lns') as fase:
+                with ThreadPoolExecutor(max_workers=self.max_trabalhadores) as executor:
+                    while time.monotonic() < limite and \
+                            (self.max_iteracoes is None or iteracoes < self.max_iteracoes):
+                        vizinhancas = self._sortear_vizinhancas(materias, salas, atual, aleatorio)
+                        # O CBC roda em processo próprio, então as threads resolvem os subproblemas em paralelo
+                        parciais = list(executor.map(
+                            lambda vizinhanca: self._reotimizar(vizinhanca, atual), vizinhancas))
+                        for (livres, _), alocacoes in zip(vizinhancas, parciais):
+                            iteracoes += 1
+                            if alocacoes is None:
+                                continue
+                            anterior = sum(self._custo(atual[m.id]) for m in livres)
+                            novo = sum(self._custo(a) for a in alocacoes)
+                            if novo <= anterior:
+                                melhorias += int(novo < anterior)
+                                atual.update((a.materia.id, a) for a in alocacoes)
+                        self._notificar_progresso(f"{iteracoes} vizinhanças, {melhorias} melhorias",
+                                                  10.0 + 90.0 * self._fracao_concluida(limite, iteracoes))
+                fase.contadores['iteracoes'] = iteracoes
+                fase.contadores['melhorias'] = melhorias
+                # Sem limite de iterações atingido, o resultado depende de quanto coube no orçamento
+                tempo_esgotado = self.max_iteracoes is None or iteracoes < self.max_iteracoes
+
+            with instrumentacao.fase('metricas'):
+                objetivo_final = sum(self._custo(a) for a in atual.values())
+                resultado = AlocacaoResultado(sucesso=True, alocacoes=[atual[m.id] for m in materias])
+                resultado.metricas = dict(resultado.metricas, modo_modelo='lns', iteracoes=iteracoes,
+                                          melhorias=melhorias, objetivo_inicial=objetivo_inicial,
+                                          objetivo_final=objetivo_final, tempo_esgotado=tempo_esgotado)
+                return resultado
+
+        except Exception as e:
+            return AlocacaoResultado(sucesso=False, erro=str(e))
+
+    def _fracao_concluida(self, limite: float, iteracoes: int) -> float:
+        """Quanto do orçamento (tempo ou iterações, o que estiver mais perto do fim) já foi consumido"""
+        fracao = 1.0 - max(0.0, limite - time.monotonic()) / self.orcamento_tempo if self.orcamento_tempo else 1.0
+        if self.max_iteracoes:
+            fracao = max(fracao, iteracoes / self.max_iteracoes)
+        return min(1.0, fracao)
+
+    @staticmethod
+    def _custo(alocacao: Alocacao) -> float:
+        """Mesmo custo da função objetivo do modelo linear"""
+        return alocacao.sala.capacidade - alocacao.materia.inscritos + alocacao.sala.custo_adicional
+
+    def _sortear_vizinhancas(self, materias: List[Materia], salas: List[Sala], atual: Dict[str, Alocacao],
+                             aleatorio: random.Random) -> List[Tuple[List[Materia], List[Sala]]]:
+        """Sorteia vizinhanças (matérias liberadas, salas disponíveis); em lote, elas são disjuntas"""
+        tipo = aleatorio.choice(self.VIZINHANCAS)
+
+        if tipo == 'dia':
+            # Libera matérias de um dia; todas as salas ficam disponíveis, então não há lote paralelo
+            dias = sorted({slot.split(' ')[0] for m in materias for slot in extrair_slots_tempo(m.horario)})
+            dia = aleatorio.choice(dias)
+            livres = [m for m in materias
+                      if any(slot.split(' ')[0] == dia for slot in extrair_slots_tempo(m.horario))]
+            return [(self._limitar(livres, aleatorio), salas)]
+
+        if tipo == 'local':
+            grupos = {}
+            for sala in salas:
+                grupos.setdefault(sala.local, []).append(sala)
+            particao = list(grupos.values())
+        elif tipo == 'capacidade':
+            ordenadas = sorted(salas, key=lambda s: s.capacidade)
+            faixas = max(1, min(self.max_trabalhadores, len(ordenadas)) * 2)
+            particao = [list(faixa) for faixa in np.array_split(np.array(ordenadas, dtype=object), faixas)]
+        else:
+            embaralhadas = aleatorio.sample(salas, len(salas))
+            tamanho = max(2, len(salas) // max(2, 2 * self.max_trabalhadores))
+            particao = [embaralhadas[k:k + tamanho] for k in range(0, len(embaralhadas), tamanho)]
+
+        # Conjuntos de salas disjuntos tornam os subproblemas independentes
+        aleatorio.shuffle(particao)
+        vizinhancas = []
+        for grupo in particao:
+            ids = {sala.id for sala in grupo}
+            livres = [m for m in materias if atual[m.id].sala.id in ids]
+            if len(livres) > 1:
+                vizinhancas.append((self._limitar(livres, aleatorio), grupo))
+            if len(vizinhancas) == self.max_trabalhadores:
+                break
+        return vizinhancas or [(self._limitar(list(materias), aleatorio), salas)]
+
+    def _limitar(self, materias: List[Materia], aleatorio: random.Random) -> List[Materia]:
+        if len(materias) <= self.tamanho_vizinhanca:
+            return materias
+        return aleatorio.sample(materias, self.tamanho_vizinhanca)
+
+    def _reotimizar(self, vizinhanca: Tuple[List[Materia], List[Sala]],
+                    atual: Dict[str, Alocacao]) -> Optional[List[Alocacao]]:
+        """Resolve o modelo linear só para as matérias liberadas, com as demais fixas"""
+        livres, salas = vizinhanca
+        ids_livres = {m.id for m in livres}
+        ids_salas = {s.id for s in salas}
+        ocupacao: Dict[str, Set[str]] = {}
+        for materia_id, alocacao in atual.items():
+            if materia_id not in ids_livres and alocacao.sala.id in ids_salas:
+                ocupacao.setdefault(alocacao.sala.id, set()).update(
+                    extrair_slots_tempo(alocacao.materia.horario))
+
+        estrategia = self.estrategia_subproblema.com_compatibilidade(
+            CompatibilidadeComOcupacao(self.compatibilidade, ocupacao))
+        resultado = estrategia.alocar(livres, salas)
+        return resultado.alocacoes if resultado.sucesso else None
+
+
 class AlocacaoManager:
     """Gerenciador principal de alocação"""
 
-    def __init__(self, repository: AlocacaoRepository = None):
+    def __init__(self, repository: AlocacaoRepository = None, executor: Optional[ExecutorAlocacao] = None):
         self.repository = repository or AlocacaoRepository()
+        self.executor = executor
         self.alocacao_strategy: Optional[AlocacaoStrategy] = None
         self.observers: List[Subject] = []
+        self.ultimo_resultado: Optional[AlocacaoResultado] = None
 
     def definir_estrategia(self, strategy: AlocacaoStrategy):
         """Define estratégia de alocação"""
@@ -331,8 +1047,8 @@ class AlocacaoManager:
         if not self.alocacao_strategy:
             return AlocacaoResultado(sucesso=False, erro="Estratégia de alocação não definida")
 
-        materias = self.repository.buscar_materias()
-        salas = self.repository.buscar_salas()
+        instrumentacao = Instrumentacao()
+        materias, salas = self._carregar_dados(instrumentacao)
 
         if not materias or not salas:
             return AlocacaoResultado(sucesso=False, erro="Dados insuficientes para alocação")
@@ -343,9 +1059,182 @@ class AlocacaoManager:
 
         # Executar alocação
         resultado = self.alocacao_strategy.alocar(materias, salas)
+        return self._registrar_resultado(self._anexar_instrumentacao(resultado, instrumentacao))
+
+    def _carregar_dados(self, instrumentacao: Instrumentacao) -> Tuple[List[Materia], List[Sala]]:
+        """Busca matérias e salas do repositório medindo a fase de carregamento"""
+        with instrumentacao, instrumentacao.fase('carregamento_dados') as fase:
+            materias = self.repository.buscar_materias()
+            salas = self.repository.buscar_salas()
+            fase.contadores['materias_carregadas'] = len(materias)
+            fase.contadores['salas_carregadas'] = len(salas)
+        return materias, salas
+
+    @staticmethod
+    def _anexar_instrumentacao(resultado: AlocacaoResultado,
+                               instrumentacao: Instrumentacao) -> AlocacaoResultado:
+        """Combina as medições do manager com as da estratégia"""
+        instrumentacao.incorporar(getattr(resultado, 'instrumentacao', None))
+        # Cópia rasa: o resultado pode estar compartilhado com o cache de resultados
+        resultado = copy.copy(resultado)
+        resultado.instrumentacao = instrumentacao
+        return resultado
+
+    def executar_alocacao_async(self, timeout: Optional[float] = None) -> TrabalhoAlocacao:
+        """Executa a alocação em outro processo, retornando um handle cancelável"""
+        if not self.alocacao_strategy:
+            return TrabalhoAlocacao.finalizado(
+                AlocacaoResultado(sucesso=False, erro="Estratégia de alocação não definida"))
+
+        materias = self.repository.buscar_materias()
+        salas = self.repository.buscar_salas()
+
+        if not materias or not salas:
+            return TrabalhoAlocacao.finalizado(
+                AlocacaoResultado(sucesso=False, erro="Dados insuficientes para alocação"))
+
+        for observer in self.observers:
+            observer.on_progress("Iniciando alocação", 0.0)
+
+        # O resultado é persistido e notificado pela thread de acompanhamento do trabalho
+        executor = self.executor or obter_executor_padrao()
+        return executor.submeter(self.alocacao_strategy, materias, salas, self.observers,
+                                 timeout=timeout, ao_concluir=self._registrar_resultado)
+
+    def executar_alocacao_incremental(self, delta: DeltaAlocacao,
+                                      anterior: Optional[AlocacaoResultado] = None) -> AlocacaoResultado:
+        """Aplica o delta e reotimiza apenas a vizinhança afetada da alocação anterior"""
+        if not self.alocacao_strategy:
+            return AlocacaoResultado(sucesso=False, erro="Estratégia de alocação não definida")
+
+        anterior = anterior or self.ultimo_resultado
+        self._aplicar_delta(delta)
+
+        # Sem solução anterior válida não há o que preservar
+        if anterior is None or not anterior.sucesso:
+            return self.executar_alocacao()
+
+        instrumentacao = Instrumentacao()
+        materias, salas = self._carregar_dados(instrumentacao)
+
+        if not materias or not salas:
+            return AlocacaoResultado(sucesso=False, erro="Dados insuficientes para alocação")
+
+        for observer in self.observers:
+            observer.on_progress("Iniciando realocação incremental", 0.0)
+
+        materias_por_id = {m.id: m for m in materias}
+        salas_por_id = {s.id: s for s in salas}
+
+        with instrumentacao.fase('vizinhanca') as fase:
+            livres = self._vizinhanca_afetada(delta, anterior, materias_por_id, salas)
+
+            # Alocações fora da vizinhança são mantidas e bloqueiam suas células (sala, slot)
+            fixas: Dict[str, Alocacao] = {}
+            ocupacao: Dict[str, Set[str]] = {}
+            for alocacao in anterior.alocacoes:
+                materia_id = alocacao.materia.id
+                if materia_id in livres or materia_id not in materias_por_id:
+                    continue
+                materia = materias_por_id[materia_id]
+                sala = salas_por_id.get(alocacao.sala.id)
+                if sala is None:
+                    # Sala não está mais no repositório (removida fora do delta): a matéria volta a ser livre
+                    livres.add(materia_id)
+                    continue
+                fixas[materia_id] = Alocacao(materia=materia, sala=sala,
+                                             espaco_ocioso=0, utilizacao_percentual=0.0)
+                ocupacao.setdefault(sala.id, set()).update(extrair_slots_tempo(materia.horario))
+            fase.contadores['materias_livres'] = len(livres)
+            fase.contadores['alocacoes_fixas'] = len(fixas)
+
+        novas: Dict[str, Alocacao] = {}
+        incremental = True
+        if livres:
+            compatibilidade = CompatibilidadeComOcupacao(self.alocacao_strategy.compatibilidade, ocupacao)
+            estrategia = self.alocacao_strategy.com_compatibilidade(compatibilidade)
+            parcial = estrategia.alocar([m for m in materias if m.id in livres], salas)
+            instrumentacao.incorporar(getattr(parcial, 'instrumentacao', None))
+            if parcial.sucesso:
+                novas = {a.materia.id: a for a in parcial.alocacoes}
+            incremental = parcial.sucesso and livres.issubset(novas)
+
+        if incremental:
+            alocacoes = [fixas.get(m.id) or novas[m.id] for m in materias]
+            resultado = AlocacaoResultado(sucesso=True, alocacoes=alocacoes)
+        else:
+            # A vizinhança não comporta as mudanças: recorre à reotimização completa
+            for observer in self.observers:
+                observer.on_progress("Vizinhança inviável, executando alocação completa", 0.5)
+            resultado = self.alocacao_strategy.alocar(materias, salas)
+        resultado = self._anexar_instrumentacao(resultado, instrumentacao)
+
+        if resultado.sucesso:
+            resultado.metricas = dict(resultado.metricas,
+                                      modo_realocacao='incremental' if incremental else 'completo',
+                                      materias_reotimizadas=len(livres) if incremental else len(materias))
+        return self._registrar_resultado(resultado)
+
+    def _aplicar_delta(self, delta: DeltaAlocacao):
+        """Persiste as alterações do delta no repositório"""
+        for materia_id in delta.materias_removidas:
+            self.repository.remover_materia(materia_id)
+        for sala_id in delta.salas_removidas:
+            self.repository.remover_sala(sala_id)
+        for materia in delta.materias_alteradas:
+            self.repository.salvar_materia(materia)
+        for sala in delta.salas_alteradas:
+            self.repository.salvar_sala(sala)
+
+    def _vizinhanca_afetada(self, delta: DeltaAlocacao, anterior: AlocacaoResultado,
+                            materias_por_id: Dict[str, Materia], salas: List[Sala]) -> Set[str]:
+        """Determina as matérias que devem ser reotimizadas após o delta"""
+        salas_alteradas = {s.id for s in delta.salas_alteradas} | set(delta.salas_removidas)
+        alteradas = {m.id for m in delta.materias_alteradas}
+        alocacao_anterior = {a.materia.id: a for a in anterior.alocacoes}
+
+        # Matérias novas, alteradas ou cuja sala mudou
+        livres = {m_id for m_id in materias_por_id
+                  if m_id in alteradas or m_id not in alocacao_anterior
+                  or alocacao_anterior[m_id].sala.id in salas_alteradas}
+
+        # Slots e salas liberados ou disputados pelas matérias livres e removidas
+        slots_afetados: Set[str] = set()
+        salas_afetadas = set(salas_alteradas)
+        for m_id in livres | set(delta.materias_removidas):
+            if m_id in materias_por_id:
+                slots_afetados.update(extrair_slots_tempo(materias_por_id[m_id].horario))
+            if m_id in alocacao_anterior:
+                slots_afetados.update(extrair_slots_tempo(alocacao_anterior[m_id].materia.horario))
+                salas_afetadas.add(alocacao_anterior[m_id].sala.id)
+
+        # Salas onde as matérias livres poderiam ser encaixadas
+        materias_livres = [materias_por_id[m_id] for m_id in livres]
+        if materias_livres:
+            matriz = self.alocacao_strategy.compatibilidade.matriz_compatibilidade(materias_livres, salas)
+            salas_afetadas.update(s.id for s, usada in zip(salas, matriz.any(axis=0)) if usada)
+
+        # Vizinhos: matérias que ocupam essas salas em algum slot afetado
+        for m_id, alocacao in alocacao_anterior.items():
+            if (m_id in materias_por_id and m_id not in livres
+                    and alocacao.sala.id in salas_afetadas
+                    and slots_afetados.intersection(extrair_slots_tempo(alocacao.materia.horario))):
+                livres.add(m_id)
+
+        return livres
+
+    def _registrar_resultado(self, resultado: AlocacaoResultado) -> AlocacaoResultado:
+        """Persiste alocações bem-sucedidas e notifica os observadores"""
+        # Medições por fase como eventos estruturados
+        instrumentacao = getattr(resultado, 'instrumentacao', None)
+        if instrumentacao is not None:
+            for evento in instrumentacao.eventos():
+                for observer in self.observers:
+                    observer.on_evento(evento)
 
         # Salvar alocações se bem-sucedida
         if resultado.sucesso:
+            self.ultimo_resultado = resultado
             self.repository.limpar_alocacoes()
             for alocacao in resultado.alocacoes:
                 self.repository.salvar_alocacao(alocacao)
@@ -367,18 +1256,22 @@ class AlocacaoManager:
         if not alocacoes:
             return pd.DataFrame()
 
-        dados = []
-        for alocacao in alocacoes:
-            dados.append({
-                'Materia': alocacao.materia.nome,
-                'Inscritos': alocacao.materia.inscritos,
-                'Sala': alocacao.sala.nome,
-                'Capacidade': alocacao.sala.capacidade,
-                'Espaco_Ocioso': alocacao.espaco_ocioso,
-                'Utilizacao_%': round(alocacao.utilizacao_percentual, 2),
-                'Tipo_Sala': alocacao.sala.tipo.value,
-                'Local': alocacao.sala.local.value,
-                'Horario': alocacao.materia.horario
-            })
-
-        return pd.DataFrame(dados)
+        # O repositório normalmente guarda o último resultado, cuja tabela já pode estar construída
+        ultimo = self.ultimo_resultado
+        if (ultimo is not None and len(ultimo.alocacoes) == len(alocacoes)
+                and all(a is b for a, b in zip(ultimo.alocacoes, alocacoes))):
+            tabela = ultimo.tabela
+        else:
+            tabela = construir_tabela_alocacoes(alocacoes)
+
+        return pd.DataFrame({
+            'Materia': tabela['materia_nome'],
+            'Inscritos': tabela['inscritos'],
+            'Sala': tabela['sala_nome'],
+            'Capacidade': tabela['capacidade'],
+            'Espaco_Ocioso': tabela['espaco_ocioso'],
+            'Utilizacao_%': tabela['utilizacao'].round(2),
+            'Tipo_Sala': tabela['tipo_sala'],
+            'Local': tabela['local'],
+            'Horario': tabela['horario']
+        })
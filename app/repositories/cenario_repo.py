@@ -0,0 +1,151 @@
+"""
+Cenários "what-if" com cópia sob escrita.
+Um cenário compartilha os registros inalterados do repositório base e guarda apenas as diferenças.
+"""
+
+from dataclasses import replace
+from typing import List, Dict, Set, Optional, Any
+from ..models.domain import Materia, Sala, Alocacao
+from ..strategies.interfaces import Repository
+
+
+class CenarioRepository(Repository):
+    """Repositório derivado de um repositório base que armazena apenas deltas"""
+
+    def __init__(self, base: Repository, nome: str = "cenario"):
+        self.base = base
+        self.nome = nome
+        self._materias_alteradas: Dict[str, Materia] = {}
+        self._salas_alteradas: Dict[str, Sala] = {}
+        self._materias_removidas: Set[str] = set()
+        self._salas_removidas: Set[str] = set()
+        self._alocacoes: Dict[str, Alocacao] = {}
+
+    def bifurcar(self, nome: str) -> 'CenarioRepository':
+        """Cria um novo cenário a partir deste, copiando apenas os deltas"""
+        cenario = CenarioRepository(self.base, nome)
+        cenario._materias_alteradas = dict(self._materias_alteradas)
+        cenario._salas_alteradas = dict(self._salas_alteradas)
+        cenario._materias_removidas = set(self._materias_removidas)
+        cenario._salas_removidas = set(self._salas_removidas)
+        return cenario
+
+    # Operações de cenário
+    def alterar_inscritos(self, materia_id: str, inscritos: int) -> Materia:
+        """Altera o número de inscritos de uma matéria neste cenário"""
+        return self._alterar_materia(materia_id, inscritos=inscritos)
+
+    def mover_horario(self, materia_id: str, horario: str) -> Materia:
+        """Move uma matéria para outro horário neste cenário"""
+        return self._alterar_materia(materia_id, horario=horario)
+
+    def adicionar_sala(self, sala: Sala) -> bool:
+        """Adiciona uma sala extra neste cenário"""
+        return self.salvar_sala(sala)
+
+    def fechar_sala(self, sala_id: str) -> bool:
+        """Remove uma sala deste cenário"""
+        return self.remover_sala(sala_id)
+
+    def remover_sala(self, sala_id: str) -> bool:
+        """Remove uma sala deste cenário"""
+        if self.buscar_sala_por_id(sala_id) is None:
+            return False
+        self._salas_alteradas.pop(sala_id, None)
+        self._salas_removidas.add(sala_id)
+        for materia_id in [m for m, a in self._alocacoes.items() if a.sala.id == sala_id]:
+            del self._alocacoes[materia_id]
+        return True
+
+    def remover_materia(self, materia_id: str) -> bool:
+        """Remove uma matéria deste cenário"""
+        if self.buscar_materia_por_id(materia_id) is None:
+            return False
+        self._materias_alteradas.pop(materia_id, None)
+        self._materias_removidas.add(materia_id)
+        self._alocacoes.pop(materia_id, None)
+        return True
+
+    def _alterar_materia(self, materia_id: str, **alteracoes: Any) -> Materia:
+        """Cria uma nova versão da matéria sem tocar no registro compartilhado"""
+        materia = self.buscar_materia_por_id(materia_id)
+        if materia is None:
+            raise KeyError(f"Matéria {materia_id} não encontrada no cenário {self.nome}")
+        nova = replace(materia, **alteracoes)
+        self._materias_alteradas[materia_id] = nova
+        return nova
+
+    def diferencas(self) -> Dict[str, Any]:
+        """Resume os deltas deste cenário em relação à base"""
+        return {
+            'materias_alteradas': sorted(self._materias_alteradas),
+            'materias_removidas': sorted(self._materias_removidas),
+            'salas_alteradas': sorted(self._salas_alteradas),
+            'salas_removidas': sorted(self._salas_removidas),
+        }
+
+    # Implementação da interface Repository
+    def salvar_materia(self, materia: Materia) -> bool:
+        """Salva uma matéria apenas neste cenário"""
+        self._materias_removidas.discard(materia.id)
+        self._materias_alteradas[materia.id] = materia
+        return True
+
+    def salvar_sala(self, sala: Sala) -> bool:
+        """Salva uma sala apenas neste cenário"""
+        self._salas_removidas.discard(sala.id)
+        self._salas_alteradas[sala.id] = sala
+        return True
+
+    def buscar_materias(self) -> List[Materia]:
+        """Busca as matérias do cenário (base + deltas)"""
+        return self._mesclar(self.base.buscar_materias(), self._materias_alteradas,
+                             self._materias_removidas)
+
+    def buscar_salas(self) -> List[Sala]:
+        """Busca as salas do cenário (base + deltas)"""
+        return self._mesclar(self.base.buscar_salas(), self._salas_alteradas,
+                             self._salas_removidas)
+
+    def buscar_materia_por_id(self, materia_id: str) -> Optional[Materia]:
+        """Busca matéria por ID"""
+        if materia_id in self._materias_removidas:
+            return None
+        if materia_id in self._materias_alteradas:
+            return self._materias_alteradas[materia_id]
+        return self.base.buscar_materia_por_id(materia_id)
+
+    def buscar_sala_por_id(self, sala_id: str) -> Optional[Sala]:
+        """Busca sala por ID"""
+        if sala_id in self._salas_removidas:
+            return None
+        if sala_id in self._salas_alteradas:
+            return self._salas_alteradas[sala_id]
+        return self.base.buscar_sala_por_id(sala_id)
+
+    @staticmethod
+    def _mesclar(registros_base: list, alterados: dict, removidos: Set[str]) -> list:
+        """Aplica substituições, remoções e inclusões sobre os registros da base"""
+        resultado = []
+        vistos = set()
+        for registro in registros_base:
+            vistos.add(registro.id)
+            if registro.id in removidos:
+                continue
+            resultado.append(alterados.get(registro.id, registro))
+        resultado.extend(r for r_id, r in alterados.items() if r_id not in vistos)
+        return resultado
+
+    # Alocações próprias do cenário
+    def salvar_alocacao(self, alocacao: Alocacao) -> bool:
+        """Salva uma alocação deste cenário"""
+        self._alocacoes[alocacao.materia.id] = alocacao
+        return True
+
+    def buscar_alocacoes(self) -> List[Alocacao]:
+        """Busca as alocações deste cenário"""
+        return list(self._alocacoes.values())
+
+    def limpar_alocacoes(self):
+        """Limpa as alocações deste cenário"""
+        self._alocacoes.clear()
@@ -0,0 +1,361 @@
+"""
+Repositório persistente em SQLite.
+Implementa Repository Pattern com tabelas indexadas por horário, sala, local e capacidade.
+"""
+
+import json
+import sqlite3
+from typing import List, Optional, Iterable
+from ..models.domain import Materia, Sala, Alocacao, TipoSala, LocalSala
+from ..strategies.interfaces import Repository
+from ..utils.horarios import extrair_slots_tempo
+
+
+ESQUEMA_SQL = """
+CREATE TABLE IF NOT EXISTS materias (
+    cenario TEXT NOT NULL,
+    id TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    inscritos INTEGER NOT NULL,
+    horario TEXT NOT NULL,
+    material INTEGER NOT NULL,
+    docente TEXT NOT NULL DEFAULT '',
+    curso TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (cenario, id)
+);
+
+CREATE TABLE IF NOT EXISTS salas (
+    cenario TEXT NOT NULL,
+    id TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    capacidade INTEGER NOT NULL,
+    tipo TEXT NOT NULL,
+    local TEXT NOT NULL,
+    tipo_equipamento INTEGER NOT NULL,
+    materiais_disponiveis TEXT NOT NULL,
+    custo_adicional REAL NOT NULL,
+    PRIMARY KEY (cenario, id)
+);
+
+CREATE TABLE IF NOT EXISTS slots_materia (
+    cenario TEXT NOT NULL,
+    materia_id TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    PRIMARY KEY (cenario, materia_id, slot)
+);
+
+CREATE TABLE IF NOT EXISTS alocacoes (
+    cenario TEXT NOT NULL,
+    materia_id TEXT NOT NULL,
+    sala_id TEXT NOT NULL,
+    espaco_ocioso INTEGER NOT NULL,
+    utilizacao_percentual REAL NOT NULL,
+    PRIMARY KEY (cenario, materia_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_salas_local ON salas (cenario, local);
+CREATE INDEX IF NOT EXISTS idx_salas_capacidade ON salas (cenario, capacidade);
+CREATE INDEX IF NOT EXISTS idx_slots_slot ON slots_materia (cenario, slot, materia_id);
+CREATE INDEX IF NOT EXISTS idx_alocacoes_sala ON alocacoes (cenario, sala_id);
+"""
+
+COLUNAS_MATERIA = "id, nome, inscritos, horario, material, docente, curso"
+NUM_COLUNAS_MATERIA = len(COLUNAS_MATERIA.split(","))
+
+# Colunas acrescentadas depois da primeira versão do esquema, migradas em arquivos antigos
+COLUNAS_MIGRADAS = {
+    "materias": [("docente", "TEXT NOT NULL DEFAULT ''"), ("curso", "TEXT NOT NULL DEFAULT ''")],
+}
+COLUNAS_SALA = ("id, nome, capacidade, tipo, local, tipo_equipamento, "
+                "materiais_disponiveis, custo_adicional")
+
+
+class SQLiteRepository(Repository):
+    """Repositório de matérias, salas e alocações persistido em arquivo SQLite"""
+
+    def __init__(self, caminho: str = ":memory:", cenario: str = "padrao"):
+        self.caminho = caminho
+        self.cenario = cenario
+        self.conexao = sqlite3.connect(caminho)
+        self._configurar_conexao()
+
+    def _configurar_conexao(self):
+        """Ativa WAL e cria tabelas e índices"""
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.conexao.executescript(ESQUEMA_SQL)
+        self._migrar_esquema()
+        self.conexao.commit()
+
+    def _migrar_esquema(self):
+        """Acrescenta as colunas que faltam em arquivos criados por versões anteriores"""
+        for tabela, colunas in COLUNAS_MIGRADAS.items():
+            existentes = {linha[1] for linha in self.conexao.execute(f"PRAGMA table_info({tabela})")}
+            for nome, definicao in colunas:
+                if nome not in existentes:
+                    self.conexao.execute(f"ALTER TABLE {tabela} ADD COLUMN {nome} {definicao}")
+
+    def fechar(self):
+        """Fecha a conexão com o banco"""
+        self.conexao.close()
+
+    def __enter__(self) -> 'SQLiteRepository':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fechar()
+
+    def com_cenario(self, cenario: str) -> 'SQLiteRepository':
+        """Abre outro cenário (ou semestre) no mesmo arquivo"""
+        if self.caminho == ":memory:":
+            raise ValueError("Cenários compartilhados exigem um arquivo em disco")
+        return SQLiteRepository(self.caminho, cenario)
+
+    def listar_cenarios(self) -> List[str]:
+        """Lista os cenários armazenados no arquivo"""
+        cursor = self.conexao.execute(
+            "SELECT cenario FROM materias UNION SELECT cenario FROM salas ORDER BY cenario"
+        )
+        return [linha[0] for linha in cursor]
+
+    # Conversão entre linhas e objetos de domínio
+    def _linha_materia(self, materia: Materia) -> tuple:
+        return (self.cenario, materia.id, materia.nome, materia.inscritos,
+                materia.horario, materia.material, materia.docente, materia.curso)
+
+    def _linha_sala(self, sala: Sala) -> tuple:
+        return (self.cenario, sala.id, sala.nome, sala.capacidade, sala.tipo.value,
+                sala.local.value, sala.tipo_equipamento,
+                json.dumps(sala.materiais_disponiveis), sala.custo_adicional)
+
+    def _linhas_slots(self, materia: Materia) -> List[tuple]:
+        slots = dict.fromkeys(extrair_slots_tempo(materia.horario))
+        return [(self.cenario, materia.id, slot) for slot in slots]
+
+    @staticmethod
+    def _criar_materia(linha: tuple) -> Materia:
+        return Materia(id=linha[0], nome=linha[1], inscritos=linha[2],
+                       horario=linha[3], material=linha[4],
+                       docente=linha[5], curso=linha[6])
+
+    @staticmethod
+    def _criar_sala(linha: tuple) -> Sala:
+        return Sala(id=linha[0], nome=linha[1], capacidade=linha[2],
+                    tipo=TipoSala(linha[3]), local=LocalSala(linha[4]),
+                    tipo_equipamento=linha[5],
+                    materiais_disponiveis=json.loads(linha[6]),
+                    custo_adicional=linha[7])
+
+    # Implementação da interface Repository
+    def salvar_materia(self, materia: Materia) -> bool:
+        """Salva uma matéria"""
+        return self.salvar_materias([materia])
+
+    def salvar_sala(self, sala: Sala) -> bool:
+        """Salva uma sala"""
+        return self.salvar_salas([sala])
+
+    def buscar_materias(self) -> List[Materia]:
+        """Busca todas as matérias"""
+        cursor = self.conexao.execute(
+            f"SELECT {COLUNAS_MATERIA} FROM materias WHERE cenario = ? ORDER BY rowid",
+            (self.cenario,)
+        )
+        return [self._criar_materia(linha) for linha in cursor]
+
+    def buscar_salas(self) -> List[Sala]:
+        """Busca todas as salas"""
+        cursor = self.conexao.execute(
+            f"SELECT {COLUNAS_SALA} FROM salas WHERE cenario = ? ORDER BY rowid",
+            (self.cenario,)
+        )
+        return [self._criar_sala(linha) for linha in cursor]
+
+    def buscar_materia_por_id(self, materia_id: str) -> Optional[Materia]:
+        """Busca matéria por ID"""
+        linha = self.conexao.execute(
+            f"SELECT {COLUNAS_MATERIA} FROM materias WHERE cenario = ? AND id = ?",
+            (self.cenario, materia_id)
+        ).fetchone()
+        return self._criar_materia(linha) if linha else None
+
+    def buscar_sala_por_id(self, sala_id: str) -> Optional[Sala]:
+        """Busca sala por ID"""
+        linha = self.conexao.execute(
+            f"SELECT {COLUNAS_SALA} FROM salas WHERE cenario = ? AND id = ?",
+            (self.cenario, sala_id)
+        ).fetchone()
+        return self._criar_sala(linha) if linha else None
+
+    # Operações em lote
+    def salvar_materias(self, materias: Iterable[Materia]) -> bool:
+        """Salva várias matérias e seus slots de horário em uma única transação"""
+        materias = list(materias)
+        try:
+            with self.conexao:
+                self.conexao.executemany(
+                    "DELETE FROM slots_materia WHERE cenario = ? AND materia_id = ?",
+                    [(self.cenario, m.id) for m in materias]
+                )
+                self.conexao.executemany(
+                    f"""INSERT INTO materias (cenario, {COLUNAS_MATERIA}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (cenario, id) DO UPDATE SET
+                           nome = excluded.nome, inscritos = excluded.inscritos,
+                           horario = excluded.horario, material = excluded.material,
+                           docente = excluded.docente, curso = excluded.curso""",
+                    [self._linha_materia(m) for m in materias]
+                )
+                self.conexao.executemany(
+                    "INSERT INTO slots_materia VALUES (?, ?, ?)",
+                    [linha for m in materias for linha in self._linhas_slots(m)]
+                )
+            return True
+        except sqlite3.Error:
+            return False
+
+    def salvar_salas(self, salas: Iterable[Sala]) -> bool:
+        """Salva várias salas em uma única transação"""
+        try:
+            with self.conexao:
+                self.conexao.executemany(
+                    """INSERT INTO salas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (cenario, id) DO UPDATE SET
+                           nome = excluded.nome, capacidade = excluded.capacidade,
+                           tipo = excluded.tipo, local = excluded.local,
+                           tipo_equipamento = excluded.tipo_equipamento,
+                           materiais_disponiveis = excluded.materiais_disponiveis,
+                           custo_adicional = excluded.custo_adicional""",
+                    [self._linha_sala(s) for s in salas]
+                )
+            return True
+        except sqlite3.Error:
+            return False
+
+    def remover_materia(self, materia_id: str) -> bool:
+        """Remove uma matéria, seus slots e sua alocação"""
+        parametros = (self.cenario, materia_id)
+        with self.conexao:
+            cursor = self.conexao.execute(
+                "DELETE FROM materias WHERE cenario = ? AND id = ?", parametros)
+            self.conexao.execute(
+                "DELETE FROM slots_materia WHERE cenario = ? AND materia_id = ?", parametros)
+            self.conexao.execute(
+                "DELETE FROM alocacoes WHERE cenario = ? AND materia_id = ?", parametros)
+        return cursor.rowcount > 0
+
+    def remover_sala(self, sala_id: str) -> bool:
+        """Remove uma sala e as alocações que a utilizam"""
+        parametros = (self.cenario, sala_id)
+        with self.conexao:
+            cursor = self.conexao.execute(
+                "DELETE FROM salas WHERE cenario = ? AND id = ?", parametros)
+            self.conexao.execute(
+                "DELETE FROM alocacoes WHERE cenario = ? AND sala_id = ?", parametros)
+        return cursor.rowcount > 0
+
+    def importar_repositorio(self, repository: Repository) -> bool:
+        """Copia matérias e salas de outro repositório"""
+        return (self.salvar_materias(repository.buscar_materias()) and
+                self.salvar_salas(repository.buscar_salas()))
+
+    # Alocações
+    def salvar_alocacao(self, alocacao: Alocacao) -> bool:
+        """Salva uma alocação"""
+        return self.salvar_alocacoes([alocacao])
+
+    def salvar_alocacoes(self, alocacoes: Iterable[Alocacao]) -> bool:
+        """Salva várias alocações em uma única transação"""
+        try:
+            with self.conexao:
+                self.conexao.executemany(
+                    "INSERT OR REPLACE INTO alocacoes VALUES (?, ?, ?, ?, ?)",
+                    [(self.cenario, a.materia.id, a.sala.id, a.espaco_ocioso,
+                      a.utilizacao_percentual) for a in alocacoes]
+                )
+            return True
+        except sqlite3.Error:
+            return False
+
+    def buscar_alocacoes(self) -> List[Alocacao]:
+        """Busca todas as alocações"""
+        return self._buscar_alocacoes_onde("", ())
+
+    def limpar_alocacoes(self):
+        """Limpa todas as alocações"""
+        with self.conexao:
+            self.conexao.execute("DELETE FROM alocacoes WHERE cenario = ?", (self.cenario,))
+
+    def _buscar_alocacoes_onde(self, filtro: str, parametros: tuple) -> List[Alocacao]:
+        """Monta alocações a partir da junção entre alocações, matérias e salas"""
+        colunas_materia = ", ".join(f"m.{c.strip()}" for c in COLUNAS_MATERIA.split(","))
+        colunas_sala = ", ".join(f"s.{c.strip()}" for c in COLUNAS_SALA.split(","))
+        cursor = self.conexao.execute(
+            f"""SELECT {colunas_materia}, {colunas_sala}
+                FROM alocacoes a
+                JOIN materias m ON m.cenario = a.cenario AND m.id = a.materia_id
+                JOIN salas s ON s.cenario = a.cenario AND s.id = a.sala_id
+                WHERE a.cenario = ? {filtro}
+                ORDER BY a.rowid""",
+            (self.cenario,) + parametros
+        )
+
+        alocacoes = []
+        salas = {}
+        for linha in cursor:
+            materia = self._criar_materia(linha[:NUM_COLUNAS_MATERIA])
+            sala_id = linha[NUM_COLUNAS_MATERIA]
+            if sala_id not in salas:
+                salas[sala_id] = self._criar_sala(linha[NUM_COLUNAS_MATERIA:])
+            sala = salas[sala_id]
+            alocacoes.append(Alocacao(
+                materia=materia,
+                sala=sala,
+                espaco_ocioso=sala.calcular_espaco_ocioso(materia.inscritos),
+                utilizacao_percentual=sala.calcular_utilizacao(materia.inscritos)
+            ))
+        return alocacoes
+
+    # Consultas indexadas
+    def buscar_alocacoes_por_sala(self, sala_id: str) -> List[Alocacao]:
+        """Busca as alocações de uma sala"""
+        return self._buscar_alocacoes_onde("AND a.sala_id = ?", (sala_id,))
+
+    def buscar_alocacoes_por_slot(self, slot: str) -> List[Alocacao]:
+        """Busca as alocações que ocupam um slot (ex: 'Segunda 09:00-09:50')"""
+        return self._buscar_alocacoes_onde(
+            """AND a.materia_id IN (SELECT materia_id FROM slots_materia
+                                    WHERE cenario = a.cenario AND slot = ?)""",
+            (slot,)
+        )
+
+    def buscar_salas_por_local(self, local: LocalSala) -> List[Sala]:
+        """Busca salas de uma localização"""
+        cursor = self.conexao.execute(
+            f"SELECT {COLUNAS_SALA} FROM salas WHERE cenario = ? AND local = ? ORDER BY rowid",
+            (self.cenario, local.value)
+        )
+        return [self._criar_sala(linha) for linha in cursor]
+
+    def buscar_salas_por_capacidade_minima(self, capacidade: int) -> List[Sala]:
+        """Busca salas com capacidade maior ou igual à informada, da menor para a maior"""
+        cursor = self.conexao.execute(
+            f"""SELECT {COLUNAS_SALA} FROM salas
+                WHERE cenario = ? AND capacidade >= ?
+                ORDER BY capacidade, rowid""",
+            (self.cenario, capacidade)
+        )
+        return [self._criar_sala(linha) for linha in cursor]
+
+    def buscar_salas_livres(self, slot: str, capacidade_minima: int = 0) -> List[Sala]:
+        """Busca salas sem alocação no slot informado"""
+        cursor = self.conexao.execute(
+            f"""SELECT {COLUNAS_SALA} FROM salas s
+                WHERE s.cenario = ? AND s.capacidade >= ?
+                  AND s.id NOT IN (
+                      SELECT a.sala_id FROM slots_materia sm
+                      JOIN alocacoes a ON a.cenario = sm.cenario AND a.materia_id = sm.materia_id
+                      WHERE sm.cenario = ? AND sm.slot = ?)
+                ORDER BY s.capacidade, s.rowid""",
+            (self.cenario, capacidade_minima, self.cenario, slot)
+        )
+        return [self._criar_sala(linha) for linha in cursor]
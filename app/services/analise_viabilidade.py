@@ -0,0 +1,181 @@
+"""
+Análise de viabilidade antes da resolução.
+Para cada slot de horário verifica, por emparelhamento bipartido (Hopcroft-Karp), se há
+salas compatíveis e com capacidade suficiente para todas as matérias simultâneas, e
+reporta o conjunto de matérias que viola a condição de Hall (o gargalo exato).
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+from ..models.domain import Materia, Sala
+from ..strategies.interfaces import CompatibilidadeStrategy
+from .tamanho_modelo import agrupar_indices_por_slot
+
+LIVRE = -1
+
+
+@dataclass
+class GargaloHorario:
+    """Matérias de um slot que disputam menos salas do que precisam"""
+    slot: str
+    materias: List[str]
+    salas: List[str]
+
+    @property
+    def deficit(self) -> int:
+        return len(self.materias) - len(self.salas)
+
+    def descricao(self) -> str:
+        salas = ', '.join(self.salas) or 'nenhuma'
+        return (f"{self.slot}: {len(self.materias)} matérias ({', '.join(self.materias)}) "
+                f"para {len(self.salas)} salas ({salas})")
+
+
+@dataclass
+class RelatorioViabilidade:
+    """Resultado da verificação de viabilidade pré-solver"""
+    materias_sem_sala: List[str] = field(default_factory=list)
+    gargalos: List[GargaloHorario] = field(default_factory=list)
+    slots_analisados: int = 0
+    tempo: float = 0.0
+
+    @property
+    def viavel(self) -> bool:
+        """Condição necessária: o modelo pode ainda assim ser inviável por matérias em vários slots"""
+        return not self.materias_sem_sala and not self.gargalos
+
+    def resumo(self) -> str:
+        if self.viavel:
+            return f"Nenhum gargalo encontrado em {self.slots_analisados} slots"
+        linhas = ["Instância inviável detectada antes da resolução:"]
+        if self.materias_sem_sala:
+            linhas.append(f"- Matérias sem sala compatível com capacidade suficiente: "
+                          f"{', '.join(self.materias_sem_sala)}")
+        for gargalo in self.gargalos:
+            linhas.append(f"- Faltam {gargalo.deficit} sala(s) em {gargalo.descricao()}")
+        return '\n'.join(linhas)
+
+
+def _hopcroft_karp(adjacencias: List[List[int]], n_salas: int) -> List[int]:
+    """Emparelhamento máximo matéria -> sala; retorna a sala de cada matéria ou LIVRE"""
+    par_materia = [LIVRE] * len(adjacencias)
+    par_sala = [LIVRE] * n_salas
+    infinito = len(adjacencias) + 1
+
+    while True:
+        # Busca em largura: camadas a partir das matérias livres
+        distancia = [infinito] * len(adjacencias)
+        fila = deque()
+        for u, sala in enumerate(par_materia):
+            if sala == LIVRE:
+                distancia[u] = 0
+                fila.append(u)
+        alcancou_livre = False
+        while fila:
+            u = fila.popleft()
+            for v in adjacencias[u]:
+                w = par_sala[v]
+                if w == LIVRE:
+                    alcancou_livre = True
+                elif distancia[w] == infinito:
+                    distancia[w] = distancia[u] + 1
+                    fila.append(w)
+        if not alcancou_livre:
+            return par_materia
+
+        # Busca em profundidade iterativa por caminhos aumentantes disjuntos
+        proximo = [0] * len(adjacencias)
+        for raiz in range(len(adjacencias)):
+            if par_materia[raiz] != LIVRE:
+                continue
+            pilha = [raiz]
+            while pilha:
+                u = pilha[-1]
+                if proximo[u] >= len(adjacencias[u]):
+                    distancia[u] = infinito
+                    pilha.pop()
+                    continue
+                v = adjacencias[u][proximo[u]]
+                proximo[u] += 1
+                w = par_sala[v]
+                if w == LIVRE:
+                    # Inverte o caminho aumentante encontrado
+                    for u_caminho in reversed(pilha):
+                        anterior = par_materia[u_caminho]
+                        par_materia[u_caminho] = v
+                        par_sala[v] = u_caminho
+                        v = anterior
+                    break
+                if distancia[w] == distancia[u] + 1:
+                    pilha.append(w)
+
+
+def _conjunto_hall(adjacencias: List[List[int]], par_materia: List[int],
+                   n_salas: int) -> Tuple[List[int], List[int]]:
+    """Matérias alcançáveis por caminhos alternantes a partir das não emparelhadas e suas salas"""
+    par_sala = [LIVRE] * n_salas
+    for u, v in enumerate(par_materia):
+        if v != LIVRE:
+            par_sala[v] = u
+
+    materias_visitadas = {u for u, v in enumerate(par_materia) if v == LIVRE}
+    salas_visitadas = set()
+    fila = deque(materias_visitadas)
+    while fila:
+        u = fila.popleft()
+        for v in adjacencias[u]:
+            if v in salas_visitadas:
+                continue
+            salas_visitadas.add(v)
+            w = par_sala[v]
+            if w != LIVRE and w not in materias_visitadas:
+                materias_visitadas.add(w)
+                fila.append(w)
+    # Pelo teorema de König todas essas salas estão emparelhadas, logo |N(S)| < |S|
+    return sorted(materias_visitadas), sorted(salas_visitadas)
+
+
+def analisar_viabilidade(materias: List[Materia], salas: List[Sala],
+                         compatibilidade: CompatibilidadeStrategy,
+                         matriz: Optional[np.ndarray] = None,
+                         grupos: Optional[Dict[str, List[int]]] = None) -> RelatorioViabilidade:
+    """Verifica as condições de Hall por slot e retorna os gargalos encontrados"""
+    inicio = time.perf_counter()
+    if matriz is None:
+        matriz = compatibilidade.matriz_compatibilidade(materias, salas)
+    grupos = grupos if grupos is not None else agrupar_indices_por_slot(materias)
+
+    capacidades = np.array([s.capacidade for s in salas], dtype=np.int64)
+    inscritos = np.array([m.inscritos for m in materias], dtype=np.int64)
+    viaveis = matriz & (capacidades[None, :] >= inscritos[:, None])
+
+    relatorio = RelatorioViabilidade(slots_analisados=len(grupos))
+    sem_sala = ~viaveis.any(axis=1) if len(materias) else np.zeros(0, dtype=bool)
+    relatorio.materias_sem_sala = [materias[i].id for i in np.flatnonzero(sem_sala)]
+
+    for slot, indices in grupos.items():
+        # Matérias sem nenhuma sala já foram reportadas; aqui interessa a disputa entre elas
+        indices = [i for i in indices if not sem_sala[i]]
+        if len(indices) < 2:
+            continue
+        submatriz = viaveis[indices]
+        salas_slot = np.flatnonzero(submatriz.any(axis=0))
+        posicao = {j: k for k, j in enumerate(salas_slot)}
+        adjacencias = [[posicao[j] for j in np.flatnonzero(linha)] for linha in submatriz]
+        par_materia = _hopcroft_karp(adjacencias, len(salas_slot))
+        if LIVRE not in par_materia:
+            continue
+
+        materias_hall, salas_hall = _conjunto_hall(adjacencias, par_materia, len(salas_slot))
+        relatorio.gargalos.append(GargaloHorario(
+            slot=slot,
+            materias=[materias[indices[u]].id for u in materias_hall],
+            salas=[salas[salas_slot[v]].id for v in salas_hall],
+        ))
+
+    relatorio.gargalos.sort(key=lambda g: (-g.deficit, g.slot))
+    relatorio.tempo = time.perf_counter() - inicio
+    return relatorio
@@ -0,0 +1,69 @@
+"""
+Atribuição de custo mínimo.
+Implementa o algoritmo húngaro (potenciais e caminhos mínimos, O(n²m)) com o laço
+interno vetorizado em numpy, para matrizes retangulares de custo matéria x sala.
+"""
+
+from typing import Optional
+import numpy as np
+
+SEM_ATRIBUICAO = -1
+
+
+def atribuicao_custo_minimo(custos: np.ndarray, permitidos: Optional[np.ndarray] = None) -> np.ndarray:
+    """Retorna a coluna atribuída a cada linha (ou SEM_ATRIBUICAO se não houver atribuição viável)"""
+    n, m = custos.shape
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if n > m:
+        return np.full(n, SEM_ATRIBUICAO, dtype=np.int64)
+
+    custos = np.asarray(custos, dtype=np.float64)
+    if permitidos is not None:
+        # Pares proibidos recebem um custo maior que qualquer atribuição viável completa
+        penalidade = (np.abs(custos[permitidos]).max(initial=0.0) + 1.0) * (n + 1)
+        custos = np.where(permitidos, custos, penalidade)
+
+    # Índices 1..n / 1..m; a coluna 0 é a raiz fictícia de cada busca
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    linha_da_coluna = np.zeros(m + 1, dtype=np.int64)
+    caminho = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        linha_da_coluna[0] = i
+        j0 = 0
+        minimo = np.full(m + 1, np.inf)
+        usada = np.zeros(m + 1, dtype=bool)
+        while True:
+            usada[j0] = True
+            i0 = linha_da_coluna[j0]
+            livres = ~usada[1:]
+            reduzido = custos[i0 - 1] - u[i0] - v[1:]
+            melhora = livres & (reduzido < minimo[1:])
+            minimo[1:][melhora] = reduzido[melhora]
+            caminho[1:][melhora] = j0
+
+            candidatos = np.where(livres, minimo[1:], np.inf)
+            j1 = int(np.argmin(candidatos)) + 1
+            delta = candidatos[j1 - 1]
+            u[linha_da_coluna[usada]] += delta
+            v[usada] -= delta
+            minimo[~usada] -= delta
+
+            j0 = j1
+            if linha_da_coluna[j0] == 0:
+                break
+
+        # Inverte o caminho aumentante
+        while j0:
+            j1 = caminho[j0]
+            linha_da_coluna[j0] = linha_da_coluna[j1]
+            j0 = j1
+
+    atribuicao = np.full(n, SEM_ATRIBUICAO, dtype=np.int64)
+    colunas = np.flatnonzero(linha_da_coluna[1:])
+    atribuicao[linha_da_coluna[1:][colunas] - 1] = colunas
+    if permitidos is not None:
+        atribuicao[~permitidos[np.arange(n), atribuicao]] = SEM_ATRIBUICAO
+    return atribuicao
@@ -0,0 +1,177 @@
+"""
+Barramento de eventos para observadores.
+Enfileira notificações e as entrega em threads de fundo, uma por observador,
+com entrega em lotes e limitação da taxa de eventos de progresso.
+"""
+
+import queue
+import threading
+import time
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from ..models.domain import Observer, AlocacaoResultado
+
+_ENCERRAR = object()
+
+
+class _EntregadorObserver:
+    """Fila e thread de entrega dedicadas a um observador"""
+
+    def __init__(self, observer: Observer, tamanho_lote: int, estatisticas: Dict[str, int],
+                 lock_estatisticas: threading.Lock):
+        self.observer = observer
+        self.tamanho_lote = tamanho_lote
+        self.fila: queue.Queue = queue.Queue()
+        self._estatisticas = estatisticas
+        self._lock_estatisticas = lock_estatisticas
+        self._thread = threading.Thread(target=self._executar, daemon=True,
+                                        name=f"observer-{type(observer).__name__}")
+        self._thread.start()
+
+    def enfileirar(self, evento: Tuple[str, tuple]):
+        self.fila.put(evento)
+
+    def encerrar(self, timeout: Optional[float] = None):
+        self.fila.put(_ENCERRAR)
+        self._thread.join(timeout)
+
+    def _executar(self):
+        """Retira eventos em lotes e os entrega na ordem de chegada"""
+        while True:
+            lote = [self.fila.get()]
+            while len(lote) < self.tamanho_lote:
+                try:
+                    lote.append(self.fila.get_nowait())
+                except queue.Empty:
+                    break
+
+            encerrar = False
+            for evento in lote:
+                if evento is _ENCERRAR:
+                    encerrar = True
+                else:
+                    self._entregar(*evento)
+                self.fila.task_done()
+
+            with self._lock_estatisticas:
+                self._estatisticas['lotes'] += 1
+            if encerrar:
+                return
+
+    def _entregar(self, metodo: str, argumentos: tuple):
+        try:
+            getattr(self.observer, metodo)(*argumentos)
+            contador = 'entregues'
+        except Exception:
+            # Um observador com falha não interrompe a entrega aos demais
+            contador = 'falhas_entrega'
+        with self._lock_estatisticas:
+            self._estatisticas[contador] += 1
+
+
+class BarramentoEventos(Observer):
+    """Observador que repassa notificações de forma assíncrona aos observadores inscritos"""
+
+    def __init__(self, observers: Iterable[Observer] = (), intervalo_progresso: float = 0.1,
+                 tamanho_lote: int = 64):
+        self.intervalo_progresso = intervalo_progresso
+        self.tamanho_lote = tamanho_lote
+        self._entregadores: List[_EntregadorObserver] = []
+        self._lock = threading.Lock()
+        self._ultimo_progresso = 0.0
+        self._ultima_etapa: Optional[str] = None
+        self._progresso_pendente: Optional[Tuple[str, float]] = None
+        self._lock_estatisticas = threading.Lock()
+        self.estatisticas = {'publicados': 0, 'progresso_descartado': 0,
+                             'entregues': 0, 'falhas_entrega': 0, 'lotes': 0}
+
+        for observer in observers:
+            self.inscrever(observer)
+
+    # Inscrições
+    def inscrever(self, observer: Observer):
+        """Inscreve um observador com fila e thread próprias"""
+        with self._lock:
+            self._entregadores.append(_EntregadorObserver(observer, self.tamanho_lote,
+                                                          self.estatisticas, self._lock_estatisticas))
+
+    def cancelar_inscricao(self, observer: Observer):
+        """Remove um observador após entregar os eventos já enfileirados"""
+        with self._lock:
+            entregadores = [e for e in self._entregadores if e.observer is observer]
+            self._entregadores = [e for e in self._entregadores if e.observer is not observer]
+        for entregador in entregadores:
+            entregador.encerrar()
+
+    @property
+    def observers(self) -> List[Observer]:
+        return [e.observer for e in self._entregadores]
+
+    # Interface Observer: apenas enfileira, sem bloquear quem notifica
+    def on_progress(self, etapa: str, progresso: float):
+        """Publica progresso; atualizações da mesma etapa são limitadas por intervalo"""
+        agora = time.monotonic()
+        with self._lock:
+            mesma_etapa = etapa == self._ultima_etapa
+            if mesma_etapa and agora - self._ultimo_progresso < self.intervalo_progresso:
+                # Retém apenas o valor mais recente, entregue na próxima publicação
+                if self._progresso_pendente is not None:
+                    self.estatisticas['progresso_descartado'] += 1
+                self._progresso_pendente = (etapa, progresso)
+                return
+            pendente = None if mesma_etapa else self._progresso_pendente
+            self._ultimo_progresso = agora
+            self._ultima_etapa = etapa
+            self._progresso_pendente = None
+        if pendente is not None:
+            self._publicar('on_progress', pendente)
+        self._publicar('on_progress', (etapa, progresso))
+
+    def on_sucesso(self, resultado: AlocacaoResultado):
+        self._liberar_progresso_pendente()
+        self._publicar('on_sucesso', (resultado,))
+
+    def on_erro(self, erro: str):
+        self._liberar_progresso_pendente()
+        self._publicar('on_erro', (erro,))
+
+    def on_evento(self, evento: Dict[str, Any]):
+        self._liberar_progresso_pendente()
+        self._publicar('on_evento', (evento,))
+
+    def _publicar(self, metodo: str, argumentos: tuple):
+        with self._lock:
+            entregadores = list(self._entregadores)
+            self.estatisticas['publicados'] += 1
+        for entregador in entregadores:
+            entregador.enfileirar((metodo, argumentos))
+
+    def _liberar_progresso_pendente(self):
+        with self._lock:
+            pendente, self._progresso_pendente = self._progresso_pendente, None
+            if pendente is not None:
+                self._ultimo_progresso = time.monotonic()
+        if pendente is not None:
+            self._publicar('on_progress', pendente)
+
+    # Sincronização
+    def descarregar(self):
+        """Aguarda a entrega de todos os eventos publicados até agora"""
+        self._liberar_progresso_pendente()
+        with self._lock:
+            entregadores = list(self._entregadores)
+        for entregador in entregadores:
+            entregador.fila.join()
+
+    def fechar(self):
+        """Entrega os eventos pendentes e encerra as threads de entrega"""
+        self._liberar_progresso_pendente()
+        with self._lock:
+            entregadores, self._entregadores = self._entregadores, []
+        for entregador in entregadores:
+            entregador.encerrar()
+
+    def __enter__(self) -> 'BarramentoEventos':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fechar()
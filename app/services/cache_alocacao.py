@@ -0,0 +1,267 @@
+"""
+Memoização de resultados de alocação.
+Implementa cache LRU em memória com camada opcional em disco, indexado pela
+impressão digital das entradas (matérias, salas, regras de compatibilidade e parâmetros).
+"""
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import is_dataclass
+from enum import Enum
+from typing import List, Dict, Optional, Any, Tuple
+import numpy as np
+from ..models.domain import Materia, Sala, AlocacaoResultado, Observer
+from ..strategies.interfaces import AlocacaoStrategy, CompatibilidadeStrategy, SolverStrategy
+from ..utils.instrumentacao import Instrumentacao
+
+TIPOS_PRIMITIVOS = (str, int, float, bool)
+TIPOS_CONFIGURACAO = (AlocacaoStrategy, CompatibilidadeStrategy, SolverStrategy)
+
+
+class ParametroNaoMemoizavel(TypeError):
+    """Parâmetro de estratégia sem representação canônica na chave do cache"""
+
+
+def _descrever_parametros(objeto: Any) -> Dict[str, Any]:
+    """Descreve classe e atributos públicos de uma estratégia, recursivamente"""
+    # Só a configuração entra na chave: estado de execução fica em atributos privados ("_")
+    # ou declarados em ATRIBUTOS_EXECUCAO na classe
+    descricao = {'classe': f"{type(objeto).__module__}.{type(objeto).__qualname__}"}
+    execucao = getattr(type(objeto), 'ATRIBUTOS_EXECUCAO', ())
+    for nome, valor in sorted(vars(objeto).items()):
+        if nome.startswith('_') or nome in execucao:
+            continue
+        descricao[nome] = _descrever_valor(valor, f"{type(objeto).__name__}.{nome}")
+    return descricao
+
+
+def _descrever_valor(valor: Any, caminho: str) -> Any:
+    """Representação canônica de um parâmetro; tipos desconhecidos não podem ser ignorados"""
+    if valor is None or isinstance(valor, TIPOS_PRIMITIVOS):
+        return valor
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, TIPOS_CONFIGURACAO) or (is_dataclass(valor) and not isinstance(valor, type)):
+        return _descrever_parametros(valor)
+    if isinstance(valor, (list, tuple)):
+        return [_descrever_valor(v, f"{caminho}[{i}]") for i, v in enumerate(valor)]
+    if isinstance(valor, (set, frozenset)):
+        return sorted((_descrever_valor(v, caminho) for v in valor), key=json.dumps)
+    if isinstance(valor, dict):
+        return {str(k): _descrever_valor(v, f"{caminho}[{k!r}]") for k, v in valor.items()}
+    # Ignorar o parâmetro faria configurações diferentes compartilharem a mesma chave
+    raise ParametroNaoMemoizavel(f"{caminho} ({type(valor).__name__}) não tem representação na chave do cache")
+
+
+def calcular_impressao_digital(materias: List[Materia], salas: List[Sala],
+                               estrategia: AlocacaoStrategy) -> str:
+    """Calcula a chave canônica (SHA-256) de uma execução de alocação
+
+    Levanta ParametroNaoMemoizavel se a estratégia tiver parâmetros sem representação canônica.
+    """
+    materias = sorted(materias, key=lambda m: m.id)
+    salas = sorted(salas, key=lambda s: s.id)
+
+    conteudo = {
+        'materias': [(m.id, m.nome, m.inscritos, m.horario, m.material, m.docente, m.curso) for m in materias],
+        'salas': [(s.id, s.nome, s.capacidade, s.tipo.value, s.local.value, s.tipo_equipamento,
+                   sorted(s.materiais_disponiveis), s.custo_adicional) for s in salas],
+        # Inclui estratégias aninhadas, compatibilidade e solver
+        'estrategia': _descrever_parametros(estrategia),
+    }
+    digest = hashlib.sha256(json.dumps(conteudo, sort_keys=True, default=str).encode('utf-8'))
+
+    # A matriz de compatibilidade captura o efeito real das regras sobre estes dados
+    matriz = estrategia.compatibilidade.matriz_compatibilidade(materias, salas)
+    digest.update(np.packbits(matriz).tobytes())
+
+    return digest.hexdigest()
+
+
+class CacheResultadosAlocacao:
+    """Cache LRU de resultados de alocação com camada opcional em disco"""
+
+    def __init__(self, capacidade: int = 32, diretorio: Optional[str] = None,
+                 capacidade_disco: int = 256):
+        self.capacidade = capacidade
+        self.diretorio = diretorio
+        self.capacidade_disco = capacidade_disco
+        self._memoria: 'OrderedDict[str, AlocacaoResultado]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.estatisticas = {
+            'acertos_memoria': 0,
+            'acertos_disco': 0,
+            'falhas': 0,
+            'remocoes_memoria': 0,
+            'remocoes_disco': 0,
+        }
+
+        if self.diretorio:
+            os.makedirs(self.diretorio, exist_ok=True)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Ao ser enviado a outro processo, leva apenas a configuração (a camada em disco é compartilhada)"""
+        estado = dict(self.__dict__)
+        estado['_memoria'] = OrderedDict()
+        del estado['_lock']
+        return estado
+
+    def __setstate__(self, estado: Dict[str, Any]):
+        self.__dict__.update(estado)
+        self._lock = threading.Lock()
+
+    def obter(self, chave: str) -> Optional[AlocacaoResultado]:
+        """Busca um resultado pela chave, promovendo acertos em disco para a memória"""
+        with self._lock:
+            if chave in self._memoria:
+                self._memoria.move_to_end(chave)
+                self.estatisticas['acertos_memoria'] += 1
+                return self._memoria[chave]
+
+        resultado = self._ler_disco(chave)
+        with self._lock:
+            if resultado is None:
+                self.estatisticas['falhas'] += 1
+                return None
+            self.estatisticas['acertos_disco'] += 1
+            self._inserir_memoria(chave, resultado)
+        return resultado
+
+    def armazenar(self, chave: str, resultado: AlocacaoResultado):
+        """Armazena um resultado nas camadas de memória e disco"""
+        with self._lock:
+            self._inserir_memoria(chave, resultado)
+        self._gravar_disco(chave, resultado)
+
+    def limpar(self):
+        """Remove todos os resultados em memória e em disco"""
+        with self._lock:
+            self._memoria.clear()
+        for caminho in self._arquivos_disco():
+            os.remove(caminho)
+
+    def obter_estatisticas(self) -> Dict[str, Any]:
+        """Retorna contadores de acertos, falhas e remoções"""
+        with self._lock:
+            estatisticas = dict(self.estatisticas)
+            estatisticas['itens_memoria'] = len(self._memoria)
+        acertos = estatisticas['acertos_memoria'] + estatisticas['acertos_disco']
+        consultas = acertos + estatisticas['falhas']
+        estatisticas['taxa_acerto'] = (acertos / consultas) if consultas else 0.0
+        return estatisticas
+
+    def _inserir_memoria(self, chave: str, resultado: AlocacaoResultado):
+        """Insere na camada LRU, removendo o item menos usado se necessário"""
+        self._memoria[chave] = resultado
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.capacidade:
+            self._memoria.popitem(last=False)
+            self.estatisticas['remocoes_memoria'] += 1
+
+    def _caminho_disco(self, chave: str) -> str:
+        return os.path.join(self.diretorio, f"{chave}.pkl")
+
+    def _arquivos_disco(self) -> List[str]:
+        if not self.diretorio or not os.path.isdir(self.diretorio):
+            return []
+        return [os.path.join(self.diretorio, nome) for nome in os.listdir(self.diretorio)
+                if nome.endswith('.pkl')]
+
+    def _ler_disco(self, chave: str) -> Optional[AlocacaoResultado]:
+        """Lê um resultado da camada em disco"""
+        if not self.diretorio:
+            return None
+        caminho = self._caminho_disco(chave)
+        try:
+            with open(caminho, 'rb') as arquivo:
+                resultado = pickle.load(arquivo)
+            os.utime(caminho)
+            return resultado
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _gravar_disco(self, chave: str, resultado: AlocacaoResultado):
+        """Grava um resultado em disco de forma atômica e aplica o limite de arquivos"""
+        if not self.diretorio:
+            return
+        caminho = self._caminho_disco(chave)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        try:
+            with open(temporario, 'wb') as arquivo:
+                pickle.dump(resultado, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, caminho)
+        except (OSError, pickle.PicklingError):
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            return
+
+        arquivos = sorted(self._arquivos_disco(), key=os.path.getmtime)
+        for antigo in arquivos[:max(0, len(arquivos) - self.capacidade_disco)]:
+            os.remove(antigo)
+            with self._lock:
+                self.estatisticas['remocoes_disco'] += 1
+
+
+class AlocacaoMemoizadaStrategy(AlocacaoStrategy):
+    """Decorador de estratégia que reutiliza resultados de entradas já resolvidas"""
+
+    def __init__(self, estrategia: AlocacaoStrategy, cache: CacheResultadosAlocacao = None):
+        super().__init__(estrategia.compatibilidade)
+        self.estrategia = estrategia
+        self.cache = cache or CacheResultadosAlocacao()
+
+    def com_compatibilidade(self, compatibilidade) -> 'AlocacaoMemoizadaStrategy':
+        """Aplica a nova compatibilidade à estratégia decorada, mantendo o mesmo cache"""
+        return AlocacaoMemoizadaStrategy(self.estrategia.com_compatibilidade(compatibilidade),
+                                         self.cache)
+
+    def adicionar_observer(self, observer: Observer):
+        """Os observadores acompanham a estratégia decorada, que é quem reporta o progresso"""
+        super().adicionar_observer(observer)
+        self.estrategia.adicionar_observer(observer)
+
+    def remover_observer(self, observer: Observer):
+        super().remover_observer(observer)
+        self.estrategia.remover_observer(observer)
+
+    def alocar(self, materias: List[Materia], salas: List[Sala]) -> AlocacaoResultado:
+        """Retorna o resultado armazenado ou delega à estratégia decorada"""
+        instrumentacao = self._nova_instrumentacao()
+        with instrumentacao.fase('cache') as fase:
+            chave, resultado = self.consultar(materias, salas)
+            fase.contadores['acerto_cache'] = int(resultado is not None)
+
+        if resultado is not None:
+            # Cópia rasa para não sobrescrever as medições da execução original armazenada
+            resultado = copy.copy(resultado)
+        else:
+            resultado = self.estrategia.alocar(materias, salas)
+            instrumentacao.incorporar(getattr(resultado, 'instrumentacao', None))
+            self.registrar(chave, resultado)
+
+        resultado.instrumentacao = instrumentacao
+        return resultado
+
+    def consultar(self, materias: List[Materia],
+                  salas: List[Sala]) -> Tuple[Optional[str], Optional[AlocacaoResultado]]:
+        """Busca no cache o resultado destas entradas, retornando também a chave calculada"""
+        # A chave fica com quem consultou: a mesma estratégia pode atender execuções concorrentes
+        try:
+            chave = calcular_impressao_digital(materias, salas, self.estrategia)
+        except ParametroNaoMemoizavel:
+            # Sem chave canônica a execução não passa pelo cache
+            return None, None
+        return chave, self.cache.obter(chave)
+
+    def registrar(self, chave: Optional[str], resultado: AlocacaoResultado):
+        """Memoriza o resultado sob a chave obtida em consultar"""
+        # Apenas soluções encontradas são memorizadas; falhas podem ser transitórias, e
+        # execuções interrompidas pelo orçamento de tempo dependem da carga da máquina
+        if chave is None or not resultado.sucesso or resultado.metricas.get('tempo_esgotado'):
+            return
+        self.cache.armazenar(chave, resultado)
@@ -3,11 +3,13 @@ Carregador de dados refatorado usando padrões de projeto.
 Implementa Repository Pattern, Factory Pattern e Strategy Pattern.
 """
 
+import os
 import pandas as pd
 import re
 from typing import List, Dict, Optional, Any
 from ..models.domain import Materia, Sala, Subject
-from ..strategies.interfaces import Repository, Validator, ValidatorPadrao
+from ..strategies.interfaces import (Repository, Validator, ValidatorPadrao, CompatibilidadeStrategy,
+                                     CompatibilidadePadrao)
 from ..factories.creators import FactoryManager, MateriaFactoryCSV, SalaFactoryCSV
 from ..repositories.alocacao_repo import AlocacaoRepository
 
@@ -15,9 +17,11 @@ from ..repositories.alocacao_repo import AlocacaoRepository
 class CSVRepository(Repository):
     """Repositório para dados CSV"""
 
-    def __init__(self, arquivo_csv: str, factory_manager: FactoryManager):
+    def __init__(self, arquivo_csv: str, factory_manager: FactoryManager, curso: Optional[str] = None):
         self.arquivo_csv = arquivo_csv
         self.factory_manager = factory_manager
+        # Sem coluna 'curso' no CSV, a oferta é identificada pelo nome do arquivo
+        self.curso = curso or os.path.splitext(os.path.basename(arquivo_csv))[0]
         self.df: Optional[pd.DataFrame] = None
         self.materias: Dict[str, Materia] = {}
         self.salas: Dict[str, Sala] = {}
@@ -60,6 +64,8 @@ class CSVRepository(Repository):
     def _extrair_dados_materia(self, row: pd.Series) -> Dict[str, Any]:
         """Extrai dados de matéria de uma linha do CSV"""
         material_value = int(row.get('material', 0))
+        docente = row.get('docente')
+        curso = row.get('curso')
 
         return {
             'codigo': str(row['codigo']),
@@ -67,7 +73,9 @@ class CSVRepository(Repository):
             'matriculados': int(row['matriculados']),
             'horario': self._mapear_horario(row['horario']),
             'capacidade': int(row['capacidade']),
-            'material': material_value  # 1 = precisa de computadores, 0 = não precisa
+            'material': material_value,  # 1 = precisa de computadores, 0 = não precisa
+            'docente': '' if pd.isna(docente) else str(docente).strip(),
+            'curso': self.curso if pd.isna(curso) else str(curso).strip()
         }
 
     def _mapear_horario(self, horario_str: str) -> str:
@@ -299,10 +307,13 @@ class CSVRepository(Repository):
 class CarregadorDadosRefatorado:
     """Carregador de dados refatorado usando padrões de projeto"""
 
-    def __init__(self, factory_manager: FactoryManager = None, validator: Validator = None):
+    def __init__(self, factory_manager: FactoryManager = None, validator: Validator = None,
+                 compatibilidade: CompatibilidadeStrategy = None):
         self.factory_manager = factory_manager or FactoryManager()
         self.validator = validator or ValidatorPadrao()
+        self.compatibilidade = compatibilidade or CompatibilidadePadrao()
         self.repository: Optional[Repository] = None
+        self.tabela_erros: Optional[pd.DataFrame] = None
         self.observers: List[Subject] = []
 
     def adicionar_observer(self, observer: Subject):
@@ -345,16 +356,12 @@ class CarregadorDadosRefatorado:
         if not self.repository:
             return ["Repositório não inicializado"]
 
-        materias = self.repository.buscar_materias()
-        salas = self.repository.buscar_salas()
+        materias = list(self.repository.buscar_materias())
+        salas = list(self.repository.buscar_salas())
 
-        # Validar matérias
-        for materia in materias:
-            erros.extend(self.validator.validar_materia(materia))
-
-        # Validar salas
-        for sala in salas:
-            erros.extend(self.validator.validar_sala(sala))
+        # Validar matérias e salas em lote, uma única vez por carga (inclui matérias sem sala compatível)
+        self.tabela_erros = self.validator.validar_lote(materias, salas, self.compatibilidade)
+        erros.extend(self.validator.formatar_erros(self.tabela_erros))
 
         # Validações específicas
         if not materias:
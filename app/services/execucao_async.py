@@ -0,0 +1,275 @@
+"""
+Execução assíncrona de alocações.
+Executa estratégias em processos separados, com cancelamento, tempo limite,
+limite de processos simultâneos e eventos de progresso repassados aos observadores.
+"""
+
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+from enum import Enum
+from typing import List, Optional, Callable, Iterable
+from ..models.domain import Materia, Sala, AlocacaoResultado, Observer
+from ..strategies.interfaces import AlocacaoStrategy
+from .cache_alocacao import AlocacaoMemoizadaStrategy
+
+INTERVALO_VERIFICACAO = 0.1  # segundos entre verificações de cancelamento e tempo limite
+
+
+class EstadoTrabalho(Enum):
+    """Estados de um trabalho de alocação"""
+    PENDENTE = "pendente"
+    EXECUTANDO = "executando"
+    CONCLUIDO = "concluido"
+    FALHOU = "falhou"
+    CANCELADO = "cancelado"
+    EXPIRADO = "expirado"
+
+
+class _ObservadorFila(Observer):
+    """Observador instalado na estratégia dentro do processo filho; repassa os eventos pela fila"""
+
+    def __init__(self, fila):
+        self.fila = fila
+
+    def on_progress(self, etapa: str, progresso: float):
+        # 10-90% do trabalho: o início e o fim do processo são reportados pelo pai
+        self.fila.put(('progresso', etapa, 10.0 + 0.8 * progresso))
+
+    def on_evento(self, evento: dict):
+        self.fila.put(('evento', evento))
+
+    def on_sucesso(self, resultado: AlocacaoResultado):
+        pass
+
+    def on_erro(self, erro: str):
+        pass
+
+
+def _executar_no_processo(estrategia: AlocacaoStrategy, materias: List[Materia],
+                          salas: List[Sala], fila) -> None:
+    """Ponto de entrada do processo de trabalho"""
+    try:
+        fila.put(('progresso', "Resolvendo modelo de alocação", 10.0))
+        estrategia.adicionar_observer(_ObservadorFila(fila))
+        resultado = estrategia.alocar(materias, salas)
+    except Exception as e:
+        resultado = AlocacaoResultado(sucesso=False, erro=str(e))
+    fila.put(('resultado', resultado))
+
+
+class TrabalhoAlocacao:
+    """Handle de uma alocação executada em outro processo"""
+
+    _sequencia = itertools.count(1)
+
+    def __init__(self, executor: Optional['ExecutorAlocacao'], estrategia: Optional[AlocacaoStrategy],
+                 materias: List[Materia], salas: List[Sala], observers: Iterable[Observer] = (),
+                 timeout: Optional[float] = None,
+                 ao_concluir: Optional[Callable[[AlocacaoResultado], None]] = None):
+        self.id = next(self._sequencia)
+        self.timeout = timeout
+        self.estado = EstadoTrabalho.PENDENTE
+        self.etapa = "Aguardando processo disponível"
+        self.progresso = 0.0
+        self._executor = executor
+        self._estrategia = estrategia
+        self._materias = materias
+        self._salas = salas
+        self._observers = list(observers)
+        self._ao_concluir = ao_concluir
+        self._resultado: Optional[AlocacaoResultado] = None
+        self._cancelamento = threading.Event()
+        self._finalizado = threading.Event()
+        self._monitor = threading.Thread(target=self._executar, daemon=True,
+                                         name=f"alocacao-{self.id}")
+
+    @classmethod
+    def finalizado(cls, resultado: AlocacaoResultado) -> 'TrabalhoAlocacao':
+        """Cria um trabalho já concluído (ex: entradas inválidas)"""
+        trabalho = cls(None, None, [], [])
+        trabalho._concluir(resultado, EstadoTrabalho.CONCLUIDO if resultado.sucesso
+                           else EstadoTrabalho.FALHOU)
+        return trabalho
+
+    # API pública
+    def concluido(self) -> bool:
+        """Indica se o trabalho terminou (com sucesso, falha, cancelamento ou tempo limite)"""
+        return self._finalizado.is_set()
+
+    def cancelar(self) -> bool:
+        """Solicita o cancelamento; retorna False se o trabalho já terminou"""
+        if self.concluido():
+            return False
+        self._cancelamento.set()
+        return True
+
+    def resultado(self, timeout: Optional[float] = None) -> AlocacaoResultado:
+        """Aguarda e retorna o resultado do trabalho"""
+        if not self._finalizado.wait(timeout):
+            raise TimeoutError(f"Alocação {self.id} ainda em execução")
+        return self._resultado
+
+    # Execução em segundo plano
+    def _iniciar(self):
+        self._monitor.start()
+
+    def _executar(self):
+        """Aguarda vaga no executor, dispara o processo e acompanha seus eventos"""
+        # O cache vive no processo pai: consulta antes e memoriza depois da execução
+        memoizada = None
+        chave_cache = None
+        if isinstance(self._estrategia, AlocacaoMemoizadaStrategy):
+            memoizada = self._estrategia
+            self._estrategia = memoizada.estrategia
+            chave_cache, resultado = memoizada.consultar(self._materias, self._salas)
+            if resultado is not None:
+                self._notificar_progresso("Resultado obtido do cache", 90.0)
+                self._concluir(resultado, EstadoTrabalho.CONCLUIDO)
+                return
+
+        semaforo = self._executor._semaforo
+        while not semaforo.acquire(timeout=INTERVALO_VERIFICACAO):
+            if self._cancelamento.is_set():
+                self._concluir(AlocacaoResultado(sucesso=False, erro="Alocação cancelada"),
+                               EstadoTrabalho.CANCELADO)
+                return
+
+        try:
+            if self._cancelamento.is_set():
+                resultado = AlocacaoResultado(sucesso=False, erro="Alocação cancelada")
+                estado = EstadoTrabalho.CANCELADO
+            else:
+                resultado, estado = self._executar_processo()
+        except Exception as e:
+            resultado = AlocacaoResultado(sucesso=False, erro=f"Falha ao executar processo de alocação: {e}")
+            estado = EstadoTrabalho.FALHOU
+        finally:
+            semaforo.release()
+
+        if memoizada is not None and estado == EstadoTrabalho.CONCLUIDO:
+            memoizada.registrar(chave_cache, resultado)
+        self._concluir(resultado, estado)
+
+    def _executar_processo(self):
+        """Executa a estratégia em um processo filho até obter resultado, cancelar ou expirar"""
+        contexto = self._executor.contexto
+        fila = contexto.Queue()
+        processo = contexto.Process(target=_executar_no_processo,
+                                    args=(self._estrategia, self._materias, self._salas, fila),
+                                    daemon=True, name=f"alocacao-{self.id}")
+        processo.start()
+        self.estado = EstadoTrabalho.EXECUTANDO
+        self._notificar_progresso("Processo de alocação iniciado", 5.0)
+
+        try:
+            return self._acompanhar(processo, fila)
+        finally:
+            if processo.is_alive():
+                processo.terminate()
+            processo.join(timeout=1.0)
+            fila.close()
+
+    def _acompanhar(self, processo, fila):
+        """Repassa eventos da fila até o resultado final"""
+        limite = time.monotonic() + self.timeout if self.timeout else None
+
+        while True:
+            if self._cancelamento.is_set():
+                return (AlocacaoResultado(sucesso=False, erro="Alocação cancelada"),
+                        EstadoTrabalho.CANCELADO)
+            if limite is not None and time.monotonic() > limite:
+                return (AlocacaoResultado(sucesso=False, erro=f"Tempo limite de {self.timeout}s excedido"),
+                        EstadoTrabalho.EXPIRADO)
+
+            try:
+                evento = fila.get(timeout=INTERVALO_VERIFICACAO)
+            except queue.Empty:
+                if processo.is_alive():
+                    continue
+                # O filho pode ter enviado o resultado e saído entre o get e a verificação acima
+                try:
+                    evento = fila.get(timeout=INTERVALO_VERIFICACAO)
+                except queue.Empty:
+                    erro = f"Processo de alocação encerrado inesperadamente (código {processo.exitcode})"
+                    return AlocacaoResultado(sucesso=False, erro=erro), EstadoTrabalho.FALHOU
+
+            if evento[0] == 'progresso':
+                self._notificar_progresso(evento[1], evento[2])
+            elif evento[0] == 'evento':
+                self._registrar_evento(evento[1])
+            elif evento[0] == 'resultado':
+                resultado = evento[1]
+                return resultado, EstadoTrabalho.CONCLUIDO if resultado.sucesso else EstadoTrabalho.FALHOU
+
+    def _notificar_progresso(self, etapa: str, progresso: float):
+        self.etapa = etapa
+        self.progresso = progresso
+        for observer in self._observers:
+            observer.on_progress(etapa, progresso)
+
+    def _registrar_evento(self, evento: dict):
+        """Mostra a fase concluída na etapa; os observadores recebem os eventos junto com o resultado"""
+        if evento.get('tipo') == 'fase':
+            self.etapa = f"Fase '{evento['fase']}' concluída ({evento['tempo_parede']:.2f}s)"
+
+    def _concluir(self, resultado: AlocacaoResultado, estado: EstadoTrabalho):
+        """Registra o resultado final e libera quem aguarda o trabalho"""
+        self._resultado = resultado
+        self.estado = estado
+        self.etapa = estado.value
+        if resultado.sucesso:
+            self.progresso = 100.0
+        try:
+            if self._ao_concluir:
+                self._ao_concluir(resultado)
+        finally:
+            self._finalizado.set()
+
+
+class ExecutorAlocacao:
+    """Dispara alocações em processos separados respeitando um limite de processos simultâneos"""
+
+    def __init__(self, max_processos: int = 2, metodo_inicio: str = "spawn"):
+        self.max_processos = max_processos
+        # spawn evita herdar threads e locks do processo pai (Streamlit, observadores)
+        self.contexto = multiprocessing.get_context(metodo_inicio)
+        self._semaforo = threading.BoundedSemaphore(max_processos)
+        self._trabalhos: List[TrabalhoAlocacao] = []
+        self._lock = threading.Lock()
+
+    def submeter(self, estrategia: AlocacaoStrategy, materias: List[Materia], salas: List[Sala],
+                 observers: Iterable[Observer] = (), timeout: Optional[float] = None,
+                 ao_concluir: Optional[Callable[[AlocacaoResultado], None]] = None) -> TrabalhoAlocacao:
+        """Enfileira uma alocação e retorna seu handle"""
+        trabalho = TrabalhoAlocacao(self, estrategia, list(materias), list(salas),
+                                    observers, timeout, ao_concluir)
+        with self._lock:
+            self._trabalhos = [t for t in self._trabalhos if not t.concluido()]
+            self._trabalhos.append(trabalho)
+        trabalho._iniciar()
+        return trabalho
+
+    def trabalhos_ativos(self) -> List[TrabalhoAlocacao]:
+        """Trabalhos pendentes ou em execução"""
+        with self._lock:
+            return [t for t in self._trabalhos if not t.concluido()]
+
+    def cancelar_todos(self) -> int:
+        """Cancela todos os trabalhos ativos"""
+        return sum(trabalho.cancelar() for trabalho in self.trabalhos_ativos())
+
+
+_executor_padrao: Optional[ExecutorAlocacao] = None
+_executor_padrao_lock = threading.Lock()
+
+
+def obter_executor_padrao() -> ExecutorAlocacao:
+    """Executor compartilhado usado quando nenhum outro é informado"""
+    global _executor_padrao
+    with _executor_padrao_lock:
+        if _executor_padrao is None:
+            _executor_padrao = ExecutorAlocacao()
+        return _executor_padrao
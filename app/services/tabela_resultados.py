@@ -0,0 +1,50 @@
+"""
+Tabela colunar de resultados de alocação.
+Uma linha por alocação, na ordem da lista, com textos repetidos (sala, local, horário,
+curso...) em colunas categóricas; abas, gráficos, exportações e agrupamentos do PDF
+derivam dela por groupby em vez de percorrer a lista de alocações novamente.
+"""
+
+import hashlib
+from typing import Sequence
+import numpy as np
+import pandas as pd
+from ..models.domain import Alocacao, TipoSala, LocalSala
+
+
+def construir_tabela_alocacoes(alocacoes: Sequence[Alocacao]) -> pd.DataFrame:
+    """Monta a tabela de alocações; a posição de cada linha é a da alocação na lista"""
+    materias = [a.materia for a in alocacoes]
+    salas = [a.sala for a in alocacoes]
+    return pd.DataFrame({
+        'materia_id': pd.Series([m.id for m in materias], dtype=object),
+        'materia_nome': pd.Series([m.nome for m in materias], dtype=object),
+        'docente': pd.Categorical([m.docente for m in materias]),
+        'curso': pd.Categorical([m.curso for m in materias]),
+        'horario': pd.Categorical([m.horario for m in materias]),
+        'material': np.array([m.material for m in materias], dtype=np.int8),
+        'inscritos': np.array([m.inscritos for m in materias], dtype=np.int32),
+        'sala_id': pd.Categorical([s.id for s in salas]),
+        'sala_nome': pd.Categorical([s.nome for s in salas]),
+        'tipo_sala': pd.Categorical([s.tipo.value for s in salas], categories=[t.value for t in TipoSala]),
+        'local': pd.Categorical([s.local.value for s in salas], categories=[l.value for l in LocalSala]),
+        'capacidade': np.array([s.capacidade for s in salas], dtype=np.int32),
+        'custo_adicional': np.array([s.custo_adicional for s in salas], dtype=np.float64),
+        'espaco_ocioso': np.array([a.espaco_ocioso for a in alocacoes], dtype=np.int32),
+        'utilizacao': np.array([a.utilizacao_percentual for a in alocacoes], dtype=np.float64),
+    })
+
+
+def impressao_tabela(tabela: pd.DataFrame) -> str:
+    """SHA-256 do conteúdo da tabela, linha a linha; chave dos caches derivados do resultado"""
+    # hash_pandas_object usa os valores das categorias, não os códigos
+    linhas = pd.util.hash_pandas_object(tabela, index=False).to_numpy()
+    digest = hashlib.sha256(linhas.tobytes())
+    digest.update(repr(list(tabela.columns)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def utilizacao_agregada(tabela: pd.DataFrame, por) -> pd.Series:
+    """Inscritos / capacidade (%) somados por grupo"""
+    somas = tabela.groupby(por, observed=True)[['inscritos', 'capacidade']].sum()
+    return (somas['inscritos'] / somas['capacidade'].where(somas['capacidade'] > 0) * 100).fillna(0.0)
@@ -0,0 +1,142 @@
+"""
+Estatísticas e limites de tamanho do modelo de alocação.
+Estima variáveis, restrições, não-zeros e memória do modelo linear a partir da
+matriz de compatibilidade, antes de criar qualquer objeto do PuLP.
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Dict, Optional
+import numpy as np
+from ..models.domain import Materia, Sala
+from ..utils.horarios import extrair_slots_tempo
+
+# Custo medido dos objetos PuLP (LpVariable, LpAffineExpression, LpConstraint) em CPython 64 bits
+BYTES_POR_VARIAVEL = 1300
+BYTES_POR_NAO_ZERO = 130
+
+
+class AcaoExcessoModelo(Enum):
+    """O que fazer quando o modelo excede os limites configurados"""
+    DECOMPOR = "decompor"
+    HEURISTICA = "heuristica"
+    ERRO = "erro"
+
+
+@dataclass
+class EstatisticasModelo:
+    """Tamanho estimado do modelo de programação linear inteira"""
+    materias: int
+    salas: int
+    variaveis: int
+    restricoes_alocacao_unica: int
+    restricoes_capacidade: int
+    restricoes_conflito: int
+    nao_zeros: int
+
+    @property
+    def restricoes(self) -> int:
+        return self.restricoes_alocacao_unica + self.restricoes_capacidade + self.restricoes_conflito
+
+    @property
+    def memoria_estimada(self) -> int:
+        """Memória estimada dos objetos do modelo em bytes"""
+        return self.variaveis * BYTES_POR_VARIAVEL + (self.nao_zeros + self.variaveis) * BYTES_POR_NAO_ZERO
+
+    def para_contadores(self) -> Dict[str, float]:
+        return {
+            'modelo_variaveis': self.variaveis,
+            'modelo_restricoes': self.restricoes,
+            'modelo_restricoes_conflito': self.restricoes_conflito,
+            'modelo_nao_zeros': self.nao_zeros,
+            'modelo_memoria_estimada_bytes': self.memoria_estimada,
+        }
+
+    def resumo(self) -> str:
+        return (f"{self.materias} matérias x {self.salas} salas, {self.variaveis} variáveis, "
+                f"{self.restricoes} restrições ({self.restricoes_conflito} de conflito), "
+                f"{self.nao_zeros} não-zeros, ~{self.memoria_estimada / 2**20:.1f} MiB")
+
+
+@dataclass
+class LimitesModelo:
+    """Limites de tamanho do modelo; None desativa o limite"""
+    max_variaveis: Optional[int] = None
+    max_nao_zeros: Optional[int] = None
+    max_memoria_mb: Optional[float] = None
+    acao: AcaoExcessoModelo = AcaoExcessoModelo.DECOMPOR
+
+    def violacoes(self, estatisticas: EstatisticasModelo) -> List[str]:
+        """Descreve os limites ultrapassados pelo modelo"""
+        violacoes = []
+        if self.max_variaveis is not None and estatisticas.variaveis > self.max_variaveis:
+            violacoes.append(f"variáveis {estatisticas.variaveis} > {self.max_variaveis}")
+        if self.max_nao_zeros is not None and estatisticas.nao_zeros > self.max_nao_zeros:
+            violacoes.append(f"não-zeros {estatisticas.nao_zeros} > {self.max_nao_zeros}")
+        memoria_mb = estatisticas.memoria_estimada / 2**20
+        if self.max_memoria_mb is not None and memoria_mb > self.max_memoria_mb:
+            violacoes.append(f"memória estimada {memoria_mb:.1f} MiB > {self.max_memoria_mb} MiB")
+        return violacoes
+
+
+def agrupar_indices_por_slot(materias: List[Materia]) -> Dict[str, List[int]]:
+    """Índices das matérias que ocupam cada slot de tempo"""
+    grupos: Dict[str, List[int]] = {}
+    for i, materia in enumerate(materias):
+        for slot in extrair_slots_tempo(materia.horario):
+            grupos.setdefault(slot, []).append(i)
+    return grupos
+
+
+def calcular_estatisticas_modelo(materias: List[Materia], salas: List[Sala], matriz: np.ndarray,
+                                 grupos: Optional[Dict[str, List[int]]] = None) -> EstatisticasModelo:
+    """Conta variáveis, restrições e não-zeros que a montagem do modelo linear vai gerar"""
+    grupos = grupos if grupos is not None else agrupar_indices_por_slot(materias)
+    pares = int(matriz.sum())
+
+    # Uma restrição de conflito por (slot, sala) com ao menos uma matéria candidata
+    restricoes_conflito = 0
+    nao_zeros_conflito = 0
+    for indices in grupos.values():
+        por_sala = matriz[indices].sum(axis=0)
+        restricoes_conflito += int(np.count_nonzero(por_sala))
+        nao_zeros_conflito += int(por_sala.sum())
+
+    return EstatisticasModelo(
+        materias=len(materias),
+        salas=len(salas),
+        variaveis=pares,
+        restricoes_alocacao_unica=len(materias),
+        restricoes_capacidade=pares,
+        restricoes_conflito=restricoes_conflito,
+        # Alocação única e capacidade têm um termo por variável
+        nao_zeros=2 * pares + nao_zeros_conflito,
+    )
+
+
+def componentes_independentes(materias: List[Materia], matriz: np.ndarray,
+                              grupos: Optional[Dict[str, List[int]]] = None) -> List[List[int]]:
+    """Particiona as matérias em grupos sem restrições em comum (horário e sala candidata)"""
+    grupos = grupos if grupos is not None else agrupar_indices_por_slot(materias)
+    pai = list(range(len(materias)))
+
+    def raiz(i: int) -> int:
+        while pai[i] != i:
+            pai[i] = pai[pai[i]]
+            i = pai[i]
+        return i
+
+    for indices in grupos.values():
+        if len(indices) < 2:
+            continue
+        submatriz = matriz[indices]
+        for j in np.flatnonzero(submatriz.any(axis=0)):
+            candidatas = [indices[k] for k in np.flatnonzero(submatriz[:, j])]
+            primeira = raiz(candidatas[0])
+            for outra in candidatas[1:]:
+                pai[raiz(outra)] = primeira
+
+    componentes: Dict[int, List[int]] = {}
+    for i in range(len(materias)):
+        componentes.setdefault(raiz(i), []).append(i)
+    return list(componentes.values())
@@ -3,9 +3,14 @@ Interfaces e estratégias para o sistema de alocação de salas.
 Implementa Strategy Pattern para diferentes algoritmos de alocação.
 """
 
+import copy
 from abc import ABC, abstractmethod
-from typing import List, Dict, Set, Optional
+from typing import Any, List, Dict, Set, Optional
+import numpy as np
+import pandas as pd
 from ..models.domain import Materia, Sala, Alocacao, AlocacaoResultado, Observer
+from ..utils.horarios import extrair_slots_tempo
+from ..utils.instrumentacao import Instrumentacao, MedicaoFase
 
 
 class CompatibilidadeStrategy(ABC):
@@ -16,10 +21,46 @@ class CompatibilidadeStrategy(ABC):
         """Verifica se uma matéria é compatível com uma sala"""
         pass
 
+    def matriz_compatibilidade(self, materias: List[Materia], salas: List[Sala]) -> np.ndarray:
+        """Retorna matriz booleana (matérias x salas) de compatibilidade"""
+        matriz = np.zeros((len(materias), len(salas)), dtype=bool)
+        for i, materia in enumerate(materias):
+            for j, sala in enumerate(salas):
+                matriz[i, j] = self.eh_compativel(materia, sala)
+        return matriz
+
+
+def _matriz_compatibilidade_padrao(materias: List[Materia], salas: List[Sala]) -> np.ndarray:
+    """Aplica as regras de compatibilidade padrão coluna a coluna"""
+    materia_if = np.array([m.id.startswith('IF') for m in materias], dtype=bool)
+    material = np.array([m.material for m in materias], dtype=np.int64)
+    sala_if = np.array([s.local.value == "if" for s in salas], dtype=bool)
+    sala_lab = np.array([s.tipo.value == "laboratorio" for s in salas], dtype=bool)
+    equipamento = np.array([s.tipo_equipamento for s in salas], dtype=np.int64)
+
+    # Matérias de Física só vão para o IF e as demais nunca vão para o IF
+    compativel = materia_if[:, None] == sala_if[None, :]
+
+    # Material especial exige laboratório
+    compativel &= ~((material[:, None] > 0) & ~sala_lab[None, :])
+
+    # Materiais 1, 2 e 3 exigem o equipamento correspondente
+    exige_equipamento = np.isin(material, (1, 2, 3))
+    compativel &= ~(exige_equipamento[:, None] & (equipamento[None, :] != material[:, None]))
+
+    return compativel
+
 
 class CompatibilidadePadrao(CompatibilidadeStrategy):
     """Estratégia padrão de compatibilidade"""
 
+    def matriz_compatibilidade(self, materias: List[Materia], salas: List[Sala]) -> np.ndarray:
+        """Calcula a matriz de compatibilidade de forma vetorizada"""
+        # Subclasses que alteram as regras usam a verificação par a par
+        if type(self).eh_compativel is not CompatibilidadePadrao.eh_compativel:
+            return super().matriz_compatibilidade(materias, salas)
+        return _matriz_compatibilidade_padrao(materias, salas)
+
     def eh_compativel(self, materia: Materia, sala: Sala) -> bool:
         """Verifica compatibilidade baseada em tipo de sala, material e localização"""
 
@@ -58,6 +99,12 @@ class CompatibilidadeFlexivel(CompatibilidadeStrategy):
     def __init__(self, materiais_opcionais: Set[str] = None):
         self.materiais_opcionais = materiais_opcionais or set()
 
+    def matriz_compatibilidade(self, materias: List[Materia], salas: List[Sala]) -> np.ndarray:
+        """Calcula a matriz de compatibilidade de forma vetorizada"""
+        if type(self).eh_compativel is not CompatibilidadeFlexivel.eh_compativel:
+            return super().matriz_compatibilidade(materias, salas)
+        return _matriz_compatibilidade_padrao(materias, salas)
+
     def eh_compativel(self, materia: Materia, sala: Sala) -> bool:
         """Verifica compatibilidade com flexibilidade para materiais opcionais"""
 
@@ -90,17 +137,90 @@ class CompatibilidadeFlexivel(CompatibilidadeStrategy):
         return True
 
 
+class CompatibilidadeComOcupacao(CompatibilidadeStrategy):
+    """Compatibilidade que bloqueia salas já ocupadas nos horários da matéria"""
+
+    def __init__(self, base: CompatibilidadeStrategy, ocupacao: Dict[str, Set[str]]):
+        self.base = base
+        self.ocupacao = ocupacao  # sala_id -> slots já ocupados por alocações fixas
+        self._slots_por_horario: Dict[str, Set[str]] = {}
+
+    def _slots(self, materia: Materia) -> Set[str]:
+        """Slots de tempo da matéria, memorizados por horário"""
+        slots = self._slots_por_horario.get(materia.horario)
+        if slots is None:
+            slots = set(extrair_slots_tempo(materia.horario))
+            self._slots_por_horario[materia.horario] = slots
+        return slots
+
+    def eh_compativel(self, materia: Materia, sala: Sala) -> bool:
+        """Compatível pela regra base e sem conflito com a ocupação fixa"""
+        if not self.base.eh_compativel(materia, sala):
+            return False
+        ocupados = self.ocupacao.get(sala.id)
+        return not (ocupados and ocupados & self._slots(materia))
+
+    def matriz_compatibilidade(self, materias: List[Materia], salas: List[Sala]) -> np.ndarray:
+        """Aplica a ocupação fixa sobre a matriz da regra base"""
+        matriz = self.base.matriz_compatibilidade(materias, salas)
+        for j, sala in enumerate(salas):
+            ocupados = self.ocupacao.get(sala.id)
+            if not ocupados:
+                continue
+            for i, materia in enumerate(materias):
+                if matriz[i, j] and ocupados & self._slots(materia):
+                    matriz[i, j] = False
+        return matriz
+
+
 class AlocacaoStrategy(ABC):
     """Estratégia para algoritmos de alocação"""
 
     def __init__(self, compatibilidade: CompatibilidadeStrategy = None):
         self.compatibilidade = compatibilidade or CompatibilidadePadrao()
+        self._observers: List[Observer] = []
 
     @abstractmethod
     def alocar(self, materias: List[Materia], salas: List[Sala]) -> AlocacaoResultado:
         """Executa o algoritmo de alocação"""
         pass
 
+    def adicionar_observer(self, observer: Observer):
+        """Adiciona observador do progresso e das fases medidas durante alocar"""
+        self._observers.append(observer)
+
+    def remover_observer(self, observer: Observer):
+        """Remove um observador"""
+        self._observers.remove(observer)
+
+    def _notificar_progresso(self, etapa: str, progresso: float):
+        """Notifica o progresso (0-100) da execução em andamento"""
+        for observer in self._observers:
+            observer.on_progress(etapa, progresso)
+
+    def _notificar_fase(self, medicao: MedicaoFase):
+        """Notifica uma fase medida assim que ela termina"""
+        if self._observers:
+            evento = medicao.para_evento()
+            for observer in self._observers:
+                observer.on_evento(evento)
+
+    def _nova_instrumentacao(self, medir_memoria: bool = False) -> Instrumentacao:
+        """Instrumentação que repassa cada fase concluída aos observadores"""
+        return Instrumentacao(medir_memoria, ao_concluir_fase=self._notificar_fase)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Observadores pertencem ao processo que os registrou; cópias e processos filhos começam sem eles
+        estado = dict(self.__dict__)
+        estado['_observers'] = []
+        return estado
+
+    def com_compatibilidade(self, compatibilidade: CompatibilidadeStrategy) -> 'AlocacaoStrategy':
+        """Retorna uma cópia da estratégia usando outra regra de compatibilidade"""
+        copia = copy.copy(self)
+        copia.compatibilidade = compatibilidade
+        return copia
+
     def _filtrar_salas_compatíveis(self, materia: Materia, salas: List[Sala]) -> List[Sala]:
         """Filtra salas compatíveis com a matéria"""
         return [sala for sala in salas if self.compatibilidade.eh_compativel(materia, sala)]
@@ -153,6 +273,22 @@ class Repository(ABC):
         """Busca sala por ID"""
         pass
 
+    def criar_cenario(self, nome: str = "cenario") -> 'Repository':
+        """Cria um cenário what-if que compartilha os registros deste repositório"""
+        from ..repositories.cenario_repo import CenarioRepository
+        return CenarioRepository(self, nome)
+
+
+COLUNAS_TABELA_ERROS = ['entidade', 'indice', 'id', 'regra', 'mensagem']
+
+
+def _tabela_erros(linhas: List[dict]) -> pd.DataFrame:
+    """Monta a tabela estruturada de erros de validação"""
+    if not linhas:
+        return pd.DataFrame(columns=COLUNAS_TABELA_ERROS)
+    tabela = pd.DataFrame(linhas, columns=COLUNAS_TABELA_ERROS)
+    return tabela.sort_values(['entidade', 'indice'], kind='stable', ignore_index=True)
+
 
 class Validator(ABC):
     """Interface para validadores"""
@@ -172,6 +308,36 @@ class Validator(ABC):
         """Valida uma alocação específica"""
         pass
 
+    def validar_lote(self, materias: List[Materia], salas: List[Sala],
+                     compatibilidade: CompatibilidadeStrategy = None) -> pd.DataFrame:
+        """Valida matérias e salas de uma vez, retornando tabela de erros"""
+        linhas = []
+
+        for indice, materia in enumerate(materias):
+            for mensagem in self.validar_materia(materia):
+                linhas.append({'entidade': 'materia', 'indice': indice, 'id': materia.id,
+                               'regra': 'validar_materia', 'mensagem': mensagem})
+
+        for indice, sala in enumerate(salas):
+            for mensagem in self.validar_sala(sala):
+                linhas.append({'entidade': 'sala', 'indice': indice, 'id': sala.id,
+                               'regra': 'validar_sala', 'mensagem': mensagem})
+
+        if compatibilidade is not None and materias and salas:
+            matriz = compatibilidade.matriz_compatibilidade(materias, salas)
+            for indice in np.flatnonzero(~matriz.any(axis=1)):
+                materia = materias[indice]
+                linhas.append({'entidade': 'materia', 'indice': int(indice), 'id': materia.id,
+                               'regra': 'sem_sala_compativel',
+                               'mensagem': f"Nenhuma sala compatível encontrada para matéria {materia.nome}"})
+
+        return _tabela_erros(linhas)
+
+    @staticmethod
+    def formatar_erros(tabela: pd.DataFrame) -> List[str]:
+        """Converte a tabela de erros em lista de mensagens"""
+        return tabela['mensagem'].tolist()
+
 
 class ValidatorPadrao(Validator):
     """Validador padrão com regras básicas"""
@@ -219,3 +385,80 @@ class ValidatorPadrao(Validator):
             erros.append(f"Capacidade da sala ({sala.capacidade}) insuficiente para {materia.inscritos} inscritos")
 
         return erros
+
+    def validar_lote(self, materias: List[Materia], salas: List[Sala],
+                     compatibilidade: CompatibilidadeStrategy = None) -> pd.DataFrame:
+        """Valida matérias e salas verificando cada regra sobre a coluna inteira"""
+        # Subclasses que alteram as regras por objeto usam a verificação um a um
+        if (type(self).validar_materia is not ValidatorPadrao.validar_materia
+                or type(self).validar_sala is not ValidatorPadrao.validar_sala):
+            return super().validar_lote(materias, salas, compatibilidade)
+
+        partes = []
+
+        if materias:
+            df_materias = pd.DataFrame({
+                'id': [m.id for m in materias],
+                'nome': [m.nome for m in materias],
+                'inscritos': [m.inscritos for m in materias],
+                'horario': [m.horario for m in materias],
+            })
+            regras_materia = [
+                ('nome_vazio', df_materias['nome'].str.strip() == '',
+                 "Nome da matéria não pode ser vazio"),
+                ('inscritos_nao_positivo', df_materias['inscritos'] <= 0,
+                 "Número de inscritos deve ser positivo"),
+                ('horario_vazio', df_materias['horario'].str.strip() == '',
+                 "Horário não pode ser vazio"),
+            ]
+            partes.extend(self._aplicar_regras('materia', df_materias, regras_materia))
+
+            if compatibilidade is not None and salas:
+                sem_sala = ~compatibilidade.matriz_compatibilidade(materias, salas).any(axis=1)
+                violacoes = df_materias[sem_sala]
+                partes.append(pd.DataFrame({
+                    'entidade': 'materia',
+                    'indice': violacoes.index,
+                    'id': violacoes['id'],
+                    'regra': 'sem_sala_compativel',
+                    'mensagem': "Nenhuma sala compatível encontrada para matéria " + violacoes['nome'],
+                }))
+
+        if salas:
+            df_salas = pd.DataFrame({
+                'id': [s.id for s in salas],
+                'nome': [s.nome for s in salas],
+                'capacidade': [s.capacidade for s in salas],
+                'custo_adicional': [s.custo_adicional for s in salas],
+            })
+            regras_sala = [
+                ('nome_vazio', df_salas['nome'].str.strip() == '',
+                 "Nome da sala não pode ser vazio"),
+                ('capacidade_nao_positiva', df_salas['capacidade'] <= 0,
+                 "Capacidade deve ser positiva"),
+                ('custo_negativo', df_salas['custo_adicional'] < 0,
+                 "Custo adicional não pode ser negativo"),
+            ]
+            partes.extend(self._aplicar_regras('sala', df_salas, regras_sala))
+
+        partes = [parte for parte in partes if not parte.empty]
+        if not partes:
+            return _tabela_erros([])
+
+        tabela = pd.concat(partes, ignore_index=True)
+        return tabela.sort_values(['entidade', 'indice'], kind='stable',
+                                  ignore_index=True)[COLUNAS_TABELA_ERROS]
+
+    def _aplicar_regras(self, entidade: str, df: pd.DataFrame, regras: list) -> List[pd.DataFrame]:
+        """Gera as linhas de erro de cada regra a partir de sua máscara booleana"""
+        partes = []
+        for regra, mascara, mensagem in regras:
+            violacoes = df[mascara]
+            partes.append(pd.DataFrame({
+                'entidade': entidade,
+                'indice': violacoes.index,
+                'id': violacoes['id'],
+                'regra': regra,
+                'mensagem': mensagem,
+            }))
+        return partes
@@ -0,0 +1,91 @@
+"""
+Testes dos índices secundários do AlocacaoRepository.
+"""
+
+import pytest
+from app.models.domain import Materia, Sala, Alocacao, TipoSala, LocalSala
+from app.repositories.alocacao_repo import AlocacaoRepository
+
+
+def _alocar(materia, sala):
+    return Alocacao(materia=materia, sala=sala,
+                    espaco_ocioso=sala.calcular_espaco_ocioso(materia.inscritos),
+                    utilizacao_percentual=sala.calcular_utilizacao(materia.inscritos))
+
+
+@pytest.fixture
+def repo():
+    repository = AlocacaoRepository()
+    materias = [
+        Materia('CC_COMP001', 'Algoritmos', 35, 'Segunda/Quarta 07:00-07:50/08:00-08:50', 0),
+        Materia('CC_COMP002', 'Redes', 50, 'Segunda 08:00-08:50', 0),
+        Materia('CC_COMP003', 'Lógica', 20, 'Terça 10:00-10:50', 0),
+    ]
+    salas = [
+        Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0),
+        Sala('SALA_002', 'Sala 2', 60, TipoSala.AULA, LocalSala.IM, 0),
+        Sala('SALA_003', 'Sala 3', 25, TipoSala.AULA, LocalSala.IC, 0),
+    ]
+    for materia in materias:
+        repository.salvar_materia(materia)
+    for sala in salas:
+        repository.salvar_sala(sala)
+    repository.salvar_alocacao(_alocar(materias[0], salas[0]))
+    repository.salvar_alocacao(_alocar(materias[1], salas[1]))
+    repository.salvar_alocacao(_alocar(materias[2], salas[0]))
+    return repository
+
+
+def _ids(alocacoes):
+    return sorted(a.materia.id for a in alocacoes)
+
+
+def test_buscar_alocacoes_retorna_lista_independente(repo):
+    alocacoes = repo.buscar_alocacoes()
+
+    assert isinstance(alocacoes, list)
+    assert alocacoes[0].materia.id == 'CC_COMP001'
+    # Alterar o repositório durante a iteração não invalida a lista retornada
+    for alocacao in alocacoes:
+        repo.remover_alocacao(alocacao.materia.id)
+    assert len(alocacoes) == 3
+    assert len(repo.alocacoes) == 0
+
+
+def test_indices_por_sala_e_slot(repo):
+    assert _ids(repo.buscar_alocacoes_por_sala('SALA_001')) == ['CC_COMP001', 'CC_COMP003']
+    assert _ids(repo.buscar_alocacoes_por_slot('Segunda 08:00-08:50')) == ['CC_COMP001', 'CC_COMP002']
+    assert repo.buscar_alocacoes_por_slot('Sexta 18:00-18:50') == []
+    assert _ids(repo.alocacoes_por_sala()['SALA_002'].values()) == ['CC_COMP002']
+
+
+def test_realocar_atualiza_indices(repo):
+    materia = repo.buscar_materia_por_id('CC_COMP001')
+    repo.salvar_alocacao(_alocar(materia, repo.buscar_sala_por_id('SALA_002')))
+
+    assert _ids(repo.buscar_alocacoes_por_sala('SALA_001')) == ['CC_COMP003']
+    assert _ids(repo.buscar_alocacoes_por_sala('SALA_002')) == ['CC_COMP001', 'CC_COMP002']
+    assert len(repo.buscar_alocacoes()) == 3
+
+
+def test_remocoes_atualizam_indices(repo):
+    assert repo.remover_sala('SALA_001')
+
+    assert _ids(repo.buscar_alocacoes()) == ['CC_COMP002']
+    assert repo.buscar_alocacoes_por_slot('Terça 10:00-10:50') == []
+    assert 'SALA_001' not in repo.alocacoes_por_sala()
+    assert [s.id for s in repo.buscar_salas_por_local(LocalSala.IC)] == ['SALA_003']
+
+    assert repo.remover_materia('CC_COMP002')
+    assert repo.alocacoes_por_slot() == {}
+
+
+def test_consultas_de_salas(repo):
+    assert [s.id for s in repo.buscar_salas_por_capacidade_minima(30)] == ['SALA_001', 'SALA_002']
+    assert [s.id for s in repo.buscar_salas_livres('Segunda 08:00-08:50')] == ['SALA_003']
+    assert [s.id for s in repo.buscar_salas_livres('Terça 10:00-10:50', capacidade_minima=30)] == \
+        ['SALA_002']
+
+    # Mudar a capacidade reposiciona a sala no índice ordenado
+    repo.salvar_sala(Sala('SALA_003', 'Sala 3', 100, TipoSala.AULA, LocalSala.IC, 0))
+    assert [s.id for s in repo.buscar_salas_por_capacidade_minima(30)] == ['SALA_001', 'SALA_002', 'SALA_003']
@@ -0,0 +1,79 @@
+"""
+Testes da análise de viabilidade (Hopcroft-Karp e conjunto de Hall).
+"""
+
+from app.models.domain import Materia, Sala, TipoSala, LocalSala
+from app.services.analise_viabilidade import analisar_viabilidade, _hopcroft_karp, LIVRE
+from app.strategies.interfaces import CompatibilidadePadrao
+
+HORARIO = 'Segunda 07:00-07:50'
+
+
+def _salas():
+    return [
+        Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0),
+        Sala('SALA_002', 'Sala 2', 60, TipoSala.AULA, LocalSala.IC, 0),
+        Sala('SALA_003', 'Sala 3', 20, TipoSala.AULA, LocalSala.IC, 0),
+        Sala('SALA_004', 'Laboratório 1', 30, TipoSala.LABORATORIO, LocalSala.IC, 1),
+    ]
+
+
+def test_hopcroft_karp_emparelhamento_maximo():
+    # Guloso pela ordem emparelharia 0-0 e deixaria 1 livre; o máximo tem tamanho 3
+    adjacencias = [[0, 1], [0], [1, 2]]
+
+    par_materia = _hopcroft_karp(adjacencias, 3)
+
+    assert LIVRE not in par_materia
+    assert len(set(par_materia)) == 3
+    assert all(v in adjacencias[u] for u, v in enumerate(par_materia))
+
+
+def test_hopcroft_karp_sem_emparelhamento_perfeito():
+    par_materia = _hopcroft_karp([[0], [0], [0, 1]], 2)
+    assert sum(v != LIVRE for v in par_materia) == 2
+
+
+def test_conjunto_hall_em_instancia_inviavel():
+    # Três turmas grandes no mesmo horário disputam as duas salas com capacidade suficiente
+    materias = [
+        Materia('CC_COMP001', 'Algoritmos', 35, HORARIO, 0),
+        Materia('CC_COMP002', 'Compiladores', 38, HORARIO, 0),
+        Materia('CC_COMP003', 'Redes', 50, HORARIO, 0),
+        Materia('CC_COMP004', 'Lógica', 15, HORARIO, 0),
+    ]
+
+    relatorio = analisar_viabilidade(materias, _salas(), CompatibilidadePadrao())
+
+    assert not relatorio.viavel
+    assert relatorio.materias_sem_sala == []
+    assert len(relatorio.gargalos) == 1
+    gargalo = relatorio.gargalos[0]
+    assert gargalo.slot == 'Segunda 07:00-07:50'
+    assert gargalo.deficit == 1
+    assert set(gargalo.materias) == {'CC_COMP001', 'CC_COMP002', 'CC_COMP003'}
+    assert set(gargalo.salas) == {'SALA_001', 'SALA_002'}
+
+
+def test_materia_sem_sala_compativel():
+    materias = [Materia('CC_COMP010', 'Robótica', 10, HORARIO, 2)]
+
+    relatorio = analisar_viabilidade(materias, _salas(), CompatibilidadePadrao())
+
+    assert not relatorio.viavel
+    assert relatorio.materias_sem_sala == ['CC_COMP010']
+    assert relatorio.gargalos == []
+
+
+def test_instancia_viavel():
+    materias = [
+        Materia('CC_COMP001', 'Algoritmos', 35, HORARIO, 0),
+        Materia('CC_COMP002', 'Programação', 25, HORARIO, 1),
+        Materia('CC_COMP003', 'Redes', 50, HORARIO, 0),
+        Materia('CC_COMP004', 'Lógica', 15, HORARIO, 0),
+    ]
+
+    relatorio = analisar_viabilidade(materias, _salas(), CompatibilidadePadrao())
+
+    assert relatorio.viavel
+    assert relatorio.slots_analisados == 1
@@ -0,0 +1,129 @@
+"""
+Testes da atribuição de custo mínimo e da estratégia de matching.
+"""
+
+import itertools
+import numpy as np
+import pytest
+from app.models.domain import Materia, Sala, TipoSala, LocalSala, Observer
+from app.repositories.alocacao_repo import AlocacaoLinearStrategy, AlocacaoMatchingStrategy
+from app.services.atribuicao import atribuicao_custo_minimo, SEM_ATRIBUICAO
+from app.strategies.interfaces import CompatibilidadePadrao
+
+
+def _otimo_forca_bruta(custos, permitidos=None):
+    """Menor custo total entre todas as atribuições viáveis (None se não houver)"""
+    n, m = custos.shape
+    melhor = None
+    for colunas in itertools.permutations(range(m), n):
+        if permitidos is not None and not all(permitidos[i, j] for i, j in enumerate(colunas)):
+            continue
+        total = sum(custos[i, j] for i, j in enumerate(colunas))
+        melhor = total if melhor is None else min(melhor, total)
+    return melhor
+
+
+def _custo_total(resultado):
+    return sum(a.sala.capacidade - a.materia.inscritos + a.sala.custo_adicional
+               for a in resultado.alocacoes)
+
+
+@pytest.mark.parametrize('semente', range(10))
+@pytest.mark.parametrize('n, m', [(3, 3), (3, 5), (5, 6)])
+def test_atribuicao_igual_forca_bruta(semente, n, m):
+    rng = np.random.default_rng(semente)
+    custos = rng.integers(0, 50, size=(n, m)).astype(np.float64)
+
+    colunas = atribuicao_custo_minimo(custos)
+
+    assert len(set(colunas.tolist())) == n
+    assert custos[np.arange(n), colunas].sum() == pytest.approx(_otimo_forca_bruta(custos))
+
+
+@pytest.mark.parametrize('semente', range(10))
+def test_atribuicao_respeita_pares_permitidos(semente):
+    rng = np.random.default_rng(semente)
+    custos = rng.integers(0, 50, size=(4, 6)).astype(np.float64)
+    permitidos = rng.random((4, 6)) < 0.6
+    otimo = _otimo_forca_bruta(custos, permitidos)
+
+    colunas = atribuicao_custo_minimo(custos, permitidos)
+
+    if otimo is None:
+        assert not all(permitidos[i, j] for i, j in enumerate(colunas))
+    else:
+        assert all(permitidos[i, j] for i, j in enumerate(colunas))
+        assert custos[np.arange(4), colunas].sum() == pytest.approx(otimo)
+
+
+def test_atribuicao_mais_linhas_que_colunas():
+    colunas = atribuicao_custo_minimo(np.zeros((3, 2)))
+    assert (colunas == SEM_ATRIBUICAO).all()
+
+
+def test_matching_atinge_otimo_do_modelo_linear():
+    materias = [
+        Materia('CC_COMP001', 'Algoritmos', 38, 'Segunda/Quarta 07:00-07:50/08:00-08:50', 0),
+        Materia('CC_COMP002', 'Compiladores', 25, 'Segunda/Quarta 07:00-07:50/08:00-08:50', 0),
+        Materia('CC_COMP003', 'Redes', 52, 'Segunda/Quarta 07:00-07:50/08:00-08:50', 0),
+        Materia('CC_COMP004', 'Programação', 30, 'Segunda/Quarta 07:00-07:50/08:00-08:50', 1),
+        Materia('CC_COMP005', 'Grafos', 44, 'Terça/Quinta 10:00-10:50/11:00-11:50', 0),
+        Materia('CC_COMP006', 'Lógica', 20, 'Terça/Quinta 10:00-10:50/11:00-11:50', 0),
+    ]
+    salas = [
+        Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0),
+        Sala('SALA_002', 'Sala 2', 60, TipoSala.AULA, LocalSala.IC, 0),
+        Sala('SALA_003', 'Sala 3', 30, TipoSala.AULA, LocalSala.IM, 0, custo_adicional=5.0),
+        Sala('SALA_004', 'Sala 4', 55, TipoSala.AULA, LocalSala.IM, 0, custo_adicional=2.5),
+        Sala('SALA_005', 'Laboratório 1', 35, TipoSala.LABORATORIO, LocalSala.IC, 1),
+        Sala('SALA_006', 'Sala 6', 45, TipoSala.AULA, LocalSala.IC, 0),
+    ]
+    compatibilidade = CompatibilidadePadrao()
+
+    linear = AlocacaoLinearStrategy(compatibilidade).alocar(materias, salas)
+    matching = AlocacaoMatchingStrategy(compatibilidade).alocar(materias, salas)
+
+    assert linear.sucesso and matching.sucesso
+    assert matching.metricas['modo_modelo'] == 'atribuicao'
+    assert len(matching.alocacoes) == len(materias)
+    assert _custo_total(matching) == pytest.approx(_custo_total(linear))
+
+
+class ObservadorProgresso(Observer):
+    def __init__(self):
+        self.etapas = []
+
+    def on_progress(self, etapa: str, progresso: float):
+        self.etapas.append(etapa)
+
+    def on_sucesso(self, resultado):
+        pass
+
+    def on_erro(self, erro: str):
+        pass
+
+
+def test_matching_resolve_os_componentes_em_sequencia():
+    materias = [
+        Materia('CC_COMP001', 'Algoritmos', 30, 'Segunda 07:00-07:50', 0),
+        Materia('CC_COMP002', 'Redes', 30, 'Segunda 07:00-07:50', 0),
+        Materia('CC_COMP003', 'Grafos', 30, 'Terça 10:00-10:50', 0),
+    ]
+    salas = [
+        Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0),
+        Sala('SALA_002', 'Sala 2', 60, TipoSala.AULA, LocalSala.IC, 0),
+    ]
+    matching = AlocacaoMatchingStrategy()
+    observador = ObservadorProgresso()
+    matching.adicionar_observer(observador)
+
+    resultado = matching.alocar(materias, salas)
+
+    assert resultado.sucesso, resultado.erro
+    assert [e for e in observador.etapas if e.startswith('Atribuição')] == ['Atribuição 1/2', 'Atribuição 2/2']
+
+    materias.append(Materia('CC_COMP004', 'Lógica', 30, 'Segunda 07:00-07:50', 0))
+    resultado = matching.alocar(materias, salas)
+
+    assert not resultado.sucesso
+    assert resultado.erro.startswith("Salas insuficientes para as matérias simultâneas")
@@ -0,0 +1,142 @@
+"""
+Testes do barramento de eventos e do observador de console.
+"""
+
+import threading
+import time
+from app.core.facade import ConsoleObserver
+from app.models.domain import Materia, Sala, Alocacao, AlocacaoResultado, TipoSala, LocalSala, Observer
+from app.services.barramento_eventos import BarramentoEventos
+
+
+class ObservadorGravador(Observer):
+    def __init__(self, atraso: float = 0.0):
+        self.atraso = atraso
+        self.chamadas = []
+
+    def on_progress(self, etapa: str, progresso: float):
+        time.sleep(self.atraso)
+        self.chamadas.append(('progresso', etapa, progresso))
+
+    def on_sucesso(self, resultado):
+        self.chamadas.append(('sucesso',))
+
+    def on_erro(self, erro: str):
+        self.chamadas.append(('erro', erro))
+
+    def on_evento(self, evento: dict):
+        self.chamadas.append(('evento', evento['tipo']))
+
+
+class ObservadorComFalha(ObservadorGravador):
+    def on_erro(self, erro: str):
+        raise RuntimeError("falha no observador")
+
+
+def _resultado():
+    materia = Materia('CC_COMP001', 'Algoritmos', 35, 'Segunda 07:00-07:50', 0)
+    sala = Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0)
+    alocacao = Alocacao(materia=materia, sala=sala, espaco_ocioso=5,
+                        utilizacao_percentual=sala.calcular_utilizacao(35))
+    return AlocacaoResultado(sucesso=True, alocacoes=[alocacao])
+
+
+def test_entrega_em_ordem_e_descarregar():
+    observador = ObservadorGravador()
+    with BarramentoEventos([observador], intervalo_progresso=0) as barramento:
+        barramento.on_progress("Carregando", 10.0)
+        barramento.on_evento({'tipo': 'fase'})
+        barramento.on_erro("sem sala")
+        barramento.on_sucesso(_resultado())
+        barramento.descarregar()
+
+        assert observador.chamadas == [('progresso', "Carregando", 10.0), ('evento', 'fase'),
+                                       ('erro', "sem sala"), ('sucesso',)]
+        assert barramento.estatisticas['entregues'] == 4
+
+
+def test_progresso_da_mesma_etapa_e_agrupado():
+    observador = ObservadorGravador()
+    with BarramentoEventos([observador], intervalo_progresso=60.0) as barramento:
+        for progresso in range(10):
+            barramento.on_progress("Resolvendo", float(progresso))
+        barramento.on_progress("Extraindo", 95.0)
+        barramento.descarregar()
+
+    # A primeira atualização passa, a última retida sai antes da troca de etapa
+    assert observador.chamadas == [('progresso', "Resolvendo", 0.0), ('progresso', "Resolvendo", 9.0),
+                                   ('progresso', "Extraindo", 95.0)]
+    assert barramento.estatisticas['progresso_descartado'] == 8
+
+
+def test_progresso_retido_sai_antes_do_resultado():
+    observador = ObservadorGravador()
+    with BarramentoEventos([observador], intervalo_progresso=60.0) as barramento:
+        barramento.on_progress("Resolvendo", 10.0)
+        barramento.on_progress("Resolvendo", 50.0)
+        barramento.on_sucesso(_resultado())
+
+    assert observador.chamadas == [('progresso', "Resolvendo", 10.0), ('progresso', "Resolvendo", 50.0),
+                                   ('sucesso',)]
+
+
+def test_observador_lento_nao_atrasa_quem_publica_nem_os_demais():
+    lento, rapido = ObservadorGravador(atraso=0.5), ObservadorGravador()
+    barramento = BarramentoEventos([lento, rapido], intervalo_progresso=0)
+
+    inicio = time.perf_counter()
+    barramento.on_progress("Carregando", 10.0)
+    barramento.on_progress("Resolvendo", 50.0)
+    assert time.perf_counter() - inicio < 0.25
+
+    limite = time.monotonic() + 5
+    while len(rapido.chamadas) < 2 and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert len(rapido.chamadas) == 2
+    assert lento.chamadas == []
+
+    barramento.fechar()
+    assert len(lento.chamadas) == 2
+    assert not [t for t in threading.enumerate() if t.name.startswith('observer-ObservadorGravador')]
+
+
+def test_falha_de_um_observador_nao_interrompe_a_entrega():
+    com_falha, gravador = ObservadorComFalha(), ObservadorGravador()
+    with BarramentoEventos([com_falha, gravador]) as barramento:
+        barramento.on_erro("primeiro")
+        barramento.on_evento({'tipo': 'resumo'})
+        barramento.descarregar()
+
+        assert com_falha.chamadas == [('evento', 'resumo')]
+        assert gravador.chamadas == [('erro', "primeiro"), ('evento', 'resumo')]
+        assert barramento.estatisticas['falhas_entrega'] == 1
+
+
+def test_cancelar_inscricao_entrega_o_que_ja_foi_publicado():
+    observador = ObservadorGravador()
+    barramento = BarramentoEventos([observador])
+    barramento.on_erro("antes")
+
+    barramento.cancelar_inscricao(observador)
+    barramento.on_erro("depois")
+
+    assert observador.chamadas == [('erro', "antes")]
+    assert barramento.observers == []
+
+
+def test_console_observer_so_monta_o_relatorio_sob_pedido(capsys):
+    observador = ConsoleObserver()
+    observador.on_sucesso(_resultado())
+
+    saida = capsys.readouterr().out
+    assert "Alocação concluída com sucesso!" in saida
+    assert "RESUMO DAS ALOCAÇÕES POR SALA" not in saida
+    assert observador.ultimo_relatorio._texto is None
+
+    observador.imprimir_relatorio()
+    saida = capsys.readouterr().out
+    assert "RESUMO DAS ALOCAÇÕES POR SALA" in saida
+    assert "RESUMO DAS ALOCAÇÕES POR HORÁRIO" in saida
+
+    ConsoleObserver(detalhado=True).on_sucesso(_resultado())
+    assert "RESUMO DAS ALOCAÇÕES POR SALA" in capsys.readouterr().out
@@ -0,0 +1,186 @@
+"""
+Testes do cache de resultados de alocação (chave, acertos, falhas e invalidação).
+"""
+
+import dataclasses
+from app.models.domain import Materia, Sala, TipoSala, LocalSala
+import pytest
+from app.repositories.alocacao_repo import (
+    AlocacaoLinearStrategy, AlocacaoGulosaStrategy, AlocacaoMatchingStrategy, AlocacaoLNSStrategy,
+)
+from app.services.cache_alocacao import (
+    CacheResultadosAlocacao, AlocacaoMemoizadaStrategy, ParametroNaoMemoizavel, calcular_impressao_digital,
+)
+from app.strategies.interfaces import CompatibilidadePadrao, CompatibilidadeComOcupacao
+
+HORARIO = 'Segunda/Quarta 07:00-07:50/08:00-08:50'
+
+
+def _dados():
+    materias = [
+        Materia('CC_COMP001', 'Algoritmos', 35, HORARIO, 0, docente='Ana', curso='CC'),
+        Materia('CC_COMP002', 'Redes', 50, HORARIO, 0, docente='Bruno', curso='CC'),
+    ]
+    salas = [
+        Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0),
+        Sala('SALA_002', 'Sala 2', 60, TipoSala.AULA, LocalSala.IC, 0),
+    ]
+    return materias, salas
+
+
+def _memoizada(cache=None):
+    return AlocacaoMemoizadaStrategy(AlocacaoGulosaStrategy(CompatibilidadePadrao()),
+                                     cache or CacheResultadosAlocacao())
+
+
+def test_mesma_entrada_acerta_o_cache():
+    materias, salas = _dados()
+    estrategia = _memoizada()
+
+    primeiro = estrategia.alocar(materias, salas)
+    segundo = estrategia.alocar(materias, salas)
+
+    estatisticas = estrategia.cache.obter_estatisticas()
+    assert estatisticas['falhas'] == 1
+    assert estatisticas['acertos_memoria'] == 1
+    assert segundo.alocacoes == primeiro.alocacoes
+
+
+def test_ordem_das_entradas_nao_altera_a_chave():
+    materias, salas = _dados()
+    estrategia = AlocacaoGulosaStrategy(CompatibilidadePadrao())
+    assert (calcular_impressao_digital(materias, salas, estrategia)
+            == calcular_impressao_digital(materias[::-1], salas[::-1], estrategia))
+
+
+def test_alteracoes_nas_materias_invalidam_a_chave():
+    materias, salas = _dados()
+    estrategia = AlocacaoGulosaStrategy(CompatibilidadePadrao())
+    base = calcular_impressao_digital(materias, salas, estrategia)
+
+    for campo, valor in (('inscritos', 36), ('horario', 'Terça 10:00-10:50'), ('material', 1)):
+        alteradas = [dataclasses.replace(materias[0], **{campo: valor}), materias[1]]
+        assert calcular_impressao_digital(alteradas, salas, estrategia) != base, campo
+
+
+def test_alteracoes_nas_salas_e_parametros_invalidam_a_chave():
+    materias, salas = _dados()
+    compatibilidade = CompatibilidadePadrao()
+    base = calcular_impressao_digital(materias, salas, AlocacaoLinearStrategy(compatibilidade))
+
+    salas_alteradas = [dataclasses.replace(salas[0], custo_adicional=1.5), salas[1]]
+    assert calcular_impressao_digital(materias, salas_alteradas,
+                                      AlocacaoLinearStrategy(compatibilidade)) != base
+    assert calcular_impressao_digital(materias, salas, AlocacaoLinearStrategy(
+        compatibilidade, relaxacao_linear=True)) != base
+    assert calcular_impressao_digital(materias, salas, AlocacaoGulosaStrategy(compatibilidade)) != base
+
+
+def test_estado_da_execucao_nao_entra_na_chave():
+    materias, salas = _dados()
+    linear = AlocacaoLinearStrategy(CompatibilidadePadrao())
+    estrategia = AlocacaoMemoizadaStrategy(linear, CacheResultadosAlocacao())
+
+    estrategia.alocar(materias, salas)
+    assert linear.ultimas_estatisticas is not None
+    estrategia.alocar(materias, salas)
+
+    assert estrategia.cache.obter_estatisticas()['acertos_memoria'] == 1
+
+
+def test_registrar_usa_a_chave_da_consulta():
+    materias, salas = _dados()
+    estrategia = _memoizada()
+    outras_materias = materias[:1]
+
+    chave, resultado = estrategia.consultar(materias, salas)
+    assert resultado is None
+    # Uma consulta concorrente entre a consulta e o registro não muda a chave usada
+    estrategia.consultar(outras_materias, salas)
+    estrategia.registrar(chave, estrategia.estrategia.alocar(materias, salas))
+
+    assert estrategia.consultar(materias, salas)[1] is not None
+    assert estrategia.consultar(outras_materias, salas)[1] is None
+
+
+def test_camada_em_disco(tmp_path):
+    materias, salas = _dados()
+    _memoizada(CacheResultadosAlocacao(diretorio=str(tmp_path))).alocar(materias, salas)
+
+    # Um novo cache no mesmo diretório começa com a memória vazia
+    estrategia = _memoizada(CacheResultadosAlocacao(diretorio=str(tmp_path)))
+    resultado = estrategia.alocar(materias, salas)
+
+    assert resultado.sucesso
+    assert estrategia.cache.obter_estatisticas()['acertos_disco'] == 1
+
+
+def test_remocao_lru_e_limpeza(tmp_path):
+    materias, salas = _dados()
+    estrategia = _memoizada(CacheResultadosAlocacao(capacidade=1, diretorio=str(tmp_path)))
+
+    estrategia.alocar(materias, salas)
+    estrategia.alocar(materias[:1], salas)
+    estatisticas = estrategia.cache.obter_estatisticas()
+    assert estatisticas['remocoes_memoria'] == 1
+    assert estatisticas['itens_memoria'] == 1
+
+    estrategia.cache.limpar()
+    assert estrategia.cache.obter_estatisticas()['itens_memoria'] == 0
+    assert list(tmp_path.glob('*.pkl')) == []
+    assert estrategia.consultar(materias, salas)[1] is None
+
+
+@pytest.mark.parametrize('estrategia, variante', [
+    (AlocacaoMatchingStrategy(),
+     AlocacaoMatchingStrategy(estrategia_restante=AlocacaoLinearStrategy(relaxacao_linear=True))),
+    (AlocacaoLNSStrategy(), AlocacaoLNSStrategy(estrategia_inicial=AlocacaoGulosaStrategy())),
+    (AlocacaoLNSStrategy(), AlocacaoLNSStrategy(semente=1)),
+    (AlocacaoLNSStrategy(), AlocacaoLNSStrategy(orcamento_tempo=5.0)),
+])
+def test_estrategias_aninhadas_entram_na_chave(estrategia, variante):
+    materias, salas = _dados()
+    assert calcular_impressao_digital(materias, salas, estrategia) != \
+        calcular_impressao_digital(materias, salas, variante)
+
+
+def test_ocupacao_da_compatibilidade_entra_na_chave():
+    materias, salas = _dados()
+    livre = CompatibilidadeComOcupacao(CompatibilidadePadrao(), {})
+    ocupada = CompatibilidadeComOcupacao(CompatibilidadePadrao(), {'SALA_001': {'Sexta 18:00-18:50'}})
+
+    assert calcular_impressao_digital(materias, salas, AlocacaoGulosaStrategy(livre)) != \
+        calcular_impressao_digital(materias, salas, AlocacaoGulosaStrategy(ocupada))
+
+
+def test_parametro_sem_representacao_nao_e_memorizado():
+    materias, salas = _dados()
+    gulosa = AlocacaoGulosaStrategy(CompatibilidadePadrao())
+    gulosa.registro = object()
+    estrategia = AlocacaoMemoizadaStrategy(gulosa, CacheResultadosAlocacao())
+
+    with pytest.raises(ParametroNaoMemoizavel):
+        calcular_impressao_digital(materias, salas, gulosa)
+    assert estrategia.consultar(materias, salas) == (None, None)
+    assert estrategia.alocar(materias, salas).sucesso
+    assert estrategia.alocar(materias, salas).sucesso
+
+    estatisticas = estrategia.cache.obter_estatisticas()
+    assert estatisticas['itens_memoria'] == 0
+    assert estatisticas['acertos_memoria'] == estatisticas['falhas'] == 0
+
+
+def test_lns_limitado_pelo_tempo_nao_e_memorizado():
+    materias, salas = _dados()
+    por_tempo = AlocacaoMemoizadaStrategy(AlocacaoLNSStrategy(orcamento_tempo=0.2), CacheResultadosAlocacao())
+    por_iteracoes = AlocacaoMemoizadaStrategy(AlocacaoLNSStrategy(orcamento_tempo=60.0, max_iteracoes=2),
+                                              CacheResultadosAlocacao())
+
+    resultado = por_tempo.alocar(materias, salas)
+    assert resultado.sucesso and resultado.metricas['tempo_esgotado']
+    assert por_tempo.cache.obter_estatisticas()['itens_memoria'] == 0
+
+    resultado = por_iteracoes.alocar(materias, salas)
+    assert resultado.sucesso and not resultado.metricas['tempo_esgotado']
+    por_iteracoes.alocar(materias, salas)
+    assert por_iteracoes.cache.obter_estatisticas()['acertos_memoria'] == 1
@@ -0,0 +1,87 @@
+"""
+Testes dos cenários what-if com cópia sob escrita.
+"""
+
+import pytest
+from app.models.domain import Materia, Sala, TipoSala, LocalSala
+from app.repositories.alocacao_repo import AlocacaoRepository, AlocacaoManager, AlocacaoGulosaHorariosStrategy
+from app.repositories.cenario_repo import CenarioRepository
+
+
+@pytest.fixture
+def base():
+    repository = AlocacaoRepository()
+    repository.salvar_materia(Materia('CC_COMP001', 'Algoritmos', 35, 'Segunda 07:00-07:50', 0))
+    repository.salvar_materia(Materia('CC_COMP002', 'Redes', 50, 'Segunda 07:00-07:50', 0))
+    repository.salvar_sala(Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0))
+    repository.salvar_sala(Sala('SALA_002', 'Sala 2', 60, TipoSala.AULA, LocalSala.IC, 0))
+    return repository
+
+
+def test_cenario_compartilha_registros_inalterados(base):
+    cenario = base.criar_cenario('teste')
+
+    assert isinstance(cenario, CenarioRepository)
+    assert cenario.buscar_materias() == base.buscar_materias()
+    assert all(a is b for a, b in zip(cenario.buscar_salas(), base.buscar_salas()))
+    assert cenario.diferencas() == {'materias_alteradas': [], 'materias_removidas': [],
+                                    'salas_alteradas': [], 'salas_removidas': []}
+
+
+def test_alteracoes_nao_tocam_a_base(base):
+    original = base.buscar_materia_por_id('CC_COMP001')
+    cenario = base.criar_cenario()
+
+    alterada = cenario.alterar_inscritos('CC_COMP001', 80)
+    cenario.mover_horario('CC_COMP002', 'Terça 10:00-10:50')
+    cenario.fechar_sala('SALA_001')
+    cenario.adicionar_sala(Sala('SALA_099', 'Auditório', 120, TipoSala.AUDITORIO, LocalSala.IC, 0))
+
+    assert alterada.inscritos == 80
+    assert original.inscritos == 35
+    assert base.buscar_materia_por_id('CC_COMP001') is original
+    assert base.buscar_materia_por_id('CC_COMP002').horario == 'Segunda 07:00-07:50'
+    assert [s.id for s in base.buscar_salas()] == ['SALA_001', 'SALA_002']
+
+    assert [m.inscritos for m in cenario.buscar_materias()] == [80, 50]
+    assert [s.id for s in cenario.buscar_salas()] == ['SALA_002', 'SALA_099']
+    assert cenario.buscar_sala_por_id('SALA_001') is None
+    assert cenario.diferencas() == {'materias_alteradas': ['CC_COMP001', 'CC_COMP002'],
+                                    'materias_removidas': [],
+                                    'salas_alteradas': ['SALA_099'], 'salas_removidas': ['SALA_001']}
+
+
+def test_bifurcar_copia_apenas_os_deltas(base):
+    cenario = base.criar_cenario('a')
+    cenario.alterar_inscritos('CC_COMP001', 10)
+
+    derivado = cenario.bifurcar('b')
+    derivado.remover_materia('CC_COMP002')
+    derivado.alterar_inscritos('CC_COMP001', 20)
+
+    assert [m.inscritos for m in cenario.buscar_materias()] == [10, 50]
+    assert [m.inscritos for m in derivado.buscar_materias()] == [20]
+    assert base.buscar_materia_por_id('CC_COMP001').inscritos == 35
+
+
+def test_alterar_materia_inexistente(base):
+    cenario = base.criar_cenario()
+    cenario.remover_materia('CC_COMP001')
+
+    with pytest.raises(KeyError):
+        cenario.alterar_inscritos('CC_COMP001', 10)
+    assert not cenario.remover_sala('SALA_999')
+
+
+def test_alocacao_no_cenario_fica_no_cenario(base):
+    cenario = base.criar_cenario()
+    cenario.fechar_sala('SALA_002')
+    cenario.adicionar_sala(Sala('SALA_003', 'Sala 3', 55, TipoSala.AULA, LocalSala.IC, 0))
+
+    manager = AlocacaoManager(cenario)
+    manager.definir_estrategia(AlocacaoGulosaHorariosStrategy())
+    resultado = manager.executar_alocacao()
+
+    assert resultado.sucesso, resultado.erro
+    assert {a.sala.id for a in cenario.buscar_alocacoes()} == {'SALA_001', 'SALA_003'}
+    assert base.buscar_alocacoes() == []
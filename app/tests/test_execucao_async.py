@@ -0,0 +1,163 @@
+"""
+Testes da execução assíncrona de alocações em processos separados.
+"""
+
+import os
+import time
+import pytest
+from app.models.domain import Materia, Sala, TipoSala, LocalSala, AlocacaoResultado, Observer
+from app.repositories.alocacao_repo import AlocacaoLinearStrategy, AlocacaoGulosaStrategy
+from app.services.cache_alocacao import AlocacaoMemoizadaStrategy, CacheResultadosAlocacao
+from app.services.execucao_async import ExecutorAlocacao, EstadoTrabalho
+from app.strategies.interfaces import AlocacaoStrategy
+
+HORARIO = 'Segunda/Quarta 07:00-07:50/08:00-08:50'
+
+
+class EstrategiaLenta(AlocacaoStrategy):
+    """Dorme antes de responder; definida no módulo para ser importável pelo processo filho"""
+
+    def __init__(self, segundos: float = 30.0):
+        super().__init__()
+        self.segundos = segundos
+
+    def alocar(self, materias, salas):
+        time.sleep(self.segundos)
+        return AlocacaoResultado(sucesso=True)
+
+
+class EstrategiaQueEncerra(AlocacaoStrategy):
+    """Encerra o processo filho sem enviar resultado"""
+
+    def alocar(self, materias, salas):
+        os._exit(3)
+
+
+class ObservadorGravador(Observer):
+    def __init__(self):
+        self.progresso = []
+        self.eventos = []
+
+    def on_progress(self, etapa: str, progresso: float):
+        self.progresso.append((etapa, progresso))
+
+    def on_evento(self, evento: dict):
+        self.eventos.append(evento)
+
+    def on_sucesso(self, resultado):
+        pass
+
+    def on_erro(self, erro: str):
+        pass
+
+
+def _dados():
+    materias = [
+        Materia('CC_COMP001', 'Algoritmos', 35, HORARIO, 0),
+        Materia('CC_COMP002', 'Redes', 50, HORARIO, 0),
+    ]
+    salas = [
+        Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0),
+        Sala('SALA_002', 'Sala 2', 60, TipoSala.AULA, LocalSala.IC, 0),
+    ]
+    return materias, salas
+
+
+@pytest.fixture
+def executor():
+    executor = ExecutorAlocacao(max_processos=2)
+    yield executor
+    executor.cancelar_todos()
+
+
+def test_estrategia_notifica_progresso_e_fases():
+    materias, salas = _dados()
+    estrategia = AlocacaoLinearStrategy()
+    observador = ObservadorGravador()
+    estrategia.adicionar_observer(observador)
+
+    assert estrategia.alocar(materias, salas).sucesso
+
+    etapas = [etapa for etapa, _ in observador.progresso]
+    assert "Resolvendo modelo linear" in etapas
+    assert [p for _, p in observador.progresso] == sorted(p for _, p in observador.progresso)
+    assert 'solver' in [evento['fase'] for evento in observador.eventos]
+
+
+def test_progresso_do_processo_filho_chega_ao_trabalho(executor):
+    materias, salas = _dados()
+    observador = ObservadorGravador()
+
+    trabalho = executor.submeter(AlocacaoLinearStrategy(), materias, salas, observers=[observador])
+    resultado = trabalho.resultado(timeout=60)
+
+    assert resultado.sucesso, resultado.erro
+    assert trabalho.estado == EstadoTrabalho.CONCLUIDO
+    assert trabalho.progresso == 100.0
+    # O progresso real da estratégia é repassado pela fila, dentro da faixa de 10-90%
+    repassados = [p for etapa, p in observador.progresso if etapa == "Resolvendo modelo linear"]
+    assert len(repassados) == 1 and 10.0 < repassados[0] < 90.0
+
+
+def test_cancelar_trabalho_em_execucao(executor):
+    materias, salas = _dados()
+    trabalho = executor.submeter(EstrategiaLenta(), materias, salas)
+
+    assert trabalho.cancelar()
+    resultado = trabalho.resultado(timeout=30)
+
+    assert trabalho.estado == EstadoTrabalho.CANCELADO
+    assert not resultado.sucesso
+    assert not trabalho.cancelar()
+
+
+def test_tempo_limite_expira(executor):
+    materias, salas = _dados()
+    trabalho = executor.submeter(EstrategiaLenta(), materias, salas, timeout=0.5)
+
+    resultado = trabalho.resultado(timeout=30)
+
+    assert trabalho.estado == EstadoTrabalho.EXPIRADO
+    assert "Tempo limite" in resultado.erro
+
+
+def test_processo_encerrado_sem_resultado(executor):
+    materias, salas = _dados()
+    trabalho = executor.submeter(EstrategiaQueEncerra(), materias, salas)
+
+    resultado = trabalho.resultado(timeout=60)
+
+    assert trabalho.estado == EstadoTrabalho.FALHOU
+    assert "código 3" in resultado.erro
+
+
+def test_limite_de_processos_mantem_trabalho_pendente():
+    executor = ExecutorAlocacao(max_processos=1)
+    materias, salas = _dados()
+    primeiro = executor.submeter(EstrategiaLenta(), materias, salas)
+    segundo = executor.submeter(EstrategiaLenta(), materias, salas)
+
+    try:
+        time.sleep(0.5)
+        assert segundo.estado == EstadoTrabalho.PENDENTE
+        assert len(executor.trabalhos_ativos()) == 2
+    finally:
+        assert executor.cancelar_todos() == 2
+    segundo.resultado(timeout=30)
+    primeiro.resultado(timeout=30)
+    assert segundo.estado == EstadoTrabalho.CANCELADO
+    assert executor.trabalhos_ativos() == []
+
+
+def test_estrategia_memoizada_usa_o_cache_do_processo_pai(executor):
+    materias, salas = _dados()
+    estrategia = AlocacaoMemoizadaStrategy(AlocacaoGulosaStrategy(), CacheResultadosAlocacao())
+
+    primeiro = executor.submeter(estrategia, materias, salas).resultado(timeout=60)
+    observador = ObservadorGravador()
+    segundo = executor.submeter(estrategia, materias, salas, observers=[observador]).resultado(timeout=5)
+
+    assert primeiro.sucesso and segundo.sucesso
+    assert segundo.alocacoes == primeiro.alocacoes
+    assert observador.progresso == [("Resultado obtido do cache", 90.0)]
+    assert estrategia.cache.obter_estatisticas()['acertos_memoria'] == 1
@@ -0,0 +1,140 @@
+"""
+Testes da instrumentação por fase e dos exportadores de medições.
+"""
+
+import json
+import pickle
+from app.models.domain import Materia, Sala, TipoSala, LocalSala, Observer
+from app.repositories.alocacao_repo import AlocacaoRepository, AlocacaoManager, AlocacaoLinearStrategy
+from app.utils.instrumentacao import (
+    Instrumentacao, MedicaoFase, exportar_jsonl, exportar_prometheus, formatar_prometheus,
+)
+
+HORARIO = 'Segunda/Quarta 07:00-07:50/08:00-08:50'
+
+
+class ObservadorEventos(Observer):
+    def __init__(self):
+        self.eventos = []
+
+    def on_progress(self, etapa: str, progresso: float):
+        pass
+
+    def on_evento(self, evento: dict):
+        self.eventos.append(evento)
+
+    def on_sucesso(self, resultado):
+        pass
+
+    def on_erro(self, erro: str):
+        pass
+
+
+def _manager():
+    repository = AlocacaoRepository()
+    repository.salvar_materia(Materia('CC_COMP001', 'Algoritmos', 35, HORARIO, 0))
+    repository.salvar_materia(Materia('CC_COMP002', 'Redes', 50, HORARIO, 0))
+    repository.salvar_sala(Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0))
+    repository.salvar_sala(Sala('SALA_002', 'Sala 2', 60, TipoSala.AULA, LocalSala.IC, 0))
+    manager = AlocacaoManager(repository)
+    manager.definir_estrategia(AlocacaoLinearStrategy())
+    return manager
+
+
+def _instrumentacao():
+    instrumentacao = Instrumentacao()
+    instrumentacao.registrar_fase(MedicaoFase('solver', tempo_parede=1.5, tempo_cpu=1.0,
+                                              contadores={'variaveis': 10}))
+    instrumentacao.registrar_fase(MedicaoFase('solver', tempo_parede=0.5, tempo_cpu=0.25,
+                                              contadores={'variaveis': 4, 'modo': 'heuristica'}))
+    return instrumentacao
+
+
+def test_resultado_traz_fases_e_contadores():
+    resultado = _manager().executar_alocacao()
+
+    assert resultado.sucesso, resultado.erro
+    instrumentacao = resultado.instrumentacao
+    nomes = [fase.nome for fase in instrumentacao.fases]
+    assert nomes[0] == 'carregamento_dados'
+    for nome in ('compatibilidade', 'variaveis', 'restricoes', 'solver', 'extracao', 'metricas'):
+        assert nome in nomes
+    assert instrumentacao.contadores['variaveis'] == 4
+    assert instrumentacao.contadores['materias_carregadas'] == 2
+    assert instrumentacao.tempo_total == sum(f.tempo_parede for f in instrumentacao.fases)
+
+
+def test_observadores_recebem_eventos_das_fases():
+    manager = _manager()
+    observador = ObservadorEventos()
+    manager.adicionar_observer(observador)
+
+    resultado = manager.executar_alocacao()
+
+    assert [e['fase'] for e in observador.eventos if e['tipo'] == 'fase'] == \
+        [f.nome for f in resultado.instrumentacao.fases]
+    assert observador.eventos[-1]['tipo'] == 'resumo'
+
+
+def test_fase_mede_excecao_e_chama_callback():
+    concluidas = []
+    instrumentacao = Instrumentacao(ao_concluir_fase=concluidas.append)
+
+    try:
+        with instrumentacao.fase('falha') as fase:
+            fase.contadores['tentativas'] = 1
+            raise RuntimeError("erro")
+    except RuntimeError:
+        pass
+
+    assert [f.nome for f in concluidas] == ['falha']
+    assert instrumentacao.obter_fase('falha').contadores == {'tentativas': 1}
+    # O callback não vai junto quando a instrumentação é enviada a outro processo
+    assert pickle.loads(pickle.dumps(instrumentacao)).ao_concluir_fase is None
+
+
+def test_medir_memoria_registra_pico():
+    with Instrumentacao(medir_memoria=True) as instrumentacao:
+        with instrumentacao.fase('alocacao'):
+            dados = [0] * 100_000
+
+    assert len(dados) == 100_000
+    assert instrumentacao.fases[0].pico_memoria >= 800_000
+    assert Instrumentacao().fases == []
+
+
+def test_exportar_jsonl(tmp_path):
+    caminho = tmp_path / 'medicoes.jsonl'
+
+    assert exportar_jsonl(_instrumentacao(), str(caminho), {'cenario': 'base'}) == 3
+    exportar_jsonl(_instrumentacao(), str(caminho))
+
+    linhas = [json.loads(linha) for linha in caminho.read_text(encoding='utf-8').splitlines()]
+    assert len(linhas) == 6
+    assert linhas[0]['cenario'] == 'base' and linhas[0]['fase'] == 'solver'
+    assert linhas[2]['tipo'] == 'resumo'
+    assert linhas[2]['tempo_parede'] == 2.0
+    assert linhas[2]['contadores'] == {'variaveis': 4, 'modo': 'heuristica'}
+
+
+def test_formatar_prometheus_agrega_fases_repetidas():
+    texto = formatar_prometheus(_instrumentacao(), {'cenario': 'a"b'})
+
+    assert 'alocacao_fase_tempo_parede_segundos{cenario="a\\"b",fase="solver"} 2.0' in texto
+    assert 'alocacao_fase_tempo_cpu_segundos{cenario="a\\"b",fase="solver"} 1.25' in texto
+    assert 'alocacao_variaveis{cenario="a\\"b"} 4' in texto
+    # Contadores não numéricos e medições ausentes ficam de fora
+    assert 'modo' not in texto
+    assert 'pico_memoria' not in texto
+
+
+def test_exportar_prometheus_substitui_arquivo(tmp_path):
+    caminho = tmp_path / 'alocacao.prom'
+    caminho.write_text('antigo\n', encoding='utf-8')
+
+    exportar_prometheus(_instrumentacao(), str(caminho), prefixo='teste')
+
+    conteudo = caminho.read_text(encoding='utf-8')
+    assert conteudo.startswith('# HELP teste_fase_tempo_parede_segundos')
+    assert 'antigo' not in conteudo
+    assert [p.name for p in tmp_path.iterdir()] == ['alocacao.prom']
@@ -0,0 +1,137 @@
+"""
+Testes da busca em vizinhança grande (LNS).
+"""
+
+import pytest
+from app.models.domain import Materia, Sala, TipoSala, LocalSala, AlocacaoResultado, Observer
+from app.repositories.alocacao_repo import AlocacaoLinearStrategy, AlocacaoLNSStrategy
+from app.strategies.interfaces import AlocacaoStrategy, CompatibilidadePadrao
+from app.utils.horarios import extrair_slots_tempo
+
+HORARIOS = [
+    'Segunda/Quarta 07:00-07:50/08:00-08:50',
+    'Segunda/Quarta 10:00-10:50/11:00-11:50',
+    'Terça/Quinta 10:00-10:50/11:00-11:50',
+]
+
+
+class EstrategiaSemSolucao(AlocacaoStrategy):
+    def alocar(self, materias, salas):
+        return AlocacaoResultado(sucesso=False, erro="sem solução")
+
+
+class ObservadorProgresso(Observer):
+    def __init__(self):
+        self.progresso = []
+
+    def on_progress(self, etapa: str, progresso: float):
+        self.progresso.append((etapa, progresso))
+
+    def on_sucesso(self, resultado):
+        pass
+
+    def on_erro(self, erro: str):
+        pass
+
+
+def _dados():
+    materias = [Materia(f'CC_COMP{i:03d}', f'Matéria {i}', 15 + (i * 7) % 40,
+                        HORARIOS[i % len(HORARIOS)], 1 if i % 5 == 0 else 0)
+                for i in range(1, 13)]
+    salas = [Sala(f'SALA_{j:03d}', f'Sala {j}', 25 + 8 * j, TipoSala.AULA,
+                  LocalSala.IM if j % 3 == 0 else LocalSala.IC, 0,
+                  custo_adicional=3.0 if j % 3 == 0 else 0.0)
+             for j in range(1, 7)]
+    salas.append(Sala('SALA_007', 'Laboratório 1', 60, TipoSala.LABORATORIO, LocalSala.IC, 1))
+    return materias, salas
+
+
+def _custo_total(alocacoes):
+    return sum(a.sala.capacidade - a.materia.inscritos + a.sala.custo_adicional for a in alocacoes)
+
+
+def _verificar_solucao(resultado, materias):
+    """Todas as matérias alocadas, em salas compatíveis, sem duas na mesma sala e slot"""
+    assert resultado.sucesso, resultado.erro
+    assert [a.materia.id for a in resultado.alocacoes] == [m.id for m in materias]
+    compatibilidade = CompatibilidadePadrao()
+    ocupadas = set()
+    for alocacao in resultado.alocacoes:
+        assert compatibilidade.eh_compativel(alocacao.materia, alocacao.sala)
+        assert alocacao.sala.capacidade >= alocacao.materia.inscritos
+        for slot in extrair_slots_tempo(alocacao.materia.horario):
+            assert (alocacao.sala.id, slot) not in ocupadas
+            ocupadas.add((alocacao.sala.id, slot))
+
+
+def _lns(**parametros):
+    return AlocacaoLNSStrategy(CompatibilidadePadrao(), orcamento_tempo=30.0, tamanho_vizinhanca=6,
+                               max_iteracoes=8, **parametros)
+
+
+@pytest.fixture(scope='module')
+def otimo():
+    materias, salas = _dados()
+    resultado = AlocacaoLinearStrategy(CompatibilidadePadrao()).alocar(materias, salas)
+    _verificar_solucao(resultado, materias)
+    return _custo_total(resultado.alocacoes)
+
+
+def test_lns_nao_piora_a_solucao_inicial(otimo):
+    materias, salas = _dados()
+
+    resultado = _lns().alocar(materias, salas)
+
+    _verificar_solucao(resultado, materias)
+    metricas = resultado.metricas
+    assert metricas['modo_modelo'] == 'lns'
+    assert metricas['iteracoes'] == 8
+    assert not metricas['tempo_esgotado']
+    assert metricas['objetivo_final'] <= metricas['objetivo_inicial'] + 1e-6
+    assert metricas['objetivo_final'] == pytest.approx(_custo_total(resultado.alocacoes))
+    assert metricas['objetivo_final'] >= otimo - 1e-6
+
+
+def test_mesma_semente_mesmo_resultado():
+    materias, salas = _dados()
+
+    primeiro = _lns(semente=7).alocar(materias, salas)
+    segundo = _lns(semente=7).alocar(materias, salas)
+
+    assert [a.sala.id for a in primeiro.alocacoes] == [a.sala.id for a in segundo.alocacoes]
+    assert primeiro.metricas['melhorias'] == segundo.metricas['melhorias']
+
+
+def test_orcamento_de_tempo_esgotado():
+    materias, salas = _dados()
+
+    resultado = AlocacaoLNSStrategy(CompatibilidadePadrao(), orcamento_tempo=0.0).alocar(materias, salas)
+
+    _verificar_solucao(resultado, materias)
+    assert resultado.metricas['iteracoes'] == 0
+    assert resultado.metricas['tempo_esgotado']
+    assert resultado.metricas['objetivo_final'] == resultado.metricas['objetivo_inicial']
+
+
+def test_solucao_inicial_recorre_a_relaxacao():
+    materias, salas = _dados()
+
+    resultado = _lns(estrategia_inicial=EstrategiaSemSolucao(), max_trabalhadores=2).alocar(materias, salas)
+
+    _verificar_solucao(resultado, materias)
+    rascunho = AlocacaoLinearStrategy(CompatibilidadePadrao(), relaxacao_linear=True).alocar(materias, salas)
+    assert resultado.metricas['objetivo_inicial'] == pytest.approx(rascunho.metricas['objetivo_arredondado'])
+
+
+def test_progresso_por_lote_de_vizinhancas():
+    materias, salas = _dados()
+    estrategia = _lns()
+    observador = ObservadorProgresso()
+    estrategia.adicionar_observer(observador)
+
+    estrategia.alocar(materias, salas)
+
+    lns = [(etapa, progresso) for etapa, progresso in observador.progresso if 'vizinhanças' in etapa]
+    assert observador.progresso[0] == ("Solução inicial obtida", 10.0)
+    assert lns[-1] == ("8 vizinhanças, " + lns[-1][0].split(', ')[1], 100.0)
+    assert all(10.0 <= progresso <= 100.0 for _, progresso in lns)
@@ -0,0 +1,99 @@
+"""
+Testes das cores das matérias e do cache de páginas do PDF.
+"""
+
+import zlib
+import pytest
+import pdf_generator
+import timetable_layout
+
+
+def _ids_com_mesma_cor_preferida(quantidade):
+    por_indice = {}
+    for i in range(10000):
+        course_id = f'CC_COMP{i:03d}'
+        ids = por_indice.setdefault(timetable_layout.preferred_color_index(course_id), [])
+        ids.append(course_id)
+        if len(ids) == quantidade:
+            return ids
+    raise AssertionError("nenhuma colisão encontrada")
+
+
+def test_paleta_fixa():
+    assert timetable_layout.generate_palette() == timetable_layout.COURSE_PALETTE
+    assert len(set(timetable_layout.COURSE_PALETTE)) == timetable_layout.PALETTE_SIZE
+    # Cores claras o bastante para texto preto
+    assert all(sum(rgb) >= 1.5 for rgb in timetable_layout.COURSE_PALETTE)
+    assert timetable_layout.get_course_rgb('CC_COMP001') == timetable_layout.COURSE_PALETTE[
+        zlib.crc32(b'CC_COMP001') % timetable_layout.PALETTE_SIZE]
+
+
+def test_materias_da_mesma_pagina_nao_repetem_cor():
+    ids = _ids_com_mesma_cor_preferida(3)
+
+    cores = timetable_layout.assign_course_colors(ids)
+
+    assert len(set(cores.values())) == 3
+    assert cores[ids[0]] == timetable_layout.get_course_rgb(ids[0])
+
+
+def test_cores_independem_da_ordem():
+    ids = _ids_com_mesma_cor_preferida(2) + ['CC_COMP900', 'CC_COMP901']
+
+    assert timetable_layout.assign_course_colors(ids) == timetable_layout.assign_course_colors(reversed(ids + ids))
+
+
+def test_blocos_da_pagina_com_cores_distintas():
+    ids = _ids_com_mesma_cor_preferida(2)
+    courses = [{'id': course_id, 'name': course_id, 'room_info': "Sala 1",
+                'slots': [(day, 'M1', 'M2')], 'material': 0}
+               for course_id, day in zip(ids, ('Seg', 'Ter'))]
+
+    blocks = pdf_generator.build_course_blocks(courses)
+
+    assert len(blocks) == 2
+    assert blocks[0][-1] != blocks[1][-1]
+
+
+@pytest.fixture
+def page_specs():
+    pytest.importorskip('pypdf')
+    resultado = pdf_generator.create_test_pdf_with_mock_data()
+    return pdf_generator.build_page_specs(pdf_generator.convert_alocacoes_to_pdf_format(resultado))
+
+
+def test_cache_reaproveita_paginas(page_specs):
+    cache = pdf_generator.PageCache()
+
+    primeiro = pdf_generator.render_pages(page_specs, page_cache=cache)
+    assert (cache.hits, cache.misses, len(cache)) == (0, len(page_specs), len(page_specs))
+
+    segundo = pdf_generator.render_pages(page_specs, page_cache=cache)
+    assert (cache.hits, cache.misses) == (len(page_specs), len(page_specs))
+    assert segundo == primeiro
+
+
+def test_so_a_sala_alterada_e_renderizada(page_specs, monkeypatch):
+    cache = pdf_generator.PageCache()
+    pdf_generator.render_pages(page_specs, page_cache=cache)
+    renderizadas = []
+    original = pdf_generator.render_page_specs_to_bytes
+    monkeypatch.setattr(pdf_generator, 'render_page_specs_to_bytes',
+                        lambda specs: renderizadas.extend(specs) or original(specs))
+    alterada = dict(page_specs[1], title=page_specs[1]['title'] + " (revisada)")
+
+    pdf_generator.render_pages([page_specs[0], alterada] + list(page_specs[2:]), page_cache=cache)
+
+    assert renderizadas == [alterada]
+
+
+def test_cache_descarta_menos_recente(page_specs):
+    cache = pdf_generator.PageCache(max_pages=2)
+
+    pdf_generator.render_pages(page_specs[:3], page_cache=cache)
+    assert len(cache) == 2
+    assert cache.get(pdf_generator.page_fingerprint(page_specs[0])) is None
+    assert cache.get(pdf_generator.page_fingerprint(page_specs[2])) is not None
+
+    cache.clear()
+    assert len(cache) == 0
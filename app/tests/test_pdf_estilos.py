@@ -0,0 +1,55 @@
+"""
+Testes dos estilos de bloco em cache e da geometria pré-calculada da grade.
+"""
+
+import pytest
+from reportlab.lib import colors
+import pdf_generator
+import timetable_layout
+
+
+def test_estilo_criado_uma_vez_por_cor():
+    preto = pdf_generator.get_course_block_style(colors.black)
+
+    assert pdf_generator.get_course_block_style(colors.Color(0, 0, 0)) is preto
+    assert pdf_generator.get_course_block_style(colors.white) is not preto
+    assert pdf_generator.get_course_block_style(colors.white).textColor == colors.white
+
+
+def test_bloco_desenhado_com_estilo_do_cache(monkeypatch):
+    usados = []
+    original = pdf_generator.Paragraph
+    monkeypatch.setattr(pdf_generator, 'Paragraph',
+                        lambda texto, estilo: usados.append(estilo) or original(texto, estilo))
+    c = pdf_generator.canvas.Canvas(None)
+
+    pdf_generator.draw_course_block_split(c, 0, 'M1', 'M2', "Algoritmos", "IC-101", colors.Color(0.9, 0.9, 0.9))
+    pdf_generator.draw_course_block_split(c, 1, 'M1', 'M2', "Redes", "IC-102", colors.Color(0.1, 0.1, 0.2))
+
+    assert usados[0] is pdf_generator.get_course_block_style(colors.black)
+    assert usados[1] is pdf_generator.get_course_block_style(colors.white)
+
+
+def test_geometria_pre_calculada():
+    layout = timetable_layout.get_grid_layout((0, 1), ('M', 'T', 'N'))
+
+    assert timetable_layout.get_grid_layout((0, 1), ('M', 'T', 'N')) is layout
+    manha = layout.block_geometry[(1, 'M1', 'M2')]
+    assert len(manha) == 1
+    x, y, largura, altura = manha[0]
+    assert x == pytest.approx(timetable_layout.GRID_X_START)
+    assert largura == pytest.approx(layout.slot_layout[0][1] + layout.slot_layout[1][1])
+    assert altura == pytest.approx(layout.row_height)
+    assert y == pytest.approx(timetable_layout.GRID_Y_START - 2 * layout.row_height)
+
+    # Um bloco que atravessa o jantar é dividido em dois retângulos
+    assert len(layout.block_geometry[(0, 'T6', 'N1')]) == 2
+    assert pdf_generator.get_block_geometry(4, 'M1', 'M1', layout) == []
+
+
+def test_intervalos_so_entre_turnos_usados():
+    layout = timetable_layout.get_grid_layout((0,), ('M', 'N'))
+
+    ids = [slot[0] for slot in layout.slot_defs]
+    assert ids == ['M1', 'M2', 'M3', 'M4', 'M5', 'M6', 'INT2', 'N1', 'N2', 'N3', 'N4', 'N5', 'N6']
+    assert pdf_generator.get_course_blocks_with_intervals('M6', 'N1', layout) == [(5, 5), (7, 7)]
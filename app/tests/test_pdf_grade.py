@@ -0,0 +1,54 @@
+"""
+Testes da grade estática desenhada uma vez como form XObject.
+"""
+
+import io
+import pytest
+import pdf_generator
+
+
+@pytest.fixture(scope='module')
+def page_specs():
+    resultado = pdf_generator.create_test_pdf_with_mock_data()
+    return pdf_generator.build_page_specs(pdf_generator.convert_alocacoes_to_pdf_format(resultado))
+
+
+def test_grade_desenhada_uma_vez_por_documento(page_specs, monkeypatch):
+    chamadas = []
+    desenhar = pdf_generator.draw_static_grid
+    monkeypatch.setattr(pdf_generator, 'draw_static_grid',
+                        lambda c, layout: chamadas.append(layout.key) or desenhar(c, layout))
+
+    pdf_bytes = pdf_generator.render_pages(page_specs)
+
+    assert len(page_specs) > 1
+    assert len(chamadas) == 1
+    assert pdf_bytes.count(b'/Subtype /Form') == 1
+
+
+def test_cada_layout_tem_seu_form(page_specs, monkeypatch):
+    chamadas = []
+    desenhar = pdf_generator.draw_static_grid
+    monkeypatch.setattr(pdf_generator, 'draw_static_grid',
+                        lambda c, layout: chamadas.append(layout.key) or desenhar(c, layout))
+    outra_grade = [dict(spec, grid=(tuple(range(6)), spec['grid'][1])) for spec in page_specs[:2]]
+
+    pdf_generator.render_pages(list(page_specs[:2]) + outra_grade)
+
+    assert len(chamadas) == 2 and chamadas[0] != chamadas[1]
+
+
+def test_paginas_referenciam_o_mesmo_form(page_specs):
+    pypdf = pytest.importorskip('pypdf')
+
+    leitor = pypdf.PdfReader(io.BytesIO(pdf_generator.render_pages(page_specs)))
+
+    referencias = set()
+    for pagina in leitor.pages:
+        xobjects = pagina['/Resources']['/XObject']
+        assert len(xobjects) == 1
+        nome = next(iter(xobjects))
+        assert pdf_generator.GRID_FORM_NAME in nome
+        referencias.add(xobjects.raw_get(nome).idnum)
+        assert f"{nome} Do".encode() in pagina.get_contents().get_data()
+    assert len(referencias) == 1
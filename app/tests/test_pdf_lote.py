@@ -0,0 +1,79 @@
+"""
+Testes da exportação em lote por docente, curso, sala e local.
+"""
+
+import io
+import zipfile
+import pytest
+import pdf_generator
+from app.models.domain import Materia, Sala, Alocacao, AlocacaoResultado, TipoSala, LocalSala
+from app.repositories.sqlite_repo import SQLiteRepository
+
+
+def _alocacoes():
+    salas = [Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0),
+             Sala('SALA_002', 'Sala 2', 60, TipoSala.AULA, LocalSala.IM, 0)]
+    materias = [
+        Materia('CC_COMP001', 'Algoritmos', 35, 'Segunda 07:00-07:50/08:00-08:50', 0,
+                docente='Ana Souza', curso='Ciência da Computação'),
+        Materia('CC_COMP002', 'Redes', 50, 'Terça 10:00-10:50', 0,
+                docente='Ana Souza; Bruno Lima', curso='Engenharia de Computação'),
+        Materia('CC_COMP003', 'Cálculo', 30, 'Quarta 08:00-08:50', 0, curso='Ciência da Computação'),
+    ]
+    return [Alocacao(materia, sala, sala.calcular_espaco_ocioso(materia.inscritos),
+                     sala.calcular_utilizacao(materia.inscritos))
+            for materia, sala in zip(materias, [salas[0], salas[1], salas[0]])]
+
+
+@pytest.fixture
+def resultado():
+    # Os dados passam pelo SQLite para garantir que docente e curso sobrevivem à persistência
+    with SQLiteRepository() as repo:
+        alocacoes = _alocacoes()
+        repo.salvar_materias([a.materia for a in alocacoes])
+        repo.salvar_salas({a.sala.id: a.sala for a in alocacoes}.values())
+        repo.salvar_alocacoes(alocacoes)
+        return AlocacaoResultado(sucesso=True, alocacoes=repo.buscar_alocacoes())
+
+
+def _grupos(resultado, group_by):
+    index = pdf_generator.index_allocations(resultado)
+    return {spec['group']: sorted({block[3] for block in spec['blocks']})
+            for spec in pdf_generator.build_group_page_specs(index, group_by, resultado.tabela)}
+
+
+def test_agrupamento_por_docente_e_curso(resultado):
+    assert _grupos(resultado, 'docente') == {
+        'Ana Souza': ['Algoritmos', 'Redes'],
+        'Bruno Lima': ['Redes'],
+        'Sem docente': ['Cálculo'],
+    }
+    assert _grupos(resultado, 'curso') == {
+        'Ciência da Computação': ['Algoritmos', 'Cálculo'],
+        'Engenharia de Computação': ['Redes'],
+    }
+
+
+def test_lote_em_zip_um_arquivo_por_grupo(resultado):
+    progresso = []
+
+    zip_bytes = pdf_generator.render_timetable_batch(resultado, 'curso', as_zip=True,
+                                                     progress=lambda feitos, total: progresso.append((feitos, total)))
+
+    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as arquivo:
+        nomes = arquivo.namelist()
+        assert all(arquivo.read(nome).startswith(b'%PDF') for nome in nomes)
+    assert nomes == ['Ciencia_da_Computacao.pdf', 'Engenharia_de_Computacao.pdf']
+    assert progresso == [(1, 2), (2, 2)]
+
+
+def test_exportar_lote_em_pdf_unico(resultado, tmp_path):
+    pypdf = pytest.importorskip('pypdf')
+    destino = tmp_path / 'docentes.pdf'
+
+    assert pdf_generator.export_timetable_batch(resultado, str(destino), 'docente')
+
+    assert len(pypdf.PdfReader(str(destino)).pages) == 3
+    assert [p.name for p in tmp_path.iterdir()] == ['docentes.pdf']
+    assert not pdf_generator.export_timetable_batch(AlocacaoResultado(sucesso=True, alocacoes=[]),
+                                                    str(tmp_path / 'vazio.pdf'))
@@ -0,0 +1,47 @@
+"""
+Testes da API de PDF em memória.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import pdf_generator
+from app.models.domain import AlocacaoResultado
+
+
+@pytest.fixture(scope='module')
+def resultado():
+    return pdf_generator.create_test_pdf_with_mock_data()
+
+
+def test_render_retorna_bytes_do_pdf(resultado):
+    pdf_bytes = pdf_generator.render_timetable_pdf(resultado)
+
+    assert pdf_bytes.startswith(b'%PDF')
+    assert pdf_bytes.rstrip().endswith(b'%%EOF')
+    assert pdf_generator.render_timetable_pdf(AlocacaoResultado(sucesso=True, alocacoes=[])) is None
+
+
+def test_stream_em_blocos(resultado):
+    blocos = list(pdf_generator.stream_timetable_pdf(resultado, chunk_size=4096))
+
+    assert all(len(bloco) == 4096 for bloco in blocos[:-1])
+    assert b''.join(blocos) == pdf_generator.render_timetable_pdf(resultado)
+
+
+def test_renderizacoes_concorrentes_iguais_a_sequencial(resultado):
+    sequencial = pdf_generator.render_timetable_pdf(resultado)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        concorrentes = list(executor.map(lambda _: pdf_generator.render_timetable_pdf(resultado), range(8)))
+
+    assert all(pdf_bytes == sequencial for pdf_bytes in concorrentes)
+
+
+def test_arquivo_gravado_sem_alterar_o_padrao(resultado, tmp_path):
+    destino = tmp_path / 'horario.pdf'
+
+    assert pdf_generator.create_timetable_pdf_from_alocacoes(resultado, str(destino))
+
+    assert destino.read_bytes() == pdf_generator.render_timetable_pdf(resultado)
+    assert [p.name for p in tmp_path.iterdir()] == ['horario.pdf']
+    assert pdf_generator.PDF_FILENAME == "horario_alocacao.pdf"
@@ -0,0 +1,62 @@
+"""
+Testes dos horários noturnos e da grade dimensionada pelos dias e turnos usados.
+"""
+
+import pytest
+import pdf_generator
+import timetable_layout
+from app.models.domain import Materia, Sala, Alocacao, AlocacaoResultado, TipoSala, LocalSala
+
+
+def _resultado(*horarios):
+    sala = Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0)
+    materias = [Materia(f'CC_COMP{i:03d}', f'Matéria {i}', 30, horario, 0)
+                for i, horario in enumerate(horarios, start=1)]
+    return AlocacaoResultado(sucesso=True, alocacoes=[
+        Alocacao(materia, sala, sala.calcular_espaco_ocioso(30), sala.calcular_utilizacao(30))
+        for materia in materias])
+
+
+def test_horarios_noturnos_viram_slots():
+    # Formato produzido pelo carregador para o código 35N12
+    slots = timetable_layout.parse_horario_to_slots('Terça/Quinta 18:00-18:50/18:50-19:40')
+
+    assert slots == [('Ter', 'N1', 'N2'), ('Qui', 'N1', 'N2')]
+    assert timetable_layout.parse_horario_to_slots('Sábado 22:10-23:00') == [('Sab', 'N6', 'N6')]
+
+
+def test_bloco_atravessa_o_jantar():
+    slots = timetable_layout.parse_horario_to_slots('Sexta 17:10-18:00/18:00-18:50')
+
+    assert slots == [('Sex', 'T6', 'N1')]
+    assert timetable_layout.grid_for_blocks([(4, 'T6', 'N1')]) == ((4,), ('T', 'N'))
+
+
+def test_grade_so_com_dias_e_turnos_usados():
+    assert timetable_layout.grid_for_blocks([]) == (timetable_layout.DEFAULT_DAYS, timetable_layout.DEFAULT_SHIFTS)
+    assert timetable_layout.grid_for_blocks([(1, 'N1', 'N2'), (5, 'M1', 'M1')]) == ((1, 5), ('M', 'N'))
+
+    layout = timetable_layout.get_grid_layout((1, 5), ('N',))
+    assert [slot[0] for slot in layout.slot_defs] == ['N1', 'N2', 'N3', 'N4', 'N5', 'N6']
+    assert (1, 'N1', 'N2') in layout.block_geometry
+    assert (0, 'N1', 'N2') not in layout.block_geometry
+
+
+def test_materia_noturna_no_pdf():
+    resultado = _resultado('Segunda/Quarta 18:00-18:50/18:50-19:40', 'Sábado 20:30-21:20/21:20-22:10')
+
+    spec, = pdf_generator.build_page_specs(pdf_generator.convert_alocacoes_to_pdf_format(resultado))
+
+    assert sorted(block[:3] for block in spec['blocks']) == [(0, 'N1', 'N2'), (2, 'N1', 'N2'), (5, 'N4', 'N5')]
+    assert spec['grid'] == ((0, 2, 5), ('N',))
+    assert pdf_generator.render_pages([spec]).startswith(b'%PDF')
+
+
+def test_intervalo_do_jantar_dividido_na_geometria():
+    layout = timetable_layout.get_grid_layout((4,), ('T', 'N'))
+
+    primeiro, segundo = layout.block_geometry[(4, 'T6', 'N1')]
+
+    jantar = layout.slot_layout[layout.slot_id_to_index['INT3']][1]
+    assert segundo[0] == pytest.approx(primeiro[0] + primeiro[2] + jantar)
+    assert primeiro[1] == segundo[1]
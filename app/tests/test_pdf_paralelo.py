@@ -0,0 +1,47 @@
+"""
+Testes da renderização do PDF em paralelo (fragmentos de páginas unidos com pypdf).
+"""
+
+import io
+import pytest
+import pdf_generator
+
+pypdf = pytest.importorskip('pypdf')
+
+
+@pytest.fixture(scope='module')
+def page_specs():
+    resultado = pdf_generator.create_test_pdf_with_mock_data()
+    return pdf_generator.build_page_specs(pdf_generator.convert_alocacoes_to_pdf_format(resultado))
+
+
+def _conteudos(pdf_bytes):
+    leitor = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+    return [pagina.get_contents().get_data() for pagina in leitor.pages]
+
+
+def test_paralelo_igual_ao_serial(page_specs):
+    serial = pdf_generator.render_pages(page_specs, workers=1)
+    paralelo = pdf_generator.render_pages(page_specs, workers=2)
+
+    conteudos_serial = _conteudos(serial)
+    assert len(conteudos_serial) == len(page_specs) > 1
+    assert _conteudos(paralelo) == conteudos_serial
+
+
+def test_fragmentos_contiguos(page_specs):
+    fragmentos = pdf_generator.split_into_shards(page_specs, 3)
+
+    assert [spec for fragmento in fragmentos for spec in fragmento] == list(page_specs)
+    assert all(fragmentos)
+
+
+def test_benchmark_recusa_paralelo_sem_pypdf(monkeypatch):
+    resultado = pdf_generator.create_test_pdf_with_mock_data()
+    monkeypatch.setattr(pdf_generator, 'PdfWriter', None)
+
+    with pytest.raises(RuntimeError, match="pypdf não instalado"):
+        pdf_generator.benchmark_pdf_rendering(resultado, worker_counts=(1, 2))
+
+    medicoes = pdf_generator.benchmark_pdf_rendering(resultado, worker_counts=(1,))
+    assert medicoes[0]['workers'] == 1 and medicoes[0]['pages'] > 0
@@ -0,0 +1,75 @@
+"""
+Testes do perfilamento opcional de execuções.
+"""
+
+import os
+import pstats
+import tracemalloc
+from app.utils.perfil import PerfiladorExecucao, perfil_habilitado, VARIAVEL_AMBIENTE
+
+
+def _trabalho():
+    return sorted(str(i) for i in range(20_000))
+
+
+def test_flag_e_variavel_de_ambiente(monkeypatch):
+    monkeypatch.delenv(VARIAVEL_AMBIENTE, raising=False)
+    assert not perfil_habilitado()
+
+    monkeypatch.setenv(VARIAVEL_AMBIENTE, " Sim ")
+    assert perfil_habilitado()
+    assert not perfil_habilitado(False)
+
+    monkeypatch.setenv(VARIAVEL_AMBIENTE, "0")
+    assert not perfil_habilitado()
+    assert perfil_habilitado(True)
+
+
+def test_desabilitado_nao_grava_nada(tmp_path):
+    perfilador = PerfiladorExecucao(str(tmp_path / 'perfis'), habilitado=False)
+
+    with perfilador.secao('alocacao'):
+        _trabalho()
+
+    assert perfilador.arquivos == []
+    assert perfilador.diretorio_execucao is None
+    assert not (tmp_path / 'perfis').exists()
+
+
+def test_secao_grava_pstats_e_relatorios(tmp_path):
+    perfilador = PerfiladorExecucao(str(tmp_path), habilitado=True, top_n=5)
+
+    with perfilador.secao('alocacao'):
+        _trabalho()
+
+    nomes = [os.path.basename(caminho) for caminho in perfilador.arquivos]
+    assert nomes == ['alocacao.pstats', 'alocacao_cpu.txt', 'alocacao_memoria.txt']
+    assert os.path.dirname(perfilador.arquivos[0]) == perfilador.diretorio_execucao
+    assert '_trabalho' in str(pstats.Stats(perfilador.arquivos[0]).stats)
+    with open(perfilador.arquivos[2], encoding='utf-8') as arquivo:
+        assert arquivo.readline() == 'Seção: alocacao\n'
+    # tracemalloc é desligado se foi o perfilador que o ligou
+    assert not tracemalloc.is_tracing()
+
+
+def test_secoes_repetidas_nao_sobrescrevem(tmp_path):
+    perfilador = PerfiladorExecucao(str(tmp_path), habilitado=True)
+
+    for _ in range(3):
+        with perfilador.secao('pdf'):
+            _trabalho()
+
+    pstats_gravados = sorted(os.path.basename(c) for c in perfilador.arquivos if c.endswith('.pstats'))
+    assert pstats_gravados == ['pdf.pstats', 'pdf_2.pstats', 'pdf_3.pstats']
+    assert len(os.listdir(perfilador.diretorio_execucao)) == 9
+
+
+def test_secao_aninhada_conta_na_externa(tmp_path):
+    perfilador = PerfiladorExecucao(str(tmp_path), habilitado=True)
+
+    with perfilador.secao('execucao'):
+        with perfilador.secao('alocacao'):
+            _trabalho()
+
+    assert [os.path.basename(c) for c in perfilador.arquivos if c.endswith('.pstats')] == ['execucao.pstats']
+    assert '_trabalho' in str(pstats.Stats(perfilador.arquivos[0]).stats)
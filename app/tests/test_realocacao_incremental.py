@@ -0,0 +1,105 @@
+"""
+Testes da realocação incremental após pequenas alterações nos dados.
+"""
+
+from app.models.domain import Materia, Sala, TipoSala, LocalSala, DeltaAlocacao
+from app.repositories.alocacao_repo import AlocacaoRepository, AlocacaoManager, AlocacaoLinearStrategy
+from app.strategies.interfaces import CompatibilidadePadrao
+from app.utils.horarios import extrair_slots_tempo
+
+HORARIOS = [
+    'Segunda/Quarta 07:00-07:50/08:00-08:50',
+    'Segunda/Quarta 10:00-10:50/11:00-11:50',
+    'Terça/Quinta 10:00-10:50/11:00-11:50',
+]
+
+
+def _dados():
+    materias = [Materia(f'CC_COMP{i:03d}', f'Matéria {i}', 15 + (i * 7) % 40,
+                        HORARIOS[i % len(HORARIOS)], 1 if i % 5 == 0 else 0)
+                for i in range(1, 13)]
+    salas = [Sala(f'SALA_{j:03d}', f'Sala {j}', 25 + 8 * j, TipoSala.AULA,
+                  LocalSala.IM if j % 3 == 0 else LocalSala.IC, 0,
+                  custo_adicional=3.0 if j % 3 == 0 else 0.0)
+             for j in range(1, 7)]
+    salas.append(Sala('SALA_007', 'Laboratório 1', 60, TipoSala.LABORATORIO, LocalSala.IC, 1))
+    return materias, salas
+
+
+def _verificar_solucao(resultado, materias):
+    """Todas as matérias alocadas, em salas compatíveis, sem duas na mesma sala e slot"""
+    assert resultado.sucesso, resultado.erro
+    assert sorted(a.materia.id for a in resultado.alocacoes) == sorted(m.id for m in materias)
+    compatibilidade = CompatibilidadePadrao()
+    ocupadas = set()
+    for alocacao in resultado.alocacoes:
+        assert compatibilidade.eh_compativel(alocacao.materia, alocacao.sala)
+        assert alocacao.sala.capacidade >= alocacao.materia.inscritos
+        for slot in extrair_slots_tempo(alocacao.materia.horario):
+            assert (alocacao.sala.id, slot) not in ocupadas
+            ocupadas.add((alocacao.sala.id, slot))
+
+
+def _manager():
+    materias, salas = _dados()
+    repository = AlocacaoRepository()
+    for materia in materias:
+        repository.salvar_materia(materia)
+    for sala in salas:
+        repository.salvar_sala(sala)
+    manager = AlocacaoManager(repository)
+    manager.definir_estrategia(AlocacaoLinearStrategy(CompatibilidadePadrao()))
+    anterior = manager.executar_alocacao()
+    _verificar_solucao(anterior, materias)
+    return manager, anterior, materias
+
+
+def test_incremental_preserva_alocacoes_fora_da_vizinhanca():
+    manager, anterior, materias = _manager()
+    alterada = Materia('CC_COMP002', 'Matéria 2', 20, HORARIOS[1], 0)
+
+    resultado = manager.executar_alocacao_incremental(DeltaAlocacao(materias_alteradas=[alterada]), anterior)
+
+    _verificar_solucao(resultado, [alterada if m.id == alterada.id else m for m in materias])
+    assert resultado.metricas['modo_realocacao'] == 'incremental'
+    assert resultado.metricas['materias_reotimizadas'] < len(materias)
+    salas_anteriores = {a.materia.id: a.sala.id for a in anterior.alocacoes}
+    salas_novas = {a.materia.id: a.sala.id for a in resultado.alocacoes}
+    # Matérias de horários sem slots em comum com a alterada ficam onde estavam
+    intocadas = [m.id for m in materias if m.horario == HORARIOS[0]]
+    assert all(salas_novas[m_id] == salas_anteriores[m_id] for m_id in intocadas)
+
+
+def test_incremental_usa_o_ultimo_resultado():
+    manager, _, materias = _manager()
+
+    resultado = manager.executar_alocacao_incremental(DeltaAlocacao(materias_removidas=['CC_COMP001']))
+
+    _verificar_solucao(resultado, materias[1:])
+    assert manager.ultimo_resultado is resultado
+    assert manager.repository.buscar_materia_por_id('CC_COMP001') is None
+
+
+def test_incremental_recorre_a_alocacao_completa():
+    manager, anterior, materias = _manager()
+    # Sem o laboratório as matérias de computadores não cabem na vizinhança nem no modelo completo
+    resultado = manager.executar_alocacao_incremental(DeltaAlocacao(salas_removidas=['SALA_007']), anterior)
+
+    assert not resultado.sucesso
+
+    nova_sala = Sala('SALA_008', 'Laboratório 2', 60, TipoSala.LABORATORIO, LocalSala.IC, 1)
+    resultado = manager.executar_alocacao_incremental(DeltaAlocacao(salas_alteradas=[nova_sala]), anterior)
+
+    _verificar_solucao(resultado, materias)
+    assert {a.sala.id for a in resultado.alocacoes if a.materia.material == 1} == {'SALA_008'}
+
+
+def test_incremental_com_sala_removida_fora_do_delta():
+    manager, anterior, materias = _manager()
+    sala_id = anterior.alocacoes[0].sala.id
+    manager.repository.remover_sala(sala_id)
+
+    resultado = manager.executar_alocacao_incremental(DeltaAlocacao(), anterior)
+
+    _verificar_solucao(resultado, materias)
+    assert sala_id not in {a.sala.id for a in resultado.alocacoes}
@@ -0,0 +1,89 @@
+"""
+Testes do modo rascunho: relaxação linear com arredondamento e reparo.
+"""
+
+import numpy as np
+import pytest
+from app.models.domain import Materia, Sala, TipoSala, LocalSala
+from app.repositories.alocacao_repo import AlocacaoLinearStrategy
+from app.strategies.interfaces import CompatibilidadePadrao
+from app.utils.horarios import extrair_slots_tempo
+
+HORARIOS = [
+    'Segunda/Quarta 07:00-07:50/08:00-08:50',
+    'Segunda/Quarta 10:00-10:50/11:00-11:50',
+    'Terça/Quinta 10:00-10:50/11:00-11:50',
+]
+
+
+def _dados():
+    materias = [Materia(f'CC_COMP{i:03d}', f'Matéria {i}', 15 + (i * 7) % 40,
+                        HORARIOS[i % len(HORARIOS)], 1 if i % 5 == 0 else 0)
+                for i in range(1, 13)]
+    salas = [Sala(f'SALA_{j:03d}', f'Sala {j}', 25 + 8 * j, TipoSala.AULA,
+                  LocalSala.IM if j % 3 == 0 else LocalSala.IC, 0,
+                  custo_adicional=3.0 if j % 3 == 0 else 0.0)
+             for j in range(1, 7)]
+    salas.append(Sala('SALA_007', 'Laboratório 1', 60, TipoSala.LABORATORIO, LocalSala.IC, 1))
+    return materias, salas
+
+
+def _custo_total(alocacoes):
+    return sum(a.sala.capacidade - a.materia.inscritos + a.sala.custo_adicional for a in alocacoes)
+
+
+def _verificar_solucao(resultado, materias):
+    """Todas as matérias alocadas, em salas compatíveis, sem duas na mesma sala e slot"""
+    assert resultado.sucesso, resultado.erro
+    assert sorted(a.materia.id for a in resultado.alocacoes) == sorted(m.id for m in materias)
+    compatibilidade = CompatibilidadePadrao()
+    ocupadas = set()
+    for alocacao in resultado.alocacoes:
+        assert compatibilidade.eh_compativel(alocacao.materia, alocacao.sala)
+        assert alocacao.sala.capacidade >= alocacao.materia.inscritos
+        for slot in extrair_slots_tempo(alocacao.materia.horario):
+            assert (alocacao.sala.id, slot) not in ocupadas
+            ocupadas.add((alocacao.sala.id, slot))
+
+
+def test_relaxacao_linear_limita_o_otimo():
+    materias, salas = _dados()
+    otimo = AlocacaoLinearStrategy(CompatibilidadePadrao()).alocar(materias, salas)
+    _verificar_solucao(otimo, materias)
+    custo_otimo = _custo_total(otimo.alocacoes)
+
+    resultado = AlocacaoLinearStrategy(CompatibilidadePadrao(), relaxacao_linear=True).alocar(materias, salas)
+
+    _verificar_solucao(resultado, materias)
+    metricas = resultado.metricas
+    assert metricas['modo_modelo'] == 'relaxacao_linear'
+    assert metricas['objetivo_arredondado'] == pytest.approx(_custo_total(resultado.alocacoes))
+    assert metricas['limite_inferior_lp'] <= custo_otimo + 1e-6
+    assert metricas['objetivo_arredondado'] >= custo_otimo - 1e-6
+    assert metricas['gap_relativo'] >= -1e-9
+    assert resultado.instrumentacao.obter_fase('arredondamento') is not None
+
+
+def _dois_horarios_iguais():
+    materias = [Materia('CC_COMP001', 'Algoritmos', 30, 'Segunda 07:00-07:50', 0),
+                Materia('CC_COMP002', 'Redes', 30, 'Segunda 07:00-07:50', 0)]
+    salas = [Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0),
+             Sala('SALA_002', 'Sala 2', 50, TipoSala.AULA, LocalSala.IC, 0)]
+    return materias, salas, np.ones((2, 2), dtype=bool)
+
+
+def test_arredondamento_repara_decisoes_fracionarias_em_conflito():
+    materias, salas, matriz = _dois_horarios_iguais()
+    # As duas matérias preferem a mesma sala: a segunda precisa ser reparada para a outra
+    fracao = np.array([[0.6, 0.4], [0.5, 0.5]])
+
+    solucao = AlocacaoLinearStrategy._arredondar_solucao(materias, salas, matriz, fracao)
+
+    assert solucao == {'CC_COMP001': 'SALA_001', 'CC_COMP002': 'SALA_002'}
+
+
+def test_arredondamento_sem_solucao():
+    materias, salas, matriz = _dois_horarios_iguais()
+    matriz[:, 1] = False
+
+    assert AlocacaoLinearStrategy._arredondar_solucao(materias, salas, matriz, matriz * 1.0) is None
@@ -0,0 +1,161 @@
+"""
+Testes do repositório SQLite.
+"""
+
+import sqlite3
+import pytest
+from app.models.domain import Materia, Sala, Alocacao, TipoSala, LocalSala
+from app.repositories.sqlite_repo import SQLiteRepository
+
+
+def _materias():
+    return [
+        Materia('CC_COMP001', 'Algoritmos', 35, 'Segunda/Quarta 07:00-07:50/08:00-08:50', 0,
+                docente='Ana Souza', curso='Ciência da Computação'),
+        Materia('CC_COMP002', 'Redes', 50, 'Terça 10:00-10:50', 0,
+                docente='Ana Souza; Bruno Lima', curso='Engenharia de Computação'),
+        Materia('CC_COMP003', 'Programação', 25, 'Segunda 08:00-08:50', 1),
+    ]
+
+
+def _salas():
+    return [
+        Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0),
+        Sala('SALA_002', 'Sala 2', 60, TipoSala.AULA, LocalSala.IM, 0, custo_adicional=2.5),
+        Sala('SALA_003', 'Laboratório 1', 30, TipoSala.LABORATORIO, LocalSala.IC, 1,
+             materiais_disponiveis=['computadores', 'projetor']),
+    ]
+
+
+def _alocar(materia, sala):
+    return Alocacao(materia=materia, sala=sala,
+                    espaco_ocioso=sala.calcular_espaco_ocioso(materia.inscritos),
+                    utilizacao_percentual=sala.calcular_utilizacao(materia.inscritos))
+
+
+@pytest.fixture
+def repo():
+    repository = SQLiteRepository()
+    repository.salvar_materias(_materias())
+    repository.salvar_salas(_salas())
+    yield repository
+    repository.fechar()
+
+
+def test_ida_e_volta_de_materias_e_salas(repo):
+    assert repo.buscar_materias() == _materias()
+    assert repo.buscar_salas() == _salas()
+    assert repo.buscar_materia_por_id('CC_COMP002') == _materias()[1]
+    assert repo.buscar_sala_por_id('SALA_003').materiais_disponiveis == ['computadores', 'projetor']
+    assert repo.buscar_materia_por_id('CC_COMP999') is None
+
+
+def test_salvar_existente_atualiza_registro_e_slots(repo):
+    materia, sala = _materias()[0], _salas()[0]
+    repo.salvar_alocacao(_alocar(materia, sala))
+
+    movida = Materia(materia.id, materia.nome, 30, 'Sexta 14:00-14:50', 0)
+    assert repo.salvar_materia(movida)
+
+    assert len(repo.buscar_materias()) == 3
+    assert repo.buscar_materia_por_id(materia.id) == movida
+    assert repo.buscar_alocacoes_por_slot('Segunda 07:00-07:50') == []
+    assert [a.materia for a in repo.buscar_alocacoes_por_slot('Sexta 14:00-14:50')] == [movida]
+
+
+def test_consultas_indexadas(repo):
+    materias, salas = _materias(), _salas()
+    repo.salvar_alocacoes([_alocar(materias[0], salas[0]), _alocar(materias[1], salas[1]),
+                           _alocar(materias[2], salas[2])])
+
+    assert [a.materia.id for a in repo.buscar_alocacoes_por_sala('SALA_002')] == ['CC_COMP002']
+    assert sorted(a.materia.id for a in repo.buscar_alocacoes_por_slot('Segunda 08:00-08:50')) == \
+        ['CC_COMP001', 'CC_COMP003']
+    assert [s.id for s in repo.buscar_salas_por_local(LocalSala.IC)] == ['SALA_001', 'SALA_003']
+    assert [s.id for s in repo.buscar_salas_por_capacidade_minima(35)] == ['SALA_001', 'SALA_002']
+    assert [s.id for s in repo.buscar_salas_livres('Segunda 07:00-07:50')] == \
+        ['SALA_003', 'SALA_002']
+    assert [s.id for s in repo.buscar_salas_livres('Segunda 07:00-07:50', capacidade_minima=50)] == \
+        ['SALA_002']
+
+    alocacao = repo.buscar_alocacoes_por_sala('SALA_001')[0]
+    assert alocacao.espaco_ocioso == 5
+    assert alocacao.sala == salas[0]
+
+
+def test_remocoes_apagam_alocacoes(repo):
+    materias, salas = _materias(), _salas()
+    repo.salvar_alocacoes([_alocar(materias[0], salas[0]), _alocar(materias[1], salas[1])])
+
+    assert repo.remover_sala('SALA_001')
+    assert repo.remover_materia('CC_COMP002')
+    assert not repo.remover_sala('SALA_001')
+
+    assert repo.buscar_alocacoes() == []
+    assert repo.buscar_sala_por_id('SALA_001') is None
+    assert [m.id for m in repo.buscar_materias()] == ['CC_COMP001', 'CC_COMP003']
+
+
+def test_cenarios_isolados_no_mesmo_arquivo(tmp_path):
+    caminho = str(tmp_path / 'alocacao.db')
+    with SQLiteRepository(caminho, 'semestre_1') as primeiro:
+        primeiro.salvar_materias(_materias())
+        with primeiro.com_cenario('semestre_2') as segundo:
+            segundo.salvar_materia(_materias()[0])
+            assert len(segundo.buscar_materias()) == 1
+        assert len(primeiro.buscar_materias()) == 3
+        assert primeiro.listar_cenarios() == ['semestre_1', 'semestre_2']
+
+    with SQLiteRepository(caminho, 'semestre_1') as reaberto:
+        assert reaberto.buscar_materias() == _materias()
+
+
+def test_cenario_compartilhado_exige_arquivo(repo):
+    with pytest.raises(ValueError):
+        repo.com_cenario('outro')
+
+
+def test_indices_criados(repo):
+    indices = {linha[0] for linha in repo.conexao.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")}
+    assert indices == {'idx_salas_local', 'idx_salas_capacidade', 'idx_slots_slot', 'idx_alocacoes_sala'}
+
+
+def test_importar_repositorio(repo):
+    with SQLiteRepository() as copia:
+        assert copia.importar_repositorio(repo)
+        assert copia.buscar_materias() == repo.buscar_materias()
+        assert copia.buscar_salas() == repo.buscar_salas()
+
+
+def test_docente_e_curso_nas_alocacoes(repo):
+    materias, salas = _materias(), _salas()
+    repo.salvar_alocacoes([_alocar(materias[1], salas[1])])
+
+    alocacao = repo.buscar_alocacoes()[0]
+    assert (alocacao.materia.docente, alocacao.materia.curso) == ('Ana Souza; Bruno Lima', 'Engenharia de Computação')
+    assert alocacao.sala == salas[1]
+
+    atualizada = Materia(materias[1].id, materias[1].nome, 50, materias[1].horario, 0, docente='Carla Dias')
+    repo.salvar_materia(atualizada)
+    assert repo.buscar_materia_por_id(atualizada.id) == atualizada
+
+
+def test_migra_arquivo_sem_docente_e_curso(tmp_path):
+    caminho = str(tmp_path / 'antigo.db')
+    conexao = sqlite3.connect(caminho)
+    conexao.executescript(
+        """CREATE TABLE materias (cenario TEXT NOT NULL, id TEXT NOT NULL, nome TEXT NOT NULL,
+                                   inscritos INTEGER NOT NULL, horario TEXT NOT NULL,
+                                   material INTEGER NOT NULL, PRIMARY KEY (cenario, id));
+           INSERT INTO materias VALUES ('padrao', 'CC_COMP009', 'Cálculo', 40, 'Sexta 08:00-08:50', 0);""")
+    conexao.commit()
+    conexao.close()
+
+    with SQLiteRepository(caminho) as repo:
+        assert repo.buscar_materias() == [Materia('CC_COMP009', 'Cálculo', 40, 'Sexta 08:00-08:50', 0)]
+        assert repo.salvar_materias(_materias())
+        assert repo.buscar_materias()[1:] == _materias()
+
+    with SQLiteRepository(caminho) as reaberto:
+        assert reaberto.buscar_materia_por_id('CC_COMP001').docente == 'Ana Souza'
@@ -0,0 +1,82 @@
+"""
+Testes da pré-visualização em SVG.
+"""
+
+import numpy as np
+import pdf_generator
+import timetable_layout
+import timetable_svg
+from app.models.domain import Materia, Sala, Alocacao, AlocacaoResultado, TipoSala, LocalSala
+
+
+def _resultado(*materias_por_sala):
+    alocacoes = []
+    for j, materias in enumerate(materias_por_sala, start=1):
+        sala = Sala(f'SALA_{j:03d}', f'Sala {j}', 60, TipoSala.AULA, LocalSala.IC, 0)
+        alocacoes += [Alocacao(materia, sala, sala.calcular_espaco_ocioso(materia.inscritos),
+                               sala.calcular_utilizacao(materia.inscritos)) for materia in materias]
+    return AlocacaoResultado(sucesso=True, alocacoes=alocacoes)
+
+
+def _materia(i, horario):
+    return Materia(f'CC_COMP{i:03d}', f'Matéria {i}', 30, horario, 0)
+
+
+def test_uma_sala_por_svg_com_todos_os_blocos():
+    resultado = pdf_generator.create_test_pdf_with_mock_data()
+
+    svgs = timetable_svg.render_room_svgs(resultado)
+
+    assert sorted(svgs) == sorted(a.sala.nome for a in resultado.alocacoes)
+    assert all(svg.count('<rect') == 1 for svg in svgs.values())
+    assert not any('conflito' in svg for svg in svgs.values())
+
+
+def test_tabela_de_slots_dividida_nos_intervalos():
+    resultado = _resultado([_materia(1, 'Sexta 17:10-18:00/18:00-18:50'), _materia(2, 'Segunda 07:00-07:50')])
+    index = timetable_layout.index_allocations(resultado)
+    layout = timetable_layout.get_grid_layout((0, 4), ('M', 'T', 'N'))
+
+    room_idx, rows, start_cols, end_cols, entry_idx = timetable_svg.build_slot_table(index, layout, ['Sala 1'])
+
+    jantar = layout.slot_id_to_index['INT3']
+    assert list(zip(rows, start_cols, end_cols, entry_idx)) == [
+        (1, jantar - 1, jantar - 1, 0), (1, jantar + 1, jantar + 1, 0), (0, 0, 0, 1)]
+    assert (room_idx == 0).all()
+
+
+def test_ocupacao_conta_materias_sobrepostas():
+    resultado = _resultado([_materia(1, 'Segunda 07:00-07:50/08:00-08:50'),
+                            _materia(2, 'Segunda 08:00-08:50/09:00-09:50')],
+                           [_materia(3, 'Segunda 08:00-08:50')])
+    index = timetable_layout.index_allocations(resultado)
+    layout = timetable_layout.get_grid_layout((0,), ('M',))
+
+    occupancy = timetable_svg.build_occupancy(timetable_svg.build_slot_table(index, layout, ['Sala 1', 'Sala 2']),
+                                              layout, 2)
+
+    np.testing.assert_array_equal(occupancy[0, 0], [1, 2, 1, 0, 0, 0])
+    np.testing.assert_array_equal(occupancy[1, 0], [0, 1, 0, 0, 0, 0])
+
+
+def test_conflito_desenhado_e_sinalizado():
+    resultado = _resultado([_materia(1, 'Segunda 07:00-07:50/08:00-08:50'),
+                            _materia(2, 'Segunda 08:00-08:50/09:00-09:50'),
+                            _materia(3, 'Segunda 07:00-07:50/08:00-08:50')])
+
+    svg = timetable_svg.render_room_svgs(resultado)['Sala 1']
+
+    # Nenhuma matéria some: as três aparecem, e o trecho compartilhado é marcado uma vez
+    assert all(f'<title>Matéria {i}</title>' in svg for i in (1, 2, 3))
+    assert svg.count('class="conflito"') == 1
+    assert '<title>Conflito: Matéria 1, Matéria 2, Matéria 3</title>' in svg
+
+
+def test_html_com_uma_secao_por_sala():
+    resultado = _resultado([_materia(1, 'Segunda 07:00-07:50')], [_materia(2, 'Terça 07:00-07:50')])
+
+    html = timetable_svg.render_timetable_html(resultado)
+
+    assert html.count('<section>') == 2
+    assert html.index('Sala 1') < html.index('Sala 2')
+    assert timetable_svg.render_room_svgs(AlocacaoResultado(sucesso=True, alocacoes=[])) == {}
@@ -0,0 +1,133 @@
+"""
+Testes da tabela colunar de resultados e da chave dos caches derivados dela.
+"""
+
+import pickle
+import numpy as np
+import pytest
+import timetable_layout
+from app.models.domain import Materia, Sala, Alocacao, AlocacaoResultado, TipoSala, LocalSala
+from app.repositories.alocacao_repo import AlocacaoRepository, AlocacaoManager, AlocacaoLinearStrategy
+from app.services.tabela_resultados import construir_tabela_alocacoes, impressao_tabela, utilizacao_agregada
+
+
+def _alocacoes():
+    salas = [Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0),
+             Sala('SALA_002', 'Sala 2', 60, TipoSala.AULA, LocalSala.IM, 0, custo_adicional=2.5),
+             Sala('SALA_003', 'Laboratório 1', 30, TipoSala.LABORATORIO, LocalSala.IC, 1)]
+    materias = [
+        Materia('CC_COMP001', 'Algoritmos', 35, 'Segunda 07:00-07:50', 0, docente='Ana Souza', curso='CC'),
+        Materia('CC_COMP002', 'Redes', 45, 'Terça 10:00-10:50', 0, docente='Bruno Lima', curso='EC'),
+        Materia('CC_COMP003', 'Programação', 25, 'Segunda 07:00-07:50', 1, docente='Ana Souza', curso='CC'),
+        Materia('CC_COMP004', 'Cálculo', 20, 'Quarta 08:00-08:50', 0, curso='CC'),
+    ]
+    return [Alocacao(materia, sala, sala.calcular_espaco_ocioso(materia.inscritos),
+                     sala.calcular_utilizacao(materia.inscritos))
+            for materia, sala in zip(materias, [salas[0], salas[1], salas[2], salas[0]])]
+
+
+def test_uma_linha_por_alocacao_na_ordem_da_lista():
+    alocacoes = _alocacoes()
+
+    tabela = construir_tabela_alocacoes(alocacoes)
+
+    assert list(tabela['materia_id']) == [a.materia.id for a in alocacoes]
+    assert list(tabela['sala_id']) == ['SALA_001', 'SALA_002', 'SALA_003', 'SALA_001']
+    assert list(tabela['espaco_ocioso']) == [5, 15, 5, 20]
+    assert list(tabela['docente']) == ['Ana Souza', 'Bruno Lima', 'Ana Souza', '']
+    for coluna in ('docente', 'curso', 'horario', 'sala_id', 'sala_nome', 'tipo_sala', 'local'):
+        assert tabela[coluna].dtype == 'category', coluna
+    assert list(tabela['local'].cat.categories) == [local.value for local in LocalSala]
+    assert tabela['horario'].cat.categories.size == 3
+    assert tabela['material'].dtype == np.int8 and tabela['inscritos'].dtype == np.int32
+
+
+def test_tabela_vazia_mantem_as_colunas():
+    tabela = construir_tabela_alocacoes([])
+
+    assert tabela.empty
+    assert list(tabela.columns) == list(construir_tabela_alocacoes(_alocacoes()).columns)
+
+
+def test_utilizacao_agregada_soma_antes_de_dividir():
+    tabela = construir_tabela_alocacoes(_alocacoes())
+
+    por_local = utilizacao_agregada(tabela, tabela['local'])
+
+    # IC: (35 + 25 + 20) / (40 + 30 + 40); IM: 45 / 60
+    assert por_local.to_dict() == pytest.approx({'ic': 80 / 110 * 100, 'im': 75.0})
+    sem_capacidade = tabela.assign(capacidade=0)
+    assert utilizacao_agregada(sem_capacidade, sem_capacidade['sala_id']).tolist() == [0.0, 0.0, 0.0]
+
+
+def test_tabela_construida_uma_vez_por_resultado():
+    resultado = AlocacaoResultado(sucesso=True, alocacoes=_alocacoes())
+
+    assert resultado.tabela is resultado.tabela
+
+    # Resultados serializados antes da tabela existir (cache em disco) não têm o atributo
+    copia = pickle.loads(pickle.dumps(resultado))
+    del copia._tabela
+    assert copia.tabela.equals(resultado.tabela)
+
+
+def test_indice_do_pdf_analisa_cada_horario_uma_vez(monkeypatch):
+    analisados = []
+    original = timetable_layout.parse_horario_to_slots
+    monkeypatch.setattr(timetable_layout, 'parse_horario_to_slots',
+                        lambda horario: analisados.append(horario) or original(horario))
+    resultado = AlocacaoResultado(sucesso=True, alocacoes=_alocacoes())
+
+    index = timetable_layout.index_allocations(resultado)
+
+    assert sorted(analisados) == sorted(set(a.materia.horario for a in resultado.alocacoes))
+    assert [entry['row'] for entry in index] == [0, 1, 2, 3]
+    assert index[2]['slots'] == index[0]['slots'] == [('Seg', 'M1', 'M1')]
+
+
+def test_dataframe_do_gerenciador_reaproveita_a_tabela():
+    repository = AlocacaoRepository()
+    for alocacao in _alocacoes():
+        repository.salvar_materia(alocacao.materia)
+        repository.salvar_sala(alocacao.sala)
+    manager = AlocacaoManager(repository)
+    manager.definir_estrategia(AlocacaoLinearStrategy())
+    resultado = manager.executar_alocacao()
+    assert resultado.sucesso, resultado.erro
+
+    df = manager.obter_resultados_dataframe()
+
+    assert resultado._tabela is not None
+    assert list(df['Materia']) == list(resultado.tabela['materia_nome'])
+    assert list(df['Utilizacao_%']) == [round(a.utilizacao_percentual, 2) for a in resultado.alocacoes]
+    assert AlocacaoManager(AlocacaoRepository()).obter_resultados_dataframe().empty
+
+
+def test_chave_estavel_para_o_mesmo_resultado():
+    primeiro = AlocacaoResultado(sucesso=True, alocacoes=_alocacoes())
+    segundo = AlocacaoResultado(sucesso=True, alocacoes=_alocacoes())
+
+    assert impressao_tabela(primeiro.tabela) == impressao_tabela(segundo.tabela)
+    assert impressao_tabela(construir_tabela_alocacoes([])) == impressao_tabela(construir_tabela_alocacoes([]))
+
+
+@pytest.mark.parametrize('alterar', [
+    lambda alocacoes: alocacoes.reverse(),
+    lambda alocacoes: alocacoes.pop(),
+    lambda alocacoes: setattr(alocacoes[0].materia, 'horario', 'Sexta 07:00-07:50'),
+    lambda alocacoes: setattr(alocacoes[1].materia, 'docente', 'Carla Dias'),
+    lambda alocacoes: setattr(alocacoes[2].sala, 'nome', 'Laboratório 2'),
+])
+def test_chave_muda_com_o_conteudo(alterar):
+    # Qualquer mudança visível nas abas precisa invalidar os caches do Streamlit
+    original = impressao_tabela(construir_tabela_alocacoes(_alocacoes()))
+    alocacoes = _alocacoes()
+    alterar(alocacoes)
+
+    assert impressao_tabela(construir_tabela_alocacoes(alocacoes)) != original
+
+
+def test_chave_considera_as_colunas():
+    tabela = construir_tabela_alocacoes(_alocacoes())
+
+    assert impressao_tabela(tabela.rename(columns={'docente': 'professor'})) != impressao_tabela(tabela)
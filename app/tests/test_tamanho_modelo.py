@@ -0,0 +1,109 @@
+"""
+Testes das estatísticas e dos limites de tamanho do modelo linear.
+"""
+
+import pytest
+from app.models.domain import Materia, Sala, TipoSala, LocalSala
+from app.repositories.alocacao_repo import AlocacaoLinearStrategy
+from app.services.tamanho_modelo import (
+    AcaoExcessoModelo, EstatisticasModelo, LimitesModelo, componentes_independentes,
+)
+from app.strategies.interfaces import CompatibilidadePadrao
+from app.utils.horarios import extrair_slots_tempo
+
+
+def _dados():
+    # Dois horários sem slots em comum: dois componentes independentes de 6 variáveis cada
+    materias = [Materia(f'CC_COMP00{i}', f'Matéria {i}', 30,
+                        'Segunda 07:00-07:50' if i <= 2 else 'Terça 10:00-10:50', 0)
+                for i in range(1, 5)]
+    salas = [Sala(f'SALA_00{j}', f'Sala {j}', 30 + 10 * j, TipoSala.AULA, LocalSala.IC, 0)
+             for j in range(1, 4)]
+    return materias, salas
+
+
+def _verificar(resultado, materias):
+    assert resultado.sucesso, resultado.erro
+    assert [a.materia.id for a in resultado.alocacoes] == [m.id for m in materias]
+    ocupados = [(a.sala.id, slot) for a in resultado.alocacoes for slot in extrair_slots_tempo(a.materia.horario)]
+    assert len(ocupados) == len(set(ocupados))
+
+
+def test_estimativa_bate_com_o_modelo_montado():
+    materias, salas = _dados()
+    estrategia = AlocacaoLinearStrategy(CompatibilidadePadrao())
+
+    estimativa = estrategia.estimar_modelo(materias, salas)
+    _verificar(estrategia.alocar(materias, salas), materias)
+
+    assert estimativa == estrategia.ultimas_estatisticas
+    assert estimativa.variaveis == len(estrategia.variaveis) == 12
+    assert estimativa.restricoes == len(estrategia.problema.constraints) == 22
+    assert estimativa.nao_zeros == sum(len(r) for r in estrategia.problema.constraints.values()) == 36
+
+
+def test_estatisticas_derivadas():
+    estatisticas = EstatisticasModelo(materias=2, salas=2, variaveis=4, restricoes_alocacao_unica=2,
+                                      restricoes_capacidade=4, restricoes_conflito=2, nao_zeros=12)
+
+    assert estatisticas.restricoes == 8
+    assert estatisticas.memoria_estimada == 4 * 1300 + 16 * 130
+    assert estatisticas.para_contadores()['modelo_restricoes'] == 8
+    assert "4 variáveis, 8 restrições (2 de conflito)" in estatisticas.resumo()
+
+
+def test_violacoes_dos_limites():
+    materias, salas = _dados()
+    estatisticas = AlocacaoLinearStrategy().estimar_modelo(materias, salas)
+
+    assert LimitesModelo().violacoes(estatisticas) == []
+    assert LimitesModelo(max_variaveis=12, max_nao_zeros=36).violacoes(estatisticas) == []
+    violacoes = LimitesModelo(max_variaveis=11, max_nao_zeros=35, max_memoria_mb=0.001).violacoes(estatisticas)
+    assert violacoes[:2] == ["variáveis 12 > 11", "não-zeros 36 > 35"]
+    assert violacoes[2].startswith("memória estimada")
+
+
+def test_componentes_independentes():
+    materias, salas = _dados()
+    matriz = CompatibilidadePadrao().matriz_compatibilidade(materias, salas)
+
+    assert sorted(componentes_independentes(materias, matriz)) == [[0, 1], [2, 3]]
+
+
+def test_excesso_com_erro():
+    materias, salas = _dados()
+    estrategia = AlocacaoLinearStrategy(limites=LimitesModelo(max_variaveis=10, acao=AcaoExcessoModelo.ERRO))
+
+    resultado = estrategia.alocar(materias, salas)
+
+    assert not resultado.sucesso
+    assert resultado.erro.startswith("Modelo excede os limites configurados (variáveis 12 > 10)")
+    # Nenhum objeto do PuLP é criado para um modelo rejeitado
+    assert estrategia.problema is None
+
+
+def test_excesso_com_heuristica():
+    materias, salas = _dados()
+    estrategia = AlocacaoLinearStrategy(limites=LimitesModelo(max_variaveis=10,
+                                                              acao=AcaoExcessoModelo.HEURISTICA))
+
+    resultado = estrategia.alocar(materias, salas)
+
+    _verificar(resultado, materias)
+    assert resultado.metricas['modo_modelo'] == 'heuristica'
+    assert estrategia.problema is None
+
+
+@pytest.mark.parametrize('max_variaveis, componentes_heuristica', [(10, 0), (5, 2)])
+def test_excesso_com_decomposicao(max_variaveis, componentes_heuristica):
+    materias, salas = _dados()
+    estrategia = AlocacaoLinearStrategy(limites=LimitesModelo(max_variaveis=max_variaveis))
+
+    resultado = estrategia.alocar(materias, salas)
+
+    _verificar(resultado, materias)
+    assert resultado.metricas['modo_modelo'] == 'decomposto'
+    assert resultado.metricas['componentes'] == 2
+    # Componentes que ainda excedem o limite vão para a heurística
+    assert resultado.metricas['componentes_heuristica'] == componentes_heuristica
+    assert resultado.instrumentacao.contadores['componentes'] == 2
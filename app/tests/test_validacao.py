@@ -0,0 +1,76 @@
+"""
+Testes da validação em lote de matérias e salas.
+"""
+
+from typing import List
+from app.models.domain import Materia, Sala, TipoSala, LocalSala
+from app.strategies.interfaces import ValidatorPadrao, CompatibilidadePadrao, COLUNAS_TABELA_ERROS
+
+HORARIO = 'Segunda 07:00-07:50'
+
+
+def _dados():
+    materias = [
+        Materia('CC_COMP001', 'Algoritmos', 35, HORARIO, 0),
+        Materia('CC_COMP002', 'Redes', 20, HORARIO, 0),
+        Materia('CC_COMP003', 'Robótica', 10, HORARIO, 2),
+    ]
+    salas = [
+        Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0),
+        Sala('SALA_002', 'Sala 2', 60, TipoSala.AULA, LocalSala.IC, 0),
+    ]
+    # As invariantes do __post_init__ valem só na construção; dados importados podem violá-las
+    materias[1].inscritos = 0
+    materias[1].horario = ' '
+    salas[1].custo_adicional = -1.0
+    return materias, salas
+
+
+def test_validar_lote_igual_a_validacao_por_objeto():
+    materias, salas = _dados()
+    validator = ValidatorPadrao()
+
+    tabela = validator.validar_lote(materias, salas)
+
+    assert list(tabela.columns) == COLUNAS_TABELA_ERROS
+    esperado = [m for materia in materias for m in validator.validar_materia(materia)] + \
+               [m for sala in salas for m in validator.validar_sala(sala)]
+    assert validator.formatar_erros(tabela) == esperado
+    assert tabela['id'].tolist() == ['CC_COMP002', 'CC_COMP002', 'SALA_002']
+    assert tabela['indice'].tolist() == [1, 1, 1]
+
+
+def test_validar_lote_materias_sem_sala_compativel():
+    materias, salas = _dados()
+
+    tabela = ValidatorPadrao().validar_lote(materias, salas, CompatibilidadePadrao())
+
+    sem_sala = tabela[tabela['regra'] == 'sem_sala_compativel']
+    assert sem_sala['id'].tolist() == ['CC_COMP003']
+    assert sem_sala['indice'].tolist() == [2]
+
+
+def test_validar_lote_sem_erros():
+    tabela = ValidatorPadrao().validar_lote(
+        [Materia('CC_COMP001', 'Algoritmos', 35, HORARIO, 0)],
+        [Sala('SALA_001', 'Sala 1', 40, TipoSala.AULA, LocalSala.IC, 0)],
+        CompatibilidadePadrao())
+
+    assert tabela.empty
+    assert list(tabela.columns) == COLUNAS_TABELA_ERROS
+
+
+def test_validar_lote_respeita_regras_sobrescritas():
+    class ValidatorLimiteTurma(ValidatorPadrao):
+        def validar_materia(self, materia: Materia) -> List[str]:
+            erros = super().validar_materia(materia)
+            if materia.inscritos > 30:
+                erros.append("Turma acima do limite")
+            return erros
+
+    materias, salas = _dados()
+
+    tabela = ValidatorLimiteTurma().validar_lote(materias, salas)
+
+    assert "Turma acima do limite" in tabela['mensagem'].tolist()
+    assert tabela[tabela['mensagem'] == "Turma acima do limite"]['id'].tolist() == ['CC_COMP001']
@@ -0,0 +1,33 @@
+"""
+Utilitários para interpretação de horários das matérias.
+"""
+
+import re
+from typing import List
+
+
+def extrair_slots_tempo(horario_str: str) -> List[str]:
+    """Extrai slots de tempo individuais de um horário complexo"""
+    # Padrão para extrair dias e horários
+    # Ex: "Segunda/Quinta 09:00-09:50/10:00-10:50" -> ["Segunda 09:00-09:50", "Segunda 10:00-10:50", "Quinta 09:00-09:50", "Quinta 10:00-10:50"]
+
+    # Dividir por " | " se houver múltiplos horários
+    horarios_parts = horario_str.split(' | ')
+    slots = []
+
+    for part in horarios_parts:
+        # Extrair dias e horários
+        match = re.match(r'([^0-9]+)\s+(.+)', part.strip())
+        if not match:
+            continue
+
+        dias_str, horarios_str = match.groups()
+        dias = [d.strip() for d in dias_str.split('/')]
+        horarios = [h.strip() for h in horarios_str.split('/')]
+
+        # Combinar cada dia com cada horário
+        for dia in dias:
+            for horario in horarios:
+                slots.append(f"{dia} {horario}")
+
+    return slots if slots else [horario_str]
@@ -0,0 +1,228 @@
+"""
+Instrumentação das fases de alocação.
+Mede tempo de parede, tempo de CPU, pico de memória e contadores por fase,
+e exporta as medições em JSON lines e no formato texto do Prometheus.
+"""
+
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import List, Dict, Optional, Any, Iterator, Callable
+
+try:
+    import resource
+except ImportError:  # indisponível no Windows
+    resource = None
+
+
+def _tempo_cpu() -> float:
+    """CPU do processo mais a de processos filhos já encerrados (ex: o CBC)"""
+    tempos = os.times()
+    return time.process_time() + tempos.children_user + tempos.children_system
+
+
+def _memoria_rss_maxima() -> Optional[int]:
+    """Pico de memória residente do processo em bytes, quando disponível"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+
+@dataclass
+class MedicaoFase:
+    """Medições de uma fase da alocação"""
+    nome: str
+    tempo_parede: float = 0.0
+    tempo_cpu: float = 0.0
+    pico_memoria: Optional[int] = None  # bytes alocados pelo Python na fase (requer tracemalloc)
+    memoria_rss_maxima: Optional[int] = None  # pico residente do processo ao fim da fase
+    contadores: Dict[str, float] = field(default_factory=dict)
+
+    def para_evento(self) -> Dict[str, Any]:
+        """Representação da fase como evento estruturado"""
+        evento = {'tipo': 'fase'}
+        evento.update(asdict(self))
+        evento['fase'] = evento.pop('nome')
+        return evento
+
+
+class Instrumentacao:
+    """Coleta medições por fase de uma execução de alocação"""
+
+    def __init__(self, medir_memoria: bool = False,
+                 ao_concluir_fase: Optional[Callable[[MedicaoFase], None]] = None):
+        # tracemalloc dá o pico exato por fase, mas deixa a montagem do modelo ~2-3x mais lenta
+        self.medir_memoria = medir_memoria
+        self.fases: List[MedicaoFase] = []
+        self.ao_concluir_fase = ao_concluir_fase  # chamado com cada fase assim que ela termina
+        self._iniciou_rastreamento = False
+
+    def __enter__(self) -> 'Instrumentacao':
+        # tracemalloc só é ligado aqui se ninguém o ligou antes (ex: um profiler externo)
+        if self.medir_memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_rastreamento = True
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._iniciou_rastreamento:
+            tracemalloc.stop()
+            self._iniciou_rastreamento = False
+
+    def __getstate__(self) -> Dict[str, Any]:
+        estado = dict(self.__dict__)
+        estado['_iniciou_rastreamento'] = False
+        # O callback aponta para observadores locais (ex: a fila do processo de trabalho)
+        estado['ao_concluir_fase'] = None
+        return estado
+
+    @contextmanager
+    def fase(self, nome: str) -> Iterator[MedicaoFase]:
+        """Mede o bloco como uma fase; contadores podem ser preenchidos na medição retornada"""
+        medicao = MedicaoFase(nome)
+        rastreando = self.medir_memoria and tracemalloc.is_tracing()
+        if rastreando:
+            tracemalloc.reset_peak()
+            memoria_inicial = tracemalloc.get_traced_memory()[0]
+
+        inicio_parede = time.perf_counter()
+        inicio_cpu = _tempo_cpu()
+        try:
+            yield medicao
+        finally:
+            medicao.tempo_parede = time.perf_counter() - inicio_parede
+            medicao.tempo_cpu = _tempo_cpu() - inicio_cpu
+            if rastreando:
+                medicao.pico_memoria = max(0, tracemalloc.get_traced_memory()[1] - memoria_inicial)
+            medicao.memoria_rss_maxima = _memoria_rss_maxima()
+            self.fases.append(medicao)
+            if self.ao_concluir_fase is not None:
+                self.ao_concluir_fase(medicao)
+
+    def registrar_fase(self, medicao: MedicaoFase):
+        """Inclui uma fase medida externamente"""
+        self.fases.append(medicao)
+
+    def incorporar(self, outra: Optional['Instrumentacao']):
+        """Acrescenta as fases de outra instrumentação"""
+        if outra is not None:
+            self.fases.extend(outra.fases)
+
+    def obter_fase(self, nome: str) -> Optional[MedicaoFase]:
+        """Busca a primeira fase com o nome informado"""
+        return next((f for f in self.fases if f.nome == nome), None)
+
+    @property
+    def tempo_total(self) -> float:
+        return sum(f.tempo_parede for f in self.fases)
+
+    @property
+    def tempo_cpu_total(self) -> float:
+        return sum(f.tempo_cpu for f in self.fases)
+
+    @property
+    def contadores(self) -> Dict[str, float]:
+        """Contadores de todas as fases (fases posteriores prevalecem em nomes repetidos)"""
+        contadores = {}
+        for medicao in self.fases:
+            contadores.update(medicao.contadores)
+        return contadores
+
+    def eventos(self) -> List[Dict[str, Any]]:
+        """Eventos estruturados das fases seguidos de um resumo"""
+        eventos = [f.para_evento() for f in self.fases]
+        eventos.append({
+            'tipo': 'resumo',
+            'tempo_parede': self.tempo_total,
+            'tempo_cpu': self.tempo_cpu_total,
+            'contadores': self.contadores,
+        })
+        return eventos
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {
+            'fases': [asdict(f) for f in self.fases],
+            'tempo_total': self.tempo_total,
+            'tempo_cpu_total': self.tempo_cpu_total,
+            'contadores': self.contadores,
+        }
+
+
+# Exportadores
+def exportar_jsonl(instrumentacao: Instrumentacao, caminho: str,
+                   rotulos: Optional[Dict[str, Any]] = None) -> int:
+    """Acrescenta os eventos da instrumentação a um arquivo JSON lines"""
+    rotulos = rotulos or {}
+    registro = time.time()
+    eventos = instrumentacao.eventos()
+    with open(caminho, 'a', encoding='utf-8') as arquivo:
+        for evento in eventos:
+            linha = {'timestamp': registro, **rotulos, **evento}
+            arquivo.write(json.dumps(linha, ensure_ascii=False, default=str) + '\n')
+    return len(eventos)
+
+
+def _nome_metrica(nome: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_]', '_', nome)
+
+
+def _formatar_rotulos(rotulos: Dict[str, Any]) -> str:
+    if not rotulos:
+        return ''
+    pares = []
+    for chave, valor in sorted(rotulos.items()):
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pares.append(f'{_nome_metrica(chave)}="{valor}"')
+    return '{' + ','.join(pares) + '}'
+
+
+def formatar_prometheus(instrumentacao: Instrumentacao, rotulos: Optional[Dict[str, Any]] = None,
+                        prefixo: str = "alocacao") -> str:
+    """Formata as medições no formato texto de exposição do Prometheus"""
+    rotulos = rotulos or {}
+    linhas = []
+
+    # Fases repetidas (ex: nova resolução após fallback) viram uma única série
+    metricas_fase = [
+        ('fase_tempo_parede_segundos', "Tempo de parede por fase", 'tempo_parede', sum),
+        ('fase_tempo_cpu_segundos', "Tempo de CPU por fase", 'tempo_cpu', sum),
+        ('fase_pico_memoria_bytes', "Pico de memória alocada por fase", 'pico_memoria', max),
+        ('fase_memoria_rss_maxima_bytes', "Pico de memória residente ao fim da fase", 'memoria_rss_maxima', max),
+    ]
+    for sufixo, descricao, atributo, agregar in metricas_fase:
+        valores: Dict[str, List[float]] = {}
+        for medicao in instrumentacao.fases:
+            valor = getattr(medicao, atributo)
+            if valor is not None:
+                valores.setdefault(medicao.nome, []).append(valor)
+        if not valores:
+            continue
+        nome = f"{prefixo}_{sufixo}"
+        linhas.append(f"# HELP {nome} {descricao}")
+        linhas.append(f"# TYPE {nome} gauge")
+        for fase, lista in valores.items():
+            linhas.append(f"{nome}{_formatar_rotulos({**rotulos, 'fase': fase})} {agregar(lista)}")
+
+    for contador, valor in sorted(instrumentacao.contadores.items()):
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            continue
+        nome = f"{prefixo}_{_nome_metrica(contador)}"
+        linhas.append(f"# TYPE {nome} gauge")
+        linhas.append(f"{nome}{_formatar_rotulos(rotulos)} {valor}")
+
+    return '\n'.join(linhas) + '\n'
+
+
+def exportar_prometheus(instrumentacao: Instrumentacao, caminho: str,
+                        rotulos: Optional[Dict[str, Any]] = None, prefixo: str = "alocacao"):
+    """Grava as medições em um arquivo .prom (coletor textfile) de forma atômica"""
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        arquivo.write(formatar_prometheus(instrumentacao, rotulos, prefixo))
+    os.replace(temporario, caminho)
@@ -0,0 +1,109 @@
+"""
+Perfilamento opcional de execuções.
+Envolve etapas (carregamento, alocação, geração de PDF) em cProfile e tracemalloc
+e grava, por execução, arquivos .pstats e relatórios top-N em um diretório próprio.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Iterator
+
+VARIAVEL_AMBIENTE = "ALOCACAO_PROFILE"
+VALORES_VERDADEIROS = {"1", "true", "sim", "yes", "on"}
+
+
+def perfil_habilitado(flag: Optional[bool] = None) -> bool:
+    """Flag explícita tem prioridade; sem ela, consulta a variável ALOCACAO_PROFILE"""
+    if flag is not None:
+        return flag
+    return os.environ.get(VARIAVEL_AMBIENTE, "").strip().lower() in VALORES_VERDADEIROS
+
+
+class PerfiladorExecucao:
+    """Perfila seções de uma execução e grava os relatórios em um diretório por execução"""
+
+    def __init__(self, diretorio_base: str = "perfis", habilitado: Optional[bool] = None,
+                 top_n: int = 25):
+        self.diretorio_base = diretorio_base
+        self.habilitado = perfil_habilitado(habilitado)
+        self.top_n = top_n
+        self.diretorio_execucao: Optional[str] = None
+        self.arquivos: List[str] = []
+        self._ocorrencias: Dict[str, int] = {}
+        self._secao_ativa: Optional[str] = None
+
+    def _preparar_diretorio(self) -> str:
+        """Cria o diretório da execução na primeira seção perfilada"""
+        if self.diretorio_execucao is None:
+            nome = f"{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}"
+            self.diretorio_execucao = os.path.join(self.diretorio_base, nome)
+            os.makedirs(self.diretorio_execucao, exist_ok=True)
+        return self.diretorio_execucao
+
+    @contextmanager
+    def secao(self, nome: str) -> Iterator[None]:
+        """Perfila o bloco; seções aninhadas são contabilizadas na seção externa"""
+        if not self.habilitado or self._secao_ativa is not None:
+            yield
+            return
+
+        self._secao_ativa = nome
+        iniciou_rastreamento = not tracemalloc.is_tracing()
+        if iniciou_rastreamento:
+            tracemalloc.start(10)
+        memoria_antes = tracemalloc.take_snapshot()
+        perfilador = cProfile.Profile()
+        inicio = time.perf_counter()
+
+        perfilador.enable()
+        try:
+            yield
+        finally:
+            perfilador.disable()
+            duracao = time.perf_counter() - inicio
+            memoria_depois = tracemalloc.take_snapshot()
+            pico = tracemalloc.get_traced_memory()[1]
+            if iniciou_rastreamento:
+                tracemalloc.stop()
+            self._secao_ativa = None
+            self._gravar(nome, perfilador, memoria_antes, memoria_depois, duracao, pico)
+
+    def _gravar(self, nome: str, perfilador: cProfile.Profile, memoria_antes, memoria_depois,
+                duracao: float, pico: int):
+        """Grava .pstats, relatório de CPU e relatório de alocações da seção"""
+        diretorio = self._preparar_diretorio()
+
+        # Seções repetidas na mesma execução ganham sufixo (_2, _3...) em vez de sobrescrever a anterior
+        ocorrencia = self._ocorrencias.get(nome, 0) + 1
+        self._ocorrencias[nome] = ocorrencia
+        if ocorrencia > 1:
+            nome = f"{nome}_{ocorrencia}"
+
+        caminho_pstats = os.path.join(diretorio, f"{nome}.pstats")
+        perfilador.dump_stats(caminho_pstats)
+
+        saida = io.StringIO()
+        estatisticas = pstats.Stats(perfilador, stream=saida)
+        estatisticas.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_n)
+        caminho_cpu = os.path.join(diretorio, f"{nome}_cpu.txt")
+        with open(caminho_cpu, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(f"Seção: {nome}\nDuração: {duracao:.3f}s\n")
+            arquivo.write(saida.getvalue())
+
+        filtros = [tracemalloc.Filter(False, tracemalloc.__file__),
+                   tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+        diferencas = (memoria_depois.filter_traces(filtros)
+                      .compare_to(memoria_antes.filter_traces(filtros), 'lineno'))
+        caminho_memoria = os.path.join(diretorio, f"{nome}_memoria.txt")
+        with open(caminho_memoria, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(f"Seção: {nome}\nPico de memória rastreada: {pico / 1024:.1f} KiB\n")
+            arquivo.write(f"Top {self.top_n} linhas por memória alocada (retida ao fim da seção):\n")
+            for estatistica in diferencas[:self.top_n]:
+                arquivo.write(f"{estatistica}\n")
+
+        self.arquivos.extend([caminho_pstats, caminho_cpu, caminho_memoria])
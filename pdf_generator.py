@@ -1,8 +1,21 @@
-import random
 import sys
 import os
 import re
-from typing import Dict, List, Tuple, Any
+import io
+import hashlib
+import json
+import math
+import threading
+import unicodedata
+import zipfile
+from collections import OrderedDict
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Any, Optional, Sequence, Iterator, Callable, Iterable
+from xml.sax.saxutils import escape
+import numpy as np
+import pandas as pd
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import landscape, A4
 from reportlab.lib.units import cm
@@ -12,6 +25,13 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
+from timetable_layout import (
+    PAGE_WIDTH, PAGE_HEIGHT, MARGIN_TOP, MARGIN_BOTTOM, MARGIN_LEFT, MARGIN_RIGHT, HEADER_HEIGHT,
+    FOOTER_HEIGHT, DAY_LABEL_WIDTH, TIMESLOT_HEADER_HEIGHT, GRID_X_START, GRID_Y_START, GRID_WIDTH,
+    GRID_HEIGHT, DAYS_OF_WEEK, DEFAULT_DAYS, TIMESLOT_DEFINITIONS, SHIFTS, DEFAULT_SHIFTS, SLOT_ID_TO_INDEX,
+    COURSE_PALETTE, get_course_rgb, assign_course_colors, GridLayout, get_grid_layout, DEFAULT_GRID_LAYOUT, grid_for_blocks,
+    parse_horario_to_slots, index_allocations, make_course_entry,
+)
 
 try:
     pdfmetrics.registerFont(TTFont('Arial', 'arial.ttf'))
@@ -23,63 +43,12 @@ except:
     FONT_NAME = 'Helvetica'
     FONT_NAME_BOLD = 'Helvetica-Bold'
 
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # optional: without it, rendering stays on a single process
+    PdfReader = PdfWriter = None
+
 PDF_FILENAME = "horario_alocacao.pdf"
-PAGE_WIDTH, PAGE_HEIGHT = landscape(A4)
-
-MARGIN_TOP = 1.2 * cm
-MARGIN_BOTTOM = 1.0 * cm
-MARGIN_LEFT = 0.8 * cm
-MARGIN_RIGHT = 0.8 * cm
-
-HEADER_HEIGHT = 1.8 * cm
-FOOTER_HEIGHT = 0.6 * cm
-DAY_LABEL_WIDTH = 2.0 * cm
-TIMESLOT_HEADER_HEIGHT = 1.8 * cm
-
-GRID_X_START = MARGIN_LEFT + DAY_LABEL_WIDTH
-GRID_Y_START = PAGE_HEIGHT - MARGIN_TOP - HEADER_HEIGHT - TIMESLOT_HEADER_HEIGHT
-GRID_WIDTH = PAGE_WIDTH - MARGIN_LEFT - MARGIN_RIGHT - DAY_LABEL_WIDTH
-GRID_HEIGHT = PAGE_HEIGHT - MARGIN_TOP - MARGIN_BOTTOM - HEADER_HEIGHT - FOOTER_HEIGHT - TIMESLOT_HEADER_HEIGHT
-
-DAYS_OF_WEEK = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex']
-
-TIMESLOT_DEFINITIONS = [
-    ('M1', '07:00', '07:50', False),
-    ('M2', '08:00', '08:50', False),
-    ('M3', '09:00', '09:50', False),
-    ('M4', '10:00', '10:50', False),
-    ('M5', '11:00', '11:50', False),
-    ('M6', '12:00', '12:50', False),
-    ('INT2', 'Almoço', '', True),
-    ('T1', '13:00', '13:50', False),
-    ('T2', '13:50', '14:40', False),
-    ('T3', '14:40', '15:30', False),
-    ('T4', '15:30', '16:20', False),
-    ('T5', '16:20', '17:10', False),
-    ('T6', '17:10', '18:00', False),
-]
-
-ROW_HEIGHT = GRID_HEIGHT / len(DAYS_OF_WEEK)
-
-NUM_REGULAR_SLOTS = sum(1 for _, _, _, is_interval in TIMESLOT_DEFINITIONS if not is_interval)
-NUM_INTERVAL_SLOTS = sum(1 for _, _, _, is_interval in TIMESLOT_DEFINITIONS if is_interval)
-REGULAR_SLOT_RELATIVE_WIDTH = 1.0
-INTERVAL_SLOT_RELATIVE_WIDTH = 0.4
-
-TOTAL_RELATIVE_WIDTH_UNITS = (NUM_REGULAR_SLOTS * REGULAR_SLOT_RELATIVE_WIDTH) + \
-                             (NUM_INTERVAL_SLOTS * INTERVAL_SLOT_RELATIVE_WIDTH)
-
-REGULAR_COL_WIDTH = (GRID_WIDTH / TOTAL_RELATIVE_WIDTH_UNITS) * REGULAR_SLOT_RELATIVE_WIDTH
-INTERVAL_COL_WIDTH = (GRID_WIDTH / TOTAL_RELATIVE_WIDTH_UNITS) * INTERVAL_SLOT_RELATIVE_WIDTH
-
-COLUMN_PROPERTIES = []
-current_x = GRID_X_START
-for slot_id, _, _, is_interval in TIMESLOT_DEFINITIONS:
-    col_w = INTERVAL_COL_WIDTH if is_interval else REGULAR_COL_WIDTH
-    COLUMN_PROPERTIES.append({'id': slot_id, 'x': current_x, 'width': col_w})
-    current_x += col_w
-
-SLOT_ID_TO_INDEX = {slot['id']: i for i, slot in enumerate(COLUMN_PROPERTIES)}
 
 styles = getSampleStyleSheet()
 TITLE_STYLE = ParagraphStyle(
@@ -102,94 +71,98 @@ FOOTER_STYLE = ParagraphStyle(
     'FooterStyle', parent=styles['Normal'], fontName=FONT_NAME, fontSize=9, alignment=TA_LEFT
 )
 
-def generate_random_colors(num_colors=64):
-    color_list = []
-    for _ in range(num_colors):
-        r = random.uniform(0.5, 1.0)
-        g = random.uniform(0.5, 1.0)
-        b = random.uniform(0.5, 1.0)
-        color_list.append(colors.Color(r, g, b))
-    return color_list
+COLOR_PALETTE = [colors.Color(*rgb) for rgb in COURSE_PALETTE]
 
-COLOR_PALETTE = generate_random_colors()
-COLOR_IDX_GENERATOR = (i for i in range(len(COLOR_PALETTE)))
-
-def get_next_color():
-    global COLOR_IDX_GENERATOR
-    try:
-        idx = next(COLOR_IDX_GENERATOR)
-    except StopIteration:
-        COLOR_IDX_GENERATOR = (i for i in range(len(COLOR_PALETTE)))
-        idx = next(COLOR_IDX_GENERATOR)
-    return COLOR_PALETTE[idx % len(COLOR_PALETTE)]
+def make_slot_header_label(label_l1: str, label_l2: str, is_interval: bool) -> str:
+    if is_interval:
+        return f"<font size=6>{label_l1}</font><br/><font size=6>{label_l2}</font>"
+    return f"<b>{label_l1}</b><br/><font size=7>{label_l2}</font>"
 
-def draw_page_template(c: canvas.Canvas, title_text: str, location_text: str):
-    c.setFont(FONT_NAME, 10)
+GRID_FORM_NAME = "timetable_grid"
+STATIC_FOOTER_TEXT = "Sistema de Alocação de Salas - Programação Linear"
 
-    p_title = Paragraph(title_text, TITLE_STYLE)
-    title_width, title_height = p_title.wrap(PAGE_WIDTH - MARGIN_LEFT - MARGIN_RIGHT, HEADER_HEIGHT)
-    p_title.drawOn(c, MARGIN_LEFT, PAGE_HEIGHT - MARGIN_TOP - title_height)
+def assign_grid_layout(page_specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # One grid per document, covering only the days and shifts that hold a course
+    grid = grid_for_blocks(block for spec in page_specs for block in spec['blocks'])
+    for spec in page_specs:
+        spec['grid'] = grid
+    return page_specs
 
-    p_location = Paragraph(location_text, LOCATION_STYLE)
-    location_width, location_height = p_location.wrap(PAGE_WIDTH - MARGIN_LEFT - MARGIN_RIGHT, HEADER_HEIGHT - title_height)
-    p_location.drawOn(c, MARGIN_LEFT, PAGE_HEIGHT - MARGIN_TOP - title_height - location_height - 0.2*cm)
-    
-    footer_text = f"Horário criado: {random.randint(1,28)}/{random.randint(1,12)}/2025"
-    p_footer = Paragraph(footer_text, FOOTER_STYLE)
-    footer_width, footer_height = p_footer.wrap(GRID_X_START + GRID_WIDTH - MARGIN_LEFT, FOOTER_HEIGHT)
-    p_footer.drawOn(c, MARGIN_LEFT, FOOTER_HEIGHT) 
-
-    asc_footer_text = "Sistema de Alocação de Salas - Programação Linear"
-    p_asc_footer = Paragraph(asc_footer_text, FOOTER_STYLE)
+def draw_static_grid(c: canvas.Canvas, layout: GridLayout = DEFAULT_GRID_LAYOUT):
+    p_asc_footer = Paragraph(STATIC_FOOTER_TEXT, FOOTER_STYLE)
     asc_width, asc_height = p_asc_footer.wrap(GRID_X_START + GRID_WIDTH - MARGIN_LEFT, FOOTER_HEIGHT + 0.3*cm)
     p_asc_footer.drawOn(c, PAGE_WIDTH - MARGIN_RIGHT - asc_width, MARGIN_BOTTOM)
 
     c.setStrokeColor(colors.black)
     c.setLineWidth(1)
     
+    row_height = layout.row_height
     c.line(MARGIN_LEFT, GRID_Y_START + TIMESLOT_HEADER_HEIGHT, MARGIN_LEFT + DAY_LABEL_WIDTH + GRID_WIDTH, GRID_Y_START + TIMESLOT_HEADER_HEIGHT)
-    for i in range(len(DAYS_OF_WEEK) + 1):
-        y = GRID_Y_START - (i * ROW_HEIGHT)
+    for i in range(len(layout.days) + 1):
+        y = GRID_Y_START - (i * row_height)
         c.line(MARGIN_LEFT, y, MARGIN_LEFT + DAY_LABEL_WIDTH + GRID_WIDTH, y)
 
     c.line(MARGIN_LEFT, GRID_Y_START + TIMESLOT_HEADER_HEIGHT, MARGIN_LEFT, GRID_Y_START - GRID_HEIGHT)
     c.line(GRID_X_START, GRID_Y_START + TIMESLOT_HEADER_HEIGHT, GRID_X_START, GRID_Y_START - GRID_HEIGHT)
     
-    for col_prop in COLUMN_PROPERTIES:
-        x_line = col_prop['x'] + col_prop['width']
+    for col_x, col_width, _ in layout.slot_layout:
+        x_line = col_x + col_width
         c.line(x_line, GRID_Y_START + TIMESLOT_HEADER_HEIGHT, x_line, GRID_Y_START - GRID_HEIGHT)
 
-    for i, day_name in enumerate(DAYS_OF_WEEK):
-        y_pos = GRID_Y_START - (i * ROW_HEIGHT) - ROW_HEIGHT / 2
-        p_day = Paragraph(day_name, DAY_LABEL_STYLE)
-        w, h = p_day.wrap(DAY_LABEL_WIDTH, ROW_HEIGHT)
+    for i, day_idx in enumerate(layout.days):
+        y_pos = GRID_Y_START - (i * row_height) - row_height / 2
+        p_day = Paragraph(DAYS_OF_WEEK[day_idx], DAY_LABEL_STYLE)
+        w, h = p_day.wrap(DAY_LABEL_WIDTH, row_height)
         p_day.drawOn(c, MARGIN_LEFT + (DAY_LABEL_WIDTH - w)/2, y_pos - h/2)
 
     y_label_base = GRID_Y_START + TIMESLOT_HEADER_HEIGHT
-    for col_prop in COLUMN_PROPERTIES:
-        slot_id = col_prop['id']
-        original_def = next(s_def for s_def in TIMESLOT_DEFINITIONS if s_def[0] == slot_id)
-        label_L1 = original_def[1]
-        label_L2 = original_def[2]
-        
-        if original_def[3]:
-            full_label_text = f"<font size=6>{label_L1}</font><br/><font size=6>{label_L2}</font>"
-        else:
-            full_label_text = f"<b>{label_L1}</b><br/><font size=7>{label_L2}</font>"
+    for (col_x, col_width, _), (_, label_l1, label_l2, is_interval) in zip(layout.slot_layout, layout.slot_defs):
+        p_slot = Paragraph(make_slot_header_label(label_l1, label_l2, is_interval), TIMESLOT_LABEL_STYLE)
         
-        p_slot = Paragraph(full_label_text, TIMESLOT_LABEL_STYLE)
-        
-        col_width = col_prop['width']
         w, h = p_slot.wrap(col_width, TIMESLOT_HEADER_HEIGHT)
         
-        p_slot.drawOn(c, col_prop['x'] + (col_width - w) / 2, y_label_base - h - 0.2*cm)
+        p_slot.drawOn(c, col_x + (col_width - w) / 2, y_label_base - h - 0.2*cm)
+
+def ensure_grid_form(c: canvas.Canvas, layout: GridLayout = DEFAULT_GRID_LAYOUT):
+    # The grid is identical on every page: drawn once per document and layout, referenced by each page
+    form_name = f"{GRID_FORM_NAME}_{layout.key}"
+    grid_forms = c.__dict__.setdefault('_timetable_grid_forms', set())
+    if form_name not in grid_forms:
+        c.beginForm(form_name)
+        draw_static_grid(c, layout)
+        c.endForm()
+        grid_forms.add(form_name)
+
+def draw_page_template(c: canvas.Canvas, title_text: str, location_text: str, footer_text: str = None,
+                       layout: GridLayout = DEFAULT_GRID_LAYOUT):
+    ensure_grid_form(c, layout)
+    c.setFont(FONT_NAME, 10)
+
+    p_title = Paragraph(title_text, TITLE_STYLE)
+    title_width, title_height = p_title.wrap(PAGE_WIDTH - MARGIN_LEFT - MARGIN_RIGHT, HEADER_HEIGHT)
+    p_title.drawOn(c, MARGIN_LEFT, PAGE_HEIGHT - MARGIN_TOP - title_height)
+
+    p_location = Paragraph(location_text, LOCATION_STYLE)
+    location_width, location_height = p_location.wrap(PAGE_WIDTH - MARGIN_LEFT - MARGIN_RIGHT, HEADER_HEIGHT - title_height)
+    p_location.drawOn(c, MARGIN_LEFT, PAGE_HEIGHT - MARGIN_TOP - title_height - location_height - 0.2*cm)
+    
+    if footer_text is None:
+        footer_text = make_footer_text()
+    p_footer = Paragraph(footer_text, FOOTER_STYLE)
+    footer_width, footer_height = p_footer.wrap(GRID_X_START + GRID_WIDTH - MARGIN_LEFT, FOOTER_HEIGHT)
+    p_footer.drawOn(c, MARGIN_LEFT, FOOTER_HEIGHT) 
 
-def get_elementary_slots_indices(start_slot_id: str, end_slot_id: str):
+    c.doForm(f"{GRID_FORM_NAME}_{layout.key}")
+
+def make_footer_text() -> str:
+    return f"Horário criado: {time.strftime('%d/%m/%Y')}"
+
+def get_elementary_slots_indices(start_slot_id: str, end_slot_id: str, layout: GridLayout = DEFAULT_GRID_LAYOUT):
     try:
-        start_idx = SLOT_ID_TO_INDEX[start_slot_id]
-        end_idx = SLOT_ID_TO_INDEX[end_slot_id]
+        start_idx = layout.slot_id_to_index[start_slot_id]
+        end_idx = layout.slot_id_to_index[end_slot_id]
     except KeyError:
-        print(f"Error: Slot ID {start_slot_id} or {end_slot_id} not found in SLOT_ID_TO_INDEX.")
+        print(f"Error: Slot ID {start_slot_id} or {end_slot_id} not found in the grid layout.")
         return []
     
     if start_idx > end_idx:
@@ -197,69 +170,24 @@ def get_elementary_slots_indices(start_slot_id: str, end_slot_id: str):
         return []
     return list(range(start_idx, end_idx + 1))
 
-def get_course_blocks_with_intervals(start_slot_id: str, end_slot_id: str):
-    try:
-        start_idx = SLOT_ID_TO_INDEX[start_slot_id]
-        end_idx = SLOT_ID_TO_INDEX[end_slot_id]
-    except KeyError:
-        print(f"Error: Slot ID {start_slot_id} or {end_slot_id} not found.")
-        return []
-    
-    if start_idx > end_idx:
-        return []
-    
-    blocks = []
-    current_block_start = start_idx
-    
-    for i in range(start_idx, end_idx + 1):
-        slot_id = COLUMN_PROPERTIES[i]['id']
-        is_interval = False
-        for _, _, _, interval_flag in TIMESLOT_DEFINITIONS:
-            if _ == slot_id and interval_flag:
-                is_interval = True
-                break
-        
-        if is_interval:
-            if current_block_start < i:
-                blocks.append((current_block_start, i - 1))
-            current_block_start = i + 1
-    
-    if current_block_start <= end_idx:
-        blocks.append((current_block_start, end_idx))
-    
-    return blocks
+def get_course_blocks_with_intervals(start_slot_id: str, end_slot_id: str, layout: GridLayout = DEFAULT_GRID_LAYOUT):
+    return layout.course_blocks_with_intervals(start_slot_id, end_slot_id)
 
-def draw_course_block_split(c: canvas.Canvas, day_index: int, start_slot_id: str, end_slot_id: str,
-                           course_name: str, room_info: str, fill_color):
-    blocks = get_course_blocks_with_intervals(start_slot_id, end_slot_id)
-    
-    if not blocks:
-        print(f"No valid blocks found for course {course_name}")
-        return
-    
-    for block_start_idx, block_end_idx in blocks:
-        block_x = COLUMN_PROPERTIES[block_start_idx]['x']
-        block_y = GRID_Y_START - ((day_index + 1) * ROW_HEIGHT)
-        
-        block_width = 0
-        for i in range(block_start_idx, block_end_idx + 1):
-            block_width += COLUMN_PROPERTIES[i]['width']
-        
-        block_height = ROW_HEIGHT
+COURSE_BLOCK_PADDING = 1
+MAX_COURSE_NAME_LENGTH = 40
 
-        padding = 1
-        c.setFillColor(fill_color)
-        c.setStrokeColor(colors.darkgrey)
-        c.rect(block_x + padding, block_y + padding, block_width - 2*padding, block_height - 2*padding, fill=1, stroke=1)
+_COURSE_BLOCK_STYLES: Dict[str, ParagraphStyle] = {}
 
-        r, g, b, _ = fill_color.rgba()
-        text_color = colors.black
-        if (r + g + b) < 1.5:
-            text_color = colors.white
-        
-        course_p_style = ParagraphStyle(
-            'CourseBlockStyle', 
-            parent=COURSE_TEXT_STYLE, 
+def get_block_geometry(day_index: int, start_slot_id: str, end_slot_id: str,
+                       layout: GridLayout = DEFAULT_GRID_LAYOUT) -> List[Tuple[float, float, float, float]]:
+    return layout.block_geometry.get((day_index, start_slot_id, end_slot_id), [])
+
+def get_course_block_style(text_color) -> ParagraphStyle:
+    style = _COURSE_BLOCK_STYLES.get(text_color.hexval())
+    if style is None:
+        style = ParagraphStyle(
+            f'CourseBlockStyle{len(_COURSE_BLOCK_STYLES)}',
+            parent=COURSE_TEXT_STYLE,
             textColor=text_color,
             fontSize=8,
             leading=9,
@@ -268,184 +196,434 @@ def draw_course_block_split(c: canvas.Canvas, day_index: int, start_slot_id: str
             allowWidows=1,
             allowOrphans=1
         )
+        _COURSE_BLOCK_STYLES[text_color.hexval()] = style
+    return style
+
+for _text_color in (colors.black, colors.white):
+    get_course_block_style(_text_color)
+
+def draw_course_block_split(c: canvas.Canvas, day_index: int, start_slot_id: str, end_slot_id: str,
+                           course_name: str, room_info: str, fill_color, layout: GridLayout = DEFAULT_GRID_LAYOUT):
+    blocks = get_block_geometry(day_index, start_slot_id, end_slot_id, layout)
+    
+    if not blocks:
+        print(f"No valid blocks found for course {course_name}")
+        return
+
+    r, g, b, _ = fill_color.rgba()
+    text_color = colors.white if (r + g + b) < 1.5 else colors.black
+    course_p_style = get_course_block_style(text_color)
+
+    display_name = course_name if len(course_name) <= MAX_COURSE_NAME_LENGTH else course_name[:MAX_COURSE_NAME_LENGTH] + "..."
+    text_content = f"<font name='{FONT_NAME}'>{display_name}</font><br/><br/><font name='{FONT_NAME_BOLD}'><b>{room_info}</b></font>"
+
+    padding = COURSE_BLOCK_PADDING
+    for block_x, block_y, block_width, block_height in blocks:
+        c.setFillColor(fill_color)
+        c.setStrokeColor(colors.darkgrey)
+        c.rect(block_x + padding, block_y + padding, block_width - 2*padding, block_height - 2*padding, fill=1, stroke=1)
 
-        max_course_name_length = 40
-        display_name = course_name if len(course_name) <= max_course_name_length else course_name[:max_course_name_length] + "..."
-        
-        text_content = f"<font name='{FONT_NAME}'>{display_name}</font><br/><br/><font name='{FONT_NAME_BOLD}'><b>{room_info}</b></font>"
-        p_course = Paragraph(text_content, course_p_style)
-        
         text_area_width = block_width - 0.4 * cm
         text_area_height = block_height - 0.3 * cm
         
         if text_area_width > 0 and text_area_height > 0:
+            p_course = Paragraph(text_content, course_p_style)
             w, h = p_course.wrap(text_area_width, text_area_height)
             
             text_x = block_x + (block_width - w) / 2
             text_y = block_y + (block_height - h) / 2
             p_course.drawOn(c, text_x, text_y)
 
-def parse_horario_to_slots(horario_str: str) -> List[Tuple[str, str, str]]:
-    day_mapping = {
-        'Segunda': 'Seg',
-        'Terça': 'Ter', 
-        'Quarta': 'Qua',
-        'Quinta': 'Qui',
-        'Sexta': 'Sex',
-        'Sábado': 'Sab',
-        'Domingo': 'Dom'
-    }
-    
-    time_to_slot = {}
-    for slot_id, start_time, end_time, is_interval in TIMESLOT_DEFINITIONS:
-        if not is_interval and start_time:
-            time_to_slot[start_time] = slot_id
-    
-    slots = []
-    
-    horario_parts = horario_str.split(' | ')
-    
-    for part in horario_parts:
-        match = re.match(r'([^0-9]+)\s+(.+)', part.strip())
-        if not match:
-            continue
-            
-        dias_str, horarios_str = match.groups()
-        dias = [d.strip() for d in dias_str.split('/')]
-        horarios = [h.strip() for h in horarios_str.split('/')]
-        
-        for dia in dias:
-            day_abbrev = day_mapping.get(dia, dia)
-            
-            if day_abbrev not in DAYS_OF_WEEK:
-                continue
-            
-            slot_ids = []
-            for horario in horarios:
-                time_match = re.match(r'(\d{2}:\d{2})-\d{2}:\d{2}', horario)
-                if time_match:
-                    start_time = time_match.group(1)
-                    if start_time in time_to_slot:
-                        slot_ids.append(time_to_slot[start_time])
-            
-            if len(slot_ids) >= 1:
-                slot_ids_sorted = sorted(slot_ids, key=lambda x: SLOT_ID_TO_INDEX.get(x, 999))
-                
-                i = 0
-                while i < len(slot_ids_sorted):
-                    start_slot = slot_ids_sorted[i]
-                    end_slot = start_slot
-                    
-                    j = i + 1
-                    while j < len(slot_ids_sorted):
-                        current_idx = SLOT_ID_TO_INDEX[slot_ids_sorted[j]]
-                        end_idx = SLOT_ID_TO_INDEX[end_slot]
-                        
-                        if current_idx == end_idx + 1 or (current_idx > end_idx and current_idx <= end_idx + 2):
-                            end_slot = slot_ids_sorted[j]
-                            j += 1
-                        else:
-                            break
-                    
-                    slots.append((day_abbrev, start_slot, end_slot))
-                    i = j
-    
-    return slots
-
-def convert_alocacoes_to_pdf_format(alocacoes_resultado):
-    from app.models.domain import AlocacaoResultado
-    
-    if not isinstance(alocacoes_resultado, AlocacaoResultado) or not alocacoes_resultado.sucesso:
-        print("Resultado de alocação inválido ou sem sucesso")
+def convert_alocacoes_to_pdf_format(alocacoes_resultado, index: Optional[List[Dict[str, Any]]] = None):
+    if index is None:
+        index = index_allocations(alocacoes_resultado)
+    if not index:
         return {}
-    
-    alocacoes = alocacoes_resultado.alocacoes
+    entries = {entry['row']: entry for entry in index}
     
     grouped_data = {}
     
-    for alocacao in alocacoes:
-        materia = alocacao.materia
-        sala = alocacao.sala
-        
-        slots = parse_horario_to_slots(materia.horario)
-        
-        if not slots:
-            print(f"Warning: Could not parse horario '{materia.horario}' for materia '{materia.nome}'")
+    for sala_key, rows in alocacoes_resultado.tabela.groupby('sala_id', observed=True).indices.items():
+        room_entries = [entries[row] for row in rows if row in entries]
+        if not room_entries:
             continue
         
-        sala_key = sala.id
-        if sala_key not in grouped_data:
-            grouped_data[sala_key] = {
-                'sala': sala,
-                'courses': []
-            }
-        
-        material_label = {0: "", 1: " [COMP]", 2: " [ROB]", 3: " [ELET]"}.get(materia.material, "")
-        
-        course_entry = {
-            'id': materia.id,
-            'name': materia.nome + material_label,
-            'room_info': f"{sala.nome} ({materia.inscritos} alunos)",
-            'slots': slots,
-            'material': materia.material
+        sala = room_entries[0]['sala']
+        grouped_data[sala_key] = {
+            'sala': sala,
+            'courses': [make_course_entry(entry['materia'], sala, entry['slots']) for entry in room_entries]
         }
-        grouped_data[sala_key]['courses'].append(course_entry)
     
     return grouped_data
 
-def create_timetable_pdf_from_alocacoes(alocacoes_resultado, output_filename: str = None):
-    if output_filename:
-        global PDF_FILENAME
-        PDF_FILENAME = output_filename
-    
-    print("Convertendo resultado de alocação para formato PDF...")
-    grouped_data = convert_alocacoes_to_pdf_format(alocacoes_resultado)
-    
-    if not grouped_data:
-        print("Nenhum dado para gerar PDF")
-        return False
-    
-    c = canvas.Canvas(PDF_FILENAME, pagesize=landscape(A4))
-    c.setTitle("Horário de Alocação de Salas")
-    
+def get_course_color(course_id: str):
+    return colors.Color(*get_course_rgb(course_id))
+
+def build_page_specs(grouped_data) -> List[Dict[str, Any]]:
+    # Colours and the footer date are resolved here, so rendering a spec is deterministic
+    # and shards rendered in other processes match a single-process render page for page
+    page_specs = []
     for sala_id, data in sorted(grouped_data.items(), key=lambda x: x[1]['sala'].nome):
         sala = data['sala']
         courses = data['courses']
-        
+
         page_title = f"Sala: {sala.nome}"
         location_info = f"Instituto de Computação IC/UFAL - {sala.tipo.value.upper()} - Capacidade: {sala.capacidade}"
         if sala.local.value == 'im':
             location_info += f" - Instituto de Matemática (Custo: R$ {sala.custo_adicional:.2f})"
-        
-        draw_page_template(c, page_title, location_info)
-        
-        occupied_slots = set()
-        
-        for course in courses:
-            course_color = get_next_color()
-            
-            for day_str, start_slot, end_slot in course['slots']:
-                try:
-                    day_idx = DAYS_OF_WEEK.index(day_str)
-                except ValueError:
-                    print(f"Warning: Invalid day '{day_str}' for course '{course['name']}'. Skipping slot.")
-                    continue
-                
-                slot_tuple = (day_idx, start_slot, end_slot)
-                if slot_tuple in occupied_slots:
-                    continue
-                
-                occupied_slots.add(slot_tuple)
-                
-                draw_course_block_split(c, day_idx, start_slot, end_slot,
-                                      course["name"], course["room_info"], course_color)
-        
+
+        page_specs.append({
+            'title': page_title,
+            'location': location_info,
+            'footer': make_footer_text(),
+            'blocks': build_course_blocks(courses),
+        })
+    return assign_grid_layout(page_specs)
+
+def build_course_blocks(courses) -> List[Tuple]:
+    blocks = []
+    occupied_slots = set()
+    course_colors = assign_course_colors(course['id'] for course in courses)
+
+    for course in courses:
+        course_color = colors.Color(*course_colors[course['id']])
+
+        for day_str, start_slot, end_slot in course['slots']:
+            try:
+                day_idx = DAYS_OF_WEEK.index(day_str)
+            except ValueError:
+                print(f"Warning: Invalid day '{day_str}' for course '{course['name']}'. Skipping slot.")
+                continue
+
+            slot_tuple = (day_idx, start_slot, end_slot)
+            if slot_tuple in occupied_slots:
+                continue
+
+            occupied_slots.add(slot_tuple)
+            blocks.append((day_idx, start_slot, end_slot, course["name"], course["room_info"],
+                           course_color.rgb()))
+    return blocks
+
+def split_professors(docente: str) -> List[str]:
+    return [name.strip() for name in docente.split(';') if name.strip()] or ["Sem docente"]
+
+# Each key maps a column of the result table to every group a value belongs to
+# (a course with two professors is on both pages)
+BATCH_GROUP_KEYS: Dict[str, Tuple[str, Callable[[str], Iterable[str]]]] = {
+    'sala': ('sala_nome', lambda nome: [nome]),
+    'docente': ('docente', split_professors),
+    'curso': ('curso', lambda curso: [curso or "Sem curso"]),
+    'local': ('local', lambda local: [local.upper()]),
+}
+BATCH_GROUP_TITLES = {'sala': "Sala", 'docente': "Docente", 'curso': "Curso", 'local': "Local"}
+MAX_ROOMS_IN_HEADER = 8
+
+def group_table_rows(table: pd.DataFrame, group_by: str) -> Dict[str, np.ndarray]:
+    # Key functions run once per category, not once per allocation; rows are joined by category code
+    column_name, key_func = BATCH_GROUP_KEYS[group_by]
+    column = table[column_name]
+    keys = pd.DataFrame([(code, str(key)) for code, value in enumerate(column.cat.categories)
+                         for key in dict.fromkeys(key_func(value))], columns=['code', 'key'])
+    if keys.empty or table.empty:
+        return {}
+    rows = pd.DataFrame({'row': np.arange(len(table)), 'code': column.cat.codes.to_numpy(dtype=np.int64)})
+    merged = rows.merge(keys, on='code')
+    return {key: group['row'].to_numpy() for key, group in merged.groupby('key', sort=True)}
+
+def build_group_page_specs(index: Sequence[Dict[str, Any]], group_by='docente',
+                           table: Optional[pd.DataFrame] = None) -> List[Dict[str, Any]]:
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    if not index:
+        return []
+    if callable(group_by):
+        group_title = "Grupo"
+        for entry in index:
+            for key in dict.fromkeys(group_by(entry['materia'], entry['sala'])):
+                groups.setdefault(str(key), []).append(entry)
+    else:
+        if table is None:
+            raise ValueError(f"Agrupamento '{group_by}' requer a tabela do resultado")
+        group_title = BATCH_GROUP_TITLES[group_by]
+        entries = {entry['row']: entry for entry in index}
+        for key, rows in group_table_rows(table, group_by).items():
+            group_entries = [entries[row] for row in rows if row in entries]
+            if group_entries:
+                groups[key] = group_entries
+
+    page_specs = []
+    for key in sorted(groups):
+        entries = groups[key]
+        rooms = sorted({entry['sala'].nome for entry in entries})
+        rooms_text = ", ".join(rooms[:MAX_ROOMS_IN_HEADER])
+        if len(rooms) > MAX_ROOMS_IN_HEADER:
+            rooms_text += f" e mais {len(rooms) - MAX_ROOMS_IN_HEADER}"
+        courses = [make_course_entry(entry['materia'], entry['sala'], entry['slots']) for entry in entries]
+
+        page_specs.append({
+            'title': escape(f"{group_title}: {key}"),
+            'location': escape(f"{len(entries)} turma(s) - Salas: {rooms_text}"),
+            'footer': make_footer_text(),
+            'blocks': build_course_blocks(courses),
+            'group': key,
+        })
+    return assign_grid_layout(page_specs)
+
+def draw_page_specs(c: canvas.Canvas, page_specs: Sequence[Dict[str, Any]]):
+    for spec in page_specs:
+        layout = get_grid_layout(*spec.get('grid', (DEFAULT_DAYS, DEFAULT_SHIFTS)))
+        draw_page_template(c, spec['title'], spec['location'], spec['footer'], layout)
+        for day_idx, start_slot, end_slot, name, room_info, rgb in spec['blocks']:
+            draw_course_block_split(c, day_idx, start_slot, end_slot, name, room_info, colors.Color(*rgb), layout)
         c.showPage()
 
+def render_page_specs_to_bytes(page_specs: Sequence[Dict[str, Any]]) -> bytes:
+    buffer = io.BytesIO()
+    # invariant=1 drops timestamps and random document IDs from the output
+    c = canvas.Canvas(buffer, pagesize=landscape(A4), invariant=1)
+    c.setTitle("Horário de Alocação de Salas")
+    draw_page_specs(c, page_specs)
     c.save()
-    print(f"PDF '{PDF_FILENAME}' gerado com sucesso.")
+    return buffer.getvalue()
+
+def split_into_shards(page_specs: Sequence[Dict[str, Any]], workers: int) -> List[Sequence[Dict[str, Any]]]:
+    # Contiguous shards keep the room-name order; a few shards per worker balances uneven pages
+    shard_size = max(1, math.ceil(len(page_specs) / (workers * 4)))
+    return [page_specs[i:i + shard_size] for i in range(0, len(page_specs), shard_size)]
+
+def iter_rendered_shards(shards: Sequence[Sequence[Dict[str, Any]]], workers: int) -> Iterator[bytes]:
+    # Yields each shard's PDF in order as soon as it is ready, so callers can report progress
+    if workers > 1 and len(shards) > 1:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            yield from executor.map(render_page_specs_to_bytes, shards,
+                                    chunksize=max(1, len(shards) // (workers * 4)))
+    else:
+        for shard in shards:
+            yield render_page_specs_to_bytes(shard)
+
+def render_pages_parallel(page_specs: Sequence[Dict[str, Any]], workers: int) -> bytes:
+    shards = split_into_shards(page_specs, workers)
+
+    writer = PdfWriter()
+    for shard_pdf in iter_rendered_shards(shards, workers):
+        for page in PdfReader(io.BytesIO(shard_pdf)).pages:
+            writer.add_page(page)
+    writer.add_metadata({'/Title': "Horário de Alocação de Salas"})
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+def page_fingerprint(page_spec: Dict[str, Any]) -> str:
+    content = json.dumps([page_spec['title'], page_spec['location'], page_spec['footer'], page_spec['blocks'],
+                          page_spec.get('grid')],
+                         ensure_ascii=False)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+class PageCache:
+    # Single-page PDFs keyed by the fingerprint of the room page; least recently used pages are dropped
+    def __init__(self, max_pages: int = 512):
+        self.max_pages = max_pages
+        self._pages: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fingerprint: str) -> Optional[bytes]:
+        with self._lock:
+            page = self._pages.get(fingerprint)
+            if page is None:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(fingerprint)
+            self.hits += 1
+            return page
+
+    def put(self, fingerprint: str, page: bytes):
+        with self._lock:
+            self._pages[fingerprint] = page
+            self._pages.move_to_end(fingerprint)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+def render_pages_cached(page_specs: Sequence[Dict[str, Any]], page_cache: PageCache, workers: int = 1) -> bytes:
+    fingerprints = [page_fingerprint(spec) for spec in page_specs]
+    pages = [page_cache.get(fingerprint) for fingerprint in fingerprints]
+    missing = [i for i, page in enumerate(pages) if page is None]
+
+    # Only rooms whose content changed are rendered again, each as a single-page document
+    single_pages = [[page_specs[i]] for i in missing]
+    if workers > 1 and len(missing) > 1:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            rendered = list(executor.map(render_page_specs_to_bytes, single_pages,
+                                         chunksize=max(1, len(missing) // (workers * 4))))
+    else:
+        rendered = [render_page_specs_to_bytes(pages_spec) for pages_spec in single_pages]
+    for i, page in zip(missing, rendered):
+        pages[i] = page
+        page_cache.put(fingerprints[i], page)
+
+    writer = PdfWriter()
+    for page in pages:
+        writer.add_page(PdfReader(io.BytesIO(page)).pages[0])
+    # Each cached page carries its own copy of the grid form and fonts
+    if hasattr(writer, 'compress_identical_objects'):
+        writer.compress_identical_objects()
+    writer.add_metadata({'/Title': "Horário de Alocação de Salas"})
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+def render_pages(page_specs: Sequence[Dict[str, Any]], workers: int = 1,
+                 page_cache: Optional[PageCache] = None) -> bytes:
+    if page_cache is not None:
+        if PdfWriter is not None:
+            return render_pages_cached(page_specs, page_cache, workers)
+        print("pypdf não instalado: cache de páginas desativado.")
+    if workers > 1 and len(page_specs) > 1:
+        if PdfWriter is not None:
+            return render_pages_parallel(page_specs, workers)
+        print("pypdf não instalado: renderizando o PDF em um único processo.")
+    return render_page_specs_to_bytes(page_specs)
+
+def render_timetable_pdf(alocacoes_resultado, workers: int = 1,
+                         page_cache: Optional[PageCache] = None) -> Optional[bytes]:
+    grouped_data = convert_alocacoes_to_pdf_format(alocacoes_resultado)
+
+    if not grouped_data:
+        print("Nenhum dado para gerar PDF")
+        return None
+
+    return render_pages(build_page_specs(grouped_data), workers, page_cache)
+
+def stream_timetable_pdf(alocacoes_resultado, chunk_size: int = 64 * 1024, workers: int = 1,
+                         page_cache: Optional[PageCache] = None) -> Iterator[bytes]:
+    pdf_bytes = render_timetable_pdf(alocacoes_resultado, workers, page_cache)
+    if pdf_bytes is None:
+        return
+    view = memoryview(pdf_bytes)
+    for offset in range(0, len(view), chunk_size):
+        yield bytes(view[offset:offset + chunk_size])
+
+def create_timetable_pdf_from_alocacoes(alocacoes_resultado, output_filename: str = None, workers: int = 1,
+                                        page_cache: Optional[PageCache] = None):
+    output_filename = output_filename or PDF_FILENAME
+    
+    print("Convertendo resultado de alocação para formato PDF...")
+    pdf_bytes = render_timetable_pdf(alocacoes_resultado, workers, page_cache)
+    if pdf_bytes is None:
+        return False
+
+    # Written beside the target and renamed, so concurrent renders never leave a mixed file
+    temp_filename = f"{output_filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_filename, 'wb') as pdf_file:
+        pdf_file.write(pdf_bytes)
+    os.replace(temp_filename, output_filename)
+    print(f"PDF '{output_filename}' gerado com sucesso.")
     return True
 
+def batch_file_name(group: str, used_names: set) -> str:
+    ascii_name = unicodedata.normalize('NFKD', group).encode('ascii', 'ignore').decode('ascii')
+    base_name = re.sub(r'[^A-Za-z0-9.-]+', '_', ascii_name).strip('_') or "grupo"
+    file_name = f"{base_name}.pdf"
+    suffix = 2
+    while file_name in used_names:
+        file_name = f"{base_name}_{suffix}.pdf"
+        suffix += 1
+    used_names.add(file_name)
+    return file_name
+
+def render_timetable_batch(alocacoes_resultado, group_by='docente', as_zip: bool = False, workers: int = 1,
+                           progress: Optional[Callable[[int, int], None]] = None,
+                           index: Optional[List[Dict[str, Any]]] = None) -> Optional[bytes]:
+    if index is None:
+        index = index_allocations(alocacoes_resultado)
+    page_specs = build_group_page_specs(index, group_by, alocacoes_resultado.tabela if index else None)
+
+    if not page_specs:
+        print("Nenhum dado para gerar PDF")
+        return None
+
+    total = len(page_specs)
+    done = 0
+    buffer = io.BytesIO()
+
+    if as_zip:
+        # One file per group; each page is its own shard, so progress advances page by page
+        used_names = set()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for spec, page_pdf in zip(page_specs, iter_rendered_shards([[spec] for spec in page_specs], workers)):
+                archive.writestr(batch_file_name(spec['group'], used_names), page_pdf)
+                done += 1
+                if progress:
+                    progress(done, total)
+        return buffer.getvalue()
+
+    if PdfWriter is None:
+        c = canvas.Canvas(buffer, pagesize=landscape(A4), invariant=1)
+        c.setTitle("Horário de Alocação de Salas")
+        for spec in page_specs:
+            draw_page_specs(c, [spec])
+            done += 1
+            if progress:
+                progress(done, total)
+        c.save()
+        return buffer.getvalue()
+
+    shards = split_into_shards(page_specs, workers)
+    writer = PdfWriter()
+    for shard, shard_pdf in zip(shards, iter_rendered_shards(shards, workers)):
+        for page in PdfReader(io.BytesIO(shard_pdf)).pages:
+            writer.add_page(page)
+        done += len(shard)
+        if progress:
+            progress(done, total)
+    if hasattr(writer, 'compress_identical_objects'):
+        writer.compress_identical_objects()
+    writer.add_metadata({'/Title': "Horário de Alocação de Salas"})
+    writer.write(buffer)
+    return buffer.getvalue()
+
+def export_timetable_batch(alocacoes_resultado, output_filename: str, group_by='docente', as_zip: bool = False,
+                           workers: int = 1, progress: Optional[Callable[[int, int], None]] = None):
+    batch_bytes = render_timetable_batch(alocacoes_resultado, group_by, as_zip, workers, progress)
+    if batch_bytes is None:
+        return False
+
+    temp_filename = f"{output_filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_filename, 'wb') as batch_file:
+        batch_file.write(batch_bytes)
+    os.replace(temp_filename, output_filename)
+    print(f"Arquivo '{output_filename}' gerado com sucesso.")
+    return True
+
+def benchmark_pdf_rendering(alocacoes_resultado, worker_counts: Sequence[int] = (1, 2, 4),
+                            repeat: int = 1) -> List[Dict[str, float]]:
+    # Without pypdf, render_pages silently falls back to one process and every row would time the same thing
+    if PdfWriter is None and any(workers > 1 for workers in worker_counts):
+        raise RuntimeError("pypdf não instalado: a renderização paralela não está disponível, "
+                           "instale pypdf para comparar workers ou use worker_counts=(1,).")
+    page_specs = build_page_specs(convert_alocacoes_to_pdf_format(alocacoes_resultado))
+    results = []
+    for workers in worker_counts:
+        # Repeating the page list simulates a larger campus with the same layout
+        specs = list(page_specs) * repeat
+        start = time.perf_counter()
+        render_pages(specs, workers)
+        elapsed = time.perf_counter() - start
+        results.append({'workers': workers, 'pages': len(specs), 'seconds': elapsed,
+                        'pages_per_second': len(specs) / elapsed if elapsed else float('inf')})
+        print(f"{workers} worker(s): {len(specs)} páginas em {elapsed:.2f}s "
+              f"({results[-1]['pages_per_second']:.1f} páginas/s)")
+    return results
+
 def create_test_pdf_with_mock_data():
     from app.models.domain import Materia, Sala, Alocacao, AlocacaoResultado, TipoSala, LocalSala
     
@@ -522,6 +700,21 @@ def main():
         
         if resultado.sucesso:
             print(f"✓ Alocação bem-sucedida: {len(resultado.alocacoes)} alocações")
+            if '--benchmark' in sys.argv:
+                print("\nMedindo renderização (páginas por segundo x workers)...")
+                benchmark_pdf_rendering(resultado, worker_counts=(1, 2, 4), repeat=20)
+                return True
+            if '--batch' in sys.argv:
+                arg_idx = sys.argv.index('--batch') + 1
+                group_by = sys.argv[arg_idx] if arg_idx < len(sys.argv) else 'docente'
+                as_zip = '--zip' in sys.argv
+                output_filename = f"horarios_{group_by}.{'zip' if as_zip else 'pdf'}"
+                print(f"\nGerando horários em lote por '{group_by}'...")
+                export_timetable_batch(resultado, output_filename, group_by, as_zip,
+                                       workers=os.cpu_count() or 1,
+                                       progress=lambda done, total: print(f"  {done}/{total} páginas", end='\r'))
+                print()
+                return True
             print("\nGerando PDF...")
             create_timetable_pdf_from_alocacoes(resultado)
             return True
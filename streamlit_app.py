@@ -1,11 +1,14 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import sys
 import os
-from io import StringIO
+import time
+import hashlib
+import tempfile
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -13,13 +16,19 @@ from app.services.data_loader import SistemaCompletoRefatorado
 from app.repositories.alocacao_repo import AlocacaoLinearStrategy, AlocacaoGulosaStrategy, AlocacaoManager
 from app.strategies.interfaces import CompatibilidadePadrao
 from app.models.domain import Observer, AlocacaoResultado
+from app.services.cache_alocacao import AlocacaoMemoizadaStrategy, CacheResultadosAlocacao
+from app.services.execucao_async import ExecutorAlocacao, EstadoTrabalho
+from app.services.analise_viabilidade import analisar_viabilidade
+from app.services.tabela_resultados import impressao_tabela, utilizacao_agregada
 
 try:
-    from pdf_generator import create_timetable_pdf_from_alocacoes
+    from pdf_generator import render_timetable_pdf, render_timetable_batch, PageCache, BATCH_GROUP_TITLES
     PDF_AVAILABLE = True
 except ImportError:
     PDF_AVAILABLE = False
 
+from timetable_svg import render_room_svgs, render_timetable_html
+
 st.set_page_config(
     page_title="Sistema de Alocação de Salas",
     page_icon="🏫",
@@ -99,6 +108,318 @@ class StreamlitObserver(Observer):
     def on_erro(self, erro: str):
         self.messages.append(f"❌ Erro: {erro}")
 
+@st.cache_resource
+def obter_cache_resultados():
+    return CacheResultadosAlocacao(capacidade=16)
+
+@st.cache_resource
+def obter_executor_alocacao():
+    return ExecutorAlocacao(max_processos=2)
+
+@st.cache_resource
+def obter_cache_paginas_pdf():
+    return PageCache(max_pages=512)
+
+ARQUIVO_SALAS = 'relacao_salas.csv'
+INTERVALO_ACOMPANHAMENTO = 0.5  # segundos entre reruns enquanto uma alocação está em andamento
+NOMES_MATERIAL = {0: "Nenhum", 1: "Computadores", 2: "Robótica", 3: "Eletrônica"}
+
+# Os caches abaixo recebem objetos de domínio em parâmetros com "_" (não hasheados pelo Streamlit);
+# a chave é a impressão digital das entradas que eles representam.
+
+def impressao_digital(*partes) -> str:
+    digest = hashlib.sha256()
+    for parte in partes:
+        digest.update(parte if isinstance(parte, bytes) else repr(parte).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def ler_bytes(caminho: str) -> bytes:
+    if not os.path.exists(caminho):
+        return b''
+    with open(caminho, 'rb') as arquivo:
+        return arquivo.read()
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def carregar_oferta(conteudo: bytes, nome_arquivo: str, conteudo_salas: bytes):
+    # conteudo_salas só compõe a chave: o carregador lê a relação de salas do diretório atual
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, os.path.basename(nome_arquivo))
+        with open(caminho, 'wb') as arquivo:
+            arquivo.write(conteudo)
+        return SistemaCompletoRefatorado().carregar_dados_csv(caminho)
+
+def registrar_oferta(curso: str, conteudo: bytes, nome_arquivo: str):
+    conteudo_salas = ler_bytes(ARQUIVO_SALAS)
+    st.session_state[f'repository_{curso}'] = carregar_oferta(conteudo, nome_arquivo, conteudo_salas)
+    st.session_state[f'chave_{curso}'] = impressao_digital(conteudo, nome_arquivo, conteudo_salas)
+
+def chave_dados(include_cc: bool = True, include_ec: bool = True) -> str:
+    return impressao_digital(
+        st.session_state.chave_cc if include_cc and st.session_state.repository_cc else None,
+        st.session_state.chave_ec if include_ec and st.session_state.repository_ec else None,
+    )
+
+def obter_salas() -> list:
+    repositorio = st.session_state.repository_cc or st.session_state.repository_ec
+    return list(repositorio.buscar_salas()) if repositorio else []
+
+def combinar_materias(include_cc: bool, include_ec: bool):
+    materias_por_codigo = {}
+    materias_compartilhadas = []
+    for incluir, repositorio in ((include_cc, st.session_state.repository_cc),
+                                 (include_ec, st.session_state.repository_ec)):
+        if not (incluir and repositorio):
+            continue
+        for materia in repositorio.buscar_materias():
+            chave = f"{materia.id}_{materia.horario}"
+            if chave in materias_por_codigo:
+                materias_compartilhadas.append(materia.id)
+            else:
+                materias_por_codigo[chave] = materia
+    return list(materias_por_codigo.values()), materias_compartilhadas
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def diagnosticar_compatibilidade(chave: str, _materias: list, _salas: list) -> dict:
+    compatibilidade = CompatibilidadePadrao()
+    matriz = compatibilidade.matriz_compatibilidade(_materias, _salas)
+    relatorio = analisar_viabilidade(_materias, _salas, compatibilidade, matriz)
+    return {'pares_compativeis': int(matriz.sum()), 'viavel': relatorio.viavel, 'resumo': relatorio.resumo()}
+
+@st.cache_resource(max_entries=8)
+def graficos_dashboard(chave: str, _materias: list, _salas: list) -> dict:
+    material_names = {0: "Sem Laboratório", 1: "Computadores", 2: "Robótica", 3: "Eletrônica"}
+    material_counts = {k: 0 for k in material_names}
+    for materia in _materias:
+        material_counts[materia.material] += 1
+    df_material = pd.DataFrame([
+        {"Tipo": material_names[k], "Quantidade": v}
+        for k, v in material_counts.items()
+    ])
+    fig_material = px.pie(df_material, values='Quantidade', names='Tipo',
+                          color_discrete_sequence=px.colors.qualitative.Set3)
+    fig_material.update_traces(textposition='inside', textinfo='percent+label')
+    fig_material.update_layout(height=300)
+
+    locais_count = {}
+    for sala in _salas:
+        local = sala.local.value.upper()
+        locais_count[local] = locais_count.get(local, 0) + 1
+    df_locais = pd.DataFrame([
+        {"Local": k, "Quantidade": v}
+        for k, v in locais_count.items()
+    ])
+    fig_locais = px.bar(df_locais, x='Local', y='Quantidade',
+                        color='Local',
+                        color_discrete_sequence=px.colors.qualitative.Bold)
+    fig_locais.update_layout(showlegend=False, height=300)
+
+    inscritos = [m.inscritos for m in _materias]
+    fig_inscritos = go.Figure(data=[go.Histogram(x=inscritos, nbinsx=20,
+                                                 marker_color='#667eea')])
+    fig_inscritos.update_layout(
+        xaxis_title="Número de Inscritos",
+        yaxis_title="Frequência",
+        showlegend=False,
+        height=300
+    )
+
+    capacidades = [s.capacidade for s in _salas]
+    fig_capacidade = go.Figure(data=[go.Histogram(x=capacidades, nbinsx=15,
+                                                  marker_color='#11998e')])
+    fig_capacidade.update_layout(
+        xaxis_title="Capacidade da Sala",
+        yaxis_title="Frequência",
+        showlegend=False,
+        height=300
+    )
+
+    return {
+        'material': fig_material,
+        'locais': fig_locais,
+        'inscritos': fig_inscritos,
+        'capacidade': fig_capacidade,
+        'estatisticas_inscritos': (sum(inscritos) / len(inscritos), max(inscritos), min(inscritos)) if inscritos else None,
+        'estatisticas_capacidade': (sum(capacidades) / len(capacidades), max(capacidades), min(capacidades)) if capacidades else None,
+    }
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def tabelas_dados(chave: str, _materias: list, _salas: list):
+    df_materias = pd.DataFrame([{
+        "Código": m.id,
+        "Nome": m.nome,
+        "Inscritos": m.inscritos,
+        "Horário": m.horario,
+        "Material": NOMES_MATERIAL.get(m.material, "N/A")
+    } for m in _materias])
+    df_salas = pd.DataFrame([{
+        "Nome": s.nome,
+        "Capacidade": s.capacidade,
+        "Tipo": s.tipo.value,
+        "Local": s.local.value.upper(),
+        "Equipamento": NOMES_MATERIAL.get(s.tipo_equipamento, "N/A"),
+        "Custo Adicional": f"R$ {s.custo_adicional:.2f}"
+    } for s in _salas])
+    return df_materias, df_salas
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def csv_materias(chave: str, _materias: list) -> str:
+    return pd.DataFrame([{
+        "Código": m.id,
+        "Nome": m.nome,
+        "Inscritos": m.inscritos,
+        "Horário": m.horario,
+        "Material": m.material
+    } for m in _materias]).to_csv(index=False)
+
+def impressao_resultado(resultado: AlocacaoResultado) -> str:
+    return impressao_tabela(resultado.tabela)
+
+def obter_chave_resultado() -> str:
+    if st.session_state.get('chave_resultado') is None:
+        st.session_state.chave_resultado = impressao_resultado(st.session_state.resultado)
+    return st.session_state.chave_resultado
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def gerar_grades_svg(chave_resultado: str, _resultado: AlocacaoResultado) -> dict:
+    return render_room_svgs(_resultado)
+
+def vista_resultado(tabela: pd.DataFrame) -> pd.DataFrame:
+    # Colunas de exibição derivadas da tabela categórica do resultado, sem percorrer as alocações
+    return pd.DataFrame({
+        "Matéria": tabela['materia_nome'],
+        "Código": tabela['materia_id'],
+        "Inscritos": tabela['inscritos'],
+        "Sala": tabela['sala_nome'],
+        "Local": tabela['local'].cat.rename_categories(str.upper),
+        "Tipo": tabela['tipo_sala'].cat.rename_categories(str.title),
+        "Horário": tabela['horario'],
+        "Capacidade": tabela['capacidade'],
+        "Utilização": tabela['utilizacao'].round(1).astype(str) + "%",
+        "Ocioso": tabela['espaco_ocioso'],
+        "Lab": np.where(tabela['material'] > 0, "✓", ""),
+    })
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def agregar_resultado(chave_resultado: str, _resultado: AlocacaoResultado) -> dict:
+    tabela = _resultado.tabela
+    vista = vista_resultado(tabela)
+
+    por_sala = []
+    for _, linhas in vista.groupby(tabela['sala_id'], observed=True, sort=True):
+        primeira = linhas.iloc[0]
+        por_sala.append({
+            'nome': primeira['Sala'],
+            'local': primeira['Local'],
+            'tipo': primeira['Tipo'],
+            'capacidade': int(primeira['Capacidade']),
+            'tabela': linhas[["Matéria", "Horário", "Inscritos", "Utilização", "Ocioso", "Lab"]].reset_index(drop=True),
+        })
+
+    por_horario = [{
+        'horario': horario,
+        'materias': len(linhas),
+        'alunos': int(linhas['Inscritos'].sum()),
+        'tabela': linhas[["Matéria", "Sala", "Local", "Inscritos", "Capacidade", "Utilização"]].reset_index(drop=True),
+    } for horario, linhas in vista.groupby('Horário', observed=True, sort=True)]
+
+    por_local = tabela.groupby(vista['Local'], observed=True, sort=False).agg(
+        materias=('materia_id', 'size'),
+        salas=('sala_id', 'nunique'),
+        inscritos=('inscritos', 'sum'),
+    )
+    por_local['utilizacao'] = utilizacao_agregada(tabela, vista['Local'])
+
+    return {
+        'salas_usadas': int(tabela['sala_id'].nunique()),
+        'por_sala': por_sala,
+        'por_horario': por_horario,
+        'materias': vista[["Matéria", "Código", "Inscritos", "Sala", "Local", "Horário", "Utilização", "Lab"]],
+        'por_local': por_local.to_dict('index'),
+    }
+
+@st.cache_resource(max_entries=8)
+def graficos_analise(chave_resultado: str, _resultado: AlocacaoResultado) -> dict:
+    tabela = _resultado.tabela
+    vista = vista_resultado(tabela)
+
+    df_util_avg = tabela.groupby('sala_nome', observed=True)['utilizacao'].mean()
+    df_util_avg = df_util_avg.sort_values(ascending=False).head(15).rename_axis('Sala').reset_index(name='Utilização')
+    fig_utilizacao = px.bar(df_util_avg, x='Sala', y='Utilização',
+                            color='Utilização',
+                            color_continuous_scale='RdYlGn')
+    fig_utilizacao.update_layout(xaxis_tickangle=-45, height=400)
+
+    df_ocioso_total = tabela.groupby('sala_nome', observed=True)['espaco_ocioso'].sum()
+    df_ocioso_total = df_ocioso_total.sort_values(ascending=False).head(15).rename_axis('Sala').reset_index(name='Ocioso')
+    fig_ocioso = px.bar(df_ocioso_total, x='Sala', y='Ocioso',
+                        color='Ocioso',
+                        color_continuous_scale='Reds_r')
+    fig_ocioso.update_layout(xaxis_tickangle=-45, height=400)
+
+    df_locais = vista.groupby('Local', observed=True).size().reset_index(name='Quantidade')
+    fig_locais = px.pie(df_locais, values='Quantidade', names='Local',
+                        color_discrete_sequence=px.colors.qualitative.Set2)
+    fig_locais.update_traces(textposition='inside', textinfo='percent+label')
+
+    fig_turmas = go.Figure(data=[go.Box(y=tabela['inscritos'], name='Inscritos',
+                                        marker_color='lightblue')])
+    fig_turmas.update_layout(
+        yaxis_title="Número de Inscritos",
+        showlegend=False
+    )
+
+    util = tabela['utilizacao'].to_numpy()
+    faixas = np.bincount(np.select([util < 50, util < 70, util < 85, util <= 100], [0, 1, 2, 3], 4), minlength=5)
+    df_faixas = pd.DataFrame({"Faixa": ["0-50%", "50-70%", "70-85%", "85-100%", ">100%"], "Quantidade": faixas})
+    fig_faixas = px.bar(df_faixas, x='Faixa', y='Quantidade',
+                        color='Quantidade',
+                        color_continuous_scale='Viridis')
+    fig_faixas.update_layout(showlegend=False)
+
+    melhores = vista.loc[(tabela['utilizacao'] - 85).abs().nsmallest(10).index]
+    df_melhores = pd.DataFrame({
+        "Matéria": melhores['Matéria'].str[:40],
+        "Sala": melhores['Sala'],
+        "Util.": melhores['Utilização'],
+    })
+
+    problematicas = vista.loc[tabela['espaco_ocioso'].nlargest(10).index]
+    df_prob = pd.DataFrame({
+        "Matéria": problematicas['Matéria'].str[:40],
+        "Sala": problematicas['Sala'],
+        "Ocioso": problematicas['Ocioso'],
+    })
+
+    comparacoes = {}
+    for titulo, coluna, categoria, escala in (
+        ('local', 'Local', vista['Local'], 'Blues'),
+        ('tipo', 'Tipo', vista['Tipo'], 'Greens'),
+        ('lab', 'Categoria', pd.Series(np.where(tabela['material'] > 0, 'Lab', 'Não-Lab')), 'Oranges'),
+    ):
+        df_comp = utilizacao_agregada(tabela, categoria).rename_axis(coluna).reset_index(name='Utilização')
+        comparacoes[titulo] = px.bar(df_comp, x=coluna, y='Utilização',
+                                     color='Utilização',
+                                     color_continuous_scale=escala)
+
+    total_capacidade = int(tabela['capacidade'].sum())
+    total_inscritos = int(tabela['inscritos'].sum())
+    return {
+        'utilizacao': fig_utilizacao,
+        'ocioso': fig_ocioso,
+        'locais': fig_locais,
+        'turmas': fig_turmas,
+        'faixas': fig_faixas,
+        'melhores': df_melhores,
+        'problematicas': df_prob,
+        'comparacoes': comparacoes,
+        'total_capacidade': total_capacidade,
+        'total_inscritos': total_inscritos,
+        'eficiencia': (total_inscritos / total_capacidade * 100) if total_capacidade > 0 else 0,
+        'salas_im': int((tabela['local'] == 'im').sum()),
+        'labs': int((tabela['material'] > 0).sum()),
+    }
+
 if 'sistema' not in st.session_state:
     st.session_state.sistema = None
 if 'resultado' not in st.session_state:
@@ -111,6 +432,20 @@ if 'repository_cc' not in st.session_state:
     st.session_state.repository_cc = None
 if 'repository_ec' not in st.session_state:
     st.session_state.repository_ec = None
+if 'chave_cc' not in st.session_state:
+    st.session_state.chave_cc = None
+if 'chave_ec' not in st.session_state:
+    st.session_state.chave_ec = None
+if 'chave_resultado' not in st.session_state:
+    st.session_state.chave_resultado = None
+if 'pdf_bytes' not in st.session_state:
+    st.session_state.pdf_bytes = None
+if 'trabalho_alocacao' not in st.session_state:
+    st.session_state.trabalho_alocacao = None
+if 'entradas_alocacao' not in st.session_state:
+    st.session_state.entradas_alocacao = None
+if 'ultima_execucao' not in st.session_state:
+    st.session_state.ultima_execucao = None
 
 with st.sidebar:
     st.markdown("### 🏫 Sistema de Alocação")
@@ -188,18 +523,14 @@ if page == "🏠 Home":
         if st.button("📁 Carregar Dados Padrão", use_container_width=True):
             with st.spinner("Carregando dados..."):
                 try:
-                    sistema = SistemaCompletoRefatorado()
-                    
                     if os.path.exists('oferta_cc_2025_1.csv'):
-                        st.session_state.repository_cc = sistema.carregar_dados_csv('oferta_cc_2025_1.csv')
+                        registrar_oferta('cc', ler_bytes('oferta_cc_2025_1.csv'), 'oferta_cc_2025_1.csv')
                         st.success("✅ Dados de CC carregados!")
                     
                     if os.path.exists('oferta_ec_2025_1.csv'):
-                        st.session_state.repository_ec = sistema.carregar_dados_csv('oferta_ec_2025_1.csv')
+                        registrar_oferta('ec', ler_bytes('oferta_ec_2025_1.csv'), 'oferta_ec_2025_1.csv')
                         st.success("✅ Dados de EC carregados!")
                     
-                    st.session_state.sistema = sistema
-                    
                 except Exception as e:
                     st.error(f"Erro ao carregar dados: {e}")
     
@@ -284,13 +615,8 @@ elif page == "📊 Dashboard":
         materias_ec = list(st.session_state.repository_ec.buscar_materias()) if st.session_state.repository_ec else []
         
         todas_materias = materias_cc + materias_ec
-        
-        if st.session_state.repository_cc:
-            salas = list(st.session_state.repository_cc.buscar_salas())
-        elif st.session_state.repository_ec:
-            salas = list(st.session_state.repository_ec.buscar_salas())
-        else:
-            salas = []
+        salas = obter_salas()
+        graficos = graficos_dashboard(chave_dados(), todas_materias, salas)
         
         col1, col2, col3, col4, col5 = st.columns(5)
         
@@ -318,47 +644,11 @@ elif page == "📊 Dashboard":
         
         with col1:
             st.markdown("### 📚 Distribuição de Matérias")
-            
-            material_counts = {0: 0, 1: 0, 2: 0, 3: 0}
-            for materia in todas_materias:
-                material_counts[materia.material] += 1
-            
-            material_names = {
-                0: "Sem Laboratório",
-                1: "Computadores",
-                2: "Robótica",
-                3: "Eletrônica"
-            }
-            
-            df_material = pd.DataFrame([
-                {"Tipo": material_names[k], "Quantidade": v}
-                for k, v in material_counts.items()
-            ])
-            
-            fig = px.pie(df_material, values='Quantidade', names='Tipo',
-                        color_discrete_sequence=px.colors.qualitative.Set3)
-            fig.update_traces(textposition='inside', textinfo='percent+label')
-            fig.update_layout(height=300)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(graficos['material'], use_container_width=True)
         
         with col2:
             st.markdown("### 🏢 Distribuição de Salas por Local")
-            
-            locais_count = {}
-            for sala in salas:
-                local = sala.local.value.upper()
-                locais_count[local] = locais_count.get(local, 0) + 1
-            
-            df_locais = pd.DataFrame([
-                {"Local": k, "Quantidade": v}
-                for k, v in locais_count.items()
-            ])
-            
-            fig = px.bar(df_locais, x='Local', y='Quantidade',
-                        color='Local',
-                        color_discrete_sequence=px.colors.qualitative.Bold)
-            fig.update_layout(showlegend=False, height=300)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(graficos['locais'], use_container_width=True)
         
         st.markdown("---")
         
@@ -366,49 +656,31 @@ elif page == "📊 Dashboard":
         
         with col1:
             st.markdown("### 👥 Distribuição de Inscritos")
-            
-            inscritos = [m.inscritos for m in todas_materias]
-            
-            fig = go.Figure(data=[go.Histogram(x=inscritos, nbinsx=20,
-                                              marker_color='#667eea')])
-            fig.update_layout(
-                xaxis_title="Número de Inscritos",
-                yaxis_title="Frequência",
-                showlegend=False,
-                height=300
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            col_a, col_b, col_c = st.columns(3)
-            with col_a:
-                st.metric("Média", f"{sum(inscritos)/len(inscritos):.1f}")
-            with col_b:
-                st.metric("Máximo", max(inscritos))
-            with col_c:
-                st.metric("Mínimo", min(inscritos))
+            st.plotly_chart(graficos['inscritos'], use_container_width=True)
+            
+            if graficos['estatisticas_inscritos']:
+                media, maximo, minimo = graficos['estatisticas_inscritos']
+                col_a, col_b, col_c = st.columns(3)
+                with col_a:
+                    st.metric("Média", f"{media:.1f}")
+                with col_b:
+                    st.metric("Máximo", maximo)
+                with col_c:
+                    st.metric("Mínimo", minimo)
         
         with col2:
             st.markdown("### 🪑 Distribuição de Capacidade")
-            
-            capacidades = [s.capacidade for s in salas]
-            
-            fig = go.Figure(data=[go.Histogram(x=capacidades, nbinsx=15,
-                                              marker_color='#11998e')])
-            fig.update_layout(
-                xaxis_title="Capacidade da Sala",
-                yaxis_title="Frequência",
-                showlegend=False,
-                height=300
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            col_a, col_b, col_c = st.columns(3)
-            with col_a:
-                st.metric("Média", f"{sum(capacidades)/len(capacidades):.1f}")
-            with col_b:
-                st.metric("Máximo", max(capacidades))
-            with col_c:
-                st.metric("Mínimo", min(capacidades))
+            st.plotly_chart(graficos['capacidade'], use_container_width=True)
+            
+            if graficos['estatisticas_capacidade']:
+                media, maximo, minimo = graficos['estatisticas_capacidade']
+                col_a, col_b, col_c = st.columns(3)
+                with col_a:
+                    st.metric("Média", f"{media:.1f}")
+                with col_b:
+                    st.metric("Máximo", maximo)
+                with col_c:
+                    st.metric("Mínimo", minimo)
         
         st.markdown("---")
         
@@ -445,9 +717,7 @@ elif page == "📁 Dados":
             if st.button("Carregar CC Padrão"):
                 try:
                     with st.spinner("Carregando..."):
-                        sistema = SistemaCompletoRefatorado()
-                        st.session_state.repository_cc = sistema.carregar_dados_csv('oferta_cc_2025_1.csv')
-                        st.session_state.sistema = sistema
+                        registrar_oferta('cc', ler_bytes('oferta_cc_2025_1.csv'), 'oferta_cc_2025_1.csv')
                         st.success("✅ Dados de CC carregados!")
                 except Exception as e:
                     st.error(f"Erro: {e}")
@@ -455,18 +725,8 @@ elif page == "📁 Dados":
             if cc_file:
                 try:
                     with st.spinner("Processando arquivo..."):
-                        stringio = StringIO(cc_file.getvalue().decode("utf-8"))
-                        sistema = SistemaCompletoRefatorado()
-                        
-                        temp_file = "temp_cc.csv"
-                        with open(temp_file, 'w', encoding='utf-8') as f:
-                            f.write(stringio.read())
-                        
-                        st.session_state.repository_cc = sistema.carregar_dados_csv(temp_file)
-                        st.session_state.sistema = sistema
-                        
-                        os.remove(temp_file)
-                        
+                        # O arquivo continua no uploader a cada rerun; o cache evita reprocessá-lo
+                        registrar_oferta('cc', cc_file.getvalue(), cc_file.name)
                         st.success("✅ Arquivo de CC carregado!")
                 except Exception as e:
                     st.error(f"Erro ao processar arquivo: {e}")
@@ -479,9 +739,7 @@ elif page == "📁 Dados":
             if st.button("Carregar EC Padrão"):
                 try:
                     with st.spinner("Carregando..."):
-                        sistema = SistemaCompletoRefatorado()
-                        st.session_state.repository_ec = sistema.carregar_dados_csv('oferta_ec_2025_1.csv')
-                        st.session_state.sistema = sistema
+                        registrar_oferta('ec', ler_bytes('oferta_ec_2025_1.csv'), 'oferta_ec_2025_1.csv')
                         st.success("✅ Dados de EC carregados!")
                 except Exception as e:
                     st.error(f"Erro: {e}")
@@ -489,18 +747,8 @@ elif page == "📁 Dados":
             if ec_file:
                 try:
                     with st.spinner("Processando arquivo..."):
-                        stringio = StringIO(ec_file.getvalue().decode("utf-8"))
-                        sistema = SistemaCompletoRefatorado()
-                        
-                        temp_file = "temp_ec.csv"
-                        with open(temp_file, 'w', encoding='utf-8') as f:
-                            f.write(stringio.read())
-                        
-                        st.session_state.repository_ec = sistema.carregar_dados_csv(temp_file)
-                        st.session_state.sistema = sistema
-                        
-                        os.remove(temp_file)
-                        
+                        # O arquivo continua no uploader a cada rerun; o cache evita reprocessá-lo
+                        registrar_oferta('ec', ec_file.getvalue(), ec_file.name)
                         st.success("✅ Arquivo de EC carregado!")
                 except Exception as e:
                     st.error(f"Erro ao processar arquivo: {e}")
@@ -527,28 +775,21 @@ elif page == "📁 Dados":
             if data_source == "Ciência da Computação" and st.session_state.repository_cc:
                 materias = list(st.session_state.repository_cc.buscar_materias())
                 salas = list(st.session_state.repository_cc.buscar_salas())
+                chave = chave_dados(include_ec=False)
             elif data_source == "Engenharia de Computação" and st.session_state.repository_ec:
                 materias = list(st.session_state.repository_ec.buscar_materias())
                 salas = list(st.session_state.repository_ec.buscar_salas())
+                chave = chave_dados(include_cc=False)
             else:
                 materias_cc = list(st.session_state.repository_cc.buscar_materias()) if st.session_state.repository_cc else []
                 materias_ec = list(st.session_state.repository_ec.buscar_materias()) if st.session_state.repository_ec else []
                 materias = materias_cc + materias_ec
-                
-                if st.session_state.repository_cc:
-                    salas = list(st.session_state.repository_cc.buscar_salas())
-                else:
-                    salas = list(st.session_state.repository_ec.buscar_salas())
+                salas = obter_salas()
+                chave = chave_dados()
             
             st.markdown("### 📚 Matérias")
             
-            df_materias = pd.DataFrame([{
-                "Código": m.id,
-                "Nome": m.nome,
-                "Inscritos": m.inscritos,
-                "Horário": m.horario,
-                "Material": {0: "Nenhum", 1: "Computadores", 2: "Robótica", 3: "Eletrônica"}.get(m.material, "N/A")
-            } for m in materias])
+            df_materias, df_salas = tabelas_dados(chave, materias, salas)
             
             search = st.text_input("🔍 Buscar matéria", "")
             if search:
@@ -559,15 +800,6 @@ elif page == "📁 Dados":
             st.markdown("---")
             st.markdown("### 🏢 Salas")
             
-            df_salas = pd.DataFrame([{
-                "Nome": s.nome,
-                "Capacidade": s.capacidade,
-                "Tipo": s.tipo.value,
-                "Local": s.local.value.upper(),
-                "Equipamento": {0: "Nenhum", 1: "Computadores", 2: "Robótica", 3: "Eletrônica"}.get(s.tipo_equipamento, "N/A"),
-                "Custo Adicional": f"R$ {s.custo_adicional:.2f}"
-            } for s in salas])
-            
             st.dataframe(df_salas, use_container_width=True, height=400)
     
     with tab3:
@@ -581,15 +813,7 @@ elif page == "📁 Dados":
             with col1:
                 if st.session_state.repository_cc:
                     materias_cc = list(st.session_state.repository_cc.buscar_materias())
-                    df_export = pd.DataFrame([{
-                        "Código": m.id,
-                        "Nome": m.nome,
-                        "Inscritos": m.inscritos,
-                        "Horário": m.horario,
-                        "Material": m.material
-                    } for m in materias_cc])
-                    
-                    csv = df_export.to_csv(index=False)
+                    csv = csv_materias(st.session_state.chave_cc, materias_cc)
                     st.download_button(
                         label="📥 Download Matérias CC (CSV)",
                         data=csv,
@@ -601,15 +825,7 @@ elif page == "📁 Dados":
             with col2:
                 if st.session_state.repository_ec:
                     materias_ec = list(st.session_state.repository_ec.buscar_materias())
-                    df_export = pd.DataFrame([{
-                        "Código": m.id,
-                        "Nome": m.nome,
-                        "Inscritos": m.inscritos,
-                        "Horário": m.horario,
-                        "Material": m.material
-                    } for m in materias_ec])
-                    
-                    csv = df_export.to_csv(index=False)
+                    csv = csv_materias(st.session_state.chave_ec, materias_ec)
                     st.download_button(
                         label="📥 Download Matérias EC (CSV)",
                         data=csv,
@@ -642,6 +858,9 @@ elif page == "⚙️ Alocação":
             include_ec = st.checkbox("Incluir Engenharia de Computação", 
                                     value=bool(st.session_state.repository_ec),
                                     disabled=not st.session_state.repository_ec)
+            
+            tempo_limite = st.number_input("Tempo limite (segundos)", min_value=0, value=0, step=10,
+                                           help="0 = sem limite. Alocações que excederem o limite são canceladas")
         
         with col2:
             st.markdown("### Status")
@@ -653,145 +872,139 @@ elif page == "⚙️ Alocação":
             if st.session_state.repository_ec:
                 materias_ec = list(st.session_state.repository_ec.buscar_materias())
                 st.success(f"✅ EC: {len(materias_ec)} matérias")
+            
+            todas_materias, materias_compartilhadas = combinar_materias(include_cc, include_ec)
+            salas = obter_salas()
+            if todas_materias:
+                diagnostico = diagnosticar_compatibilidade(chave_dados(include_cc, include_ec), todas_materias, salas)
+                st.caption(f"{diagnostico['pares_compativeis']} pares matéria-sala compatíveis")
+                if not diagnostico['viavel']:
+                    st.warning(diagnostico['resumo'])
         
         st.markdown("---")
         
-        if st.button("🚀 Executar Alocação", type="primary", use_container_width=True):
-            with st.spinner("Executando alocação..."):
-                try:
-                    todas_materias = []
-                    materias_por_codigo = {}
-                    materias_compartilhadas = []
-                    
-                    if include_cc and st.session_state.repository_cc:
-                        materias_cc = list(st.session_state.repository_cc.buscar_materias())
-                        for materia in materias_cc:
-                            chave = f"{materia.id}_{materia.horario}"
-                            if chave in materias_por_codigo:
-                                materias_compartilhadas.append(materia.id)
-                            else:
-                                materias_por_codigo[chave] = materia
-                    
-                    if include_ec and st.session_state.repository_ec:
-                        materias_ec = list(st.session_state.repository_ec.buscar_materias())
-                        for materia in materias_ec:
-                            chave = f"{materia.id}_{materia.horario}"
-                            if chave in materias_por_codigo:
-                                materias_compartilhadas.append(materia.id)
-                            else:
-                                materias_por_codigo[chave] = materia
-                    
-                    todas_materias = list(materias_por_codigo.values())
-                    
-                    if st.session_state.repository_cc:
-                        salas = list(st.session_state.repository_cc.buscar_salas())
-                    else:
-                        salas = list(st.session_state.repository_ec.buscar_salas())
-                    
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-                    
-                    compatibilidade = CompatibilidadePadrao()
-                    
-                    if "Linear" in strategy_type:
-                        status_text.text("Usando estratégia de Programação Linear...")
-                        progress_bar.progress(30)
-                        alocador = AlocacaoLinearStrategy(compatibilidade)
-                    else:
-                        status_text.text("Usando estratégia Gulosa...")
-                        progress_bar.progress(30)
-                        alocador = AlocacaoGulosaStrategy(compatibilidade)
-                    
-                    progress_bar.progress(50)
-                    status_text.text("Executando alocação...")
-                    
-                    resultado = alocador.alocar(todas_materias, salas)
-                    
-                    progress_bar.progress(100)
+        # O trabalho sobrevive aos reruns: coleta o resultado uma vez ou acompanha o progresso
+        trabalho = st.session_state.get('trabalho_alocacao')
+        if trabalho is not None and trabalho.concluido():
+            st.session_state.trabalho_alocacao = None
+            resultado = trabalho.resultado()
+            st.session_state.ultima_execucao = (trabalho.estado, resultado)
+            if resultado.sucesso:
+                materias_executadas, salas_executadas, compartilhadas_executadas = \
+                    st.session_state.entradas_alocacao
+                st.session_state.resultado = resultado
+                st.session_state.chave_resultado = impressao_resultado(resultado)
+                st.session_state.pdf_bytes = None
+                st.session_state.materias = materias_executadas
+                st.session_state.salas = salas_executadas
+                st.balloons()
+            trabalho = None
+        
+        if trabalho is not None:
+            st.progress(min(99, int(trabalho.progresso)))
+            st.text(trabalho.etapa)
+            if st.button("⏹️ Cancelar Alocação", key="cancelar_alocacao", use_container_width=True):
+                trabalho.cancelar()
+                st.warning("⚠️ Cancelamento solicitado")
+        elif st.button("🚀 Executar Alocação", type="primary", use_container_width=True):
+            try:
+                compatibilidade = CompatibilidadePadrao()
+                
+                if "Linear" in strategy_type:
+                    alocador = AlocacaoLinearStrategy(compatibilidade)
+                else:
+                    alocador = AlocacaoGulosaStrategy(compatibilidade)
+                
+                alocador = AlocacaoMemoizadaStrategy(alocador, obter_cache_resultados())
+                
+                # Executa em processo separado para permitir cancelamento e tempo limite
+                trabalho = obter_executor_alocacao().submeter(
+                    alocador, todas_materias, salas, timeout=tempo_limite or None
+                )
+                st.session_state.trabalho_alocacao = trabalho
+                st.session_state.entradas_alocacao = (todas_materias, salas, materias_compartilhadas)
+                st.session_state.ultima_execucao = None
+            
+            except Exception as e:
+                st.error(f"❌ Erro durante a alocação: {e}")
+                
+                with st.expander("🔍 Detalhes do erro (para debug)"):
+                    import traceback
+                    st.code(traceback.format_exc())
                     
-                    if resultado.sucesso:
-                        st.session_state.resultado = resultado
-                        st.session_state.materias = todas_materias
-                        st.session_state.salas = salas
-                        
-                        status_text.empty()
-                        progress_bar.empty()
-                        
-                        st.success("✅ Alocação executada com sucesso!")
-                        
-                        col1, col2, col3, col4 = st.columns(4)
-                        
-                        with col1:
-                            st.metric("Matérias Alocadas", len(resultado.alocacoes))
-                        
-                        with col2:
-                            salas_usadas = len(set(a.sala.id for a in resultado.alocacoes))
-                            st.metric("Salas Utilizadas", salas_usadas)
-                        
-                        with col3:
-                            utilizacao = resultado.metricas['utilizacao_media']
-                            st.metric("Utilização Média", f"{utilizacao:.1f}%")
-                        
-                        with col4:
-                            ocioso = resultado.metricas['espaco_ocioso_total']
-                            st.metric("Espaço Ocioso", ocioso)
-                        
-                        if materias_compartilhadas:
-                            st.info(f"ℹ️ {len(materias_compartilhadas)} matérias compartilhadas detectadas")
-                        
-                        st.markdown("---")
-                        
-                        if PDF_AVAILABLE:
-                            col_pdf1, col_pdf2 = st.columns(2)
-                            
-                            with col_pdf1:
-                                if st.button("📄 Gerar PDF de Horários Agora", type="secondary", use_container_width=True):
-                                    with st.spinner("Gerando PDF..."):
-                                        try:
-                                            pdf_filename = "horario_alocacao.pdf"
-                                            sucesso_pdf = create_timetable_pdf_from_alocacoes(resultado, pdf_filename)
-                                            
-                                            if sucesso_pdf and os.path.exists(pdf_filename):
-                                                st.success(f"✅ PDF gerado com sucesso!")
-                                                
-                                                with open(pdf_filename, "rb") as pdf_file:
-                                                    pdf_bytes = pdf_file.read()
-                                                    st.download_button(
-                                                        label="⬇️ Download PDF",
-                                                        data=pdf_bytes,
-                                                        file_name=pdf_filename,
-                                                        mime="application/pdf",
-                                                        use_container_width=True
-                                                    )
-                                            else:
-                                                st.error("❌ Erro ao gerar PDF")
-                                        except Exception as e:
-                                            st.error(f"❌ Erro ao gerar PDF: {e}")
-                            
-                            with col_pdf2:
-                                st.info("💡 Você também pode gerar o PDF na página 'Resultados'")
-                        
-                        st.balloons()
-                        
-                    else:
-                        status_text.empty()
-                        progress_bar.empty()
-                        st.error(f"❌ Erro na alocação: {resultado.erro}")
+                    st.markdown("### Informações de Debug")
+                    st.write(f"**Total de matérias**: {len(todas_materias)}")
+                    st.write(f"**Total de salas**: {len(salas)}")
+                    st.write(f"**Exemplos de IDs de matérias**: {[m.id for m in todas_materias[:5]]}")
+                    st.write(f"**Exemplos de IDs de salas**: {[s.id for s in salas[:5]]}")
+        
+        ultima_execucao = st.session_state.get('ultima_execucao')
+        if trabalho is None and ultima_execucao is not None:
+            estado, resultado = ultima_execucao
+            if resultado.sucesso:
+                st.success("✅ Alocação executada com sucesso!")
                 
-                except Exception as e:
-                    status_text.empty()
-                    progress_bar.empty()
-                    st.error(f"❌ Erro durante a alocação: {e}")
+                col1, col2, col3, col4 = st.columns(4)
+                
+                with col1:
+                    st.metric("Matérias Alocadas", len(resultado.alocacoes))
+                
+                with col2:
+                    salas_usadas = resultado.tabela['sala_id'].nunique()
+                    st.metric("Salas Utilizadas", salas_usadas)
+                
+                with col3:
+                    utilizacao = resultado.metricas['utilizacao_media']
+                    st.metric("Utilização Média", f"{utilizacao:.1f}%")
+                
+                with col4:
+                    ocioso = resultado.metricas['espaco_ocioso_total']
+                    st.metric("Espaço Ocioso", ocioso)
+                
+                materias_compartilhadas_execucao = st.session_state.entradas_alocacao[2]
+                if materias_compartilhadas_execucao:
+                    st.info(f"ℹ️ {len(materias_compartilhadas_execucao)} matérias compartilhadas detectadas")
+                
+                st.markdown("---")
+                
+                if PDF_AVAILABLE:
+                    col_pdf1, col_pdf2 = st.columns(2)
+                    
+                    with col_pdf1:
+                        if st.button("📄 Gerar PDF de Horários Agora", type="secondary", use_container_width=True):
+                            with st.spinner("Gerando PDF..."):
+                                try:
+                                    pdf_filename = "horario_alocacao.pdf"
+                                    pdf_bytes = render_timetable_pdf(resultado, page_cache=obter_cache_paginas_pdf())
+                                    
+                                    if pdf_bytes:
+                                        st.session_state.pdf_bytes = pdf_bytes
+                                        st.success(f"✅ PDF gerado com sucesso!")
+                                        
+                                        st.download_button(
+                                            label="⬇️ Download PDF",
+                                            data=pdf_bytes,
+                                            file_name=pdf_filename,
+                                            mime="application/pdf",
+                                            use_container_width=True
+                                        )
+                                    else:
+                                        st.error("❌ Erro ao gerar PDF")
+                                except Exception as e:
+                                    st.error(f"❌ Erro ao gerar PDF: {e}")
                     
-                    with st.expander("🔍 Detalhes do erro (para debug)"):
-                        import traceback
-                        st.code(traceback.format_exc())
-                        
-                        st.markdown("### Informações de Debug")
-                        st.write(f"**Total de matérias**: {len(todas_materias)}")
-                        st.write(f"**Total de salas**: {len(salas)}")
-                        st.write(f"**Exemplos de IDs de matérias**: {[m.id for m in todas_materias[:5]]}")
-                        st.write(f"**Exemplos de IDs de salas**: {[s.id for s in salas[:5]]}")
+                    with col_pdf2:
+                        st.info("💡 Você também pode gerar o PDF na página 'Resultados'")
+            
+            elif estado == EstadoTrabalho.CANCELADO:
+                st.warning("⚠️ Alocação cancelada")
+            else:
+                st.error(f"❌ Erro na alocação: {resultado.erro}")
+        
+        if trabalho is not None:
+            # Sem laço bloqueante: o script termina e roda de novo, mantendo o botão de cancelar ativo
+            time.sleep(INTERVALO_ACOMPANHAMENTO)
+            st.rerun()
 
 elif page == "📈 Resultados":
     st.markdown('<div class="main-header">📈 Resultados da Alocação</div>', unsafe_allow_html=True)
@@ -801,6 +1014,8 @@ elif page == "📈 Resultados":
         st.warning("⚠️ Execute a alocação primeiro!")
     else:
         resultado = st.session_state.resultado
+        chave_resultado = obter_chave_resultado()
+        agregados = agregar_resultado(chave_resultado, resultado)
         
         col1, col2, col3, col4, col5 = st.columns(5)
         
@@ -808,8 +1023,7 @@ elif page == "📈 Resultados":
             st.metric("✅ Alocadas", len(resultado.alocacoes))
         
         with col2:
-            salas_usadas = len(set(a.sala.id for a in resultado.alocacoes))
-            st.metric("🏢 Salas", salas_usadas)
+            st.metric("🏢 Salas", agregados['salas_usadas'])
         
         with col3:
             utilizacao = resultado.metricas['utilizacao_media']
@@ -833,20 +1047,19 @@ elif page == "📈 Resultados":
                     with st.spinner("Gerando PDF..."):
                         try:
                             pdf_filename = "horario_alocacao.pdf"
-                            sucesso_pdf = create_timetable_pdf_from_alocacoes(resultado, pdf_filename)
+                            pdf_bytes = render_timetable_pdf(resultado, page_cache=obter_cache_paginas_pdf())
                             
-                            if sucesso_pdf and os.path.exists(pdf_filename):
+                            if pdf_bytes:
+                                st.session_state.pdf_bytes = pdf_bytes
                                 st.success(f"✅ PDF gerado: {pdf_filename}")
                                 
-                                with open(pdf_filename, "rb") as pdf_file:
-                                    pdf_bytes = pdf_file.read()
-                                    st.download_button(
-                                        label="⬇️ Download PDF",
-                                        data=pdf_bytes,
-                                        file_name=pdf_filename,
-                                        mime="application/pdf",
-                                        use_container_width=True
-                                    )
+                                st.download_button(
+                                    label="⬇️ Download PDF",
+                                    data=pdf_bytes,
+                                    file_name=pdf_filename,
+                                    mime="application/pdf",
+                                    use_container_width=True
+                                )
                             else:
                                 st.error("❌ Erro ao gerar PDF")
                         except Exception as e:
@@ -855,16 +1068,66 @@ elif page == "📈 Resultados":
                 st.warning("⚠️ PDF generator não disponível. Instale reportlab.")
         
         with col2:
-            if os.path.exists("horario_alocacao.pdf"):
-                with open("horario_alocacao.pdf", "rb") as pdf_file:
-                    pdf_bytes = pdf_file.read()
-                    st.download_button(
-                        label="⬇️ Download PDF Existente",
-                        data=pdf_bytes,
-                        file_name="horario_alocacao.pdf",
-                        mime="application/pdf",
-                        use_container_width=True
-                    )
+            # PDF da sessão atual, sem depender de arquivos compartilhados entre usuários
+            if st.session_state.pdf_bytes:
+                st.download_button(
+                    label="⬇️ Download PDF Existente",
+                    data=st.session_state.pdf_bytes,
+                    file_name="horario_alocacao.pdf",
+                    mime="application/pdf",
+                    use_container_width=True
+                )
+        
+        if PDF_AVAILABLE:
+            with st.expander("📦 Exportação em Lote"):
+                col_lote1, col_lote2 = st.columns(2)
+                with col_lote1:
+                    chave_lote = st.selectbox("Agrupar por", list(BATCH_GROUP_TITLES.keys()),
+                                              format_func=BATCH_GROUP_TITLES.get, index=1)
+                with col_lote2:
+                    formato_lote = st.radio("Formato", ["PDF único", "ZIP (um PDF por grupo)"], horizontal=True)
+                
+                if st.button("📦 Gerar Horários em Lote", use_container_width=True):
+                    barra_lote = st.progress(0.0, text="Renderizando páginas...")
+                    como_zip = formato_lote.startswith("ZIP")
+                    try:
+                        lote_bytes = render_timetable_batch(
+                            resultado, chave_lote, as_zip=como_zip,
+                            workers=min(4, os.cpu_count() or 1),
+                            progress=lambda feitas, total: barra_lote.progress(
+                                feitas / total, text=f"{feitas}/{total} páginas"),
+                        )
+                        if lote_bytes:
+                            extensao = "zip" if como_zip else "pdf"
+                            st.download_button(
+                                label="⬇️ Download do Lote",
+                                data=lote_bytes,
+                                file_name=f"horarios_{chave_lote}.{extensao}",
+                                mime="application/zip" if como_zip else "application/pdf",
+                                use_container_width=True
+                            )
+                        else:
+                            st.error("❌ Nenhuma página gerada")
+                    except Exception as e:
+                        st.error(f"❌ Erro na exportação em lote: {e}")
+        
+        st.markdown("---")
+        
+        st.markdown("### 🗓️ Grade por Sala")
+        grades_svg = gerar_grades_svg(chave_resultado, resultado)
+        if grades_svg:
+            col_grade1, col_grade2 = st.columns([3, 1])
+            with col_grade1:
+                sala_grade = st.selectbox("Sala", list(grades_svg.keys()), key="sala_grade_svg")
+            with col_grade2:
+                st.download_button(
+                    label="⬇️ Download HTML",
+                    data=render_timetable_html(resultado, grades_svg),
+                    file_name="horario_alocacao.html",
+                    mime="text/html",
+                    use_container_width=True
+                )
+            st.markdown(grades_svg[sala_grade], unsafe_allow_html=True)
         
         st.markdown("---")
         
@@ -873,87 +1136,40 @@ elif page == "📈 Resultados":
         with tab1:
             st.markdown("### Alocações por Sala")
             
-            salas_materias = {}
-            for alocacao in resultado.alocacoes:
-                sala_id = alocacao.sala.id
-                if sala_id not in salas_materias:
-                    salas_materias[sala_id] = {'sala': alocacao.sala, 'alocacoes': []}
-                salas_materias[sala_id]['alocacoes'].append(alocacao)
-            
-            for sala_id in sorted(salas_materias.keys()):
-                info_sala = salas_materias[sala_id]
-                sala = info_sala['sala']
-                alocacoes = info_sala['alocacoes']
-                
-                with st.expander(f"🏢 {sala.nome} - {len(alocacoes)} matérias"):
+            for info_sala in agregados['por_sala']:
+                with st.expander(f"🏢 {info_sala['nome']} - {len(info_sala['tabela'])} matérias"):
                     col1, col2, col3 = st.columns(3)
                     
                     with col1:
                         st.caption("**Local**")
-                        st.write(sala.local.value.upper())
+                        st.write(info_sala['local'])
                     
                     with col2:
                         st.caption("**Tipo**")
-                        st.write(sala.tipo.value.title())
+                        st.write(info_sala['tipo'])
                     
                     with col3:
                         st.caption("**Capacidade**")
-                        st.write(sala.capacidade)
+                        st.write(info_sala['capacidade'])
                     
                     st.markdown("---")
                     
-                    df_sala = pd.DataFrame([{
-                        "Matéria": a.materia.nome,
-                        "Horário": a.materia.horario,
-                        "Inscritos": a.materia.inscritos,
-                        "Utilização": f"{a.utilizacao_percentual:.1f}%",
-                        "Ocioso": a.espaco_ocioso,
-                        "Lab": "✓" if a.materia.material > 0 else ""
-                    } for a in alocacoes])
-                    
-                    st.dataframe(df_sala, use_container_width=True, hide_index=True)
+                    st.dataframe(info_sala['tabela'], use_container_width=True, hide_index=True)
         
         with tab2:
             st.markdown("### Alocações por Horário")
             
-            horarios_materias = {}
-            for alocacao in resultado.alocacoes:
-                horario = alocacao.materia.horario
-                if horario not in horarios_materias:
-                    horarios_materias[horario] = []
-                horarios_materias[horario].append(alocacao)
-            
-            for horario in sorted(horarios_materias.keys()):
-                alocacoes = horarios_materias[horario]
-                total_alunos = sum(a.materia.inscritos for a in alocacoes)
-                
-                with st.expander(f"🕐 {horario} - {len(alocacoes)} matérias ({total_alunos} alunos)"):
-                    df_horario = pd.DataFrame([{
-                        "Matéria": a.materia.nome,
-                        "Sala": a.sala.nome,
-                        "Local": a.sala.local.value.upper(),
-                        "Inscritos": a.materia.inscritos,
-                        "Capacidade": a.sala.capacidade,
-                        "Utilização": f"{a.utilizacao_percentual:.1f}%"
-                    } for a in alocacoes])
-                    
-                    st.dataframe(df_horario, use_container_width=True, hide_index=True)
+            for info_horario in agregados['por_horario']:
+                with st.expander(f"🕐 {info_horario['horario']} - {info_horario['materias']} matérias "
+                                 f"({info_horario['alunos']} alunos)"):
+                    st.dataframe(info_horario['tabela'], use_container_width=True, hide_index=True)
         
         with tab3:
             st.markdown("### Todas as Matérias Alocadas")
             
             search_materia = st.text_input("🔍 Buscar matéria", "")
             
-            df_materias = pd.DataFrame([{
-                "Matéria": a.materia.nome,
-                "Código": a.materia.id,
-                "Inscritos": a.materia.inscritos,
-                "Sala": a.sala.nome,
-                "Local": a.sala.local.value.upper(),
-                "Horário": a.materia.horario,
-                "Utilização": f"{a.utilizacao_percentual:.1f}%",
-                "Lab": "✓" if a.materia.material > 0 else ""
-            } for a in resultado.alocacoes])
+            df_materias = agregados['materias']
             
             if search_materia:
                 df_materias = df_materias[df_materias['Matéria'].str.contains(search_materia, case=False, na=False)]
@@ -971,24 +1187,7 @@ elif page == "📈 Resultados":
         with tab4:
             st.markdown("### Distribuição por Local")
             
-            locais_stats = {}
-            for alocacao in resultado.alocacoes:
-                local = alocacao.sala.local.value.upper()
-                if local not in locais_stats:
-                    locais_stats[local] = {
-                        'materias': 0,
-                        'inscritos': 0,
-                        'capacidade': 0,
-                        'salas': set()
-                    }
-                locais_stats[local]['materias'] += 1
-                locais_stats[local]['inscritos'] += alocacao.materia.inscritos
-                locais_stats[local]['capacidade'] += alocacao.sala.capacidade
-                locais_stats[local]['salas'].add(alocacao.sala.id)
-            
-            for local, stats in locais_stats.items():
-                utilizacao = (stats['inscritos'] / stats['capacidade'] * 100) if stats['capacidade'] > 0 else 0
-                
+            for local, stats in agregados['por_local'].items():
                 st.markdown(f"#### 📍 {local}")
                 
                 col1, col2, col3, col4 = st.columns(4)
@@ -997,13 +1196,13 @@ elif page == "📈 Resultados":
                     st.metric("Matérias", stats['materias'])
                 
                 with col2:
-                    st.metric("Salas", len(stats['salas']))
+                    st.metric("Salas", stats['salas'])
                 
                 with col3:
                     st.metric("Inscritos", stats['inscritos'])
                 
                 with col4:
-                    st.metric("Utilização", f"{utilizacao:.1f}%")
+                    st.metric("Utilização", f"{stats['utilizacao']:.1f}%")
                 
                 st.markdown("---")
 
@@ -1016,6 +1215,8 @@ elif page == "📉 Análises":
     else:
         resultado = st.session_state.resultado
         
+        graficos = graficos_analise(obter_chave_resultado(), resultado)
+        
         tab1, tab2, tab3 = st.tabs(["📊 Gráficos", "🎯 Otimização", "📈 Comparações"])
         
         with tab1:
@@ -1023,39 +1224,11 @@ elif page == "📉 Análises":
             
             with col1:
                 st.markdown("### 📊 Utilização por Sala")
-                
-                df_util = pd.DataFrame([{
-                    "Sala": a.sala.nome,
-                    "Utilização": a.utilizacao_percentual,
-                    "Local": a.sala.local.value.upper()
-                } for a in resultado.alocacoes])
-                
-                df_util_avg = df_util.groupby('Sala')['Utilização'].mean().reset_index()
-                df_util_avg = df_util_avg.sort_values('Utilização', ascending=False).head(15)
-                
-                fig = px.bar(df_util_avg, x='Sala', y='Utilização',
-                           color='Utilização',
-                           color_continuous_scale='RdYlGn')
-                fig.update_layout(xaxis_tickangle=-45, height=400)
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(graficos['utilizacao'], use_container_width=True)
             
             with col2:
                 st.markdown("### 🪑 Espaço Ocioso")
-                
-                df_ocioso = pd.DataFrame([{
-                    "Sala": a.sala.nome,
-                    "Ocioso": a.espaco_ocioso,
-                    "Local": a.sala.local.value.upper()
-                } for a in resultado.alocacoes])
-                
-                df_ocioso_total = df_ocioso.groupby('Sala')['Ocioso'].sum().reset_index()
-                df_ocioso_total = df_ocioso_total.sort_values('Ocioso', ascending=False).head(15)
-                
-                fig = px.bar(df_ocioso_total, x='Sala', y='Ocioso',
-                           color='Ocioso',
-                           color_continuous_scale='Reds_r')
-                fig.update_layout(xaxis_tickangle=-45, height=400)
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(graficos['ocioso'], use_container_width=True)
             
             st.markdown("---")
             
@@ -1063,34 +1236,11 @@ elif page == "📉 Análises":
             
             with col1:
                 st.markdown("### 📍 Alocações por Local")
-                
-                locais_count = {}
-                for alocacao in resultado.alocacoes:
-                    local = alocacao.sala.local.value.upper()
-                    locais_count[local] = locais_count.get(local, 0) + 1
-                
-                df_locais = pd.DataFrame([
-                    {"Local": k, "Quantidade": v}
-                    for k, v in locais_count.items()
-                ])
-                
-                fig = px.pie(df_locais, values='Quantidade', names='Local',
-                           color_discrete_sequence=px.colors.qualitative.Set2)
-                fig.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(graficos['locais'], use_container_width=True)
             
             with col2:
                 st.markdown("### 🎓 Distribuição de Turmas")
-                
-                inscritos = [a.materia.inscritos for a in resultado.alocacoes]
-                
-                fig = go.Figure(data=[go.Box(y=inscritos, name='Inscritos',
-                                            marker_color='lightblue')])
-                fig.update_layout(
-                    yaxis_title="Número de Inscritos",
-                    showlegend=False
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(graficos['turmas'], use_container_width=True)
         
         with tab2:
             st.markdown("### 🎯 Análise de Otimização")
@@ -1098,20 +1248,16 @@ elif page == "📉 Análises":
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                total_capacidade = sum(a.sala.capacidade for a in resultado.alocacoes)
-                total_inscritos = sum(a.materia.inscritos for a in resultado.alocacoes)
-                eficiencia = (total_inscritos / total_capacidade * 100) if total_capacidade > 0 else 0
-                
                 st.markdown(f"""
                 <div class="metric-card">
                     <h4>Eficiência Global</h4>
-                    <h2>{eficiencia:.1f}%</h2>
-                    <p>{total_inscritos} / {total_capacidade} lugares</p>
+                    <h2>{graficos['eficiencia']:.1f}%</h2>
+                    <p>{graficos['total_inscritos']} / {graficos['total_capacidade']} lugares</p>
                 </div>
                 """, unsafe_allow_html=True)
             
             with col2:
-                salas_im = sum(1 for a in resultado.alocacoes if a.sala.local.value == 'im')
+                salas_im = graficos['salas_im']
                 percentual_im = (salas_im / len(resultado.alocacoes) * 100) if resultado.alocacoes else 0
                 
                 st.markdown(f"""
@@ -1123,7 +1269,7 @@ elif page == "📉 Análises":
                 """, unsafe_allow_html=True)
             
             with col3:
-                labs = sum(1 for a in resultado.alocacoes if a.materia.material > 0)
+                labs = graficos['labs']
                 percentual_labs = (labs / len(resultado.alocacoes) * 100) if resultado.alocacoes else 0
                 
                 st.markdown(f"""
@@ -1137,32 +1283,7 @@ elif page == "📉 Análises":
             st.markdown("---")
             
             st.markdown("### 📊 Faixas de Utilização")
-            
-            faixas = {"0-50%": 0, "50-70%": 0, "70-85%": 0, "85-100%": 0, ">100%": 0}
-            
-            for alocacao in resultado.alocacoes:
-                util = alocacao.utilizacao_percentual
-                if util < 50:
-                    faixas["0-50%"] += 1
-                elif util < 70:
-                    faixas["50-70%"] += 1
-                elif util < 85:
-                    faixas["70-85%"] += 1
-                elif util <= 100:
-                    faixas["85-100%"] += 1
-                else:
-                    faixas[">100%"] += 1
-            
-            df_faixas = pd.DataFrame([
-                {"Faixa": k, "Quantidade": v}
-                for k, v in faixas.items()
-            ])
-            
-            fig = px.bar(df_faixas, x='Faixa', y='Quantidade',
-                       color='Quantidade',
-                       color_continuous_scale='Viridis')
-            fig.update_layout(showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(graficos['faixas'], use_container_width=True)
             
             st.markdown("---")
             
@@ -1170,31 +1291,11 @@ elif page == "📉 Análises":
             
             with col1:
                 st.markdown("### ⭐ Melhores Alocações")
-                
-                melhores = sorted(resultado.alocacoes, 
-                                key=lambda a: abs(a.utilizacao_percentual - 85))[:10]
-                
-                df_melhores = pd.DataFrame([{
-                    "Matéria": a.materia.nome[:40],
-                    "Sala": a.sala.nome,
-                    "Util.": f"{a.utilizacao_percentual:.1f}%"
-                } for a in melhores])
-                
-                st.dataframe(df_melhores, use_container_width=True, hide_index=True)
+                st.dataframe(graficos['melhores'], use_container_width=True, hide_index=True)
             
             with col2:
                 st.markdown("### ⚠️ Alocações Problemáticas")
-                
-                problematicas = sorted(resultado.alocacoes, 
-                                     key=lambda a: a.espaco_ocioso, reverse=True)[:10]
-                
-                df_prob = pd.DataFrame([{
-                    "Matéria": a.materia.nome[:40],
-                    "Sala": a.sala.nome,
-                    "Ocioso": a.espaco_ocioso
-                } for a in problematicas])
-                
-                st.dataframe(df_prob, use_container_width=True, hide_index=True)
+                st.dataframe(graficos['problematicas'], use_container_width=True, hide_index=True)
         
         with tab3:
             st.markdown("### 📈 Comparação de Métricas")
@@ -1203,66 +1304,15 @@ elif page == "📉 Análises":
             
             with col1:
                 st.markdown("#### Por Local")
-                
-                locais_stats = {}
-                for alocacao in resultado.alocacoes:
-                    local = alocacao.sala.local.value.upper()
-                    if local not in locais_stats:
-                        locais_stats[local] = {'inscritos': 0, 'capacidade': 0}
-                    locais_stats[local]['inscritos'] += alocacao.materia.inscritos
-                    locais_stats[local]['capacidade'] += alocacao.sala.capacidade
-                
-                df_locais_comp = pd.DataFrame([{
-                    "Local": k,
-                    "Utilização": (v['inscritos'] / v['capacidade'] * 100) if v['capacidade'] > 0 else 0
-                } for k, v in locais_stats.items()])
-                
-                fig = px.bar(df_locais_comp, x='Local', y='Utilização',
-                           color='Utilização',
-                           color_continuous_scale='Blues')
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(graficos['comparacoes']['local'], use_container_width=True)
             
             with col2:
                 st.markdown("#### Por Tipo de Sala")
-                
-                tipos_stats = {}
-                for alocacao in resultado.alocacoes:
-                    tipo = alocacao.sala.tipo.value
-                    if tipo not in tipos_stats:
-                        tipos_stats[tipo] = {'inscritos': 0, 'capacidade': 0}
-                    tipos_stats[tipo]['inscritos'] += alocacao.materia.inscritos
-                    tipos_stats[tipo]['capacidade'] += alocacao.sala.capacidade
-                
-                df_tipos_comp = pd.DataFrame([{
-                    "Tipo": k.title(),
-                    "Utilização": (v['inscritos'] / v['capacidade'] * 100) if v['capacidade'] > 0 else 0
-                } for k, v in tipos_stats.items()])
-                
-                fig = px.bar(df_tipos_comp, x='Tipo', y='Utilização',
-                           color='Utilização',
-                           color_continuous_scale='Greens')
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(graficos['comparacoes']['tipo'], use_container_width=True)
             
             with col3:
                 st.markdown("#### Lab vs Não-Lab")
-                
-                lab_stats = {'Lab': {'inscritos': 0, 'capacidade': 0},
-                           'Não-Lab': {'inscritos': 0, 'capacidade': 0}}
-                
-                for alocacao in resultado.alocacoes:
-                    categoria = 'Lab' if alocacao.materia.material > 0 else 'Não-Lab'
-                    lab_stats[categoria]['inscritos'] += alocacao.materia.inscritos
-                    lab_stats[categoria]['capacidade'] += alocacao.sala.capacidade
-                
-                df_lab_comp = pd.DataFrame([{
-                    "Categoria": k,
-                    "Utilização": (v['inscritos'] / v['capacidade'] * 100) if v['capacidade'] > 0 else 0
-                } for k, v in lab_stats.items()])
-                
-                fig = px.bar(df_lab_comp, x='Categoria', y='Utilização',
-                           color='Utilização',
-                           color_continuous_scale='Oranges')
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(graficos['comparacoes']['lab'], use_container_width=True)
             
             st.markdown("---")
             st.markdown("### 📊 Resumo Executivo")
@@ -1271,7 +1321,7 @@ elif page == "📉 Análises":
             **Resumo da Alocação:**
             
             - **Total de matérias alocadas**: {len(resultado.alocacoes)}
-            - **Salas utilizadas**: {len(set(a.sala.id for a in resultado.alocacoes))}
+            - **Salas utilizadas**: {agregar_resultado(obter_chave_resultado(), resultado)['salas_usadas']}
             - **Utilização média**: {resultado.metricas['utilizacao_media']:.1f}%
             - **Espaço ocioso total**: {resultado.metricas['espaco_ocioso_total']} lugares
             - **Custo total**: R$ {resultado.metricas.get('custo_total', 0):.2f}
@@ -0,0 +1,286 @@
+import colorsys
+import re
+import zlib
+import functools
+from typing import Dict, List, Tuple, Any, Iterable
+
+# Layout tables shared by the PDF and SVG renderers; no ReportLab import, so previews load fast
+
+cm = 72.0 / 2.54
+
+PAGE_WIDTH, PAGE_HEIGHT = 29.7 * cm, 21.0 * cm  # landscape A4
+
+MARGIN_TOP = 1.2 * cm
+MARGIN_BOTTOM = 1.0 * cm
+MARGIN_LEFT = 0.8 * cm
+MARGIN_RIGHT = 0.8 * cm
+
+HEADER_HEIGHT = 1.8 * cm
+FOOTER_HEIGHT = 0.6 * cm
+DAY_LABEL_WIDTH = 2.0 * cm
+TIMESLOT_HEADER_HEIGHT = 1.8 * cm
+
+GRID_X_START = MARGIN_LEFT + DAY_LABEL_WIDTH
+GRID_Y_START = PAGE_HEIGHT - MARGIN_TOP - HEADER_HEIGHT - TIMESLOT_HEADER_HEIGHT
+GRID_WIDTH = PAGE_WIDTH - MARGIN_LEFT - MARGIN_RIGHT - DAY_LABEL_WIDTH
+GRID_HEIGHT = PAGE_HEIGHT - MARGIN_TOP - MARGIN_BOTTOM - HEADER_HEIGHT - FOOTER_HEIGHT - TIMESLOT_HEADER_HEIGHT
+
+DAYS_OF_WEEK = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sab', 'Dom']
+DEFAULT_DAYS = (0, 1, 2, 3, 4)
+
+TIMESLOT_DEFINITIONS = [
+    ('M1', '07:00', '07:50', False),
+    ('M2', '08:00', '08:50', False),
+    ('M3', '09:00', '09:50', False),
+    ('M4', '10:00', '10:50', False),
+    ('M5', '11:00', '11:50', False),
+    ('M6', '12:00', '12:50', False),
+    ('INT2', 'Almoço', '', True),
+    ('T1', '13:00', '13:50', False),
+    ('T2', '13:50', '14:40', False),
+    ('T3', '14:40', '15:30', False),
+    ('T4', '15:30', '16:20', False),
+    ('T5', '16:20', '17:10', False),
+    ('T6', '17:10', '18:00', False),
+    ('INT3', 'Jantar', '', True),
+    ('N1', '18:00', '18:50', False),
+    ('N2', '18:50', '19:40', False),
+    ('N3', '19:40', '20:30', False),
+    ('N4', '20:30', '21:20', False),
+    ('N5', '21:20', '22:10', False),
+    ('N6', '22:10', '23:00', False),
+]
+
+SHIFTS = ('M', 'T', 'N')
+DEFAULT_SHIFTS = ('M', 'T')
+
+REGULAR_SLOT_RELATIVE_WIDTH = 1.0
+INTERVAL_SLOT_RELATIVE_WIDTH = 0.4
+
+# Position of each slot in the full definition list: ordering used when parsing horarios
+SLOT_ID_TO_INDEX = {slot_def[0]: i for i, slot_def in enumerate(TIMESLOT_DEFINITIONS)}
+START_TIME_TO_SLOT = {start_time: slot_id for slot_id, start_time, _, is_interval in TIMESLOT_DEFINITIONS
+                      if not is_interval and start_time}
+
+PALETTE_SIZE = 64
+
+def generate_palette(num_colors: int = PALETTE_SIZE) -> List[Tuple[float, float, float]]:
+    # Fixed pastel palette: golden-ratio hue steps keep consecutive entries far apart,
+    # and every process and run gets the same colours
+    palette = []
+    for i in range(num_colors):
+        hue = (i * 0.618033988749895) % 1.0
+        saturation = (0.35, 0.55)[i % 2]
+        value = (0.98, 0.85)[(i // 2) % 2]
+        palette.append(colorsys.hsv_to_rgb(hue, saturation, value))
+    return palette
+
+COURSE_PALETTE = generate_palette()
+
+def preferred_color_index(course_id: str) -> int:
+    return zlib.crc32(course_id.encode('utf-8')) % len(COURSE_PALETTE)
+
+def get_course_rgb(course_id: str) -> Tuple[float, float, float]:
+    return COURSE_PALETTE[preferred_color_index(course_id)]
+
+def assign_course_colors(course_ids: Iterable[str]) -> Dict[str, Tuple[float, float, float]]:
+    # Colours are picked per page: each course takes its preferred entry or the next free one, so
+    # courses on the same page never share a colour (up to PALETTE_SIZE courses). The result depends
+    # only on the set of ids, so an unchanged room renders an identical page
+    assigned = {}
+    used = set()
+    for course_id in sorted(set(course_ids)):
+        index = preferred_color_index(course_id)
+        if len(used) < len(COURSE_PALETTE):
+            while index in used:
+                index = (index + 1) % len(COURSE_PALETTE)
+        used.add(index)
+        assigned[course_id] = COURSE_PALETTE[index]
+    return assigned
+
+class GridLayout:
+    # Rows for the days in use and columns for the shifts in use; every block position is computed up front
+    def __init__(self, days: Tuple[int, ...], shifts: Tuple[str, ...]):
+        self.days = days
+        self.shifts = shifts
+        self.day_rows = {day_idx: row for row, day_idx in enumerate(days)}
+        self.row_height = GRID_HEIGHT / len(days)
+        self.key = f"{''.join(map(str, days))}_{''.join(shifts)}"
+
+        # Intervals only between two shifts in use, never two in a row
+        slot_defs = []
+        for slot_def in TIMESLOT_DEFINITIONS:
+            if slot_def[3]:
+                if slot_defs and not slot_defs[-1][3]:
+                    slot_defs.append(slot_def)
+            elif slot_def[0][0] in shifts:
+                slot_defs.append(slot_def)
+        if slot_defs and slot_defs[-1][3]:
+            slot_defs.pop()
+        self.slot_defs = slot_defs
+
+        width_units = sum(INTERVAL_SLOT_RELATIVE_WIDTH if slot_def[3] else REGULAR_SLOT_RELATIVE_WIDTH
+                          for slot_def in slot_defs)
+        unit_width = GRID_WIDTH / width_units
+        # slot index -> (x, width, is_interval)
+        self.slot_layout = []
+        current_x = GRID_X_START
+        for _, _, _, is_interval in slot_defs:
+            col_w = unit_width * (INTERVAL_SLOT_RELATIVE_WIDTH if is_interval else REGULAR_SLOT_RELATIVE_WIDTH)
+            self.slot_layout.append((current_x, col_w, is_interval))
+            current_x += col_w
+        self.slot_id_to_index = {slot_def[0]: i for i, slot_def in enumerate(slot_defs)}
+
+        self.block_geometry: Dict[Tuple[int, str, str], List[Tuple[float, float, float, float]]] = {}
+        regular_ids = [slot_def[0] for slot_def in slot_defs if not slot_def[3]]
+        for day_idx, row in self.day_rows.items():
+            block_y = GRID_Y_START - ((row + 1) * self.row_height)
+            for start_pos, start_slot_id in enumerate(regular_ids):
+                for end_slot_id in regular_ids[start_pos:]:
+                    self.block_geometry[(day_idx, start_slot_id, end_slot_id)] = [
+                        (self.slot_layout[block_start_idx][0], block_y,
+                         sum(self.slot_layout[i][1] for i in range(block_start_idx, block_end_idx + 1)),
+                         self.row_height)
+                        for block_start_idx, block_end_idx in self.course_blocks_with_intervals(start_slot_id, end_slot_id)
+                    ]
+
+    def course_blocks_with_intervals(self, start_slot_id: str, end_slot_id: str) -> List[Tuple[int, int]]:
+        try:
+            start_idx = self.slot_id_to_index[start_slot_id]
+            end_idx = self.slot_id_to_index[end_slot_id]
+        except KeyError:
+            print(f"Error: Slot ID {start_slot_id} or {end_slot_id} not found.")
+            return []
+        
+        if start_idx > end_idx:
+            return []
+        
+        blocks = []
+        current_block_start = start_idx
+        
+        for i in range(start_idx, end_idx + 1):
+            if self.slot_layout[i][2]:
+                if current_block_start < i:
+                    blocks.append((current_block_start, i - 1))
+                current_block_start = i + 1
+        
+        if current_block_start <= end_idx:
+            blocks.append((current_block_start, end_idx))
+        
+        return blocks
+
+@functools.lru_cache(maxsize=None)
+def get_grid_layout(days: Tuple[int, ...] = DEFAULT_DAYS, shifts: Tuple[str, ...] = DEFAULT_SHIFTS) -> GridLayout:
+    return GridLayout(days, shifts)
+
+DEFAULT_GRID_LAYOUT = get_grid_layout()
+
+def grid_for_blocks(blocks: Iterable[Tuple]) -> Tuple[Tuple[int, ...], Tuple[str, ...]]:
+    days = set()
+    shift_positions = set()
+    for day_idx, start_slot, end_slot, *_ in blocks:
+        days.add(day_idx)
+        # A block may run across shifts (T6-N1): every shift it covers must be on the grid
+        shift_positions.update(range(SHIFTS.index(start_slot[0]), SHIFTS.index(end_slot[0]) + 1))
+    if not days:
+        return DEFAULT_DAYS, DEFAULT_SHIFTS
+    return tuple(sorted(days)), tuple(SHIFTS[i] for i in sorted(shift_positions))
+
+def parse_horario_to_slots(horario_str: str) -> List[Tuple[str, str, str]]:
+    day_mapping = {
+        'Segunda': 'Seg',
+        'Terça': 'Ter', 
+        'Quarta': 'Qua',
+        'Quinta': 'Qui',
+        'Sexta': 'Sex',
+        'Sábado': 'Sab',
+        'Domingo': 'Dom'
+    }
+    
+    slots = []
+    
+    horario_parts = horario_str.split(' | ')
+    
+    for part in horario_parts:
+        match = re.match(r'([^0-9]+)\s+(.+)', part.strip())
+        if not match:
+            continue
+            
+        dias_str, horarios_str = match.groups()
+        dias = [d.strip() for d in dias_str.split('/')]
+        horarios = [h.strip() for h in horarios_str.split('/')]
+        
+        for dia in dias:
+            day_abbrev = day_mapping.get(dia, dia)
+            
+            if day_abbrev not in DAYS_OF_WEEK:
+                continue
+            
+            slot_ids = []
+            for horario in horarios:
+                time_match = re.match(r'(\d{2}:\d{2})-\d{2}:\d{2}', horario)
+                if time_match:
+                    start_time = time_match.group(1)
+                    if start_time in START_TIME_TO_SLOT:
+                        slot_ids.append(START_TIME_TO_SLOT[start_time])
+            
+            if len(slot_ids) >= 1:
+                slot_ids_sorted = sorted(slot_ids, key=lambda x: SLOT_ID_TO_INDEX.get(x, 999))
+                
+                i = 0
+                while i < len(slot_ids_sorted):
+                    start_slot = slot_ids_sorted[i]
+                    end_slot = start_slot
+                    
+                    j = i + 1
+                    while j < len(slot_ids_sorted):
+                        current_idx = SLOT_ID_TO_INDEX[slot_ids_sorted[j]]
+                        end_idx = SLOT_ID_TO_INDEX[end_slot]
+                        
+                        if current_idx == end_idx + 1 or (current_idx > end_idx and current_idx <= end_idx + 2):
+                            end_slot = slot_ids_sorted[j]
+                            j += 1
+                        else:
+                            break
+                    
+                    slots.append((day_abbrev, start_slot, end_slot))
+                    i = j
+    
+    return slots
+
+def index_allocations(alocacoes_resultado) -> List[Dict[str, Any]]:
+    from app.models.domain import AlocacaoResultado
+    
+    if not isinstance(alocacoes_resultado, AlocacaoResultado) or not alocacoes_resultado.sucesso:
+        print("Resultado de alocação inválido ou sem sucesso")
+        return []
+    
+    # Each distinct horario (a category of the result table) is parsed once; 'row' points back to
+    # the table, so every grouping (room, professor, curriculum...) reuses the entries
+    horarios = alocacoes_resultado.tabela['horario']
+    slots_by_code = [parse_horario_to_slots(horario) for horario in horarios.cat.categories]
+    index = []
+    for row, (alocacao, code) in enumerate(zip(alocacoes_resultado.alocacoes, horarios.cat.codes)):
+        materia = alocacao.materia
+        sala = alocacao.sala
+        
+        slots = slots_by_code[code]
+        
+        if not slots:
+            print(f"Warning: Could not parse horario '{materia.horario}' for materia '{materia.nome}'")
+            continue
+        
+        index.append({'materia': materia, 'sala': sala, 'slots': slots, 'row': row})
+    
+    return index
+
+def make_course_entry(materia, sala, slots) -> Dict[str, Any]:
+    material_label = {0: "", 1: " [COMP]", 2: " [ROB]", 3: " [ELET]"}.get(materia.material, "")
+    
+    return {
+        'id': materia.id,
+        'name': materia.nome + material_label,
+        'room_info': f"{sala.nome} ({materia.inscritos} alunos)",
+        'slots': slots,
+        'material': materia.material
+    }
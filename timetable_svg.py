@@ -0,0 +1,194 @@
+import functools
+import textwrap
+from typing import Dict, List, Tuple, Any, Optional
+from xml.sax.saxutils import escape
+import numpy as np
+from timetable_layout import (
+    PAGE_WIDTH, PAGE_HEIGHT, MARGIN_TOP, MARGIN_LEFT, HEADER_HEIGHT, DAY_LABEL_WIDTH, TIMESLOT_HEADER_HEIGHT,
+    GRID_X_START, GRID_Y_START, GRID_WIDTH, GRID_HEIGHT, DAYS_OF_WEEK, GridLayout, get_grid_layout,
+    grid_for_blocks, assign_course_colors, index_allocations, make_course_entry,
+)
+
+# Lightweight preview renderer: same layout tables as the PDF, plain SVG strings, no ReportLab
+
+SVG_FONT_FAMILY = "Helvetica, Arial, sans-serif"
+COURSE_FONT_SIZE = 7
+COURSE_LINE_HEIGHT = 8.5
+COURSE_BLOCK_PADDING = 1
+MAX_COURSE_NAME_LENGTH = 40
+CONFLICT_COLOR = "#d00000"
+GRID_TOP = PAGE_HEIGHT - GRID_Y_START  # SVG y grows downwards
+
+def svg_rgb(rgb: Tuple[float, float, float]) -> str:
+    return "#%02x%02x%02x" % tuple(int(round(channel * 255)) for channel in rgb)
+
+@functools.lru_cache(maxsize=None)
+def svg_grid_background(layout: GridLayout) -> str:
+    # Drawn once per layout and reused by every room, like the PDF form XObject
+    header_top = GRID_TOP - TIMESLOT_HEADER_HEIGHT
+    grid_right = GRID_X_START + GRID_WIDTH
+    parts = ['<g stroke="#000" stroke-width="1">']
+    parts.append(f'<line x1="{MARGIN_LEFT:.2f}" y1="{header_top:.2f}" x2="{grid_right:.2f}" y2="{header_top:.2f}"/>')
+    for row in range(len(layout.days) + 1):
+        y = GRID_TOP + row * layout.row_height
+        parts.append(f'<line x1="{MARGIN_LEFT:.2f}" y1="{y:.2f}" x2="{grid_right:.2f}" y2="{y:.2f}"/>')
+    for x in [MARGIN_LEFT, GRID_X_START] + [col_x + col_width for col_x, col_width, _ in layout.slot_layout]:
+        parts.append(f'<line x1="{x:.2f}" y1="{header_top:.2f}" x2="{x:.2f}" y2="{GRID_TOP + GRID_HEIGHT:.2f}"/>')
+    parts.append('</g>')
+
+    parts.append(f'<g font-family="{SVG_FONT_FAMILY}" text-anchor="middle">')
+    for row, day_idx in enumerate(layout.days):
+        y = GRID_TOP + (row + 0.5) * layout.row_height
+        parts.append(f'<text x="{MARGIN_LEFT + DAY_LABEL_WIDTH / 2:.2f}" y="{y:.2f}" font-size="11" '
+                     f'font-weight="bold" dominant-baseline="middle">{DAYS_OF_WEEK[day_idx]}</text>')
+    for (col_x, col_width, is_interval), (_, label_l1, label_l2, _) in zip(layout.slot_layout, layout.slot_defs):
+        x = col_x + col_width / 2
+        if is_interval:
+            parts.append(f'<text x="{x:.2f}" y="{header_top + 14:.2f}" font-size="6">{escape(label_l1)}</text>')
+        else:
+            parts.append(f'<text x="{x:.2f}" y="{header_top + 14:.2f}" font-size="8" font-weight="bold">'
+                         f'{label_l1}</text>')
+            parts.append(f'<text x="{x:.2f}" y="{header_top + 24:.2f}" font-size="7">{label_l2}</text>')
+    parts.append('</g>')
+    return ''.join(parts)
+
+def build_slot_table(index: List[Dict[str, Any]], layout: GridLayout,
+                     rooms: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # One row per block rectangle (room, day row, first and last column, index entry), already split
+    # at the interval columns and ordered by room, then by index entry like the PDF draws them
+    room_rows = {room: i for i, room in enumerate(rooms)}
+    table = []
+    for entry_idx, entry in enumerate(index):
+        room = room_rows[entry['sala'].nome]
+        for day_str, start_slot, end_slot in entry['slots']:
+            row = layout.day_rows.get(DAYS_OF_WEEK.index(day_str))
+            if row is None or start_slot not in layout.slot_id_to_index or end_slot not in layout.slot_id_to_index:
+                continue
+            for start_col, end_col in layout.course_blocks_with_intervals(start_slot, end_slot):
+                table.append((room, row, start_col, end_col, entry_idx))
+    table = np.array(table, dtype=np.int64).reshape(-1, 5)
+    table = table[np.argsort(table[:, 0], kind='stable')]
+    return tuple(table.T)
+
+def build_occupancy(slot_table: Tuple[np.ndarray, ...], layout: GridLayout, num_rooms: int) -> np.ndarray:
+    # rooms x days x columns, holding how many courses use each cell; more than one is a conflict
+    room_idx, rows, start_cols, end_cols, _ = slot_table
+    changes = np.zeros((num_rooms, len(layout.days), len(layout.slot_defs) + 1), dtype=np.int32)
+    np.add.at(changes, (room_idx, rows, start_cols), 1)
+    np.add.at(changes, (room_idx, rows, end_cols + 1), -1)
+    return np.cumsum(changes, axis=2)[..., :-1]
+
+def extract_runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # Runs of set cells along each row; one pass over every room at once
+    previous = np.zeros_like(mask)
+    previous[..., 1:] = mask[..., :-1]
+    following = np.zeros_like(mask)
+    following[..., :-1] = mask[..., 1:]
+    room_idx, rows, start_cols = np.nonzero(mask & ~previous)
+    end_cols = np.nonzero(mask & ~following)[2]
+    return room_idx, rows, start_cols, end_cols
+
+def svg_course_block(x: float, y: float, width: float, height: float, course: Dict[str, Any],
+                     rgb: Tuple[float, float, float]) -> str:
+    text_color = "#fff" if sum(rgb) < 1.5 else "#000"
+    name = course['name']
+    display_name = name if len(name) <= MAX_COURSE_NAME_LENGTH else name[:MAX_COURSE_NAME_LENGTH] + "..."
+
+    chars_per_line = max(4, int((width - 4) / (COURSE_FONT_SIZE * 0.5)))
+    max_lines = max(1, int((height - 4) / COURSE_LINE_HEIGHT) - 2)
+    lines = textwrap.wrap(display_name, chars_per_line)[:max_lines] + ['', course['room_info']]
+    first_y = y + height / 2 - (len(lines) - 1) * COURSE_LINE_HEIGHT / 2
+    tspans = []
+    for i, line in enumerate(lines):
+        if not line:
+            continue
+        weight = ' font-weight="bold"' if i == len(lines) - 1 else ''
+        tspans.append(f'<tspan x="{x + width / 2:.2f}" y="{first_y + i * COURSE_LINE_HEIGHT:.2f}"{weight}>'
+                      f'{escape(line)}</tspan>')
+
+    pad = COURSE_BLOCK_PADDING
+    return (f'<g><title>{escape(name)}</title>'
+            f'<rect x="{x + pad:.2f}" y="{y + pad:.2f}" width="{width - 2 * pad:.2f}" height="{height - 2 * pad:.2f}" '
+            f'fill="{svg_rgb(rgb)}" stroke="#a9a9a9"/>'
+            f'<text font-family="{SVG_FONT_FAMILY}" font-size="{COURSE_FONT_SIZE}" text-anchor="middle" '
+            f'dominant-baseline="middle" fill="{text_color}">{"".join(tspans)}</text></g>')
+
+def svg_conflict_mark(x: float, y: float, width: float, height: float, names: List[str]) -> str:
+    return (f'<g class="conflito"><title>{escape("Conflito: " + ", ".join(dict.fromkeys(names)))}</title>'
+            f'<rect x="{x + 0.5:.2f}" y="{y + 0.5:.2f}" width="{width - 1:.2f}" height="{height - 1:.2f}" '
+            f'fill="none" stroke="{CONFLICT_COLOR}" stroke-width="2" stroke-dasharray="4 2"/></g>')
+
+def render_room_svgs(alocacoes_resultado, index: Optional[List[Dict[str, Any]]] = None) -> Dict[str, str]:
+    if index is None:
+        index = index_allocations(alocacoes_resultado)
+    if not index:
+        return {}
+
+    rooms_by_name = {entry['sala'].nome: entry['sala'] for entry in index}
+    rooms = sorted(rooms_by_name)
+    # Same document-wide grid as the PDF: only the days and shifts holding a course
+    layout = get_grid_layout(*grid_for_blocks(
+        (DAYS_OF_WEEK.index(day_str), start_slot, end_slot)
+        for entry in index for day_str, start_slot, end_slot in entry['slots']
+    ))
+
+    slot_table = build_slot_table(index, layout, rooms)
+    room_idx, rows, start_cols, end_cols, entry_idx = slot_table
+    col_left = np.array([col_x for col_x, _, _ in layout.slot_layout])
+    col_right = col_left + np.array([col_width for _, col_width, _ in layout.slot_layout])
+    block_x = col_left[start_cols]
+    block_width = col_right[end_cols] - block_x
+    block_y = GRID_TOP + rows * layout.row_height
+    room_bounds = np.searchsorted(room_idx, np.arange(len(rooms) + 1))
+
+    # Overlapping courses are all drawn, as on the PDF page, and the shared cells are outlined
+    conflict_room, conflict_rows, conflict_start, conflict_end = extract_runs(
+        build_occupancy(slot_table, layout, len(rooms)) > 1)
+    conflict_bounds = np.searchsorted(conflict_room, np.arange(len(rooms) + 1))
+
+    courses = [make_course_entry(entry['materia'], entry['sala'], entry['slots']) for entry in index]
+    background = svg_grid_background(layout)
+    course_ids_by_room: Dict[str, List[str]] = {}
+    for entry in index:
+        course_ids_by_room.setdefault(entry['sala'].nome, []).append(entry['materia'].id)
+    svgs = {}
+    for r, room in enumerate(rooms):
+        sala = rooms_by_name[room]
+        # Same per-room colours as the PDF page
+        course_colors = assign_course_colors(course_ids_by_room[room])
+        location_info = f"{sala.tipo.value.upper()} - Capacidade: {sala.capacidade}"
+        if sala.local.value == 'im':
+            location_info += f" - Instituto de Matemática (Custo: R$ {sala.custo_adicional:.2f})"
+        room_blocks = range(room_bounds[r], room_bounds[r + 1])
+        blocks = ''.join(
+            svg_course_block(block_x[b], block_y[b], block_width[b], layout.row_height, courses[entry_idx[b]],
+                             course_colors[courses[entry_idx[b]]['id']])
+            for b in room_blocks
+        )
+        for c in range(conflict_bounds[r], conflict_bounds[r + 1]):
+            names = [courses[entry_idx[b]]['name'] for b in room_blocks
+                     if rows[b] == conflict_rows[c] and start_cols[b] <= conflict_end[c]
+                     and end_cols[b] >= conflict_start[c]]
+            x = col_left[conflict_start[c]]
+            blocks += svg_conflict_mark(x, GRID_TOP + conflict_rows[c] * layout.row_height,
+                                        col_right[conflict_end[c]] - x, layout.row_height, names)
+        svgs[room] = (
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {PAGE_WIDTH:.0f} {PAGE_HEIGHT:.0f}" '
+            f'width="100%" style="background:#fff">'
+            f'<text x="{MARGIN_LEFT:.2f}" y="{MARGIN_TOP + 16:.2f}" font-family="{SVG_FONT_FAMILY}" font-size="16" '
+            f'font-weight="bold">{escape("Sala: " + room)}</text>'
+            f'<text x="{MARGIN_LEFT:.2f}" y="{MARGIN_TOP + HEADER_HEIGHT - 14:.2f}" font-family="{SVG_FONT_FAMILY}" '
+            f'font-size="10">{escape(location_info)}</text>'
+            f'{background}{blocks}</svg>'
+        )
+    return svgs
+
+def render_timetable_html(alocacoes_resultado, svgs: Optional[Dict[str, str]] = None) -> str:
+    if svgs is None:
+        svgs = render_room_svgs(alocacoes_resultado)
+    rooms = ''.join(f'<section><h2>{escape(room)}</h2>{svg}</section>' for room, svg in svgs.items())
+    return ('<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">'
+            '<title>Horário de Alocação de Salas</title>'
+            f'<style>body{{font-family:{SVG_FONT_FAMILY};max-width:1200px;margin:auto}}'
+            'section{page-break-after:always;margin-bottom:2em}</style>'
+            f'</head><body>{rooms}</body></html>')